@@ -0,0 +1,312 @@
+'use client';
+
+import { useCallback, useEffect, type ReactNode } from 'react';
+
+import type { ResearchHeading } from './ResearchTree';
+
+const PRINT_STYLES = `
+@page {
+    margin: 3.5cm 2.5cm;
+    size: A4;
+}
+
+@media print {
+    *, *::before, *::after {
+        background: transparent !important;
+    }
+    html, body {
+        background: white !important;
+        color: #1a1a1a !important;
+        font-size: 11pt !important;
+        line-height: 1.6 !important;
+        -webkit-print-color-adjust: exact !important;
+        print-color-adjust: exact !important;
+        height: auto !important;
+        min-height: auto !important;
+        margin: 0 !important;
+        padding: 0 !important;
+    }
+
+    .no-print {
+        display: none !important;
+    }
+
+    /* Reset wrapper layout for print */
+    .min-h-screen {
+        min-height: 0 !important;
+    }
+    .py-16 {
+        padding-top: 0 !important;
+        padding-bottom: 0 !important;
+    }
+
+    /* Cover page */
+    .research-cover {
+        display: flex !important;
+        color: #1a1a1a !important;
+        page-break-after: always !important;
+        break-after: page !important;
+    }
+    .research-cover .cover-logo {
+        filter: grayscale(100%) contrast(1.2) !important;
+    }
+
+    /* Content area */
+    .research-content {
+        color: #1a1a1a !important;
+    }
+
+    /* Headings */
+    .research-content h1 {
+        font-size: 20pt !important;
+        color: #000 !important;
+        margin-top: 0 !important;
+        margin-bottom: 16pt !important;
+        line-height: 1.2 !important;
+    }
+    .research-content h2 {
+        font-size: 15pt !important;
+        color: #000 !important;
+        margin-top: 24pt !important;
+        margin-bottom: 10pt !important;
+        line-height: 1.25 !important;
+        page-break-after: avoid !important;
+        break-after: avoid !important;
+    }
+    .research-content h3 {
+        font-size: 12pt !important;
+        color: #1a1a1a !important;
+        margin-top: 18pt !important;
+        margin-bottom: 8pt !important;
+        page-break-after: avoid !important;
+        break-after: avoid !important;
+    }
+    .research-content h4 {
+        font-size: 11pt !important;
+        color: #333 !important;
+        margin-top: 14pt !important;
+        margin-bottom: 6pt !important;
+        page-break-after: avoid !important;
+        break-after: avoid !important;
+    }
+
+    /* Body text */
+    .research-content p {
+        color: #1a1a1a !important;
+        font-size: 10.5pt !important;
+        line-height: 1.65 !important;
+        margin-bottom: 8pt !important;
+        orphans: 3 !important;
+        widows: 3 !important;
+    }
+
+    /* Links */
+    .research-content a {
+        color: #1a1a1a !important;
+        text-decoration: underline !important;
+        text-underline-offset: 2px !important;
+    }
+
+    /* Lists */
+    .research-content ul,
+    .research-content ol {
+        color: #1a1a1a !important;
+        font-size: 10.5pt !important;
+        margin-bottom: 8pt !important;
+        padding-left: 20pt !important;
+    }
+    .research-content li {
+        color: #1a1a1a !important;
+        line-height: 1.6 !important;
+        margin-bottom: 3pt !important;
+    }
+
+    /* Blockquotes */
+    .research-content blockquote {
+        border-left: 2pt solid #999 !important;
+        padding-left: 12pt !important;
+        margin: 10pt 0 !important;
+        color: #444 !important;
+        font-style: italic !important;
+    }
+    .research-content blockquote p {
+        color: #444 !important;
+    }
+
+    /* Code */
+    .research-content pre {
+        background: #f7f7f7 !important;
+        border: 1px solid #ddd !important;
+        padding: 10pt !important;
+        margin: 10pt 0 !important;
+        font-size: 9pt !important;
+        line-height: 1.5 !important;
+        page-break-inside: avoid !important;
+        break-inside: avoid !important;
+    }
+    .research-content code {
+        background: #f0f0f0 !important;
+        border: none !important;
+        color: #333 !important;
+        font-size: 9pt !important;
+        padding: 1pt 3pt !important;
+    }
+
+    /* Bold and emphasis */
+    .research-content strong {
+        color: #000 !important;
+        font-weight: 700 !important;
+    }
+    .research-content em {
+        color: #1a1a1a !important;
+    }
+
+    /* Horizontal rules */
+    .research-content hr {
+        border: none !important;
+        border-top: 0.5pt solid #ccc !important;
+        margin: 20pt 0 !important;
+    }
+
+    /* Tables */
+    .research-content table {
+        border-collapse: collapse !important;
+        width: 100% !important;
+        font-size: 9.5pt !important;
+        margin: 10pt 0 !important;
+        page-break-inside: avoid !important;
+        break-inside: avoid !important;
+    }
+    .research-content th {
+        background: #f0f0f0 !important;
+        border: 0.5pt solid #ccc !important;
+        padding: 5pt 8pt !important;
+        color: #1a1a1a !important;
+        font-weight: 600 !important;
+        text-align: left !important;
+    }
+    .research-content td {
+        border: 0.5pt solid #ccc !important;
+        padding: 5pt 8pt !important;
+        color: #1a1a1a !important;
+    }
+}
+`;
+
+export interface ResearchFrameProps {
+    title?: string;
+    /** the rendered document */
+    children: ReactNode;
+    toc?: ResearchHeading[];
+    wordCount?: number;
+    readingMinutes?: number;
+}
+
+/**
+ * Cover page, print styles, "Export PDF" button and table of contents around
+ * a research document. The document itself is rendered by the caller, so the
+ * markdown renderer stays out of the client bundle.
+ */
+export default function ResearchFrame({
+    title,
+    children,
+    toc,
+    wordCount,
+    readingMinutes,
+}: ResearchRendererProps) {
+    const handlePrint = useCallback(() => {
+        window.print();
+    }, []);
+
+    useEffect(() => {
+        const style = document.createElement('style');
+        style.textContent = PRINT_STYLES;
+        document.head.appendChild(style);
+        return () => {
+            document.head.removeChild(style);
+        };
+    }, []);
+
+    return (
+        <>
+            {title && (
+                <div className="research-cover hidden flex-col items-center justify-center text-center" style={{ height: '100vh' }}>
+                    {/* eslint-disable-next-line @next/next/no-img-element */}
+                    <img
+                        src="/piatra-institute.png"
+                        alt="piatra.institute"
+                        className="cover-logo"
+                        style={{ width: 140, height: 140, marginBottom: 12 }}
+                    />
+                    <div style={{
+                        fontSize: '13pt',
+                        fontWeight: 700,
+                        letterSpacing: '0.15em',
+                        textTransform: 'uppercase' as const,
+                        marginBottom: 80,
+                    }}>
+                        PIATRA . INSTITUTE
+                    </div>
+                    <div style={{
+                        fontSize: '9pt',
+                        fontWeight: 400,
+                        letterSpacing: '0.3em',
+                        textTransform: 'uppercase' as const,
+                        color: '#888',
+                        marginBottom: 16,
+                    }}>
+                        PLAYGROUND
+                    </div>
+                    <div className="font-serif" style={{
+                        fontSize: '18pt',
+                        fontWeight: 400,
+                        letterSpacing: '0.05em',
+                        textTransform: 'uppercase' as const,
+                        maxWidth: 400,
+                        lineHeight: 1.3,
+                    }}>
+                        {title}
+                    </div>
+                </div>
+            )}
+
+            <div className="no-print flex items-center justify-end gap-4 mb-8">
+                {wordCount !== undefined && (
+                    <span className="mr-auto text-sm text-gray-500 font-serif">
+                        {wordCount.toLocaleString('en-US')} words{readingMinutes ? ` · ${readingMinutes} min read` : ''}
+                    </span>
+                )}
+                <button
+                    onClick={handlePrint}
+                    className="px-4 py-2 text-sm text-lime-400 border border-lime-500/30 hover:border-lime-500 hover:bg-lime-500/10 transition-colors cursor-pointer"
+                >
+                    Export PDF
+                </button>
+            </div>
+
+            {toc && toc.length > 0 && (
+                <nav className="no-print border border-lime-500/20 p-4 mb-10 font-serif">
+                    <div className="text-sm uppercase tracking-widest text-lime-400 mb-3">
+                        contents
+                    </div>
+                    <ol className="space-y-1 text-sm">
+                        {toc.map((heading) => (
+                            <li key={heading.id} className={heading.depth > 2 ? 'ml-4' : ''}>
+                                <a
+                                    href={`#${heading.id}`}
+                                    className="text-gray-400 hover:text-lime-300 transition-colors"
+                                >
+                                    {heading.text}
+                                </a>
+                            </li>
+                        ))}
+                    </ol>
+                </nav>
+            )}
+
+            <div className="research-content">
+                {children}
+            </div>
+        </>
+    );
+}
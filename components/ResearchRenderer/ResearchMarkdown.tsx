@@ -0,0 +1,20 @@
+import Markdown from 'react-markdown';
+import remarkGfm from 'remark-gfm';
+
+import { RESEARCH_COMPONENTS } from './components';
+
+
+/**
+ * Parses and renders a research document from markdown, for pages without a
+ * pre-rendered research/content.json. No hooks, so it renders on the server.
+ */
+export default function ResearchMarkdown({ content }: { content: string }) {
+    return (
+        <Markdown
+            remarkPlugins={[remarkGfm]}
+            components={RESEARCH_COMPONENTS}
+        >
+            {content}
+        </Markdown>
+    );
+}
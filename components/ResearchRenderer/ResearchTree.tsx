@@ -0,0 +1,50 @@
+import { createElement, Fragment, type ElementType, type ReactNode } from 'react';
+import type { Components } from 'react-markdown';
+
+import { RESEARCH_COMPONENTS } from './components';
+
+
+/**
+ * A node of a pre-rendered research document (research/content.json):
+ * a string is text, an object an element with optional props and children.
+ */
+export type ResearchNode = string | {
+    t: string;
+    p?: Record<string, string | number>;
+    c?: ResearchNode[];
+};
+
+export interface ResearchHeading {
+    depth: number;
+    id: string;
+    text: string;
+}
+
+/** research/content.json, written by scripts/researcher next to content.md */
+export interface ResearchArtifact {
+    version: number;
+    toc: ResearchHeading[];
+    wordCount: number;
+    readingMinutes: number;
+    tree: ResearchNode[];
+}
+
+
+function renderNode(node: ResearchNode, key: number): ReactNode {
+    if (typeof node === 'string') {
+        return node;
+    }
+
+    // Styled elements where the markdown renderer has them, plain tags otherwise
+    const component = (RESEARCH_COMPONENTS[node.t as keyof Components] ?? node.t) as ElementType;
+    return createElement(component, { key, ...node.p }, node.c?.map(renderNode));
+}
+
+
+/**
+ * Renders a pre-rendered research document with the same styled elements as
+ * the markdown renderer, without parsing markdown at build or request time.
+ */
+export default function ResearchTree({ nodes }: { nodes: ResearchNode[] }) {
+    return <Fragment>{nodes.map(renderNode)}</Fragment>;
+}
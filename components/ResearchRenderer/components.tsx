@@ -0,0 +1,115 @@
+import type { Components } from 'react-markdown';
+
+
+/**
+ * Styled elements for research documents, shared by the markdown renderer
+ * and the pre-rendered tree (no hooks, so usable from server components).
+ */
+export const RESEARCH_COMPONENTS: Components = {
+    h1: ({ id, children }) => (
+        <h1 id={id} className="text-3xl font-serif text-white mt-12 mb-6 first:mt-0">
+            {children}
+        </h1>
+    ),
+    h2: ({ id, children }) => (
+        <h2 id={id} className="text-2xl font-serif text-lime-400 mt-10 mb-4">
+            {children}
+        </h2>
+    ),
+    h3: ({ id, children }) => (
+        <h3 id={id} className="text-xl font-serif text-lime-400 mt-8 mb-3">
+            {children}
+        </h3>
+    ),
+    h4: ({ id, children }) => (
+        <h4 id={id} className="text-lg font-serif text-lime-400/80 mt-6 mb-2">
+            {children}
+        </h4>
+    ),
+    p: ({ children }) => (
+        <p className="text-gray-300 font-serif text-base leading-relaxed mb-4">
+            {children}
+        </p>
+    ),
+    a: ({ href, children }) => {
+        // In-page links (table of contents, section anchors) stay in the tab
+        const external = !href?.startsWith('#');
+        return (
+            <a
+                href={href}
+                target={external ? '_blank' : undefined}
+                rel={external ? 'noopener noreferrer' : undefined}
+                className="text-lime-400 hover:text-lime-300 underline underline-offset-2 decoration-lime-500/30 hover:decoration-lime-400 transition-colors"
+            >
+                {children}
+            </a>
+        );
+    },
+    blockquote: ({ children }) => (
+        <blockquote className="border-l-2 border-lime-500/50 pl-4 my-4 italic text-gray-400">
+            {children}
+        </blockquote>
+    ),
+    ul: ({ children }) => (
+        <ul className="list-disc list-outside ml-6 mb-4 space-y-1 text-gray-300 font-serif">
+            {children}
+        </ul>
+    ),
+    ol: ({ start, children }) => (
+        <ol start={start} className="list-decimal list-outside ml-6 mb-4 space-y-1 text-gray-300 font-serif">
+            {children}
+        </ol>
+    ),
+    li: ({ children }) => (
+        <li className="leading-relaxed">{children}</li>
+    ),
+    code: ({ className, children }) => {
+        const isBlock = className?.includes('language-');
+        if (isBlock) {
+            return (
+                <code className="text-sm text-lime-200/80">
+                    {children}
+                </code>
+            );
+        }
+        return (
+            <code className="bg-[#0a0a0a] border border-lime-500/20 px-1.5 py-0.5 text-sm text-lime-300 font-mono">
+                {children}
+            </code>
+        );
+    },
+    pre: ({ children }) => (
+        <pre className="bg-[#0a0a0a] border border-lime-500/20 p-4 my-4 overflow-x-auto text-sm font-mono">
+            {children}
+        </pre>
+    ),
+    hr: () => (
+        <hr className="border-lime-500/20 my-8" />
+    ),
+    strong: ({ children }) => (
+        <strong className="text-lime-100 font-semibold">{children}</strong>
+    ),
+    em: ({ children }) => (
+        <em className="text-gray-200">{children}</em>
+    ),
+    table: ({ children }) => (
+        <div className="overflow-x-auto my-6">
+            <table className="w-full border-collapse border border-lime-500/20 text-sm">
+                {children}
+            </table>
+        </div>
+    ),
+    thead: ({ children }) => (
+        <thead className="bg-lime-500/10">{children}</thead>
+    ),
+    th: ({ children }) => (
+        <th className="border border-lime-500/20 px-3 py-2 text-left text-lime-200 font-serif">
+            {children}
+        </th>
+    ),
+    td: ({ children }) => (
+        <td className="border border-lime-500/20 px-3 py-2 text-gray-300 font-serif">
+            {children}
+        </td>
+    ),
+};
@@ -57,11 +57,34 @@ const runPiatraBench = () => {
 };
 
 
+const researchSearchIndex = './public/research-search/docs.json';
+
+const buildResearchSearchIndex = () => {
+    // researcher.py's dependencies live in its own uv project, not the repo root
+    try {
+        execSync(
+            'uv run --project scripts/researcher python scripts/researcher/researcher.py --build-search-index',
+            { stdio: 'inherit' },
+        );
+        return;
+    } catch (error) {
+        console.error(`\n!!! research search index build failed: ${error.message}`);
+    }
+
+    if (!fs.existsSync(researchSearchIndex)) {
+        console.error(`!!! ${researchSearchIndex} is missing, so the site would ship without a research search index. Aborting the build.\n`);
+        process.exit(1);
+    }
+    console.error(`!!! Keeping the existing, possibly stale, index in ${researchSearchIndex}.\n`);
+};
+
+
 const main = async () => {
     for (const { type, dataFile, link } of dataFiles) {
         await fetchData(type, dataFile, link);
     }
     runPiatraBench();
+    buildResearchSearchIndex();
 }
 
 main();
@@ -0,0 +1,221 @@
+"""
+Content-addressed archive of research runs.
+
+Every text that goes into or comes out of a run (context, prompt, provider
+reports, content.md, suggestions.md) is stored once, keyed by its SHA-256, under
+<RESEARCHER_HOME>/archive/blobs/. Blobs are shared across playgrounds, so disk
+use only grows by what actually changed between runs.
+
+A run index (archive/runs.jsonl) records which inputs produced which outputs,
+so any past run can be restored, or re-synthesized from its archived provider
+reports, without another deep research call.
+"""
+
+import hashlib
+import json
+import os
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+
+from config import RESEARCHER_HOME
+from fileio import (
+    CODEC_SUFFIXES,
+    DEFAULT_CODEC,
+    file_lock,
+    open_compressed_text,
+    private_temp_path,
+    read_compressed_text,
+)
+from providers.base import ResearchResult
+
+
+ARCHIVE_DIR = RESEARCHER_HOME / "archive"
+
+CHUNK_SIZE = 1 << 16  # characters
+
+
+@dataclass
+class RunRecord:
+    """One research run: its inputs, provider reports and outputs, by blob hash."""
+    run_id: str
+    playground: str
+    created_at: float
+    focus: str | None = None
+    queries: list[str] = field(default_factory=list)
+    inputs: dict[str, str] = field(default_factory=dict)  # "context", "prompt" -> hash
+    providers: dict[str, dict] = field(default_factory=dict)  # name -> {model, blob, duration, usage}
+    outputs: dict[str, str] = field(default_factory=dict)  # "content.md", "suggestions.md" -> hash
+    fingerprint: dict[str, str] = field(default_factory=dict)  # input name -> hash (staleness.Fingerprint)
+    tier: str = ""
+
+
+class ResearchArchive:
+    """Blob store plus run index."""
+
+    def __init__(self, root: Path = ARCHIVE_DIR):
+        self.root = root
+        self.blob_dir = root / "blobs"
+        self.index_path = root / "runs.jsonl"
+
+    # ── Blobs ────────────────────────────────────────────────────────────
+
+    def blob_path(self, digest: str) -> Path | None:
+        """Path of a stored blob, whichever codec it was written with."""
+        for suffix in CODEC_SUFFIXES.values():
+            path = self.blob_dir / digest[:2] / f"{digest[2:]}{suffix}"
+            if path.exists():
+                return path
+        return None
+
+    def put_text(self, text: str) -> str:
+        """Store a text blob (no-op if already present) and return its hash."""
+        digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        if self.blob_path(digest) is None:
+            self._write_blob(digest, [text])
+        return digest
+
+    def put_file(self, path: Path) -> str:
+        """
+        Store the text of a (possibly compressed) file without loading it whole.
+
+        The file is read twice in chunks: once to hash it, and only if the hash
+        is new, once more to write the blob.
+        """
+        hasher = hashlib.sha256()
+        for chunk in self._chunks(path):
+            hasher.update(chunk.encode("utf-8"))
+        digest = hasher.hexdigest()
+        if self.blob_path(digest) is None:
+            self._write_blob(digest, self._chunks(path))
+        return digest
+
+    def get_text(self, digest: str) -> str:
+        path = self.blob_path(digest)
+        if path is None:
+            raise KeyError(f"Blob not found in archive: {digest}")
+        return read_compressed_text(path)
+
+    def _chunks(self, path: Path):
+        with open_compressed_text(path) as f:
+            while chunk := f.read(CHUNK_SIZE):
+                yield chunk
+
+    def _write_blob(self, digest: str, chunks) -> None:
+        path = self.blob_dir / digest[:2] / f"{digest[2:]}{CODEC_SUFFIXES[DEFAULT_CODEC]}"
+        # Unique per writer: two runs archiving the same report must not
+        # write into one temp file, or the rename could publish a torn blob
+        tmp_path = private_temp_path(path)
+        try:
+            with open_compressed_text(tmp_path, "w", codec=DEFAULT_CODEC) as f:
+                for chunk in chunks:
+                    f.write(chunk)
+            os.replace(tmp_path, path)
+        finally:
+            tmp_path.unlink(missing_ok=True)
+
+    # ── Run index ────────────────────────────────────────────────────────
+
+    def new_run_id(self, playground: str) -> str:
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        suffix = hashlib.sha256(f"{playground}{time.time_ns()}".encode()).hexdigest()[:6]
+        return f"{stamp}-{suffix}"
+
+    def record_run(self, record: RunRecord) -> None:
+        """Append a run to the index."""
+        self.root.mkdir(parents=True, exist_ok=True)
+        with file_lock(self.root / ".lock"):
+            with self.index_path.open("a") as f:
+                f.write(json.dumps(asdict(record)) + "\n")
+
+    def runs(self, playground: str | None = None) -> list[RunRecord]:
+        """All recorded runs, oldest first, optionally for one playground."""
+        if not self.index_path.exists():
+            return []
+        records = []
+        for line in self.index_path.read_text().splitlines():
+            if not line.strip():
+                continue
+            record = RunRecord(**json.loads(line))
+            if playground is None or record.playground == playground:
+                records.append(record)
+        return records
+
+    def get_run(self, run_id: str, playground: str | None = None) -> RunRecord:
+        """
+        Look up a run by id (or unique id prefix).
+
+        Raises:
+            KeyError: If no run, or more than one, matches.
+        """
+        matches = [r for r in self.runs(playground) if r.run_id.startswith(run_id)]
+        if len(matches) != 1:
+            raise KeyError(
+                f"No run matching '{run_id}'." if not matches
+                else f"Run id '{run_id}' is ambiguous ({len(matches)} matches)."
+            )
+        return matches[0]
+
+    def archive_run(
+        self,
+        playground: str,
+        context: str,
+        prompt: str,
+        queries: list[str],
+        focus: str | None,
+        results: list[ResearchResult],
+        content_md: str,
+        suggestions_md: str,
+        fingerprint: dict[str, str] | None = None,
+        tier: str = "",
+    ) -> RunRecord:
+        """Store a finished run's texts and append it to the index."""
+        providers = {}
+        for result in results:
+            if result.content_path is not None:
+                blob = self.put_file(result.content_path)
+            else:
+                blob = self.put_text(result.content)
+            providers[result.provider] = {
+                "model": result.model,
+                "blob": blob,
+                "duration": result.duration,
+                "usage": result.usage,
+            }
+
+        inputs = {"context": self.put_text(context)}
+        if prompt:
+            inputs["prompt"] = self.put_text(prompt)
+
+        record = RunRecord(
+            run_id=self.new_run_id(playground),
+            playground=playground,
+            created_at=time.time(),
+            focus=focus,
+            queries=queries,
+            inputs=inputs,
+            providers=providers,
+            outputs={
+                "content.md": self.put_text(content_md),
+                "suggestions.md": self.put_text(suggestions_md),
+            },
+            fingerprint=dict(fingerprint or {}),
+            tier=tier,
+        )
+        self.record_run(record)
+        return record
+
+    def provider_results(self, record: RunRecord) -> list[ResearchResult]:
+        """Archived provider reports of a run, read lazily from their blobs."""
+        results = []
+        for name, info in record.providers.items():
+            results.append(ResearchResult(
+                provider=name,
+                content="",
+                model=info.get("model", "unknown"),
+                status="completed",
+                content_path=self.blob_path(info["blob"]),
+                usage=dict(info.get("usage", {})),
+                duration=info.get("duration", 0.0),
+            ))
+        return results
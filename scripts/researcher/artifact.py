@@ -0,0 +1,253 @@
+"""
+Pre-rendered research artifacts.
+
+Research pages used to read content.md at module load and parse its markdown on
+every build and render. `write_output` now parses it once, here, into
+research/content.json next to content.md:
+
+    {
+      "version": 1,
+      "toc": [{"depth": 2, "id": "theoretical-foundations", "text": "Theoretical Foundations"}, ...],
+      "wordCount": 4812,
+      "readingMinutes": 21,
+      "tree": [...]
+    }
+
+`tree` is the document as an HTML element tree in compact form: a string is a
+text node, and {"t": tag, "p": props, "c": children} an element ("p" and "c"
+are omitted when empty). The generated page imports the JSON and renders the
+tree with the same styled elements ResearchRenderer uses for markdown, so no
+markdown is parsed at build or request time.
+
+Markdown is parsed with markdown-it (CommonMark plus the GFM extensions
+remark-gfm renders: tables, strikethrough, autolinked URLs and www. links, and
+footnotes, with the same footnote ids and markup). Raw HTML is not passed
+through and only http(s), mailto, relative and in-page links are kept, so the
+tree is safe to render as is; protocol-relative //host links lose their href. Headings get GitHub-style slug ids, which the table of
+contents links to.
+"""
+
+import json
+import math
+import re
+
+from markdown_it import MarkdownIt
+from markdown_it.token import Token
+from mdit_py_plugins.footnote import footnote_plugin
+
+
+ARTIFACT_VERSION = 1
+ARTIFACT_NAME = "content.json"
+
+WORDS_PER_MINUTE = 230
+TOC_DEPTHS = (2, 3)
+
+_SAFE_URL = re.compile(r"^(?:https?:|mailto:|#|/(?![/\\])|\./|\.\./)", re.IGNORECASE)
+_WORD = re.compile(r"[\w’'-]+")
+
+_markdown = (
+    MarkdownIt("commonmark", {"html": False, "linkify": True})
+    .enable(["table", "strikethrough", "linkify"])
+    .use(footnote_plugin)
+)
+# GFM autolinks URLs with a scheme and www. hosts, not bare domains or //host
+_markdown.linkify.set({"fuzzy_link": False})
+_markdown.linkify.add("//", None)
+
+
+def _validate_www(linkify, text: str, pos: int) -> int:
+    pattern = re.compile(linkify.re["src_host_port_strict"] + linkify.re["src_path"], re.IGNORECASE)
+    found = pattern.match(text, pos)
+    return len(found.group()) if found else 0
+
+
+def _normalize_www(linkify, match) -> None:
+    match.url = "http://" + match.url
+
+
+_markdown.linkify.add("www.", {"validate": _validate_www, "normalize": _normalize_www})
+
+
+def _slug(text: str, seen: dict[str, int]) -> str:
+    """GitHub-style heading id, made unique within the document."""
+    slug = re.sub(r"[^\w\- ]", "", text.lower()).strip().replace(" ", "-") or "section"
+    count = seen.get(slug, 0)
+    seen[slug] = count + 1
+    return slug if count == 0 else f"{slug}-{count}"
+
+
+def _text(nodes: list) -> str:
+    return "".join(n if isinstance(n, str) else _text(n.get("c", [])) for n in nodes)
+
+
+def _element(tag: str, props: dict | None = None, children: list | None = None) -> dict:
+    element: dict = {"t": tag}
+    if props:
+        element["p"] = props
+    if children:
+        element["c"] = children
+    return element
+
+
+def _append(children: list, node) -> None:
+    # Adjacent text merges into one node
+    if isinstance(node, str) and children and isinstance(children[-1], str):
+        children[-1] += node
+    elif node != "":
+        children.append(node)
+
+
+def _props(token: Token) -> dict:
+    props = {}
+    if token.type == "link_open":
+        href = str(token.attrGet("href") or "")
+        if _SAFE_URL.match(href):
+            props["href"] = href
+        if token.attrGet("title"):
+            props["title"] = str(token.attrGet("title"))
+    elif token.tag in ("th", "td"):
+        style = str(token.attrGet("style") or "")
+        if style.startswith("text-align:"):
+            props["align"] = style.removeprefix("text-align:")
+    elif token.type == "ordered_list_open" and token.attrGet("start") not in (None, 1):
+        props["start"] = int(token.attrGet("start"))
+    return props
+
+
+def _footnote_id(meta: dict) -> str:
+    # Inline ^[notes] have no label; they are numbered like remark-gfm's
+    return str(meta.get("label") or meta["id"] + 1)
+
+
+def _footnote_ref_id(meta: dict) -> str:
+    # Later references to the same note get -2, -3, ...
+    suffix = f"-{meta['subId'] + 1}" if meta["subId"] else ""
+    return f"user-content-fnref-{_footnote_id(meta)}{suffix}"
+
+
+def _footnote_ref(meta: dict) -> dict:
+    """A footnote reference, marked up as remark-gfm does."""
+    link = _element("a", {
+        "href": f"#user-content-fn-{_footnote_id(meta)}",
+        "id": _footnote_ref_id(meta),
+        "aria-describedby": "footnote-label",
+    }, [str(meta["id"] + 1)])
+    return _element("sup", children=[link])
+
+
+def _footnote_backref(meta: dict) -> dict:
+    return _element("a", {
+        "href": f"#{_footnote_ref_id(meta)}",
+        "className": "data-footnote-backref",
+        "aria-label": f"Back to reference {meta['id'] + 1}",
+    }, ["↩"])
+
+
+def _open(token: Token) -> tuple[dict, list]:
+    """The element a block opens, and the list its content goes into."""
+    if token.type == "footnote_block_open":
+        notes = _element("ol")
+        notes["c"] = []
+        heading = _element("h2", {"id": "footnote-label", "className": "sr-only"}, ["Footnotes"])
+        return _element("section", {"className": "footnotes"}, [heading, notes]), notes["c"]
+    if token.type == "footnote_open":
+        element = _element("li", {"id": f"user-content-fn-{_footnote_id(token.meta)}"})
+    else:
+        element = _element(token.tag, _props(token))
+    element["c"] = []
+    return element, element["c"]
+
+
+def _build(tokens: list[Token]) -> list:
+    """Nest a markdown-it token stream into compact elements."""
+    root: list = []
+    stack: list[list] = [root]
+    elements: list[dict | None] = []
+
+    for token in tokens:
+        if token.nesting == 1:
+            if token.hidden:  # paragraphs of tight lists
+                elements.append(None)
+                continue
+            element, children = _open(token)
+            stack[-1].append(element)
+            stack.append(children)
+            elements.append(element)
+        elif token.nesting == -1:
+            element = elements.pop()
+            if element is None:
+                continue
+            stack.pop()
+            if not element["c"]:
+                del element["c"]
+        elif token.type == "inline":
+            for node in _build(token.children or []):
+                _append(stack[-1], node)
+        elif token.type in ("text", "html_inline", "html_block"):
+            _append(stack[-1], token.content)
+        elif token.type == "softbreak":
+            _append(stack[-1], "\n")
+        elif token.type == "footnote_ref":
+            stack[-1].append(_footnote_ref(token.meta))
+        elif token.type == "footnote_anchor":
+            _append(stack[-1], " ")
+            stack[-1].append(_footnote_backref(token.meta))
+        elif token.type == "hardbreak":
+            stack[-1].append(_element("br"))
+        elif token.type == "code_inline":
+            stack[-1].append(_element("code", children=[token.content]))
+        elif token.type in ("fence", "code_block"):
+            language = token.info.strip().split(" ")[0] if token.info else ""
+            code = _element("code", {"className": f"language-{language}"} if language else None, [token.content])
+            stack[-1].append(_element("pre", children=[code]))
+        elif token.type == "hr":
+            stack[-1].append(_element("hr"))
+        elif token.type == "image":
+            src = str(token.attrGet("src") or "")
+            if _SAFE_URL.match(src):
+                stack[-1].append(_element("img", {"src": src, "alt": token.content}))
+    return root
+
+
+def _count_words(nodes: list) -> int:
+    words = 0
+    for node in nodes:
+        if isinstance(node, str):
+            words += len(_WORD.findall(node))
+        elif node["t"] != "pre":
+            words += _count_words(node.get("c", []))
+    return words
+
+
+def render_artifact(content_md: str) -> dict:
+    """Parse content.md into the research page artifact."""
+    tree = _build(_markdown.parse(content_md))
+
+    toc = []
+    seen: dict[str, int] = {}
+    for node in tree:
+        if isinstance(node, dict) and re.fullmatch(r"h[1-6]", node["t"]):
+            text = _text(node.get("c", []))
+            node.setdefault("p", {})["id"] = _slug(text, seen)
+            depth = int(node["t"][1])
+            if depth in TOC_DEPTHS:
+                toc.append({"depth": depth, "id": node["p"]["id"], "text": text})
+
+    words = _count_words(tree)
+    return {
+        "version": ARTIFACT_VERSION,
+        "toc": toc,
+        "wordCount": words,
+        "readingMinutes": max(1, math.ceil(words / WORDS_PER_MINUTE)),
+        "tree": tree,
+    }
+
+
+def dump_artifact(artifact: dict) -> str:
+    """An artifact serialized compactly, as written to research/content.json."""
+    return json.dumps(artifact, ensure_ascii=False, separators=(",", ":")) + "\n"
+
+
+def artifact_json(content_md: str) -> str:
+    """Render and serialize content.md in one step."""
+    return dump_artifact(render_artifact(content_md))
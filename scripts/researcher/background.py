@@ -0,0 +1,218 @@
+"""
+Background-mode Responses API calls for query generation and synthesis.
+
+A foreground `responses.create` to a pro model can run for many minutes; a
+client timeout or a killed process loses the answer, and the call is paid for
+again on the next run. Here the request is submitted with background=True and
+polled until it finishes, like deep research.
+
+The response id is saved under <RESEARCHER_HOME>/responses/ as soon as the
+call is submitted, keyed by a hash of the model, instructions and input, and
+removed once the answer is read. A later call with the same request, e.g. a
+--resume after the process died during synthesis, finds the saved id and
+waits for that response instead of submitting a new one.
+
+These calls block, so callers run them with `run_in_thread`: cancelling the
+awaiting task wakes the poll loop, which stops waiting and keeps the handle
+for the next run.
+"""
+
+import asyncio
+import json
+import threading
+import time
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Callable
+
+from openai import OpenAI
+
+from cache import cache_key
+from config import RESEARCHER_HOME
+from fileio import atomic_write_text
+from retry import idempotency_key, retry_sync, status_code
+
+
+RESPONSES_DIR = RESEARCHER_HOME / "responses"
+
+POLL_INTERVAL = 2.0  # seconds before the first poll
+MAX_POLL_INTERVAL = 15.0
+DEADLINE = 2 * 60 * 60.0  # seconds to wait before leaving the response for a later run
+
+PENDING_STATUSES = ("queued", "in_progress")
+FINISHED_STATUSES = ("completed", "incomplete")  # incomplete: cut off, but may have output
+
+
+class BackgroundResponseError(RuntimeError):
+    """A background response ended without a usable answer."""
+
+
+class IncompleteResponseError(BackgroundResponseError):
+    """
+    A background response was cut off (e.g. at max_output_tokens). The partial
+    output is in `text`, for callers that can use it; it must not be cached as
+    the answer.
+    """
+
+    def __init__(self, message: str, text: str):
+        super().__init__(message)
+        self.text = text
+
+
+# Set by run_in_thread when the task awaiting the worker thread is cancelled
+_stop: ContextVar[threading.Event | None] = ContextVar("background_stop", default=None)
+
+
+async def run_in_thread(fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """
+    Like asyncio.to_thread, but cancelling the caller also stops background
+    polls made by `fn`, instead of leaving the thread waiting for the answer.
+    """
+    stop = threading.Event()
+    token = _stop.set(stop)
+    try:
+        return await asyncio.to_thread(fn, *args, **kwargs)
+    except asyncio.CancelledError:
+        stop.set()
+        raise
+    finally:
+        _stop.reset(token)
+
+
+def _wait(seconds: float) -> bool:
+    """Sleep between polls; True if the caller was cancelled meanwhile."""
+    stop = _stop.get()
+    if stop is None:
+        time.sleep(seconds)
+        return False
+    return stop.wait(seconds)
+
+
+class ResponseHandles:
+    """Ids of submitted background responses, one small JSON file each."""
+
+    def __init__(self, directory: Path = RESPONSES_DIR):
+        self.directory = directory
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.json"
+
+    def get(self, key: str) -> dict | None:
+        path = self._path(key)
+        if not path.exists():
+            return None
+        try:
+            return json.loads(path.read_text())
+        except ValueError:
+            return None
+
+    def save(self, key: str, handle: str, model: str, label: str = "") -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        atomic_write_text(
+            self._path(key),
+            json.dumps({"handle": handle, "model": model, "label": label, "submitted_at": time.time()}),
+        )
+
+    def clear(self, key: str) -> None:
+        self._path(key).unlink(missing_ok=True)
+
+
+def background_response(
+    client: OpenAI,
+    model: str,
+    input: str,
+    instructions: str | None = None,
+    label: str = "",
+    on_status: Callable[[str], None] | None = None,
+    on_retry: Callable[[int, float, BaseException], None] | None = None,
+    deadline: float = DEADLINE,
+    handles: ResponseHandles | None = None,
+) -> str:
+    """
+    Run one Responses API call in background mode and return its output text.
+
+    Args:
+        client: OpenAI client.
+        model: Model to call.
+        input: The prompt.
+        instructions: System instructions, if any.
+        label: What the call is for ("queries", "synthesis"), kept with the handle.
+        on_status: Called with a line of progress when the call is submitted or resumed.
+        on_retry: Called before each retry of a transient error.
+        deadline: Seconds to wait before giving up; the response keeps running
+            and its handle is kept, so the next identical call resumes it.
+        handles: Where response ids are kept (default: RESPONSES_DIR).
+
+    Raises:
+        IncompleteResponseError: If the response was cut off.
+        BackgroundResponseError: If the response failed, was cancelled or
+            did not finish within `deadline`, or the caller was cancelled
+            (see `run_in_thread`).
+    """
+    handles = handles or ResponseHandles()
+    key = cache_key(model, instructions or "", input)
+
+    response = None
+    saved = handles.get(key)
+    if saved is not None:
+        try:
+            response = retry_sync(lambda: client.responses.retrieve(saved["handle"]), on_retry=on_retry)
+        except Exception as e:
+            if status_code(e) != 404:
+                raise
+            response = None  # expired on the server
+        if response is not None and response.status not in PENDING_STATUSES + FINISHED_STATUSES:
+            response = None  # failed or cancelled: submit again
+        if response is not None and on_status:
+            on_status(f"Resuming background response {response.id[:12]}... ({response.status})")
+        if response is None:
+            handles.clear(key)
+
+    if response is None:
+        # Fixed across retries, so a lost reply cannot start a second response
+        idempotency = idempotency_key()
+        kwargs = {"instructions": instructions} if instructions else {}
+        response = retry_sync(
+            lambda: client.responses.create(
+                model=model,
+                input=input,
+                background=True,
+                extra_headers={"Idempotency-Key": idempotency},
+                **kwargs,
+            ),
+            on_retry=on_retry,
+        )
+        handles.save(key, response.id, model, label)
+        if on_status:
+            on_status(f"Submitted background response {response.id[:12]}...")
+
+    started = time.monotonic()
+    interval = POLL_INTERVAL
+    while response.status in PENDING_STATUSES:
+        if time.monotonic() - started > deadline:
+            raise BackgroundResponseError(
+                f"{label or model} response {response.id} still {response.status} after "
+                f"{deadline / 60:.0f} min; rerun to keep waiting for it."
+            )
+        if _wait(interval):
+            # The response keeps running; its handle stays for the next run
+            raise BackgroundResponseError(f"Stopped waiting for {label or model} response {response.id}.")
+        interval = min(interval * 1.5, MAX_POLL_INTERVAL)
+        response_id = response.id
+        response = retry_sync(lambda: client.responses.retrieve(response_id), on_retry=on_retry)
+
+    handles.clear(key)
+    text = response.output_text or ""
+    if response.status == "incomplete":
+        raise IncompleteResponseError(
+            f"{label or model} response {response.id} was cut off "
+            f"({getattr(response, 'incomplete_details', None)})",
+            text,
+        )
+    if response.status != "completed":
+        error = getattr(response, "error", None)
+        raise BackgroundResponseError(
+            f"{label or model} response {response.id} ended with status {response.status}"
+            + (f": {error}" if error else "")
+        )
+    return text
@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the OpenAI Files and Batch endpoints, for trying --batch-api
+without an API key or a 24-hour wait.
+
+It implements just what batchapi.py uses and answers every request with a
+canned response right away, or after --delay seconds:
+
+    POST /v1/files                  upload a JSONL batch file (multipart)
+    POST /v1/batches                create a batch from an uploaded file
+    GET  /v1/batches/<id>           batch status
+    GET  /v1/files/<id>/content     output file of a finished batch
+
+Query generation requests are answered with five numbered questions about the
+playground, synthesis requests with a short content.md and suggestions.md,
+anything else with an echo. Only the batch client is pointed at it, with
+--batch-base-url; deep research, and any request a batch did not answer, still
+go to the real providers (OPENAI_BASE_URL would redirect those too).
+
+Usage:
+    uv run scripts/researcher/batch_standin.py --port 8766
+    uv run scripts/researcher/researcher.py --batch --batch-api --force \\
+        --batch-base-url http://127.0.0.1:8766/v1
+"""
+
+import argparse
+import json
+import re
+import threading
+import time
+import uuid
+from email.parser import BytesParser
+from email.policy import HTTP
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from rich.console import Console
+
+console = Console()
+
+DEFAULT_PORT = 8766
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Local stand-in for the OpenAI Batch API.")
+    parser.add_argument("--host", default="127.0.0.1", help="Address to bind (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"Port to listen on (default: {DEFAULT_PORT})")
+    parser.add_argument(
+        "--delay",
+        type=float,
+        default=0.0,
+        help="Seconds a batch stays in progress before it completes (default: 0)",
+    )
+    return parser.parse_args()
+
+
+def canned_answer(body: dict) -> str:
+    """A plausible answer to one Responses request."""
+    prompt = body.get("input", "")
+    instructions = body.get("instructions") or ""
+    title = re.search(r"^# Playground: (.+)$", prompt, re.MULTILINE)
+    subject = title.group(1).strip() if title else "this playground"
+
+    if "research queries" in prompt:
+        angles = ("core theory", "recent advances", "cross-disciplinary links", "empirical evidence", "limitations")
+        return "\n".join(f"{i}. What is known about the {angle} behind {subject}?" for i, angle in enumerate(angles, 1))
+    if "content.md" in instructions and "<<<" not in instructions:
+        return (
+            f"```content.md\n## Overview\n\nA stand-in synthesis for {subject}.\n```\n\n"
+            f"```suggestions.md\n## Suggestions\n\n- Compare with the real batch output.\n```\n"
+        )
+    return prompt[:2000]
+
+
+def response_body(body: dict) -> dict:
+    text = canned_answer(body)
+    return {
+        "id": f"resp_{uuid.uuid4().hex}",
+        "object": "response",
+        "created_at": int(time.time()),
+        "status": "completed",
+        "model": body.get("model", ""),
+        "output": [{
+            "id": f"msg_{uuid.uuid4().hex}",
+            "type": "message",
+            "role": "assistant",
+            "status": "completed",
+            "content": [{"type": "output_text", "text": text, "annotations": []}],
+        }],
+        "usage": {
+            "input_tokens": len(body.get("input", "")) // 4,
+            "output_tokens": len(text) // 4,
+            "total_tokens": (len(body.get("input", "")) + len(text)) // 4,
+        },
+    }
+
+
+class BatchStandin:
+    """Files and batches held in memory."""
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.files: dict[str, dict] = {}  # id -> {"meta": file object, "data": bytes}
+        self.batches: dict[str, dict] = {}
+        self.lock = threading.Lock()
+
+    def add_file(self, data: bytes, filename: str, purpose: str) -> dict:
+        with self.lock:
+            return self._add_file(data, filename, purpose)
+
+    def create_batch(self, request: dict) -> dict:
+        with self.lock:
+            source = self.files.get(request.get("input_file_id", ""))
+        if source is None:
+            raise KeyError("input file not found")
+        lines = [json.loads(line) for line in source["data"].decode("utf-8").splitlines() if line.strip()]
+        now = int(time.time())
+        batch = {
+            "id": f"batch_{uuid.uuid4().hex[:24]}",
+            "object": "batch",
+            "endpoint": request.get("endpoint", "/v1/responses"),
+            "errors": None,
+            "input_file_id": request["input_file_id"],
+            "completion_window": request.get("completion_window", "24h"),
+            "status": "in_progress",
+            "output_file_id": None,
+            "error_file_id": None,
+            "created_at": now,
+            "in_progress_at": now,
+            "completed_at": None,
+            "request_counts": {"total": len(lines), "completed": 0, "failed": 0},
+            "metadata": request.get("metadata") or {},
+        }
+        output = "".join(
+            json.dumps({
+                "id": f"batch_req_{uuid.uuid4().hex[:24]}",
+                "custom_id": line["custom_id"],
+                "response": {"status_code": 200, "request_id": uuid.uuid4().hex, "body": response_body(line["body"])},
+                "error": None,
+            }) + "\n"
+            for line in lines
+        ).encode("utf-8")
+        with self.lock:
+            self.batches[batch["id"]] = {"batch": batch, "output": output, "ready_at": time.time() + self.delay}
+        console.print(f"[#84cc16]Batch {batch['id']}: {len(lines)} request(s)[/#84cc16]")
+        return batch
+
+    def get_batch(self, batch_id: str) -> dict:
+        with self.lock:
+            entry = self.batches[batch_id]
+            batch = entry["batch"]
+            if batch["status"] == "in_progress" and time.time() >= entry["ready_at"]:
+                meta = self._add_file(entry["output"], f"{batch_id}_output.jsonl", "batch_output")
+                batch.update(
+                    status="completed",
+                    output_file_id=meta["id"],
+                    completed_at=int(time.time()),
+                    request_counts={**batch["request_counts"], "completed": batch["request_counts"]["total"]},
+                )
+            return batch
+
+    def _add_file(self, data: bytes, filename: str, purpose: str) -> dict:
+        meta = {
+            "id": f"file-{uuid.uuid4().hex[:24]}",
+            "object": "file",
+            "bytes": len(data),
+            "created_at": int(time.time()),
+            "filename": filename,
+            "purpose": purpose,
+            "status": "processed",
+        }
+        self.files[meta["id"]] = {"meta": meta, "data": data}
+        return meta
+
+
+def make_handler(standin: BatchStandin) -> type[BaseHTTPRequestHandler]:
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, format: str, *args) -> None:
+            console.print(f"[dim]{self.command} {self.path} → {args[1] if len(args) > 1 else ''}[/dim]")
+
+        def _send(self, status: HTTPStatus, data: bytes, content_type: str = "application/json") -> None:
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _send_json(self, data: dict, status: HTTPStatus = HTTPStatus.OK) -> None:
+            self._send(status, json.dumps(data).encode("utf-8"))
+
+        def _error(self, status: HTTPStatus, message: str) -> None:
+            self._send_json({"error": {"message": message, "type": "invalid_request_error"}}, status)
+
+        def _body(self) -> bytes:
+            return self.rfile.read(int(self.headers.get("Content-Length") or 0))
+
+        def do_POST(self) -> None:
+            path = self.path.split("?")[0].rstrip("/")
+            if path == "/v1/files":
+                header = f"Content-Type: {self.headers['Content-Type']}\r\n\r\n".encode("latin-1")
+                message = BytesParser(policy=HTTP).parsebytes(header + self._body())
+                fields, upload, filename = {}, b"", "batch.jsonl"
+                for part in message.iter_parts():
+                    name = part.get_param("name", header="content-disposition")
+                    if name == "file":
+                        upload = part.get_payload(decode=True) or b""
+                        filename = part.get_filename() or filename
+                    elif name:
+                        fields[name] = part.get_content().strip()
+                self._send_json(standin.add_file(upload, filename, fields.get("purpose", "batch")))
+            elif path == "/v1/batches":
+                try:
+                    self._send_json(standin.create_batch(json.loads(self._body())))
+                except (KeyError, ValueError) as e:
+                    self._error(HTTPStatus.BAD_REQUEST, str(e))
+            else:
+                self._error(HTTPStatus.NOT_FOUND, f"No route for POST {path}")
+
+        def do_GET(self) -> None:
+            path = self.path.split("?")[0].rstrip("/")
+            if match := re.fullmatch(r"/v1/batches/([\w-]+)", path):
+                try:
+                    self._send_json(standin.get_batch(match[1]))
+                except KeyError:
+                    self._error(HTTPStatus.NOT_FOUND, "batch not found")
+            elif match := re.fullmatch(r"/v1/files/([\w-]+)/content", path):
+                entry = standin.files.get(match[1])
+                if entry is None:
+                    self._error(HTTPStatus.NOT_FOUND, "file not found")
+                else:
+                    self._send(HTTPStatus.OK, entry["data"], "application/octet-stream")
+            else:
+                self._error(HTTPStatus.NOT_FOUND, f"No route for GET {path}")
+
+    return Handler
+
+
+def main() -> None:
+    args = parse_args()
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(BatchStandin(args.delay)))
+    console.print(f"[bold #84cc16]Batch API stand-in on http://{args.host}:{args.port}/v1[/bold #84cc16]")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        console.print("\n[dim]Stopped.[/dim]")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,279 @@
+"""
+Batch API mode for catalog-wide query generation and synthesis (--batch-api).
+
+Overnight refreshes care about throughput and cost, not latency, and the
+Batch API runs the same Responses calls asynchronously at a discount. A batch
+refresh runs its playgrounds in rounds:
+
+1. Every run stops at its first model call that is not cached. Under
+   `collecting()`, `defer()` records the call as a BatchRequest and raises
+   DeferredCall instead of calling the model.
+2. The collected requests go into one JSONL batch file. It is uploaded and
+   submitted to /v1/responses, then polled until it finishes.
+3. Each answer is stored in the cache under the key the run looked up.
+4. The deferred runs are started again. They find their answers in the cache
+   and go on to their next uncached call.
+
+The first round stops at query generation and the second at synthesis, after
+deep research has run. The third writes the outputs.
+
+Submitted batches are tracked under <RESEARCHER_HOME>/batches/ until their
+results are stored, so a restarted refresh collects them instead of
+submitting again. A request that failed in its batch is not deferred a second
+time; the next round makes that call directly.
+
+The OpenAI client reads OPENAI_BASE_URL, so the whole flow can be pointed at
+the local stand-in in batch_standin.py.
+"""
+
+import io
+import json
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Callable, Iterator
+
+from openai import OpenAI
+
+from cache import ResearchCache, get_cache
+from config import RESEARCHER_HOME
+from fileio import atomic_write_text
+from retry import retry_sync
+
+
+BATCHES_DIR = RESEARCHER_HOME / "batches"
+
+ENDPOINT = "/v1/responses"
+COMPLETION_WINDOW = "24h"
+
+POLL_INTERVAL = 5.0  # seconds before the first poll
+MAX_POLL_INTERVAL = 120.0
+
+TERMINAL_STATUSES = ("completed", "failed", "expired", "cancelled")
+
+
+class DeferredCall(Exception):
+    """A model call was recorded for the next batch instead of being made."""
+
+    def __init__(self, namespace: str):
+        super().__init__(f"{namespace} call deferred to the next batch")
+        self.namespace = namespace
+
+
+@dataclass
+class BatchRequest:
+    """One Responses call, and where its answer goes in the cache."""
+    namespace: str
+    key: str
+    model: str
+    input: str
+    instructions: str | None = None
+    ttl: float | None = None
+
+    @property
+    def custom_id(self) -> str:
+        return f"{self.namespace}-{self.key[:40]}"
+
+    def to_line(self) -> str:
+        body = {"model": self.model, "input": self.input}
+        if self.instructions:
+            body["instructions"] = self.instructions
+        return json.dumps({"custom_id": self.custom_id, "method": "POST", "url": ENDPOINT, "body": body})
+
+
+@dataclass
+class BatchCollector:
+    """Requests deferred during one round."""
+    requests: dict[str, BatchRequest] = field(default_factory=dict)
+    failed: set[str] = field(default_factory=set)  # keys whose batch request failed; called directly
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def add(self, request: BatchRequest) -> None:
+        with self._lock:
+            self.requests[request.key] = request
+
+
+_collector: BatchCollector | None = None
+
+
+@contextmanager
+def collecting(collector: BatchCollector) -> Iterator[BatchCollector]:
+    """Defer uncached model calls made inside the block into `collector`."""
+    global _collector
+    _collector = collector
+    try:
+        yield collector
+    finally:
+        _collector = None
+
+
+def defer(
+    namespace: str,
+    key: str,
+    model: str,
+    input: str,
+    instructions: str | None = None,
+    ttl: float | None = None,
+) -> None:
+    """
+    Record a call for the next batch and raise DeferredCall, if requests are
+    being collected and this one has not already failed in a batch. Call it
+    after the cache lookup missed and before calling the model.
+    """
+    collector = _collector
+    if collector is None or key in collector.failed:
+        return
+    collector.add(BatchRequest(namespace, key, model, input, instructions, ttl))
+    raise DeferredCall(namespace)
+
+
+def response_text(body: dict) -> str:
+    """The output text of a Responses API response body (what the SDK calls `output_text`)."""
+    return "".join(
+        part.get("text", "")
+        for item in body.get("output", [])
+        if item.get("type") == "message"
+        for part in item.get("content", [])
+        if part.get("type") == "output_text"
+    )
+
+
+@dataclass
+class TrackedBatch:
+    """A submitted batch and the requests in it, kept until its results are stored."""
+    batch_id: str
+    input_file_id: str
+    requests: dict[str, dict]  # custom_id -> BatchRequest fields
+    submitted_at: float
+    label: str = ""
+
+
+class BatchRunner:
+    """Submits request batches, tracks them and stores their answers in the cache."""
+
+    def __init__(
+        self,
+        client: OpenAI | None = None,
+        cache: ResearchCache | None = None,
+        directory: Path = BATCHES_DIR,
+        on_status: Callable[[str], None] | None = None,
+        base_url: str | None = None,
+    ):
+        """
+        Args:
+            base_url: Endpoint for the Files and Batch calls only, e.g. the local
+                stand-in (batch_standin.py); other calls keep OPENAI_BASE_URL.
+        """
+        self.client = client or OpenAI(base_url=base_url)
+        self.cache = cache or get_cache()
+        self.directory = directory
+        self.on_status = on_status or (lambda message: None)
+
+    def pending(self) -> list[TrackedBatch]:
+        """Batches submitted earlier whose results have not been stored yet."""
+        if not self.directory.is_dir():
+            return []
+        batches = []
+        for path in sorted(self.directory.glob("*.json")):
+            try:
+                batches.append(TrackedBatch(**json.loads(path.read_text())))
+            except (ValueError, TypeError):
+                continue
+        return batches
+
+    def submit(self, requests: list[BatchRequest], label: str = "") -> TrackedBatch:
+        """Upload the requests as a JSONL file and create a batch from it."""
+        data = "".join(request.to_line() + "\n" for request in requests).encode("utf-8")
+        upload = retry_sync(lambda: self.client.files.create(
+            file=(f"researcher-{label or 'batch'}.jsonl", io.BytesIO(data)),
+            purpose="batch",
+        ))
+        batch = retry_sync(lambda: self.client.batches.create(
+            input_file_id=upload.id,
+            endpoint=ENDPOINT,
+            completion_window=COMPLETION_WINDOW,
+            metadata={"source": "researcher", "label": label},
+        ))
+        tracked = TrackedBatch(
+            batch_id=batch.id,
+            input_file_id=upload.id,
+            requests={r.custom_id: asdict(r) for r in requests},
+            submitted_at=time.time(),
+            label=label,
+        )
+        self.directory.mkdir(parents=True, exist_ok=True)
+        atomic_write_text(self.directory / f"{batch.id}.json", json.dumps(asdict(tracked)))
+        self.on_status(f"Submitted batch {batch.id} with {len(requests)} {label} request(s)")
+        return tracked
+
+    def wait(self, tracked: TrackedBatch) -> tuple[int, set[str]]:
+        """
+        Poll a batch until it ends and store its answers in the cache.
+
+        Returns:
+            (answers stored, keys of requests that got no answer).
+        """
+        interval = POLL_INTERVAL
+        while True:
+            batch = retry_sync(lambda: self.client.batches.retrieve(tracked.batch_id))
+            if batch.status in TERMINAL_STATUSES:
+                break
+            counts = getattr(batch, "request_counts", None)
+            if counts is not None:
+                self.on_status(
+                    f"Batch {tracked.batch_id}: {batch.status}, "
+                    f"{counts.completed}/{counts.total} done"
+                )
+            time.sleep(interval)
+            interval = min(interval * 1.5, MAX_POLL_INTERVAL)
+
+        # Each answered request is credited with the batch's turnaround
+        elapsed = time.time() - tracked.submitted_at
+        stored, answered = 0, set()
+        output_file_id = getattr(batch, "output_file_id", None)
+        if output_file_id:
+            output = retry_sync(lambda: self.client.files.content(output_file_id))
+            for line in output.text.splitlines():
+                if not line.strip():
+                    continue
+                result = json.loads(line)
+                fields = tracked.requests.get(result.get("custom_id", ""))
+                response = result.get("response") or {}
+                body = response.get("body") or {}
+                # A cut-off ("incomplete") answer is left to the foreground call
+                if fields is None or response.get("status_code") != 200 or body.get("status") != "completed":
+                    continue
+                text = response_text(body)
+                if not text.strip():
+                    continue
+                request = BatchRequest(**fields)
+                self.cache.put(request.namespace, request.key, text, ttl=request.ttl, cost_seconds=elapsed)
+                answered.add(request.key)
+                stored += 1
+
+        missing = {fields["key"] for fields in tracked.requests.values()} - answered
+        self.on_status(
+            f"Batch {tracked.batch_id} {batch.status}: {stored} answer(s) stored"
+            + (f", {len(missing)} without an answer" if missing else "")
+        )
+        (self.directory / f"{tracked.batch_id}.json").unlink(missing_ok=True)
+        return stored, missing
+
+    def run(self, requests: list[BatchRequest], label: str = "") -> set[str]:
+        """
+        Get answers for `requests` into the cache: first from batches an
+        earlier process submitted, then from one new batch for the rest.
+
+        Returns:
+            Keys of the requests that got no answer.
+        """
+        for tracked in self.pending():
+            self.on_status(f"Collecting batch {tracked.batch_id} submitted earlier")
+            self.wait(tracked)
+
+        remaining = [r for r in requests if not self.cache.contains(r.namespace, r.key)]
+        if remaining:
+            self.wait(self.submit(remaining, label))
+        return {r.key for r in requests if not self.cache.contains(r.namespace, r.key)}
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Benchmark serial vs. process-pool context extraction over the playground tree.
+
+Usage:
+    uv run scripts/researcher/bench_context.py
+    uv run scripts/researcher/bench_context.py --workers 1,2,4,8 --repeat 5
+    uv run scripts/researcher/bench_context.py --cached
+"""
+
+import argparse
+import statistics
+import time
+from pathlib import Path
+
+from rich.console import Console
+from rich.table import Table
+
+from cache import disable_cache
+from discovery import list_playgrounds
+from extract import default_workers, extract_contexts
+
+console = Console()
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark context extraction throughput.")
+    parser.add_argument(
+        "--workers",
+        default=f"1,{default_workers()}",
+        help="Comma-separated worker counts to compare; 1 is the serial baseline (default: 1,<cpus>)",
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=3,
+        help="Timed passes per worker count; the median is reported (default: 3)",
+    )
+    parser.add_argument(
+        "--cached",
+        action="store_true",
+        help="Read contexts through the researcher cache instead of extracting them every pass",
+    )
+    parser.add_argument(
+        "--project-root",
+        type=Path,
+        default=Path(__file__).resolve().parents[2],
+        help="Project root directory (default: the repository this script is in)",
+    )
+    return parser.parse_args()
+
+
+def time_pass(dirs: list[Path], project_root: Path, workers: int) -> tuple[float, int, int]:
+    """One full extraction; returns (wall seconds, playgrounds, total tokens)."""
+    started = time.perf_counter()
+    count = tokens = 0
+    for extracted in extract_contexts(dirs, project_root, workers=workers):
+        count += 1
+        tokens += extracted.tokens
+    return time.perf_counter() - started, count, tokens
+
+
+def main() -> None:
+    args = parse_args()
+    if not args.cached:
+        disable_cache()
+    dirs = [Path(p["path"]) for p in list_playgrounds(args.project_root)]
+    worker_counts = [int(w) for w in args.workers.split(",")]
+
+    # Warm the page cache so the first configuration is not penalized
+    time_pass(dirs, args.project_root, workers=1)
+
+    table = Table(
+        title=f"[bold #84cc16]Context extraction · {len(dirs)} playgrounds"
+        f"{' (cached)' if args.cached else ''}[/bold #84cc16]",
+        border_style="#84cc16",
+        header_style="bold #84cc16",
+    )
+    table.add_column("Workers", justify="right")
+    table.add_column("Median wall", justify="right")
+    table.add_column("Playgrounds/s", justify="right")
+    table.add_column("Speedup", justify="right")
+    table.add_column("Prompt tokens", justify="right")
+
+    baseline = None
+    for workers in worker_counts:
+        passes = [time_pass(dirs, args.project_root, workers) for _ in range(args.repeat)]
+        wall = statistics.median(p[0] for p in passes)
+        count, tokens = passes[0][1], passes[0][2]
+        baseline = baseline or wall
+        table.add_row(
+            "serial" if workers == 1 else str(workers),
+            f"{wall * 1000:.0f} ms",
+            f"{count / wall:.0f}",
+            f"{baseline / wall:.2f}×",
+            f"{tokens:,}",
+        )
+
+    console.print(table)
+
+
+if __name__ == "__main__":
+    main()
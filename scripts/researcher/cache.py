@@ -0,0 +1,337 @@
+"""
+On-disk cache shared by every stage of the researcher.
+
+Values are text (JSON for structured ones), stored compressed under
+<RESEARCHER_HOME>/cache/<namespace>/ and addressed by a hash of everything
+that determines them: `cache_key(model, instructions, prompt)` for a model
+call, the input fingerprint for a rendered context. A changed input is a new
+key, so entries never need invalidating; TTLs only bound how long a result
+that depends on the outside world (web research, model behaviour) is reused.
+
+    context     rendered playground contexts, keyed by input fingerprint
+    queries     generated research queries, keyed by model and prompt
+    provider    deep research reports, keyed by provider, model and prompt
+    synthesis   raw synthesis responses, keyed by model, instructions and prompt
+
+An SQLite index (<RESEARCHER_HOME>/cache/index.sqlite3) records each entry's
+size, last access, expiry and the seconds it took to produce, plus per
+namespace hit and miss counts. Total size is capped (DEFAULT_MAX_BYTES, or
+RESEARCHER_CACHE_MAX_MB); storing past the cap evicts the least recently used
+entries. Each hit adds its entry's production time to the namespace's saved
+time, which `--cache-stats` reports.
+
+Several processes can share the cache: the index is updated in IMMEDIATE
+transactions, values are written to a temporary file and renamed into place,
+and a value evicted by another process between lookup and read is a miss.
+"""
+
+import hashlib
+import io
+import json
+import os
+import shutil
+import sqlite3
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Iterator, TextIO
+
+from config import RESEARCHER_HOME
+from fileio import CODEC_SUFFIXES, DEFAULT_CODEC, open_compressed_text, private_temp_path
+from metrics import REGISTRY
+
+
+CACHE_DIR = RESEARCHER_HOME / "cache"
+
+DEFAULT_MAX_BYTES = int(float(os.environ.get("RESEARCHER_CACHE_MAX_MB", "512")) * 1e6)
+
+# How long results that depend on more than their inputs are reused
+QUERIES_TTL = 30 * 86400
+PROVIDER_TTL = 30 * 86400
+SYNTHESIS_TTL = 30 * 86400
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    namespace    TEXT NOT NULL,
+    key          TEXT NOT NULL,
+    body         TEXT NOT NULL,
+    size         INTEGER NOT NULL,
+    created_at   REAL NOT NULL,
+    last_access  REAL NOT NULL,
+    expires_at   REAL,
+    cost_seconds REAL NOT NULL DEFAULT 0,
+    PRIMARY KEY (namespace, key)
+);
+CREATE INDEX IF NOT EXISTS entries_lru ON entries (last_access);
+CREATE TABLE IF NOT EXISTS stats (
+    namespace     TEXT PRIMARY KEY,
+    hits          INTEGER NOT NULL DEFAULT 0,
+    misses        INTEGER NOT NULL DEFAULT 0,
+    saved_seconds REAL NOT NULL DEFAULT 0
+);
+"""
+
+def cache_key(*parts: str) -> str:
+    """Content address of a value determined by `parts`."""
+    hasher = hashlib.sha256()
+    for part in parts:
+        hasher.update(part.encode("utf-8"))
+        hasher.update(b"\0")
+    return hasher.hexdigest()
+
+
+@dataclass
+class NamespaceStats:
+    """Size and effectiveness of one namespace."""
+    namespace: str
+    entries: int = 0
+    size: int = 0
+    hits: int = 0
+    misses: int = 0
+    saved_seconds: float = 0.0
+
+    @property
+    def hit_rate(self) -> float | None:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else None
+
+
+class ResearchCache:
+    """The cache directory and its index. A disabled cache misses every lookup and stores nothing."""
+
+    def __init__(self, directory: Path = CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES, enabled: bool = True):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self.path = directory / "index.sqlite3"
+        self._ready = False
+
+    def _connect(self) -> sqlite3.Connection:
+        if not self._ready:
+            self.directory.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA busy_timeout=30000")
+        if not self._ready:
+            conn.executescript(SCHEMA)
+            self._ready = True
+        return conn
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        """An IMMEDIATE transaction, so read-then-write sequences are atomic."""
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+        finally:
+            conn.close()
+
+    def _count(self, conn: sqlite3.Connection, namespace: str, hit: bool, saved: float = 0.0) -> None:
+        conn.execute(
+            "INSERT INTO stats (namespace, hits, misses, saved_seconds) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT (namespace) DO UPDATE SET hits = hits + excluded.hits, "
+            "misses = misses + excluded.misses, saved_seconds = saved_seconds + excluded.saved_seconds",
+            (namespace, int(hit), int(not hit), saved),
+        )
+        REGISTRY.inc("researcher_cache_requests_total", namespace=namespace, result="hit" if hit else "miss")
+
+    # ── Lookups ──────────────────────────────────────────────────────────
+
+    def open(self, namespace: str, key: str) -> TextIO | None:
+        """
+        A text stream over a cached value, or None on a miss. Counts the
+        lookup and marks the entry as recently used.
+        """
+        if not self.enabled:
+            return None
+        now = time.time()
+        with self._transaction() as conn:
+            row = conn.execute(
+                "SELECT body, expires_at, cost_seconds FROM entries WHERE namespace = ? AND key = ?",
+                (namespace, key),
+            ).fetchone()
+            if row is not None and row["expires_at"] is not None and row["expires_at"] <= now:
+                self._delete(conn, namespace, key, row["body"])
+                row = None
+            if row is not None:
+                try:
+                    stream = open_compressed_text(self.directory / row["body"])
+                except FileNotFoundError:  # removed by hand; forget it
+                    self._delete(conn, namespace, key, row["body"])
+                    row = None
+            if row is None:
+                self._count(conn, namespace, hit=False)
+                return None
+            conn.execute(
+                "UPDATE entries SET last_access = ? WHERE namespace = ? AND key = ?",
+                (now, namespace, key),
+            )
+            self._count(conn, namespace, hit=True, saved=row["cost_seconds"])
+        return stream
+
+    def contains(self, namespace: str, key: str) -> bool:
+        """Whether an unexpired value is stored, without counting a lookup."""
+        if not self.enabled:
+            return False
+        conn = self._connect()
+        try:
+            row = conn.execute(
+                "SELECT expires_at FROM entries WHERE namespace = ? AND key = ?", (namespace, key)
+            ).fetchone()
+        finally:
+            conn.close()
+        return row is not None and (row["expires_at"] is None or row["expires_at"] > time.time())
+
+    def get(self, namespace: str, key: str) -> str | None:
+        stream = self.open(namespace, key)
+        if stream is None:
+            return None
+        with stream:
+            return stream.read()
+
+    def get_json(self, namespace: str, key: str):
+        text = self.get(namespace, key)
+        return None if text is None else json.loads(text)
+
+    # ── Stores ───────────────────────────────────────────────────────────
+
+    def put_stream(
+        self,
+        namespace: str,
+        key: str,
+        source: TextIO,
+        ttl: float | None = None,
+        cost_seconds: float = 0.0,
+    ) -> None:
+        """
+        Store the rest of `source` under `key`, replacing any earlier value,
+        then evict least recently used entries until the cache fits its cap.
+
+        Args:
+            ttl: Seconds the value may be reused for; None for as long as it fits.
+            cost_seconds: How long producing the value took, credited as saved
+                time on every hit.
+        """
+        if not self.enabled:
+            return
+        body = f"{namespace}/{key[:2]}/{key}{CODEC_SUFFIXES[DEFAULT_CODEC]}"
+        path = self.directory / body
+        tmp_path = private_temp_path(path)
+        try:
+            with open_compressed_text(tmp_path, "w", codec=DEFAULT_CODEC) as f:
+                shutil.copyfileobj(source, f)
+            size = tmp_path.stat().st_size
+            os.replace(tmp_path, path)
+        finally:
+            tmp_path.unlink(missing_ok=True)
+
+        now = time.time()
+        with self._transaction() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO entries "
+                "(namespace, key, body, size, created_at, last_access, expires_at, cost_seconds) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (namespace, key, body, size, now, now, now + ttl if ttl is not None else None, cost_seconds),
+            )
+            self._evict(conn, self.max_bytes)
+
+    def put(self, namespace: str, key: str, value: str, ttl: float | None = None, cost_seconds: float = 0.0) -> None:
+        if not self.enabled:
+            return
+        self.put_stream(namespace, key, io.StringIO(value), ttl=ttl, cost_seconds=cost_seconds)
+
+    def put_json(self, namespace: str, key: str, value, ttl: float | None = None, cost_seconds: float = 0.0) -> None:
+        self.put(namespace, key, json.dumps(value, ensure_ascii=False), ttl=ttl, cost_seconds=cost_seconds)
+
+    def memoize(
+        self,
+        namespace: str,
+        key: str,
+        compute: Callable[[], str],
+        ttl: float | None = None,
+    ) -> str:
+        """The cached value of `key`, or `compute()`'s result, stored with the time it took."""
+        cached = self.get(namespace, key)
+        if cached is not None:
+            return cached
+        started = time.perf_counter()
+        value = compute()
+        self.put(namespace, key, value, ttl=ttl, cost_seconds=time.perf_counter() - started)
+        return value
+
+    # ── Maintenance ──────────────────────────────────────────────────────
+
+    def _delete(self, conn: sqlite3.Connection, namespace: str, key: str, body: str) -> None:
+        conn.execute("DELETE FROM entries WHERE namespace = ? AND key = ?", (namespace, key))
+        (self.directory / body).unlink(missing_ok=True)
+
+    def _evict(self, conn: sqlite3.Connection, max_bytes: int) -> tuple[int, int]:
+        """Drop least recently used entries until the total fits `max_bytes`."""
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        removed = freed = 0
+        if total <= max_bytes:
+            return removed, freed
+        for row in conn.execute("SELECT namespace, key, body, size FROM entries ORDER BY last_access").fetchall():
+            if total - freed <= max_bytes:
+                break
+            self._delete(conn, row["namespace"], row["key"], row["body"])
+            removed += 1
+            freed += row["size"]
+        return removed, freed
+
+    def prune(self, max_bytes: int | None = None) -> tuple[int, int]:
+        """
+        Remove expired entries, then evict down to `max_bytes` (default: the cap).
+
+        Returns:
+            (entries removed, bytes freed).
+        """
+        with self._transaction() as conn:
+            expired = conn.execute(
+                "SELECT namespace, key, body, size FROM entries WHERE expires_at IS NOT NULL AND expires_at <= ?",
+                (time.time(),),
+            ).fetchall()
+            for row in expired:
+                self._delete(conn, row["namespace"], row["key"], row["body"])
+            removed, freed = self._evict(conn, self.max_bytes if max_bytes is None else max_bytes)
+        return removed + len(expired), freed + sum(row["size"] for row in expired)
+
+    def stats(self) -> list[NamespaceStats]:
+        """Per-namespace entries, size, hits, misses and saved time."""
+        by_namespace: dict[str, NamespaceStats] = {}
+        conn = self._connect()
+        try:
+            for row in conn.execute(
+                "SELECT namespace, COUNT(*) AS entries, SUM(size) AS size FROM entries GROUP BY namespace"
+            ):
+                by_namespace[row["namespace"]] = NamespaceStats(row["namespace"], row["entries"], row["size"])
+            for row in conn.execute("SELECT * FROM stats"):
+                stats = by_namespace.setdefault(row["namespace"], NamespaceStats(row["namespace"]))
+                stats.hits, stats.misses, stats.saved_seconds = row["hits"], row["misses"], row["saved_seconds"]
+        finally:
+            conn.close()
+        return [by_namespace[n] for n in sorted(by_namespace)]
+
+
+_cache: ResearchCache | None = None
+
+
+def get_cache() -> ResearchCache:
+    """Return the process-wide cache."""
+    global _cache
+    if _cache is None:
+        _cache = ResearchCache()
+    return _cache
+
+
+def disable_cache() -> None:
+    """Turn off caching for this process (--no-cache)."""
+    get_cache().enabled = False
@@ -0,0 +1,135 @@
+"""
+The research catalog manifest: app/playgrounds/research.json.
+
+One committed file records every playground that has a research companion —
+where it lives, its title and topics, when and with which models it was
+researched, its word count, the input fingerprint it was made from and its
+research tier (a fast-tier companion is a draft awaiting its upgrade) — so
+nothing has to walk the playground tree and open each research/ directory to
+find out. `write_output` updates the playground's entry after every run.
+
+Updates read the manifest, replace the one entry and write it back atomically
+under a lock, so concurrent runs never lose each other's entries. The file is
+pretty-printed with sorted keys, so each update is a small diff. A manifest
+that cannot be parsed is never overwritten by an update (readers treat it as
+empty); `--render-artifacts` rebuilds it from the tree. Fields a newer version
+added are ignored when reading.
+"""
+
+import json
+from dataclasses import asdict, dataclass, field, fields
+from pathlib import Path
+
+from fileio import atomic_write_text, file_lock
+
+
+CATALOG_FILENAME = "research.json"
+CATALOG_VERSION = 1
+
+
+class CatalogError(RuntimeError):
+    """The manifest exists but cannot be read."""
+
+
+@dataclass
+class CatalogEntry:
+    """One playground's research companion."""
+    slug: str
+    path: str  # relative to app/playgrounds/, e.g. "(2025)/(07)/hsp90-canalization"
+    title: str = ""
+    topics: list[str] = field(default_factory=list)
+    researched_at: str = ""
+    run_id: str = ""
+    models: dict[str, str] = field(default_factory=dict)
+    word_count: int = 0
+    fingerprint: str = ""
+    tier: str = ""  # "fast" for a draft awaiting its premium upgrade
+
+    @property
+    def url(self) -> str:
+        return f"/playgrounds/{self.slug}/research"
+
+
+class ResearchCatalog:
+    """Reads and updates the manifest in a playgrounds directory."""
+
+    def __init__(self, playgrounds_dir: Path):
+        self.playgrounds_dir = playgrounds_dir
+        self.path = playgrounds_dir / CATALOG_FILENAME
+
+    @classmethod
+    def for_project(cls, project_root: Path) -> "ResearchCatalog":
+        return cls(project_root / "app" / "playgrounds")
+
+    @classmethod
+    def for_playground(cls, playground_dir: Path) -> "ResearchCatalog":
+        # app/playgrounds/(YYYY)/(MM)/<slug>
+        return cls(playground_dir.parents[2])
+
+    def entries(self) -> dict[str, CatalogEntry]:
+        """All entries by slug; empty if there is no manifest yet or it is unreadable."""
+        try:
+            return self._read()
+        except CatalogError:
+            return {}
+
+    def _read(self) -> dict[str, CatalogEntry]:
+        """
+        All entries by slug, for an update.
+
+        Raises:
+            CatalogError: If the manifest cannot be parsed, so that writing
+                it back would drop every other entry.
+        """
+        if not self.path.exists():
+            return {}
+        try:
+            data = json.loads(self.path.read_text())
+            known = {f.name for f in fields(CatalogEntry)}
+            return {
+                slug: CatalogEntry(**{k: v for k, v in info.items() if k in known})
+                for slug, info in data.get("playgrounds", {}).items()
+            }
+        except (ValueError, TypeError, AttributeError) as e:
+            raise CatalogError(
+                f"Cannot read {self.path} ({e}); fix it or rebuild it with --render-artifacts."
+            ) from e
+
+    def get(self, slug: str) -> CatalogEntry | None:
+        return self.entries().get(slug)
+
+    def playground_dir(self, entry: CatalogEntry) -> Path:
+        return self.playgrounds_dir / entry.path
+
+    def update(self, entry: CatalogEntry) -> bool:
+        """
+        Add or replace one entry.
+
+        Returns:
+            True if the manifest changed.
+        """
+        with file_lock(self.path.with_name(f".{self.path.name}.lock")):
+            entries = self._read()
+            if entries.get(entry.slug) == entry:
+                return False
+            entries[entry.slug] = entry
+            return self._write(entries)
+
+    def remove(self, slug: str) -> bool:
+        with file_lock(self.path.with_name(f".{self.path.name}.lock")):
+            entries = self._read()
+            if entries.pop(slug, None) is None:
+                return False
+            return self._write(entries)
+
+    def replace_all(self, entries: list[CatalogEntry]) -> bool:
+        """Rewrite the manifest from scratch, e.g. after rebuilding it from the tree."""
+        with file_lock(self.path.with_name(f".{self.path.name}.lock")):
+            return self._write({e.slug: e for e in entries})
+
+    def _write(self, entries: dict[str, CatalogEntry]) -> bool:
+        data = {
+            "version": CATALOG_VERSION,
+            "playgrounds": {slug: asdict(entries[slug]) for slug in sorted(entries)},
+        }
+        return atomic_write_text(self.path, json.dumps(data, indent=2, ensure_ascii=False, sort_keys=True) + "\n")
@@ -0,0 +1,375 @@
+"""
+Citation normalization between the providers and synthesis.
+
+Provider reports cite heavily overlapping sources, each in its own style:
+inline markdown links, bare URLs, numbered footnotes with a reference list at
+the end. Before synthesis every cited URL is canonicalized (scheme, `www.`,
+tracking parameters, DOI and arXiv forms), deduplicated into one shared
+reference table, and each citation in the reports is replaced by a short key
+such as [R12]. The canonical form only decides which citations are the same
+source; each source is linked by the URL it was first cited with. Reference
+lists (sections titled as one, or made up mostly of linked list items) are
+taken out of the reports since the table replaces them; any line in them
+that is not a cited link stays in the report.
+
+The synthesis model cites by key; `render_citations` then turns the keys into
+numbered links and appends a bibliography, so `content.md` has one consistent
+reference list whichever provider a source came from. `cite_keys` does the
+reverse for an existing `content.md`, so it can be patched. Patched sections
+are rendered with `link_citations`, continuing the numbering the document
+already uses (`citation_numbers`), and `with_bibliography` rebuilds the
+References section, so the sections left alone keep their links as they are.
+"""
+
+import re
+from dataclasses import dataclass, field
+from urllib.parse import parse_qsl, unquote, urlencode, urlsplit, urlunsplit
+
+from providers.base import ResearchResult
+from tokens import count_tokens
+
+
+# Query parameters that only track where a click came from
+TRACKING_PARAMS = {"fbclid", "gclid", "mc_cid", "mc_eid", "ref", "ref_src", "source"}
+
+_URL = r"https?://[^\s<>\"'\]\)]+(?:\([^\s<>\"')]*\)[^\s<>\"'\]\)]*)*"
+_MD_LINK = re.compile(rf"!?\[([^\]\n]*)\]\(({_URL})(?:\s+\"[^\"\n]*\")?\)")
+_BARE_URL = re.compile(rf"<?({_URL})>?")
+_DOI = re.compile(r"\bdoi:\s*(10\.\d{4,9}/[^\s\"<>\]\)]+)", re.IGNORECASE)
+_FOOTNOTE = re.compile(r"\[\^?(\d{1,3}(?:\s*[,–-]\s*\^?\d{1,3})*)\]")
+_FOOTNOTE_DEFINITION = re.compile(r"^\[\^\d+\]:.*$\n?", re.MULTILINE)
+_KEYS = re.compile(r"\[(R\d+(?:\s*[,;]\s*R\d+)*)\]")
+_NUMBERED_LINK = re.compile(rf"\[\[(\d+)\]\]\(({_URL})\)")
+_BIBLIOGRAPHY = re.compile(r"\n## References\n(?P<entries>(?:\s*\d+\. .*\n?)*)\s*$")
+_BIBLIOGRAPHY_ENTRY = re.compile(rf"^\s*(\d+)\. \[([^\]\n]*)\]\(({_URL})\)\s*$", re.MULTILINE)
+
+_REFERENCE_WORDS = r"(?:references|sources|bibliography|works cited|citations|further reading)"
+# A heading that is a reference list title and nothing else, e.g. "## Sources:"
+_REFERENCE_TITLE = re.compile(
+    rf"^(?:#{{1,6}}\s*|\*\*)\s*(?:notes and |key |selected |cited )?{_REFERENCE_WORDS}"
+    r"(?:\s+(?:cited|consulted|and further reading|and notes))?\s*:?\s*(?:\*\*)?\s*:?\s*$",
+    re.IGNORECASE,
+)
+# A heading that only starts like one ("## Sources of Variation in CO2 Uptake")
+_REFERENCE_LIKE_HEADING = re.compile(rf"^(?:#{{1,6}}\s*|\*\*){_REFERENCE_WORDS}\b", re.IGNORECASE)
+_SECTION_HEADING = re.compile(r"^(?:#{1,6}\s.*|\*\*[^*\n]+\*\*:?)[ \t]*$", re.MULTILINE)
+_LINK_ITEM = re.compile(rf"^\s*(?:[-*+]|\d+[.)]|\[\^?\d+\]:?)\s.*{_URL}")
+_LIST_NUMBER = re.compile(r"^\s*(?:\[\^?(\d+)\]:?|(\d+)[.)])\s*")
+
+# Link texts that name no source, e.g. "[source](...)" or "[3](...)"
+_GENERIC_LINK_TEXT = re.compile(r"^(?:\d+|source|sources|link|here|ref|pdf|html|[\w.-]+\.[a-z]{2,})$", re.IGNORECASE)
+
+
+def canonical_url(url: str) -> str:
+    """A normal form of `url`, so the same source cited two ways compares equal."""
+    url = url.strip().rstrip(".,;:")
+    try:
+        parts = urlsplit(url)
+        port = parts.port
+    except ValueError:  # a malformed port or IPv6 host in a model-written link
+        return url
+    host = (parts.hostname or "").lower().removeprefix("www.")
+    path = unquote(parts.path)
+
+    if host in ("doi.org", "dx.doi.org"):
+        return f"https://doi.org/{path.lstrip('/').lower()}"
+    if host in ("arxiv.org", "export.arxiv.org"):
+        match = re.match(r"/(?:abs|pdf)/(.+?)(?:v\d+)?(?:\.pdf)?$", path)
+        if match:
+            return f"https://arxiv.org/abs/{match.group(1)}"
+
+    query = urlencode([
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if not k.lower().startswith("utm_") and k.lower() not in TRACKING_PARAMS
+    ])
+    port = f":{port}" if port and port not in (80, 443) else ""
+    return urlunsplit(("https", host + port, path.rstrip("/") or "/", query, ""))
+
+
+@dataclass
+class Reference:
+    """One source in the shared reference table."""
+    key: str
+    url: str  # as first cited; the table is keyed by its canonical form
+    title: str = ""
+    citations: int = 0
+
+
+@dataclass
+class ReferenceTable:
+    """Sources cited across all reports, keyed R1, R2, ... by first citation."""
+    references: dict[str, Reference] = field(default_factory=dict)  # canonical url -> reference
+
+    def add(self, url: str, title: str = "") -> str:
+        """Register a citation of `url` and return its key."""
+        url = url.strip().rstrip(".,;:")
+        canonical = canonical_url(url)
+        ref = self.references.get(canonical)
+        if ref is None:
+            ref = Reference(key=f"R{len(self.references) + 1}", url=url)
+            self.references[canonical] = ref
+        title = _clean_title(title)
+        if title and not ref.title:
+            ref.title = title
+        ref.citations += 1
+        return ref.key
+
+    def key_for(self, url: str) -> str | None:
+        """The key of `url`'s source, if it is in the table."""
+        ref = self.references.get(canonical_url(url.strip().rstrip(".,;:")))
+        return ref.key if ref else None
+
+    def by_key(self) -> dict[str, Reference]:
+        return {ref.key: ref for ref in self.references.values()}
+
+    @property
+    def citations(self) -> int:
+        return sum(ref.citations for ref in self.references.values())
+
+    def to_prompt(self) -> str:
+        """The table as a markdown section for the synthesis prompt."""
+        lines = [f"[{ref.key}] {ref.title + ' — ' if ref.title else ''}{ref.url}" for ref in self.references.values()]
+        return "## Reference Table\n\n" + "\n".join(lines)
+
+
+@dataclass
+class NormalizedReport:
+    """A provider report with its citations replaced by reference keys."""
+    provider: str
+    model: str
+    text: str
+    original_tokens: int = 0  # of the report as the provider wrote it
+
+
+def _clean_title(title: str) -> str:
+    title = re.sub(r"[*_`]+", "", title)
+    title = re.sub(r"\s+", " ", title).strip(" \t-–—:;,.()[]")
+    if not title or _GENERIC_LINK_TEXT.match(title):
+        return ""
+    return title[:200]
+
+
+def _is_reference_list(heading: str, lines: list[str]) -> bool:
+    """A section titled as a reference list, or headed like one and mostly linked list items."""
+    if _REFERENCE_TITLE.match(heading):
+        return True
+    if not _REFERENCE_LIKE_HEADING.match(heading):
+        return False
+    content = [line for line in lines if line.strip()]
+    return bool(content) and sum(1 for line in content if _LINK_ITEM.match(line)) >= 0.6 * len(content)
+
+
+def _split_reference_sections(text: str) -> tuple[str, list[str]]:
+    """
+    Separate reference lists from the body of a report. Only the cited link
+    lines of a reference list are taken out; anything else in it is kept,
+    with its heading.
+    """
+    headings = list(_SECTION_HEADING.finditer(text))
+    body, sections = [text[:headings[0].start()] if headings else text], []
+    for i, heading in enumerate(headings):
+        end = headings[i + 1].start() if i + 1 < len(headings) else len(text)
+        section = text[heading.end():end]
+        lines = section.splitlines(keepends=True)
+        if not _is_reference_list(heading.group(0), lines):
+            body.append(text[heading.start():end])
+            continue
+        links, rest = [], []
+        for line in lines:
+            (links if _MD_LINK.search(line) or _BARE_URL.search(line) else rest).append(line)
+        sections.append("".join(links))
+        if any(line.strip() for line in rest):
+            body.append(heading.group(0) + "".join(rest))
+        else:
+            body.append("\n")
+    return "".join(body), sections
+
+
+def _footnote_numbers(group: str) -> list[int]:
+    numbers = []
+    for part in re.split(r"\s*,\s*", group.replace("^", "")):
+        bounds = re.split(r"\s*[–-]\s*", part)
+        if len(bounds) == 2 and int(bounds[1]) - int(bounds[0]) < 20:
+            numbers.extend(range(int(bounds[0]), int(bounds[1]) + 1))
+        else:
+            numbers.extend(int(b) for b in bounds)
+    return numbers
+
+
+def normalize_report(text: str, table: ReferenceTable) -> str:
+    """Replace the citations in one report by keys from `table`."""
+    body, sections = _split_reference_sections(text)
+    # Markdown footnote definitions ("[^3]: ...") are a reference list too
+    sections.append("".join(_FOOTNOTE_DEFINITION.findall(body)))
+    body = _FOOTNOTE_DEFINITION.sub("", body)
+
+    # Numbered reference lists: remember which key each footnote number means
+    footnotes: dict[int, str] = {}
+    for section in sections:
+        for line in section.splitlines():
+            link = _MD_LINK.search(line)
+            bare = None if link else _BARE_URL.search(line)
+            if not link and not bare:
+                continue
+            number = _LIST_NUMBER.match(line)
+            if link:
+                title = link.group(1) if _clean_title(link.group(1)) else line[:link.start()]
+                key = table.add(link.group(2), _LIST_NUMBER.sub("", title))
+            else:
+                key = table.add(bare.group(1), _LIST_NUMBER.sub("", line[:bare.start()]))
+            if number:
+                footnotes[int(number.group(1) or number.group(2))] = key
+
+    def replace_link(match: re.Match) -> str:
+        key = table.add(match.group(2), match.group(1))
+        text = match.group(1).strip()
+        return f"[{key}]" if not _clean_title(text) else f"{text} [{key}]"
+
+    def replace_url(match: re.Match) -> str:
+        url = match.group(1)
+        trailing = url[len(url.rstrip(".,;:")):]
+        return f"[{table.add(url)}]{trailing}"
+
+    def replace_footnote(match: re.Match) -> str:
+        numbers = _footnote_numbers(match.group(1))
+        if not numbers or any(n not in footnotes for n in numbers):
+            return match.group(0)
+        return "[" + ", ".join(dict.fromkeys(footnotes[n] for n in numbers)) + "]"
+
+    body = _MD_LINK.sub(replace_link, body)
+    body = _BARE_URL.sub(replace_url, body)
+    body = _DOI.sub(lambda m: f"[{table.add('https://doi.org/' + m.group(1))}]", body)
+    if footnotes:
+        body = _FOOTNOTE.sub(replace_footnote, body)
+    return body.strip()
+
+
+def normalize_reports(
+    results: list[ResearchResult],
+    table: ReferenceTable | None = None,
+) -> tuple[list[NormalizedReport], ReferenceTable]:
+    """
+    Normalize the citations of every completed report into one shared table.
+
+    Args:
+        results: Provider results.
+        table: A table to extend, e.g. one holding an existing document's sources.
+
+    Returns:
+        The reports with citations replaced by keys, and the reference table.
+    """
+    table = table if table is not None else ReferenceTable()
+    reports = []
+    for result in results:
+        content = result.read_content() if result.status == "completed" else ""
+        if content:
+            reports.append(NormalizedReport(
+                result.provider, result.model, normalize_report(content, table), count_tokens(content),
+            ))
+    return reports, table
+
+
+def render_citations(markdown: str, table: ReferenceTable, bibliography: bool = True) -> str:
+    """
+    Turn reference keys in synthesized markdown into links.
+
+    With `bibliography`, cited sources are numbered in order of first citation,
+    keys become numbered links ([3]) and a References section listing them is
+    appended. Without it, each key becomes a link titled with its source.
+    Unknown keys are removed.
+    """
+    refs = table.by_key()
+    if bibliography:
+        numbers: dict[str, int] = {}
+        markdown = link_citations(markdown, table, numbers)
+        if not numbers:
+            return markdown
+        entries = []
+        for key, number in numbers.items():
+            ref = refs[key]
+            entries.append(f"{number}. [{ref.title or ref.url}]({ref.url})")
+        return markdown.rstrip() + "\n\n## References\n\n" + "\n".join(entries) + "\n"
+
+    def replace(match: re.Match) -> str:
+        return " ".join(
+            f"[{refs[key].title or refs[key].url}]({refs[key].url})"
+            for key in dict.fromkeys(re.split(r"\s*[,;]\s*", match.group(1))) if key in refs
+        )
+
+    return _KEYS.sub(replace, markdown)
+
+
+def link_citations(markdown: str, table: ReferenceTable, numbers: dict[str, int]) -> str:
+    """
+    Turn reference keys into numbered links, numbering each source `numbers`
+    does not have yet after the highest number in it (and adding it there).
+    Unknown keys are removed.
+    """
+    refs = table.by_key()
+
+    def replace(match: re.Match) -> str:
+        links = []
+        for key in dict.fromkeys(re.split(r"\s*[,;]\s*", match.group(1))):
+            ref = refs.get(key)
+            if ref is None:
+                continue
+            if key not in numbers:
+                numbers[key] = max(numbers.values(), default=0) + 1
+            links.append(f"[[{numbers[key]}]]({ref.url})")
+        return "".join(links)
+
+    return _KEYS.sub(replace, markdown)
+
+
+def split_bibliography(markdown: str) -> tuple[str, str]:
+    """A rendered document's body and its generated References section ("" if it has none)."""
+    bibliography = _BIBLIOGRAPHY.search(markdown)
+    if not bibliography:
+        return markdown, ""
+    return markdown[:bibliography.start()], markdown[bibliography.start():]
+
+
+def citation_numbers(markdown: str, table: ReferenceTable) -> dict[str, int]:
+    """The number a rendered document cites each source of `table` by, from its References and links."""
+    body, bibliography = split_bibliography(markdown)
+    cited = [(m[0], m[2]) for m in _BIBLIOGRAPHY_ENTRY.findall(bibliography)]
+    cited += [(m[1], m[2]) for m in _NUMBERED_LINK.finditer(body)]
+    numbers: dict[str, int] = {}
+    for number, url in cited:
+        key = table.key_for(url)
+        if key is not None:
+            numbers.setdefault(key, int(number))
+    return numbers
+
+
+def with_bibliography(markdown: str, table: ReferenceTable) -> str:
+    """`markdown` followed by a References section listing the numbered links it contains, by number."""
+    sources: dict[int, str] = {}
+    for match in _NUMBERED_LINK.finditer(markdown):
+        sources.setdefault(int(match[1]), match[2])
+    if not sources:
+        return markdown
+    refs = table.by_key()
+    entries = []
+    for number, url in sorted(sources.items()):
+        key = table.key_for(url)
+        title = refs[key].title if key is not None else ""
+        entries.append(f"{number}. [{title or url}]({url})")
+    return markdown.rstrip() + "\n\n## References\n\n" + "\n".join(entries) + "\n"
+
+
+def cite_keys(markdown: str, table: ReferenceTable) -> str:
+    """
+    Undo `render_citations` on a document: numbered citation links become
+    keys from `table` and the generated References section is removed, its
+    entries registered with their titles. Other links are left alone.
+    """
+    markdown, bibliography = split_bibliography(markdown)
+    if bibliography:
+        for _, title, url in _BIBLIOGRAPHY_ENTRY.findall(bibliography):
+            table.add(url, "" if title == url else title)
+        markdown = markdown.rstrip() + "\n"
+
+    markdown = _NUMBERED_LINK.sub(lambda m: f"[{table.add(m.group(2))}]", markdown)
+    # Adjacent citations were rendered as one group of links: [R1][R2] -> [R1, R2]
+    return re.sub(r"(?<=\d)\]\[(?=R\d+\])", ", ", markdown)
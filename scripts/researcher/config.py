@@ -2,7 +2,45 @@
 Central configuration for model names and constants.
 """
 
+import os
+from pathlib import Path
+
 MODEL_QUERY_GENERATION = "gpt-5.2-pro"
 MODEL_SYNTHESIS = "gpt-5.2-pro"
 MODEL_DEEP_RESEARCH_OPENAI = "o3-deep-research"
 MODEL_DEEP_RESEARCH_GEMINI = "deep-research-pro-preview-12-2025"
+MODEL_DEEP_RESEARCH_OPENAI_FAST = "o4-mini-deep-research"
+
+# Research tiers: the deep research model each provider runs at that tier.
+# A fast run publishes a draft companion within minutes and a premium run
+# replaces it later. A provider with no model at a tier is skipped there
+# (Gemini has no fast deep research agent).
+TIER_FAST = "fast"
+TIER_PREMIUM = "premium"
+RESEARCH_TIERS = {
+    TIER_FAST: {"openai": MODEL_DEEP_RESEARCH_OPENAI_FAST},
+    TIER_PREMIUM: {"openai": MODEL_DEEP_RESEARCH_OPENAI, "gemini": MODEL_DEEP_RESEARCH_GEMINI},
+}
+DEFAULT_TIER = TIER_PREMIUM
+
+# --tier also takes "draft" (fast now, upgraded at premium afterwards) and
+# "auto" (chosen per playground from its staleness, see staleness.choose_tier)
+TIER_DRAFT = "draft"
+TIER_AUTO = "auto"
+TIER_MODES = (TIER_FAST, TIER_PREMIUM, TIER_DRAFT, TIER_AUTO)
+
+# Local state shared across playgrounds (run archive, queues, caches).
+# Kept next to the script and gitignored; override with RESEARCHER_HOME.
+RESEARCHER_HOME = Path(
+    os.environ.get("RESEARCHER_HOME", Path(__file__).resolve().parent / ".researcher")
+)
+
+# USD per million tokens (input, output), used by --dry-run cost estimates.
+# Deep research output includes reasoning tokens; web search calls are billed
+# separately and not included. Update alongside the model names above.
+MODEL_PRICES = {
+    "gpt-5.2-pro": (21.00, 168.00),
+    "o3-deep-research": (10.00, 40.00),
+    "o4-mini-deep-research": (2.00, 8.00),
+    "deep-research-pro-preview-12-2025": (2.00, 12.00),
+}
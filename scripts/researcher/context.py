@@ -48,7 +48,20 @@ class PlaygroundContext:
         if self.ideation_demo:
             sections.append(f"\n## Ideation Demo Code\n\n```tsx\n{self.ideation_demo}\n```")
 
-        return "\n".join(sections)
+        return compact_prompt("\n".join(sections))
+
+
+_TRAILING_WHITESPACE = re.compile(r"[ \t]+$", re.MULTILINE)
+_BLANK_LINE_RUNS = re.compile(r"\n{3,}")
+
+
+def compact_prompt(text: str) -> str:
+    """
+    Drop whitespace that costs tokens without carrying meaning: trailing
+    spaces and runs of more than one blank line.
+    """
+    text = _TRAILING_WHITESPACE.sub("", text)
+    return _BLANK_LINE_RUNS.sub("\n\n", text)
 
 
 def _extract_metadata_field(content: str, field_name: str) -> str:
@@ -63,29 +76,28 @@ def _extract_metadata_field(content: str, field_name: str) -> str:
     return match.group(1) if match else ""
 
 
-def _extract_data_entry(data_ts_path: Path, playground_link: str) -> tuple[str, list[str], list[str], str]:
-    """
-    Extract a playground's entry from data.ts.
-
-    Returns (raw_entry, topics, operations, date).
-    """
-    if not data_ts_path.exists():
-        return "", [], [], ""
-
-    content = data_ts_path.read_text()
-
+def find_data_entry(data_ts: str, playground_link: str) -> str:
+    """Return the raw `{ ... }` block of data.ts whose link matches, or ""."""
     # Find the block containing this playground's link
     pattern = rf"\{{[^}}]*link:\s*'{playground_link}'[^}}]*\}}"
-    match = re.search(pattern, content, re.DOTALL)
+    match = re.search(pattern, data_ts, re.DOTALL)
     if not match:
         # Try with double quotes
         pattern = rf'\{{[^}}]*link:\s*"{playground_link}"[^}}]*\}}'
-        match = re.search(pattern, content, re.DOTALL)
+        match = re.search(pattern, data_ts, re.DOTALL)
+
+    return match.group(0) if match else ""
 
-    if not match:
-        return "", [], [], ""
 
-    entry = match.group(0)
+def _extract_data_entry(data_ts: str, playground_link: str) -> tuple[str, list[str], list[str], str]:
+    """
+    Extract a playground's entry from the contents of data.ts.
+
+    Returns (raw_entry, topics, operations, date).
+    """
+    entry = find_data_entry(data_ts, playground_link)
+    if not entry:
+        return "", [], [], ""
 
     # Extract topics
     topics_match = re.search(r"topics:\s*\[([^\]]+)\]", entry)
@@ -106,13 +118,15 @@ def _extract_data_entry(data_ts_path: Path, playground_link: str) -> tuple[str,
     return entry, topics, operations, date
 
 
-def build_context(playground_dir: Path, project_root: Path) -> PlaygroundContext:
+def build_context(playground_dir: Path, project_root: Path, data_ts: str | None = None) -> PlaygroundContext:
     """
     Build a complete context bundle from a playground directory.
 
     Args:
         playground_dir: Path to the playground directory.
         project_root: Root of the Next.js project.
+        data_ts: Contents of app/playgrounds/data.ts, if the caller already
+            read it (catalog-wide callers read it once, not per playground).
 
     Returns:
         PlaygroundContext with all extracted information.
@@ -162,8 +176,10 @@ def build_context(playground_dir: Path, project_root: Path) -> PlaygroundContext
             ideation_demo = demo_path.read_text()
 
     # Extract data.ts entry
-    data_ts_path = project_root / "app" / "playgrounds" / "data.ts"
-    data_entry, topics, operations, date = _extract_data_entry(data_ts_path, link)
+    if data_ts is None:
+        data_ts_path = project_root / "app" / "playgrounds" / "data.ts"
+        data_ts = data_ts_path.read_text() if data_ts_path.exists() else ""
+    data_entry, topics, operations, date = _extract_data_entry(data_ts, link)
 
     return PlaygroundContext(
         name=name,
@@ -6,12 +6,16 @@ Walks (YYYY)/(MM)/ route groups to locate the matching playground directory.
 
 from pathlib import Path
 
+from catalog import ResearchCatalog
+
 
 def find_playground(name: str, project_root: Path | None = None) -> Path:
     """
     Find a playground directory by its slug name.
 
-    Walks app/playgrounds/(YYYY)/(MM)/<name> looking for an exact directory match.
+    Playgrounds with research are looked up in the research catalog first;
+    others are found by walking app/playgrounds/(YYYY)/(MM)/<name> for an
+    exact directory match.
 
     Args:
         name: The playground slug (e.g. "hsp90-canalization")
@@ -31,6 +35,13 @@ def find_playground(name: str, project_root: Path | None = None) -> Path:
     if not playgrounds_dir.is_dir():
         raise FileNotFoundError(f"Playgrounds directory not found: {playgrounds_dir}")
 
+    catalog = ResearchCatalog(playgrounds_dir)
+    entry = catalog.get(name)
+    if entry is not None:
+        candidate = catalog.playground_dir(entry)
+        if (candidate / "page.tsx").exists():
+            return candidate
+
     # Walk (YYYY)/(MM)/ route groups
     for year_dir in sorted(playgrounds_dir.iterdir()):
         if not year_dir.is_dir() or not year_dir.name.startswith("("):
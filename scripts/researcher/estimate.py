@@ -0,0 +1,338 @@
+"""
+Dry-run planning: what a research run would send, cost and take.
+
+Every prompt the pipeline sends is rendered from the playground's context and
+its tokens counted locally. What cannot be known before a run — the queries
+the model will write, how much a deep research model reads and writes — comes
+from the archive's history for that model, and how long it takes from the
+latency history; both fall back to conservative defaults. No network calls are
+made.
+
+The same estimates drive scheduling: batches run longest-first, and
+`choose_providers` picks the providers that fit a time or cost target.
+"""
+
+import heapq
+import itertools
+import statistics
+from dataclasses import dataclass, field
+
+from archive import ResearchArchive
+from config import DEFAULT_TIER, MODEL_PRICES, MODEL_QUERY_GENERATION, MODEL_SYNTHESIS
+from extract import ExtractedContext
+from latency import LatencyHistory
+from partials import PartialStore
+from pipeline import build_research_prompt, provider_models
+from queries import build_query_prompt
+from synthesis import SYNTHESIS_SYSTEM_PROMPT, build_synthesis_prompt
+from tokens import count_tokens
+
+
+STAGE_QUERIES = "queries"
+STAGE_RESEARCH = "research"
+STAGE_SYNTHESIS = "synthesis"
+
+# The query model writes 4-6 queries; a typical one is a long sentence
+QUERY_COUNT = 5
+QUERY_TOKENS = 45
+
+# Output includes reasoning tokens, which dominate for the pro models
+QUERY_OUTPUT_TOKENS = 4_000
+SYNTHESIS_OUTPUT_TOKENS = 24_000
+QUERY_SECONDS = 60.0
+SYNTHESIS_SECONDS = 240.0
+
+HISTORY_RUNS = 20  # most recent archived runs per model used for estimates
+
+
+@dataclass
+class ModelProfile:
+    """Typical token use of a deep research model."""
+    input_tokens: int
+    output_tokens: int
+    report_tokens: int
+    runs: int = 0  # archived runs this is based on; 0 means defaults
+
+
+# Used for models without archived runs or latency history
+DEFAULT_PROFILE = ModelProfile(input_tokens=250_000, output_tokens=40_000, report_tokens=12_000)
+DEFAULT_RESEARCH_SECONDS = 900.0
+DEFAULT_SUCCESS_RATE = 0.9
+
+
+@dataclass
+class CallEstimate:
+    """One API call of a run."""
+    stage: str
+    model: str
+    input_tokens: int
+    output_tokens: int
+    seconds: float
+    provider: str = ""
+    from_history: bool = False
+
+    @property
+    def cost(self) -> float:
+        return price(self.model, self.input_tokens, self.output_tokens)
+
+
+@dataclass
+class RunEstimate:
+    """All calls a run of one playground would make."""
+    playground: str
+    calls: list[CallEstimate] = field(default_factory=list)
+    skipped: list[str] = field(default_factory=list)  # providers reused from partials
+
+    @property
+    def input_tokens(self) -> int:
+        return sum(c.input_tokens for c in self.calls)
+
+    @property
+    def output_tokens(self) -> int:
+        return sum(c.output_tokens for c in self.calls)
+
+    @property
+    def cost(self) -> float:
+        return sum(c.cost for c in self.calls)
+
+    @property
+    def seconds(self) -> float:
+        """Wall time: query generation, then providers in parallel, then synthesis."""
+        research = [c.seconds for c in self.calls if c.stage == STAGE_RESEARCH]
+        other = [c.seconds for c in self.calls if c.stage != STAGE_RESEARCH]
+        return sum(other) + max(research, default=0.0)
+
+    @property
+    def unpriced(self) -> set[str]:
+        return {c.model for c in self.calls if c.model not in MODEL_PRICES}
+
+
+def price(model: str, input_tokens: int, output_tokens: int) -> float:
+    """Cost in USD from the price table; 0 for models it does not list."""
+    input_price, output_price = MODEL_PRICES.get(model, (0.0, 0.0))
+    return (input_tokens * input_price + output_tokens * output_price) / 1_000_000
+
+
+def load_profiles(archive: ResearchArchive | None = None, recent: int = HISTORY_RUNS) -> dict[str, ModelProfile]:
+    """
+    Median token use per deep research model, from archived runs.
+
+    Report sizes are measured from the archived reports themselves, so only the
+    most recent `recent` runs per model are read.
+    """
+    archive = archive or ResearchArchive()
+    samples: dict[str, list[dict]] = {}
+    for record in reversed(archive.runs()):
+        for info in record.providers.values():
+            model = info.get("model", "unknown")
+            if len(samples.setdefault(model, [])) < recent:
+                samples[model].append(info)
+
+    profiles: dict[str, ModelProfile] = {}
+    for model, infos in samples.items():
+        usage = [i["usage"] for i in infos if i.get("usage")]
+        reports = [count_tokens(archive.get_text(i["blob"])) for i in infos if archive.blob_path(i["blob"])]
+        profiles[model] = ModelProfile(
+            input_tokens=int(statistics.median(u.get("input_tokens", 0) for u in usage))
+            if usage else DEFAULT_PROFILE.input_tokens,
+            output_tokens=int(statistics.median(u.get("output_tokens", 0) for u in usage))
+            if usage else DEFAULT_PROFILE.output_tokens,
+            report_tokens=int(statistics.median(reports)) if reports else DEFAULT_PROFILE.report_tokens,
+            runs=len(infos),
+        )
+    return profiles
+
+
+def estimate_run(
+    extracted: ExtractedContext,
+    provider_names: list[str],
+    focus: list[str] | None = None,
+    model_override: str | None = None,
+    resume: bool = False,
+    profiles: dict[str, ModelProfile] | None = None,
+    latency: LatencyHistory | None = None,
+    conservative: bool = False,
+    tier: str = DEFAULT_TIER,
+) -> RunEstimate:
+    """
+    Estimate the calls a run would make for one playground.
+
+    Args:
+        extracted: The playground's extracted context.
+        provider_names: Providers the run would use.
+        focus: Focus areas, each with its own query generation call.
+        model_override: OpenAI deep research model override.
+        resume: Leave out providers whose finished partials a resumed run would reuse.
+        profiles: Per-model history from `load_profiles()`.
+        latency: Latency history for provider durations.
+        conservative: Use the slow end (p90) of provider durations rather
+            than the median, e.g. when planning against a deadline.
+        tier: Research tier, "fast" or "premium"; providers without a model
+            at that tier are left out.
+    """
+    ctx = extracted.context
+    profiles = profiles if profiles is not None else load_profiles()
+    latency = latency or LatencyHistory()
+    models = provider_models(model_override, tier)
+    estimate = RunEstimate(playground=ctx.name)
+
+    to_run = [p for p in provider_names if p in models]
+    if resume:
+        entries = PartialStore(extracted.path).entries()
+        reusable = [
+            p for p in to_run
+            if p in entries and entries[p].manifest.status == "completed"
+            and entries[p].manifest.model in ("unknown", models[p])
+        ]
+        estimate.skipped = reusable
+        to_run = [p for p in to_run if p not in reusable]
+
+    focuses = focus or [None]
+    if to_run:
+        # One call per focus, run concurrently: only the first adds wall time
+        for i, f in enumerate(focuses):
+            estimate.calls.append(CallEstimate(
+                stage=STAGE_QUERIES,
+                model=MODEL_QUERY_GENERATION,
+                input_tokens=count_tokens(build_query_prompt(ctx, f)),
+                output_tokens=QUERY_OUTPUT_TOKENS,
+                seconds=QUERY_SECONDS if i == 0 else 0.0,
+            ))
+
+    # The real queries are not known yet: render with placeholders and add
+    # the tokens typical queries would take (before deduplication across focuses)
+    query_count = QUERY_COUNT * len(focuses)
+    research_prompt_tokens = (
+        count_tokens(build_research_prompt(ctx, [""] * query_count)) + query_count * QUERY_TOKENS
+    )
+    report_tokens = 0
+    sections = []
+    for provider in provider_names:
+        if provider not in models:
+            continue
+        model = models[provider]
+        profile = profiles.get(model, DEFAULT_PROFILE)
+        report_tokens += profile.report_tokens
+        sections.append(f"## Research from {provider} ({model})\n\n")
+        if provider in to_run:
+            stats = latency.stats(provider, model)
+            seconds = DEFAULT_RESEARCH_SECONDS
+            if stats and stats.measured:
+                seconds = stats.p90 if conservative else stats.p50
+            estimate.calls.append(CallEstimate(
+                stage=STAGE_RESEARCH,
+                provider=provider,
+                model=model,
+                input_tokens=max(profile.input_tokens, research_prompt_tokens),
+                output_tokens=profile.output_tokens,
+                seconds=seconds,
+                from_history=profile.runs > 0 or stats is not None,
+            ))
+
+    if sections:
+        estimate.calls.append(CallEstimate(
+            stage=STAGE_SYNTHESIS,
+            model=MODEL_SYNTHESIS,
+            input_tokens=(
+                count_tokens(SYNTHESIS_SYSTEM_PROMPT)
+                + count_tokens(build_synthesis_prompt(ctx, sections, focuses=focus))
+                + report_tokens
+            ),
+            output_tokens=SYNTHESIS_OUTPUT_TOKENS,
+            seconds=SYNTHESIS_SECONDS,
+        ))
+
+    return estimate
+
+
+def longest_first(runs: list[RunEstimate]) -> list[RunEstimate]:
+    """
+    Order runs longest-first, which keeps concurrent workers busy until the
+    end of a batch instead of leaving one long run to finish alone.
+    """
+    return sorted(runs, key=lambda r: -r.seconds)
+
+
+def schedule_seconds(runs: list[RunEstimate], concurrency: int = 1) -> float:
+    """
+    Predicted wall time of a batch whose runs start in order, at most
+    `concurrency` at a time.
+    """
+    slots = [0.0] * max(concurrency, 1)
+    finish = 0.0
+    for run in runs:
+        start = heapq.heappop(slots)
+        end = start + run.seconds
+        finish = max(finish, end)
+        heapq.heappush(slots, end)
+    return finish
+
+
+@dataclass
+class ProviderChoice:
+    """The providers picked for a time or cost target, and what they predict."""
+    providers: list[str]
+    estimates: list[RunEstimate]
+    seconds: float
+    cost: float
+    success_rate: float  # chance at least one provider succeeds, per run
+    feasible: bool
+
+
+def choose_providers(
+    extracted: list[ExtractedContext],
+    provider_names: list[str],
+    max_seconds: float | None = None,
+    max_cost: float | None = None,
+    concurrency: int = 1,
+    focus: list[str] | None = None,
+    model_override: str | None = None,
+    resume: bool = False,
+    tier: str = DEFAULT_TIER,
+) -> ProviderChoice:
+    """
+    Pick the subset of `provider_names` to run for one or more playgrounds.
+
+    Every non-empty subset is estimated (durations at their p90, so a plan
+    that fits is likely to finish on time). Among subsets within both targets,
+    the one most likely to produce a result wins, then the one with more
+    providers, then the cheaper one. If none fits, the fastest (or, with only
+    a cost target, the cheapest) is returned with `feasible` False.
+    """
+    profiles = load_profiles()
+    latency = LatencyHistory()
+    models = provider_models(model_override, tier)
+    provider_names = [p for p in provider_names if p in models] or provider_names
+
+    choices = []
+    for size in range(1, len(provider_names) + 1):
+        for subset in itertools.combinations(provider_names, size):
+            estimates = longest_first([
+                estimate_run(
+                    e, list(subset), focus=focus, model_override=model_override, resume=resume,
+                    profiles=profiles, latency=latency, conservative=True, tier=tier,
+                )
+                for e in extracted
+            ])
+            failure = 1.0
+            for provider in subset:
+                stats = latency.stats(provider, models.get(provider, ""))
+                failure *= 1 - (stats.success_rate if stats else DEFAULT_SUCCESS_RATE)
+            seconds = schedule_seconds(estimates, concurrency)
+            cost = sum(e.cost for e in estimates)
+            choices.append(ProviderChoice(
+                providers=list(subset),
+                estimates=estimates,
+                seconds=seconds,
+                cost=cost,
+                success_rate=1 - failure,
+                feasible=(max_seconds is None or seconds <= max_seconds)
+                and (max_cost is None or cost <= max_cost),
+            ))
+
+    feasible = [c for c in choices if c.feasible]
+    if feasible:
+        return max(feasible, key=lambda c: (round(c.success_rate, 3), len(c.providers), -c.cost))
+    if max_seconds is not None:
+        return min(choices, key=lambda c: c.seconds)
+    return min(choices, key=lambda c: c.cost)
@@ -0,0 +1,138 @@
+"""
+Parallel context extraction for catalog-wide operations.
+
+Building a playground's context means a dozen small file reads and a pass of
+regexes, then rendering and token-counting its prompt. Done for every
+playground in turn this dominates catalog-wide commands, so the work is spread
+over a process pool. Results stream back in input order as they complete;
+each worker process reads data.ts once rather than once per playground.
+
+Small inputs are extracted in-process, where pool start-up would cost more
+than it saves.
+
+Extracted contexts are cached (namespace "context") by the playground's input
+fingerprint and the source of the modules that build and count them, so an
+unchanged playground is only hashed, not parsed, rendered and counted again.
+"""
+
+import hashlib
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Iterable, Iterator
+
+import context
+import tokens
+from cache import cache_key, disable_cache, get_cache
+from context import PlaygroundContext, build_context
+from staleness import fingerprint_inputs, read_data_ts
+from tokens import count_tokens
+
+# Below this many playgrounds extraction runs serially
+PARALLEL_THRESHOLD = 8
+CHUNK_SIZE = 4
+
+# Cached contexts are only valid for the code that built them
+_CODE_VERSION = hashlib.sha256(
+    Path(context.__file__).read_bytes() + Path(tokens.__file__).read_bytes()
+).hexdigest()[:16]
+
+
+@dataclass
+class ExtractedContext:
+    """A playground's context with its rendered prompt and token count."""
+    path: Path
+    context: PlaygroundContext
+    prompt: str
+    tokens: int
+    seconds: float  # time spent extracting, in the process that did it
+
+
+def extract_context(playground_dir: Path, project_root: Path, data_ts: str | None = None) -> ExtractedContext:
+    """Build, render and token-count one playground's context."""
+    started = time.perf_counter()
+    if data_ts is None:
+        data_ts = read_data_ts(project_root)
+    cache = get_cache()
+    key = cache_key(
+        _CODE_VERSION,
+        playground_dir.name,
+        fingerprint_inputs(playground_dir, data_ts).digest,
+    ) if cache.enabled else ""
+
+    cached = cache.get_json("context", key) if key else None
+    if cached is not None:
+        ctx = PlaygroundContext(**cached["context"])
+        prompt, token_count = cached["prompt"], cached["tokens"]
+    else:
+        ctx = build_context(playground_dir, project_root, data_ts=data_ts)
+        prompt = ctx.to_prompt()
+        token_count = count_tokens(prompt)
+        if key:
+            cache.put_json(
+                "context",
+                key,
+                {"context": asdict(ctx), "prompt": prompt, "tokens": token_count},
+                cost_seconds=time.perf_counter() - started,
+            )
+    return ExtractedContext(
+        path=playground_dir,
+        context=ctx,
+        prompt=prompt,
+        tokens=token_count,
+        seconds=time.perf_counter() - started,
+    )
+
+
+# Per-process state, set once by the pool initializer
+_worker_root: Path | None = None
+_worker_data_ts: str = ""
+
+
+def _init_worker(project_root: Path, use_cache: bool) -> None:
+    global _worker_root, _worker_data_ts
+    _worker_root = project_root
+    _worker_data_ts = read_data_ts(project_root)
+    if not use_cache:  # spawned workers do not inherit --no-cache
+        disable_cache()
+
+
+def _extract_in_worker(playground_dir: Path) -> ExtractedContext:
+    return extract_context(playground_dir, _worker_root, data_ts=_worker_data_ts)
+
+
+def default_workers() -> int:
+    return max(1, min(os.cpu_count() or 1, 8))
+
+
+def extract_contexts(
+    playground_dirs: Iterable[Path],
+    project_root: Path,
+    workers: int | None = None,
+) -> Iterator[ExtractedContext]:
+    """
+    Extract many playgrounds' contexts, yielding results in input order.
+
+    Args:
+        playground_dirs: Playground directories to extract.
+        project_root: Root of the Next.js project.
+        workers: Worker processes (default: CPU count, at most 8). 1 disables
+            the pool.
+    """
+    dirs = list(playground_dirs)
+    workers = workers or default_workers()
+
+    if workers <= 1 or len(dirs) < PARALLEL_THRESHOLD:
+        data_ts = read_data_ts(project_root)
+        for playground_dir in dirs:
+            yield extract_context(playground_dir, project_root, data_ts=data_ts)
+        return
+
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(project_root, get_cache().enabled),
+    ) as pool:
+        yield from pool.map(_extract_in_worker, dirs, chunksize=CHUNK_SIZE)
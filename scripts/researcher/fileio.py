@@ -0,0 +1,135 @@
+"""
+Safe file writes and compressed text streams for research output.
+
+Writes go to a temporary file in the target directory and are renamed into
+place, so readers never see a torn file. Writes whose content matches what is
+already on disk are skipped, which keeps mtimes stable for the Next.js build
+cache and dev-server HMR.
+
+Compressed bodies use zstd when the optional `zstandard` package is installed
+and gzip otherwise; the codec is chosen from the file suffix when reading.
+"""
+
+import fcntl
+import gzip
+import io
+import os
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, TextIO
+
+try:
+    import zstandard
+except ImportError:  # optional dependency
+    zstandard = None
+
+
+DEFAULT_CODEC = "zstd" if zstandard is not None else "gzip"
+CODEC_SUFFIXES = {"zstd": ".zst", "gzip": ".gz", "none": ""}
+
+
+def private_temp_path(path: Path) -> Path:
+    """
+    Create an empty temporary sibling of `path` that no other writer (process,
+    thread or coroutine) shares, for streaming a file before renaming it into place.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    os.close(fd)
+    return Path(tmp_name)
+
+
+def atomic_write_bytes(path: Path, data: bytes) -> bool:
+    """
+    Atomically replace `path` with `data`, unless it already holds exactly that.
+
+    Returns:
+        True if the file was written, False if it was left untouched.
+    """
+    try:
+        if path.stat().st_size == len(data) and path.read_bytes() == data:
+            return False
+        mode = path.stat().st_mode & 0o777
+    except FileNotFoundError:
+        mode = 0o644
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(tmp_name, mode)
+        os.replace(tmp_name, path)
+    except BaseException:
+        Path(tmp_name).unlink(missing_ok=True)
+        raise
+
+    return True
+
+
+def atomic_write_text(path: Path, text: str) -> bool:
+    """Text counterpart of `atomic_write_bytes` (UTF-8)."""
+    return atomic_write_bytes(path, text.encode("utf-8"))
+
+
+@contextmanager
+def file_lock(lock_path: Path) -> Iterator[None]:
+    """
+    Hold an exclusive advisory lock on `lock_path` for the duration of the block.
+
+    Used to serialize writers (batch workers, watch mode, the CLI) that touch
+    the same playground's research/ directory.
+    """
+    lock_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(lock_path, "a") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def codec_for(path: Path) -> str:
+    """Infer the compression codec from a file suffix."""
+    for codec, suffix in CODEC_SUFFIXES.items():
+        if suffix and path.suffix == suffix:
+            return codec
+    return "none"
+
+
+def open_compressed_text(path: Path, mode: str = "r", codec: str | None = None) -> TextIO:
+    """
+    Open a text stream over a possibly compressed file.
+
+    Args:
+        path: File to open.
+        mode: "r" or "w".
+        codec: "zstd", "gzip" or "none". Inferred from the suffix if omitted.
+    """
+    if mode not in ("r", "w"):
+        raise ValueError(f"Unsupported mode: {mode!r}")
+    codec = codec or codec_for(path)
+
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError(f"{path} is zstd-compressed; install `zstandard` to read it.")
+        raw = open(path, mode + "b")
+        if mode == "r":
+            stream = zstandard.ZstdDecompressor().stream_reader(raw, closefd=True)
+        else:
+            stream = zstandard.ZstdCompressor(level=10).stream_writer(raw, closefd=True)
+        return io.TextIOWrapper(stream, encoding="utf-8")
+
+    if codec == "gzip":
+        return gzip.open(path, mode + "t", encoding="utf-8")
+
+    return open(path, mode, encoding="utf-8")
+
+
+def read_compressed_text(path: Path) -> str:
+    """Read a whole (possibly compressed) text file."""
+    with open_compressed_text(path) as f:
+        return f.read()
@@ -0,0 +1,628 @@
+"""
+SQLite-backed research job queue with leased, restartable workers.
+
+Jobs live in <RESEARCHER_HOME>/jobs.sqlite3 and move through the states
+
+    queued -> researching -> synthesizing -> done
+                                          -> failed / cancelled
+
+A worker claims a job by taking a lease on it and keeps the lease alive with
+heartbeats. If the worker dies, the lease expires and another worker reclaims
+the job. Provider jobs are not duplicated on a reclaim: runs always resume,
+so finished provider reports are reused from research/.partial/ and providers
+that were still running are reattached to through their stored handles.
+
+A job at the "draft" tier runs at the fast tier and, once its draft is
+published, queues the premium upgrade as a job of its own, behind all
+prioritized work.
+"""
+
+import asyncio
+import json
+import os
+import socket
+import sqlite3
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Iterator
+
+from rich.console import Console
+
+from config import DEFAULT_TIER, RESEARCHER_HOME, TIER_DRAFT, TIER_FAST, TIER_PREMIUM
+from discovery import find_playground
+from metrics import REGISTRY
+from pipeline import ResearchError, run_research
+from queries import focus_list
+from staleness import load_meta
+
+console = Console()
+
+QUEUE_PATH = RESEARCHER_HOME / "jobs.sqlite3"
+
+STATE_QUEUED = "queued"
+STATE_RESEARCHING = "researching"
+STATE_SYNTHESIZING = "synthesizing"
+STATE_DONE = "done"
+STATE_FAILED = "failed"
+STATE_CANCELLED = "cancelled"
+
+ACTIVE_STATES = (STATE_RESEARCHING, STATE_SYNTHESIZING)
+FINAL_STATES = (STATE_DONE, STATE_FAILED, STATE_CANCELLED)
+
+DEFAULT_LEASE = 120.0  # seconds a claim stays valid without a heartbeat
+DEFAULT_MAX_ATTEMPTS = 3
+HEARTBEAT_INTERVAL = 30.0
+UPGRADE_PRIORITY = 0.0  # draft upgrades wait for every prioritized job
+POLL_INTERVAL = 5.0  # seconds between claims when the queue is empty
+PROGRESS_INTERVAL = 5.0  # minimum seconds between logged messages of one provider status
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id            INTEGER PRIMARY KEY AUTOINCREMENT,
+    playground    TEXT NOT NULL,
+    state         TEXT NOT NULL,
+    options       TEXT NOT NULL DEFAULT '{}',
+    priority      REAL NOT NULL DEFAULT 0,
+    attempts      INTEGER NOT NULL DEFAULT 0,
+    max_attempts  INTEGER NOT NULL DEFAULT 3,
+    lease_owner   TEXT,
+    lease_expires REAL,
+    error         TEXT NOT NULL DEFAULT '',
+    created_at    REAL NOT NULL,
+    updated_at    REAL NOT NULL,
+    started_at    REAL,
+    finished_at   REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_state ON jobs (state, priority DESC, created_at);
+CREATE INDEX IF NOT EXISTS jobs_playground ON jobs (playground, state);
+
+CREATE TABLE IF NOT EXISTS events (
+    id      INTEGER PRIMARY KEY AUTOINCREMENT,
+    job_id  INTEGER NOT NULL,
+    at      REAL NOT NULL,
+    kind    TEXT NOT NULL,
+    data    TEXT NOT NULL DEFAULT '{}'
+);
+CREATE INDEX IF NOT EXISTS events_job ON events (job_id, id);
+"""
+
+EVENT_STATE = "state"        # the job changed state: {state, worker?, attempt?, error?, result?}
+EVENT_PROVIDER = "provider"  # provider progress: {provider, status, message}
+EVENT_RELEASED = "released"  # a stopping worker handed the job back
+
+
+@dataclass
+class Job:
+    """One row of the jobs table."""
+    id: int
+    playground: str
+    state: str
+    options: dict = field(default_factory=dict)  # providers, focus, model, from_run, reuse_similar, focus_sections, incremental
+    priority: float = 0.0
+    attempts: int = 0
+    max_attempts: int = DEFAULT_MAX_ATTEMPTS
+    lease_owner: str | None = None
+    lease_expires: float | None = None
+    error: str = ""
+    created_at: float = 0.0
+    updated_at: float = 0.0
+    started_at: float | None = None
+    finished_at: float | None = None
+
+    @classmethod
+    def from_row(cls, row: sqlite3.Row) -> "Job":
+        data = dict(row)
+        data["options"] = json.loads(data["options"] or "{}")
+        return cls(**data)
+
+
+@dataclass
+class JobEvent:
+    """One row of the events table: something that happened to a job."""
+    id: int
+    job_id: int
+    at: float
+    kind: str
+    data: dict = field(default_factory=dict)
+
+    @classmethod
+    def from_row(cls, row: sqlite3.Row) -> "JobEvent":
+        data = dict(row)
+        data["data"] = json.loads(data["data"] or "{}")
+        return cls(**data)
+
+
+def _log(conn: sqlite3.Connection, job_id: int, kind: str, data: dict | None = None) -> None:
+    conn.execute(
+        "INSERT INTO events (job_id, at, kind, data) VALUES (?, ?, ?, ?)",
+        (job_id, time.time(), kind, json.dumps(data or {})),
+    )
+
+
+class JobQueue:
+    """The jobs table. Safe to share between processes."""
+
+    def __init__(self, path: Path = QUEUE_PATH):
+        self.path = path
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = self._connect()
+        try:
+            conn.executescript(SCHEMA)
+        finally:
+            conn.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA busy_timeout=30000")
+        return conn
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        """An IMMEDIATE transaction, so read-then-write sequences are atomic."""
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+        finally:
+            conn.close()
+
+    # ── Producers ────────────────────────────────────────────────────────
+
+    def enqueue(
+        self,
+        playground: str,
+        options: dict | None = None,
+        priority: float = 0.0,
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+    ) -> Job:
+        """
+        Queue a research job for a playground.
+
+        A job already queued for the same playground with the same options is
+        reused (keeping the higher priority) rather than queuing a duplicate.
+        One with other options (focus, providers, tier...) is left as it is and
+        the new job queued beside it; claims never run both at once.
+        """
+        now = time.time()
+        options_json = json.dumps(options or {}, sort_keys=True)
+        with self._transaction() as conn:
+            row = conn.execute(
+                "SELECT id FROM jobs WHERE playground = ? AND state = ? AND options = ?",
+                (playground, STATE_QUEUED, options_json),
+            ).fetchone()
+            if row:
+                job_id = row["id"]
+                conn.execute(
+                    "UPDATE jobs SET priority = MAX(priority, ?), updated_at = ? WHERE id = ?",
+                    (priority, now, job_id),
+                )
+            else:
+                job_id = conn.execute(
+                    "INSERT INTO jobs (playground, state, options, priority, max_attempts, created_at, updated_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (playground, STATE_QUEUED, options_json, priority, max_attempts, now, now),
+                ).lastrowid
+                _log(conn, job_id, EVENT_STATE, {"state": STATE_QUEUED})
+        return self.get(job_id)
+
+    def cancel(self, job_id: int) -> bool:
+        """
+        Cancel a job that has not finished.
+
+        A running job is marked cancelled; its worker notices at the next
+        heartbeat and stops. Returns False if the job was already final.
+        """
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                f"UPDATE jobs SET state = ?, lease_owner = NULL, lease_expires = NULL, "
+                f"updated_at = ?, finished_at = ? "
+                f"WHERE id = ? AND state NOT IN ({', '.join('?' * len(FINAL_STATES))})",
+                (STATE_CANCELLED, time.time(), time.time(), job_id, *FINAL_STATES),
+            )
+            if cursor.rowcount != 1:
+                return False
+            _log(conn, job_id, EVENT_STATE, {"state": STATE_CANCELLED})
+            return True
+
+    # ── Workers ──────────────────────────────────────────────────────────
+
+    def claim(self, owner: str, lease: float = DEFAULT_LEASE) -> Job | None:
+        """
+        Lease the next runnable job to `owner`.
+
+        Runnable jobs are queued ones and running ones whose lease has expired
+        (their worker died). A playground that already has a live lease is
+        skipped, so two workers never research the same playground at once.
+        Jobs that have used up their attempts are failed instead of claimed.
+        """
+        now = time.time()
+        active = ", ".join("?" * len(ACTIVE_STATES))
+        with self._transaction() as conn:
+            while True:
+                row = conn.execute(
+                    f"SELECT * FROM jobs "
+                    f"WHERE (state = ? OR (state IN ({active}) AND lease_expires < ?)) "
+                    f"AND playground NOT IN ("
+                    f"  SELECT playground FROM jobs WHERE state IN ({active}) AND lease_expires >= ?"
+                    f") "
+                    f"ORDER BY priority DESC, created_at LIMIT 1",
+                    (STATE_QUEUED, *ACTIVE_STATES, now, *ACTIVE_STATES, now),
+                ).fetchone()
+                if row is None:
+                    return None
+
+                if row["attempts"] >= row["max_attempts"]:
+                    error = row["error"] or f"Gave up after {row['attempts']} attempt(s)."
+                    conn.execute(
+                        "UPDATE jobs SET state = ?, error = ?, lease_owner = NULL, lease_expires = NULL, "
+                        "updated_at = ?, finished_at = ? WHERE id = ?",
+                        (STATE_FAILED, error, now, now, row["id"]),
+                    )
+                    _log(conn, row["id"], EVENT_STATE, {"state": STATE_FAILED, "error": error})
+                    continue
+
+                # A reclaimed job keeps its stage; a fresh one starts researching
+                state = row["state"] if row["state"] in ACTIVE_STATES else STATE_RESEARCHING
+                conn.execute(
+                    "UPDATE jobs SET state = ?, attempts = attempts + 1, lease_owner = ?, lease_expires = ?, "
+                    "updated_at = ?, started_at = COALESCE(started_at, ?) WHERE id = ?",
+                    (state, owner, now + lease, now, now, row["id"]),
+                )
+                _log(conn, row["id"], EVENT_STATE, {
+                    "state": state, "worker": owner, "attempt": row["attempts"] + 1,
+                })
+                return Job.from_row(conn.execute("SELECT * FROM jobs WHERE id = ?", (row["id"],)).fetchone())
+
+    def heartbeat(self, job_id: int, owner: str, lease: float = DEFAULT_LEASE) -> bool:
+        """
+        Extend a lease. Returns False if the worker no longer holds it, because
+        the job was cancelled or reclaimed after the lease lapsed.
+        """
+        now = time.time()
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                f"UPDATE jobs SET lease_expires = ?, updated_at = ? "
+                f"WHERE id = ? AND lease_owner = ? AND state IN ({', '.join('?' * len(ACTIVE_STATES))})",
+                (now + lease, now, job_id, owner, *ACTIVE_STATES),
+            )
+            return cursor.rowcount == 1
+
+    def set_state(self, job_id: int, owner: str, state: str) -> bool:
+        """Move a leased job to another active stage."""
+        job = self.get(job_id)
+        if job is not None and job.state == state and job.lease_owner == owner:
+            return True
+        return self._update_owned(job_id, owner, {"state": state}, state=state)
+
+    def complete(self, job_id: int, owner: str, result: dict | None = None) -> bool:
+        """
+        Mark a job done.
+
+        Args:
+            result: Where its output went (run id, research directory); kept
+                with the final state event and returned by `result()`.
+        """
+        return self._update_owned(
+            job_id, owner, {"state": STATE_DONE, "result": result or {}},
+            state=STATE_DONE, error="", lease_owner=None, lease_expires=None, finished_at=time.time(),
+        )
+
+    def fail(self, job_id: int, owner: str, error: str, retry: bool = True) -> bool:
+        """
+        Record a failed attempt. The job is queued again while it has attempts
+        left (and `retry` is set), and failed for good otherwise.
+        """
+        job = self.get(job_id)
+        if job is None:
+            return False
+        if retry and job.attempts < job.max_attempts:
+            return self._update_owned(
+                job_id, owner, {"state": STATE_QUEUED, "error": error},
+                state=STATE_QUEUED, error=error, lease_owner=None, lease_expires=None,
+            )
+        return self._update_owned(
+            job_id, owner, {"state": STATE_FAILED, "error": error},
+            state=STATE_FAILED, error=error, lease_owner=None, lease_expires=None, finished_at=time.time(),
+        )
+
+    def release(self, job_id: int, owner: str) -> bool:
+        """
+        Give a job back without counting the attempt, e.g. on worker shutdown.
+
+        Its stage is kept so the next worker picks up where this one stopped.
+        """
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                f"UPDATE jobs SET attempts = MAX(attempts - 1, 0), lease_expires = 0, updated_at = ? "
+                f"WHERE id = ? AND lease_owner = ? AND state IN ({', '.join('?' * len(ACTIVE_STATES))})",
+                (time.time(), job_id, owner, *ACTIVE_STATES),
+            )
+            if cursor.rowcount != 1:
+                return False
+            _log(conn, job_id, EVENT_RELEASED, {"worker": owner})
+            return True
+
+    def record_event(self, job_id: int, kind: str, data: dict | None = None) -> None:
+        """Append a progress event to a job's event log."""
+        with self._transaction() as conn:
+            _log(conn, job_id, kind, data)
+
+    def _update_owned(self, job_id: int, owner: str, event: dict, **values) -> bool:
+        values["updated_at"] = time.time()
+        assignments = ", ".join(f"{column} = ?" for column in values)
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                f"UPDATE jobs SET {assignments} WHERE id = ? AND lease_owner = ? "
+                f"AND state IN ({', '.join('?' * len(ACTIVE_STATES))})",
+                (*values.values(), job_id, owner, *ACTIVE_STATES),
+            )
+            if cursor.rowcount != 1:
+                return False
+            _log(conn, job_id, EVENT_STATE, event)
+            return True
+
+    # ── Queries ──────────────────────────────────────────────────────────
+
+    def get(self, job_id: int) -> Job | None:
+        conn = self._connect()
+        try:
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        finally:
+            conn.close()
+        return Job.from_row(row) if row else None
+
+    def list_jobs(self, states: list[str] | None = None, limit: int = 50) -> list[Job]:
+        """Most recent jobs first, optionally only those in `states`."""
+        query = "SELECT * FROM jobs"
+        params: list = []
+        if states:
+            query += f" WHERE state IN ({', '.join('?' * len(states))})"
+            params.extend(states)
+        query += " ORDER BY id DESC LIMIT ?"
+        params.append(limit)
+        conn = self._connect()
+        try:
+            rows = conn.execute(query, params).fetchall()
+        finally:
+            conn.close()
+        return [Job.from_row(row) for row in rows]
+
+    def counts(self) -> dict[str, int]:
+        """Number of jobs in each state."""
+        conn = self._connect()
+        try:
+            rows = conn.execute("SELECT state, COUNT(*) FROM jobs GROUP BY state").fetchall()
+        finally:
+            conn.close()
+        counts = dict.fromkeys((STATE_QUEUED, *ACTIVE_STATES, *FINAL_STATES), 0)
+        counts.update({state: n for state, n in rows})
+        return counts
+
+    def metric_samples(self) -> list[tuple[str, dict[str, str], float]]:
+        """Job gauges for the metrics registry."""
+        counts = self.counts()
+        samples = [("researcher_jobs", {"state": state}, n) for state, n in counts.items()]
+        samples.append(("researcher_queue_depth", {}, counts[STATE_QUEUED]))
+        return samples
+
+    def events(self, job_id: int, after: int = 0, limit: int = 500) -> list[JobEvent]:
+        """A job's events with id greater than `after`, oldest first."""
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                "SELECT * FROM events WHERE job_id = ? AND id > ? ORDER BY id LIMIT ?",
+                (job_id, after, limit),
+            ).fetchall()
+        finally:
+            conn.close()
+        return [JobEvent.from_row(row) for row in rows]
+
+    def stage_timings(self, job_id: int) -> list[dict]:
+        """
+        Time spent in each state, from the job's state events.
+
+        Returns:
+            One dict per state entered, in order: state, started_at,
+            finished_at (None while still in it) and duration in seconds.
+        """
+        stages: list[dict] = []
+        after = 0
+        while batch := self.events(job_id, after=after):
+            for event in batch:
+                if event.kind == EVENT_RELEASED and stages:
+                    stages[-1]["finished_at"] = event.at
+                if event.kind != EVENT_STATE:
+                    continue
+                if stages and stages[-1]["finished_at"] is None:
+                    stages[-1]["finished_at"] = event.at
+                stages.append({"state": event.data.get("state"), "started_at": event.at, "finished_at": None})
+            after = batch[-1].id
+
+        now = time.time()
+        for stage in stages:
+            if stage["state"] in FINAL_STATES:
+                stage["finished_at"] = stage["started_at"]
+            stage["duration"] = (stage["finished_at"] or now) - stage["started_at"]
+        return stages
+
+    def result(self, job_id: int) -> dict | None:
+        """The result recorded by `complete()`, or None if the job is not done."""
+        conn = self._connect()
+        try:
+            row = conn.execute(
+                "SELECT data FROM events WHERE job_id = ? AND kind = ? ORDER BY id DESC LIMIT 1",
+                (job_id, EVENT_STATE),
+            ).fetchone()
+        finally:
+            conn.close()
+        data = json.loads(row["data"]) if row else {}
+        return data.get("result") if data.get("state") == STATE_DONE else None
+
+
+# ── Worker pool ──────────────────────────────────────────────────────────────
+
+class WorkerPool:
+    """
+    `concurrency` async workers draining the queue until cancelled.
+
+    Each worker claims a job, runs it through the pipeline with resume on, and
+    heartbeats its lease while the job runs. Stopping the pool (Ctrl+C) hands
+    running jobs back to the queue; the next worker resumes them.
+
+    Queue writes made while a job runs (stage changes, progress events, the
+    outcome) go through one writer thread, in order, so a busy database never
+    blocks the event loop the providers stream on.
+    """
+
+    def __init__(
+        self,
+        project_root: Path,
+        concurrency: int = 1,
+        queue: JobQueue | None = None,
+        lease: float = DEFAULT_LEASE,
+        heartbeat_interval: float = HEARTBEAT_INTERVAL,
+        poll_interval: float = POLL_INTERVAL,
+    ):
+        self.project_root = project_root
+        self.concurrency = concurrency
+        self.queue = queue or JobQueue()
+        self.lease = lease
+        self.heartbeat_interval = min(heartbeat_interval, lease / 3)
+        self.poll_interval = poll_interval
+        self.owner_prefix = f"{socket.gethostname()}:{os.getpid()}"
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="jobqueue-writer")
+        REGISTRY.add_collector(self.queue.metric_samples)
+
+    def _post(self, fn: Callable, *args) -> None:
+        """Queue a write without waiting for it (from callbacks on the event loop)."""
+        def report(future: Future) -> None:
+            if future.exception() is not None:
+                console.print(f"[yellow]Job queue write failed: {future.exception()!r}[/yellow]")
+
+        self._writer.submit(fn, *args).add_done_callback(report)
+
+    async def _write(self, fn: Callable, *args):
+        """Run a write after every one posted before it, off the event loop."""
+        return await asyncio.get_running_loop().run_in_executor(self._writer, fn, *args)
+
+    async def run(self) -> None:
+        console.print(
+            f"[bold #84cc16]Worker pool started ({self.concurrency} worker(s), "
+            f"queue {self.queue.path})[/bold #84cc16]"
+        )
+        await asyncio.gather(*[self._worker(i) for i in range(self.concurrency)])
+
+    async def _worker(self, index: int) -> None:
+        owner = f"{self.owner_prefix}:{index}"
+        while True:
+            job = await asyncio.to_thread(self.queue.claim, owner, self.lease)
+            if job is None:
+                await asyncio.sleep(self.poll_interval)
+                continue
+            await self._run_job(job, owner)
+
+    async def _run_job(self, job: Job, owner: str) -> None:
+        console.print(
+            f"[#84cc16]Worker {owner} took job {job.id} ({job.playground}, "
+            f"attempt {job.attempts}/{job.max_attempts})[/#84cc16]"
+        )
+        try:
+            playground_dir = find_playground(job.playground, self.project_root)
+        except FileNotFoundError as e:
+            await self._write(self.queue.fail, job.id, owner, str(e), False)
+            console.print(f"[bold red]Job {job.id}: {e}[/bold red]")
+            return
+
+        options = job.options
+        tier = options.get("tier", DEFAULT_TIER)
+        task = asyncio.create_task(
+            run_research(
+                playground_dir=playground_dir,
+                project_root=self.project_root,
+                provider_names=options.get("providers", ["openai", "gemini"]),
+                focus=focus_list(options.get("focus")),
+                model_override=options.get("model"),
+                resume=True,
+                from_run=options.get("from_run"),
+                interactive=False,
+                live_progress=False,
+                reuse_similar=options.get("reuse_similar", False),
+                focus_sections=options.get("focus_sections", False),
+                incremental=options.get("incremental", False),
+                tier=TIER_FAST if tier == TIER_DRAFT else tier,
+                on_stage=lambda stage: self._post(self.queue.set_state, job.id, owner, stage),
+                on_progress=self._progress_logger(job),
+            )
+        )
+        heartbeat = asyncio.create_task(self._heartbeat(job, owner, task))
+        try:
+            await task
+        except asyncio.CancelledError:
+            if heartbeat.done() and not heartbeat.result():
+                console.print(f"[yellow]Job {job.id} ({job.playground}) was cancelled or reclaimed; stopped.[/yellow]")
+                return
+            # Pool shutdown: hand the job back for the next worker
+            task.cancel()
+            self.queue.release(job.id, owner)
+            raise
+        except ResearchError as e:
+            await self._write(self.queue.fail, job.id, owner, str(e))
+            console.print(f"[bold red]Job {job.id} ({job.playground}) failed: {e}[/bold red]")
+        except Exception as e:
+            await self._write(self.queue.fail, job.id, owner, repr(e))
+            console.print(f"[bold red]Job {job.id} ({job.playground}) crashed: {e!r}[/bold red]")
+        else:
+            meta = load_meta(playground_dir)
+            await self._write(self.queue.complete, job.id, owner, {
+                "run_id": meta.get("run_id"),
+                "research_dir": str(task.result()),
+            })
+            console.print(f"[bold green]Job {job.id} ({job.playground}) done.[/bold green]")
+            if tier == TIER_DRAFT:
+                upgrade = await self._write(
+                    self.queue.enqueue, job.playground, {**options, "tier": TIER_PREMIUM}, UPGRADE_PRIORITY,
+                )
+                console.print(f"[#84cc16]Queued job {upgrade.id} to upgrade the {job.playground} draft.[/#84cc16]")
+        finally:
+            heartbeat.cancel()
+
+    def _progress_logger(self, job: Job):
+        """
+        Forward provider progress to the job's event log.
+
+        Status changes are always logged; repeated messages within one status
+        (streamed character counts, poll results) at most every few seconds.
+        """
+        last: dict[str, tuple[str, float]] = {}
+
+        def log(provider: str, status: str, message: str) -> None:
+            now = time.monotonic()
+            previous = last.get(provider)
+            if previous and previous[0] == status and now - previous[1] < PROGRESS_INTERVAL:
+                return
+            last[provider] = (status, now)
+            self._post(self.queue.record_event, job.id, EVENT_PROVIDER, {
+                "provider": provider, "status": status, "message": message,
+            })
+
+        return log
+
+    async def _heartbeat(self, job: Job, owner: str, task: asyncio.Task) -> bool:
+        """Keep the lease alive; stop the job if the lease is lost."""
+        while not task.done():
+            await asyncio.sleep(self.heartbeat_interval)
+            alive = await asyncio.to_thread(self.queue.heartbeat, job.id, owner, self.lease)
+            if not alive:
+                task.cancel()
+                return False
+        return True
@@ -0,0 +1,176 @@
+"""
+Per-provider, per-model latency and success history.
+
+Every deep research call, successful or not, appends a sample to
+<RESEARCHER_HOME>/latency.jsonl. The history is seeded from the run archive the
+first time it is used, so existing runs count from the start.
+
+The scheduler uses it to order batches longest-first, to pick polling
+intervals and deadlines for provider calls, and to choose which providers fit
+a time or cost target.
+
+A timed-out call only says the model takes at least that long, so durations
+are summarized with the Kaplan-Meier estimator, which counts timed-out calls
+as right-censored: they leave the running without pulling the percentiles
+down. A percentile beyond the last completed call is the longest duration
+seen, a lower bound, so repeated timeouts push the deadline out instead of
+dropping it.
+"""
+
+import json
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+from archive import ResearchArchive
+from config import RESEARCHER_HOME
+from fileio import file_lock
+
+
+LATENCY_PATH = RESEARCHER_HOME / "latency.jsonl"
+
+WINDOW = 50  # most recent samples per provider and model that count
+
+# Polling: about 40 polls over a typical run, within these bounds (seconds)
+POLL_FRACTION = 1 / 40
+MIN_POLL_INTERVAL = 10.0
+MAX_POLL_INTERVAL = 60.0
+
+# Deadlines: give up on a call that runs this much longer than the slow end
+# of its history (it keeps running remotely and can be reattached with --resume)
+DEADLINE_FACTOR = 2.0
+MIN_DEADLINE = 20 * 60.0
+
+
+@dataclass
+class LatencySample:
+    """One finished provider call."""
+    provider: str
+    model: str
+    status: str  # "completed", "failed", "timed_out"
+    seconds: float
+    at: float
+
+
+@dataclass
+class LatencyStats:
+    """Summary of the recent calls of one provider and model."""
+    provider: str
+    model: str
+    runs: int
+    successes: int
+    timed_out: int
+    p50: float  # median duration, seconds; 0 when every call failed outright
+    p90: float
+
+    @property
+    def measured(self) -> bool:
+        """Whether any call ran to completion or to its deadline."""
+        return self.successes + self.timed_out > 0
+
+    @property
+    def success_rate(self) -> float:
+        return self.successes / self.runs if self.runs else 0.0
+
+
+def _percentile(durations: list[tuple[float, bool]], q: float) -> float:
+    """
+    The q-quantile of (seconds, completed) durations, with calls that did not
+    complete counted as lasting at least their seconds (Kaplan-Meier).
+    """
+    if not durations:
+        return 0.0
+    # At equal times completions come first: a censored call was still running
+    ordered = sorted(durations, key=lambda d: (d[0], not d[1]))
+    surviving = 1.0
+    for i, (seconds, completed) in enumerate(ordered):
+        if completed:
+            surviving *= 1 - 1 / (len(ordered) - i)
+            if 1 - surviving >= q - 1e-9:
+                return seconds
+    return ordered[-1][0]
+
+
+class LatencyHistory:
+    """The latency log and the statistics derived from it."""
+
+    def __init__(self, path: Path = LATENCY_PATH, archive: ResearchArchive | None = None):
+        self.path = path
+        self._archive = archive
+        self._stats: dict[tuple[str, str], LatencyStats] | None = None
+
+    def record(self, provider: str, model: str, status: str, seconds: float) -> None:
+        """Append the outcome of one provider call."""
+        self._seed()
+        sample = LatencySample(provider, model, status, round(seconds, 1), time.time())
+        with file_lock(self.path.with_name(f".{self.path.name}.lock")):
+            with self.path.open("a") as f:
+                f.write(json.dumps(asdict(sample)) + "\n")
+        self._stats = None
+
+    def samples(self) -> list[LatencySample]:
+        self._seed()
+        samples = []
+        for line in self.path.read_text().splitlines():
+            if line.strip():
+                samples.append(LatencySample(**json.loads(line)))
+        return samples
+
+    def _seed(self) -> None:
+        """Create the log from archived runs if it does not exist yet."""
+        if self.path.exists():
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        archive = self._archive or ResearchArchive()
+        lines = []
+        for record in archive.runs():
+            for provider, info in record.providers.items():
+                if info.get("duration"):
+                    sample = LatencySample(
+                        provider, info.get("model", "unknown"), "completed",
+                        round(info["duration"], 1), record.created_at,
+                    )
+                    lines.append(json.dumps(asdict(sample)) + "\n")
+        with file_lock(self.path.with_name(f".{self.path.name}.lock")):
+            if not self.path.exists():
+                self.path.write_text("".join(lines))
+
+    def stats(self, provider: str, model: str) -> LatencyStats | None:
+        """Recent statistics for a provider and model, or None without history."""
+        if self._stats is None:
+            grouped: dict[tuple[str, str], list[LatencySample]] = {}
+            for sample in self.samples():
+                grouped.setdefault((sample.provider, sample.model), []).append(sample)
+
+            self._stats = {}
+            for key, samples in grouped.items():
+                recent = samples[-WINDOW:]
+                durations = [
+                    (s.seconds, s.status == "completed")
+                    for s in recent if s.status in ("completed", "timed_out")
+                ]
+                successes = sum(completed for _, completed in durations)
+                self._stats[key] = LatencyStats(
+                    provider=key[0],
+                    model=key[1],
+                    runs=len(recent),
+                    successes=successes,
+                    timed_out=len(durations) - successes,
+                    p50=_percentile(durations, 0.5),
+                    p90=_percentile(durations, 0.9),
+                )
+        return self._stats.get((provider, model))
+
+    def poll_interval(self, provider: str, model: str, default: float) -> float:
+        """How often to poll a call of this model for completion."""
+        stats = self.stats(provider, model)
+        if stats is None or not stats.measured:
+            return default
+        return min(max(stats.p50 * POLL_FRACTION, MIN_POLL_INTERVAL), MAX_POLL_INTERVAL)
+
+    def deadline(self, provider: str, model: str) -> float | None:
+        """Seconds after which a call is given up on; None without history."""
+        stats = self.stats(provider, model)
+        if stats is None:
+            return None
+        return max(stats.p90 * DEADLINE_FACTOR, MIN_DEADLINE)
@@ -0,0 +1,198 @@
+"""
+Process-wide metrics in the Prometheus text exposition format.
+
+Provider metrics are fed from the same progress events `ResearchProgress.update`
+receives, so anything shown in the progress table is also counted:
+
+    researcher_provider_updates_total{provider,status}    progress events
+    researcher_provider_runs_total{provider,outcome}      finished provider calls
+    researcher_provider_duration_seconds{provider,outcome}  histogram of call durations
+
+Providers count their retries and status polls themselves, where they happen
+(a streamed OpenAI response is not polled):
+
+    researcher_provider_retries_total{provider}           transient errors retried
+    researcher_provider_polls_total{provider}             status polls of a running call
+
+When a provider's report is committed the pipeline adds:
+
+    researcher_provider_tokens_total{provider,model,kind}  input / output tokens
+    researcher_report_bytes_total{provider}                report bytes written to .partial/ (uncompressed)
+
+The cache counts its lookups:
+
+    researcher_cache_requests_total{namespace,result}      hits and misses
+
+And, when a job queue is attached (workers, control server), read at export time:
+
+    researcher_jobs{state}                                 jobs by state
+    researcher_queue_depth                                 jobs waiting to be claimed
+
+Export with `render()`, from the control server's GET /metrics, or to a file
+for node_exporter's textfile collector (--metrics-file).
+"""
+
+import asyncio
+import threading
+from collections import defaultdict
+from pathlib import Path
+from typing import Callable
+
+from fileio import atomic_write_text
+
+
+# Provider calls take minutes to an hour or more
+DURATION_BUCKETS = (30, 60, 120, 300, 600, 900, 1200, 1800, 2700, 3600, 5400, 7200)
+
+EXPORT_INTERVAL = 15.0  # seconds between metrics file writes
+
+Labels = tuple[tuple[str, str], ...]
+
+
+def _labels(labels: dict[str, str]) -> Labels:
+    return tuple(sorted(labels.items()))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Labels, extra: tuple[str, str] | None = None) -> str:
+    pairs = list(labels) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(str(v))}"' for k, v in pairs) + "}"
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class MetricsRegistry:
+    """Counters, gauges and histograms keyed by name and labels. Thread-safe."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._help: dict[str, tuple[str, str]] = {}  # name -> (type, help)
+        self._values: dict[str, dict[Labels, float]] = defaultdict(dict)
+        self._histograms: dict[str, dict[Labels, list[float]]] = defaultdict(dict)  # bucket counts, sum, count
+        self._collectors: list[Callable[[], list[tuple[str, dict[str, str], float]]]] = []
+
+    def describe(self, name: str, kind: str, help_text: str) -> None:
+        self._help[name] = (kind, help_text)
+
+    def inc(self, name: str, amount: float = 1.0, **labels: str) -> None:
+        key = _labels(labels)
+        with self._lock:
+            self._values[name][key] = self._values[name].get(key, 0.0) + amount
+
+    def observe(self, name: str, value: float, **labels: str) -> None:
+        key = _labels(labels)
+        with self._lock:
+            series = self._histograms[name].setdefault(key, [0.0] * (len(DURATION_BUCKETS) + 2))
+            for i, bound in enumerate(DURATION_BUCKETS):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def add_collector(self, collector: Callable[[], list[tuple[str, dict[str, str], float]]]) -> None:
+        """Register a callback returning (name, labels, value) gauge samples at export time."""
+        with self._lock:
+            if collector not in self._collectors:
+                self._collectors.append(collector)
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format (version 0.0.4)."""
+        collected: dict[str, dict[Labels, float]] = defaultdict(dict)
+        for collector in list(self._collectors):
+            for name, labels, value in collector():
+                collected[name][_labels(labels)] = value
+
+        lines = []
+        with self._lock:
+            values = {name: dict(series) for name, series in self._values.items()}
+            histograms = {name: {k: list(v) for k, v in series.items()} for name, series in self._histograms.items()}
+        values.update(collected)
+
+        for name in sorted(set(values) | set(histograms)):
+            kind, help_text = self._help.get(name, ("untyped", ""))
+            if help_text:
+                lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in sorted(values.get(name, {}).items()):
+                lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+            for labels, series in sorted(histograms.get(name, {}).items()):
+                for bound, count in zip(DURATION_BUCKETS, series):
+                    lines.append(f"{name}_bucket{_format_labels(labels, ('le', str(bound)))} {_format_value(count)}")
+                lines.append(f"{name}_bucket{_format_labels(labels, ('le', '+Inf'))} {_format_value(series[-1])}")
+                lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(series[-2])}")
+                lines.append(f"{name}_count{_format_labels(labels)} {_format_value(series[-1])}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+REGISTRY.describe("researcher_provider_updates_total", "counter", "Provider progress events by status.")
+REGISTRY.describe("researcher_provider_retries_total", "counter", "Transient provider errors that were retried.")
+REGISTRY.describe("researcher_provider_polls_total", "counter", "Status polls of running provider calls.")
+REGISTRY.describe("researcher_provider_runs_total", "counter", "Finished provider calls by outcome.")
+REGISTRY.describe("researcher_provider_duration_seconds", "histogram", "Duration of provider calls.")
+REGISTRY.describe("researcher_provider_tokens_total", "counter", "Tokens used by provider calls.")
+REGISTRY.describe("researcher_report_bytes_total", "counter", "Bytes of provider reports written.")
+REGISTRY.describe("researcher_cache_requests_total", "counter", "Cache lookups by namespace and result.")
+REGISTRY.describe("researcher_jobs", "gauge", "Jobs in the queue by state.")
+REGISTRY.describe("researcher_queue_depth", "gauge", "Jobs waiting to be claimed.")
+
+
+def record_progress(provider: str, status: str, changed: bool, elapsed: float | None) -> None:
+    """
+    Count one progress event, as passed to `ResearchProgress.update`.
+
+    Args:
+        changed: Whether the event moved the provider to a new status.
+        elapsed: Seconds since the provider started, if it has.
+    """
+    REGISTRY.inc("researcher_provider_updates_total", provider=provider, status=status)
+    if changed and status in ("completed", "failed"):
+        REGISTRY.inc("researcher_provider_runs_total", provider=provider, outcome=status)
+        if elapsed is not None:
+            REGISTRY.observe("researcher_provider_duration_seconds", elapsed, provider=provider, outcome=status)
+
+
+def record_retry(provider: str) -> None:
+    """Count one retried transient error of a provider call."""
+    REGISTRY.inc("researcher_provider_retries_total", provider=provider)
+
+
+def record_poll(provider: str) -> None:
+    """Count one status poll of a running provider call."""
+    REGISTRY.inc("researcher_provider_polls_total", provider=provider)
+
+
+def record_report(provider: str, model: str, usage: dict[str, int], report_bytes: int) -> None:
+    """Count the tokens and bytes of a committed provider report."""
+    for kind in ("input", "output"):
+        tokens = usage.get(f"{kind}_tokens")
+        if tokens:
+            REGISTRY.inc("researcher_provider_tokens_total", tokens, provider=provider, model=model, kind=kind)
+    REGISTRY.inc("researcher_report_bytes_total", report_bytes, provider=provider)
+
+
+def render() -> str:
+    return REGISTRY.render()
+
+
+def write_file(path: Path) -> None:
+    """Write the metrics to `path` atomically (textfile collector format)."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    atomic_write_text(path, render())
+
+
+async def export_to_file(path: Path, interval: float = EXPORT_INTERVAL) -> None:
+    """Rewrite the metrics file every `interval` seconds until cancelled."""
+    try:
+        while True:
+            await asyncio.to_thread(write_file, path)
+            await asyncio.sleep(interval)
+    finally:
+        write_file(path)
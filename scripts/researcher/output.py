@@ -3,28 +3,50 @@ Write research output files and generate the Next.js page.
 
 Creates:
   - research/content.md
+  - research/content.json (content.md pre-rendered for the page, see artifact.py)
   - research/suggestions.md
   - research/page.tsx (from template)
-  - research/.partial/ (interim results)
+  - research/meta.json (input fingerprint, models and tier of the run, for staleness checks)
+
+and updates the playground's entry in the research catalog
+(app/playgrounds/research.json, see catalog.py) and its postings in the
+full-text search index (public/research-search/, see search.py).
+
+Interim provider results in research/.partial/ are handled by partials.py.
+
+All writes are atomic and skipped when the content is unchanged, and happen
+under a per-playground lock (research/.lock).
 """
 
+import json
+import re
+from contextlib import AbstractContextManager
 from pathlib import Path
 
-from context import PlaygroundContext
+from artifact import ARTIFACT_NAME, dump_artifact, render_artifact
+from catalog import CatalogEntry, ResearchCatalog
+from context import PlaygroundContext, build_context
+from fileio import atomic_write_text, file_lock
+from search import SearchIndex
+from staleness import load_meta, read_data_ts
 
 
+# page.tsx as generated before content.json, which read content.md at runtime
+_READ_CONTENT = re.compile(
+    r"\n+const content = fs\.readFileSync\(\s*path\.join\(process\.cwd\(\), '[^']*'\),\s*'utf-8',\s*\);\n"
+)
+_RENDER_CONTENT = re.compile(r'^( *)<ResearchRenderer content=\{content\} title="([^"]*)" />$', re.MULTILINE)
+
 PAGE_TEMPLATE = '''\
 import {{ Metadata }} from 'next';
 import {{ defaultOpenGraph }} from '@/data/metadata';
-import fs from 'fs';
-import path from 'path';
 
 import ResearchRenderer from '@/components/ResearchRenderer';
+import ResearchTree, {{ type ResearchArtifact }} from '@/components/ResearchRenderer/ResearchTree';
+
+import artifact from './content.json';
 
-const content = fs.readFileSync(
-    path.join(process.cwd(), '{content_path}'),
-    'utf-8',
-);
+const research = artifact as ResearchArtifact;
 
 export const metadata: Metadata = {{
     title: '{title} · research · playgrounds',
@@ -41,7 +63,14 @@ export default function ResearchPage() {{
     return (
         <div className="min-h-screen bg-black">
             <div className="max-w-3xl mx-auto px-4 sm:px-8 py-16">
-                <ResearchRenderer content={{content}} title="{title}" />
+                <ResearchRenderer
+                    title="{title}"
+                    toc={{research.toc}}
+                    wordCount={{research.wordCount}}
+                    readingMinutes={{research.readingMinutes}}
+                >
+                    <ResearchTree nodes={{research.tree}} />
+                </ResearchRenderer>
             </div>
         </div>
     );
@@ -54,6 +83,7 @@ def write_output(
     ctx: PlaygroundContext,
     content_md: str,
     suggestions_md: str,
+    meta: dict | None = None,
 ) -> Path:
     """
     Write research output files to the playground's research/ directory.
@@ -63,6 +93,7 @@ def write_output(
         ctx: Playground context (for metadata).
         content_md: The synthesized research document.
         suggestions_md: The improvement suggestions.
+        meta: Run metadata for research/meta.json; left untouched if None.
 
     Returns:
         Path to the research/ directory.
@@ -70,73 +101,151 @@ def write_output(
     research_dir = playground_dir / "research"
     research_dir.mkdir(exist_ok=True)
 
-    # Write content.md
-    (research_dir / "content.md").write_text(content_md)
-
-    # Write suggestions.md
-    (research_dir / "suggestions.md").write_text(suggestions_md)
-
-    # Generate page.tsx from template
-    # Build the relative path from project root to content.md
-    # playground_dir is like: app/playgrounds/(2025)/(07)/meaning-autogenesis
-    # We need: app/playgrounds/(2025)/(07)/meaning-autogenesis/research/content.md
-    content_path = str(research_dir / "content.md")
-    # Make it relative to project root by finding 'app/' prefix
-    idx = content_path.find("app/")
-    if idx >= 0:
-        content_path = content_path[idx:]
-    else:
-        content_path = str(Path("app") / "playgrounds" / playground_dir.name / "research" / "content.md")
-
-    page_content = PAGE_TEMPLATE.format(
-        content_path=content_path,
+    # Generate page.tsx from template; it imports the pre-rendered content.json
+    page_content = PAGE_TEMPLATE.format(title=ctx.title)
+    artifact = render_artifact(content_md)
+
+    with research_lock(playground_dir):
+        atomic_write_text(research_dir / "content.md", content_md)
+        atomic_write_text(research_dir / ARTIFACT_NAME, dump_artifact(artifact))
+        atomic_write_text(research_dir / "suggestions.md", suggestions_md)
+        # page.tsx is usually identical between runs; leaving it untouched
+        # avoids invalidating the Next.js build cache and HMR.
+        atomic_write_text(research_dir / "page.tsx", page_content)
+        if meta is not None:
+            atomic_write_text(research_dir / "meta.json", json.dumps(meta, indent=2) + "\n")
+
+    entry = catalog_entry(playground_dir, ctx, artifact["wordCount"], meta if meta is not None else load_meta(playground_dir))
+    ResearchCatalog.for_playground(playground_dir).update(entry)
+    SearchIndex.for_playground(playground_dir).update(entry.slug, entry.title, entry.url, artifact)
+    return research_dir
+
+
+def catalog_entry(playground_dir: Path, ctx: PlaygroundContext, word_count: int, meta: dict) -> CatalogEntry:
+    """The catalog entry for a playground's research companion."""
+    return CatalogEntry(
+        slug=playground_dir.name,
+        path=playground_dir.relative_to(playground_dir.parents[2]).as_posix(),
         title=ctx.title,
+        topics=list(ctx.topics),
+        researched_at=meta.get("researched_at", ""),
+        run_id=meta.get("run_id", ""),
+        models=dict(meta.get("models", {})),
+        word_count=word_count,
+        fingerprint=meta.get("fingerprint", ""),
+        tier=meta.get("tier", ""),
     )
 
-    (research_dir / "page.tsx").write_text(page_content)
 
-    return research_dir
+def research_lock(playground_dir: Path) -> AbstractContextManager[None]:
+    """Exclusive lock serializing writers to a playground's research/ directory."""
+    return file_lock(playground_dir / "research" / ".lock")
 
 
-def save_partial(
-    playground_dir: Path,
-    provider_name: str,
-    content: str,
-) -> Path:
+def migrate_page(page_tsx: str) -> str | None:
     """
-    Save an interim result from a provider to .partial/ for resumability.
-
-    Args:
-        playground_dir: Path to the playground directory.
-        provider_name: Name of the provider (e.g. "openai", "gemini").
-        content: The raw research content from the provider.
+    Rewrite a page.tsx generated before content.json existed so it imports the
+    artifact instead of reading content.md. Other edits to the page are kept.
 
     Returns:
-        Path to the saved partial file.
+        The new page, or None if the page is not in the old generated form.
     """
-    partial_dir = playground_dir / "research" / ".partial"
-    partial_dir.mkdir(parents=True, exist_ok=True)
-
-    filepath = partial_dir / f"{provider_name}.md"
-    filepath.write_text(content)
-
-    return filepath
+    if not _READ_CONTENT.search(page_tsx) or not _RENDER_CONTENT.search(page_tsx):
+        return None
+
+    def render(match: re.Match) -> str:
+        indent, title = match.group(1), match.group(2)
+        return (
+            f"{indent}<ResearchRenderer\n"
+            f'{indent}    title="{title}"\n'
+            f"{indent}    toc={{research.toc}}\n"
+            f"{indent}    wordCount={{research.wordCount}}\n"
+            f"{indent}    readingMinutes={{research.readingMinutes}}\n"
+            f"{indent}>\n"
+            f"{indent}    <ResearchTree nodes={{research.tree}} />\n"
+            f"{indent}</ResearchRenderer>"
+        )
+
+    page = re.sub(r"^import (?:fs|path) from '(?:fs|path)';\n", "", page_tsx, flags=re.MULTILINE)
+    page = page.replace(
+        "import ResearchRenderer from '@/components/ResearchRenderer';\n",
+        "import ResearchRenderer from '@/components/ResearchRenderer';\n"
+        "import ResearchTree, { type ResearchArtifact } from '@/components/ResearchRenderer/ResearchTree';\n",
+    )
+    page = _READ_CONTENT.sub(
+        "\n\nimport artifact from './content.json';\n\nconst research = artifact as ResearchArtifact;\n",
+        page,
+    )
+    return _RENDER_CONTENT.sub(render, page)
 
 
-def load_partials(playground_dir: Path) -> dict[str, str]:
+def render_artifacts(project_root: Path, playground_dirs: list[Path]) -> tuple[int, list[Path]]:
     """
-    Load any existing partial results.
+    Write content.json for every existing research companion, move pages
+    still reading content.md at runtime over to it, and rebuild the research
+    catalog from what is on disk. No API calls are made.
 
     Returns:
-        Dict mapping provider name to content.
+        The number of artifacts written, and the pages left as they were
+        because they are not in a form that can be migrated safely.
     """
-    partial_dir = playground_dir / "research" / ".partial"
-    if not partial_dir.is_dir():
-        return {}
-
-    partials = {}
-    for f in partial_dir.iterdir():
-        if f.suffix == ".md":
-            partials[f.stem] = f.read_text()
+    data_ts = read_data_ts(project_root)
+    written = 0
+    skipped: list[Path] = []
+    entries: list[CatalogEntry] = []
+    documents: list[tuple[str, str, str, dict]] = []
+    for playground_dir in playground_dirs:
+        research_dir = playground_dir / "research"
+        if not (research_dir / "content.md").exists():
+            continue
+        with research_lock(playground_dir):
+            artifact = render_artifact((research_dir / "content.md").read_text())
+            atomic_write_text(research_dir / ARTIFACT_NAME, dump_artifact(artifact))
+            written += 1
+            page_path = research_dir / "page.tsx"
+            if page_path.exists():
+                page = page_path.read_text()
+                migrated = migrate_page(page)
+                if migrated is not None:
+                    atomic_write_text(page_path, migrated)
+                elif "content.json" not in page:
+                    skipped.append(page_path)
+        ctx = build_context(playground_dir, project_root, data_ts)
+        entry = catalog_entry(playground_dir, ctx, artifact["wordCount"], load_meta(playground_dir))
+        entries.append(entry)
+        documents.append((entry.slug, entry.title, entry.url, artifact))
+
+    ResearchCatalog.for_project(project_root).replace_all(entries)
+    SearchIndex.for_project(project_root).rebuild(documents)
+    return written, skipped
+
+
+def build_search_index(project_root: Path, playground_dirs: list[Path]) -> int:
+    """
+    Rebuild the full-text search index from each companion's committed
+    content.json (rendering content.md where there is none), e.g. before
+    `next build`. No API calls are made and nothing else is written.
 
-    return partials
+    Returns:
+        The number of playgrounds indexed.
+    """
+    catalog = ResearchCatalog.for_project(project_root).entries()
+    data_ts = None
+    documents: list[tuple[str, str, str, dict]] = []
+    for playground_dir in playground_dirs:
+        research_dir = playground_dir / "research"
+        if (research_dir / ARTIFACT_NAME).exists():
+            artifact = json.loads((research_dir / ARTIFACT_NAME).read_text())
+        elif (research_dir / "content.md").exists():
+            artifact = render_artifact((research_dir / "content.md").read_text())
+        else:
+            continue
+        entry = catalog.get(playground_dir.name)
+        if entry is None:
+            if data_ts is None:
+                data_ts = read_data_ts(project_root)
+            ctx = build_context(playground_dir, project_root, data_ts)
+            entry = catalog_entry(playground_dir, ctx, artifact["wordCount"], {})
+        documents.append((entry.slug, entry.title, entry.url, artifact))
+    SearchIndex.for_project(project_root).rebuild(documents)
+    return len(documents)
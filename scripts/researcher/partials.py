@@ -0,0 +1,280 @@
+"""
+Partial result store for resumable research runs.
+
+Each provider result lives in research/.partial/ as two files:
+  - <provider>.json           — small manifest (model, prompt hash, sizes, timings, usage)
+  - <provider>.md.zst / .md.gz — compressed body
+
+While a provider is still running, <provider>.handle.json records its remote
+job id so a restarted run can reattach to it instead of submitting again.
+inputs.json records the research prompt, queries and reused runs once they are
+decided, so a run resumed after every provider finished still synthesizes and
+archives the same research.
+
+The manifest is written last and acts as the commit marker, so resume decisions
+can be made from manifests alone without reading or decompressing any bodies.
+Bare <provider>.md files from older runs are still recognised.
+"""
+
+import hashlib
+import io
+import json
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+
+from fileio import (
+    CODEC_SUFFIXES,
+    DEFAULT_CODEC,
+    atomic_write_text,
+    codec_for,
+    open_compressed_text,
+    private_temp_path,
+)
+from providers.base import ResearchResult
+
+
+INPUTS_FILENAME = "inputs.json"
+
+
+@dataclass
+class PartialManifest:
+    """Metadata describing one stored provider result."""
+    provider: str
+    model: str
+    prompt_hash: str = ""
+    status: str = "completed"
+    body: str = ""  # body filename, relative to the .partial/ directory
+    codec: str = "none"
+    chars: int = 0
+    raw_bytes: int = 0
+    stored_bytes: int = 0
+    started_at: float = 0.0
+    finished_at: float = 0.0
+    usage: dict[str, int] = field(default_factory=dict)
+
+    @property
+    def duration(self) -> float:
+        """Wall time the provider took, in seconds (0 if unknown)."""
+        if self.started_at and self.finished_at:
+            return self.finished_at - self.started_at
+        return 0.0
+
+
+@dataclass
+class PartialEntry:
+    """A stored partial; the body is only read when asked for."""
+    manifest: PartialManifest
+    body_path: Path
+
+    def to_result(self) -> ResearchResult:
+        """A ResearchResult that reads the body lazily via `read_content()`."""
+        return ResearchResult(
+            provider=self.manifest.provider,
+            content="",
+            model=self.manifest.model,
+            status=self.manifest.status,
+            content_path=self.body_path,
+            usage=dict(self.manifest.usage),
+            duration=self.manifest.duration,
+        )
+
+
+def prompt_hash(prompt: str) -> str:
+    """Short stable hash identifying the prompt a result was produced from."""
+    return hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:16]
+
+
+class PartialWriter(io.TextIOBase):
+    """
+    Text sink that streams a provider's output into the partial store.
+
+    Text is compressed into a temporary file as it arrives; `commit()` moves it
+    into place and writes the manifest, `discard()` deletes it, so an interrupted
+    or failed run never leaves a truncated partial behind for --resume.
+    """
+
+    def __init__(self, store: "PartialStore", provider: str, model: str, prompt: str = ""):
+        store.directory.mkdir(parents=True, exist_ok=True)
+
+        self.store = store
+        self.manifest = PartialManifest(
+            provider=provider,
+            model=model,
+            prompt_hash=prompt_hash(prompt) if prompt else "",
+            body=f"{provider}.md{CODEC_SUFFIXES[DEFAULT_CODEC]}",
+            codec=DEFAULT_CODEC,
+            started_at=time.time(),
+        )
+        # Another run streaming the same provider into this playground gets its own file
+        self._tmp_path = private_temp_path(store.directory / self.manifest.body)
+        self._file = open_compressed_text(self._tmp_path, "w", codec=DEFAULT_CODEC)
+
+    @property
+    def chars(self) -> int:
+        return self.manifest.chars
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, text: str) -> int:
+        self.manifest.chars += len(text)
+        self.manifest.raw_bytes += len(text.encode("utf-8"))
+        return self._file.write(text)
+
+    def flush(self) -> None:
+        self._file.flush()
+
+    def commit(self, usage: dict[str, int] | None = None) -> PartialEntry:
+        """Close the sink, move the body into place and write its manifest."""
+        self._file.close()
+        body_path = self.store.directory / self.manifest.body
+        self._tmp_path.replace(body_path)
+
+        self.manifest.finished_at = time.time()
+        self.manifest.stored_bytes = body_path.stat().st_size
+        self.manifest.usage = dict(usage or {})
+        self.store.write_manifest(self.manifest)
+        self.store.clear_handle(self.manifest.provider)
+
+        return PartialEntry(manifest=self.manifest, body_path=body_path)
+
+    def discard(self) -> None:
+        """Close the sink and delete whatever was streamed."""
+        self._file.close()
+        self._tmp_path.unlink(missing_ok=True)
+
+
+class PartialStore:
+    """The .partial/ directory of one playground."""
+
+    def __init__(self, playground_dir: Path):
+        self.directory = playground_dir / "research" / ".partial"
+
+    def writer(self, provider: str, model: str, prompt: str = "") -> PartialWriter:
+        """Open a streaming writer for a provider's result."""
+        return PartialWriter(self, provider, model, prompt)
+
+    def save(self, provider: str, model: str, content: str, prompt: str = "") -> PartialEntry:
+        """Store an already-complete result."""
+        writer = self.writer(provider, model, prompt)
+        writer.write(content)
+        return writer.commit()
+
+    def write_manifest(self, manifest: PartialManifest) -> None:
+        atomic_write_text(
+            self.directory / f"{manifest.provider}.json",
+            json.dumps(asdict(manifest), indent=2),
+        )
+
+    def save_handle(
+        self,
+        provider: str,
+        model: str,
+        handle: str,
+        prompt: str = "",
+        queries: list[str] | None = None,
+        reused: list[str] | None = None,
+    ) -> None:
+        """
+        Record the remote job id of a provider that is still running.
+
+        The prompt and queries, and the archived runs reused in place of some
+        queries, are kept alongside it so a run that reattaches can synthesize
+        and archive them without generating queries again.
+        """
+        self.directory.mkdir(parents=True, exist_ok=True)
+        atomic_write_text(
+            self.directory / f"{provider}.handle.json",
+            json.dumps({
+                "provider": provider,
+                "model": model,
+                "handle": handle,
+                "prompt": prompt,
+                "queries": queries or [],
+                "reused": reused or [],
+                "submitted_at": time.time(),
+            }),
+        )
+
+    def save_inputs(self, prompt: str, queries: list[str], reused: list[str]) -> None:
+        """Record what the providers of this run are asked (see `inputs`)."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        atomic_write_text(
+            self.directory / INPUTS_FILENAME,
+            json.dumps({"prompt": prompt, "queries": queries, "reused": reused}),
+        )
+
+    def inputs(self, entries: list[PartialEntry]) -> dict | None:
+        """
+        The prompt, queries and reused runs saved by `save_inputs`, if every
+        one of `entries` was produced from that prompt.
+        """
+        path = self.directory / INPUTS_FILENAME
+        if not entries or not path.exists():
+            return None
+        try:
+            data = json.loads(path.read_text())
+        except ValueError:
+            return None
+        expected = prompt_hash(data.get("prompt", ""))
+        if any(entry.manifest.prompt_hash != expected for entry in entries):
+            return None
+        return data
+
+    def clear_handle(self, provider: str) -> None:
+        (self.directory / f"{provider}.handle.json").unlink(missing_ok=True)
+
+    def handles(self) -> dict[str, dict]:
+        """Remote job ids of providers that were submitted but never finished."""
+        if not self.directory.is_dir():
+            return {}
+        handles = {}
+        for f in self.directory.glob("*.handle.json"):
+            try:
+                data = json.loads(f.read_text())
+            except ValueError:
+                continue
+            handles[data["provider"]] = data
+        return handles
+
+    def entries(self) -> dict[str, PartialEntry]:
+        """
+        Load manifests for every stored result, without reading any bodies.
+
+        Returns:
+            Dict mapping provider name to its entry.
+        """
+        if not self.directory.is_dir():
+            return {}
+
+        entries: dict[str, PartialEntry] = {}
+
+        for f in sorted(self.directory.glob("*.json")):
+            if f.name.endswith(".handle.json") or f.name == INPUTS_FILENAME:
+                continue
+            try:
+                manifest = PartialManifest(**json.loads(f.read_text()))
+            except (ValueError, TypeError):
+                continue
+            body_path = self.directory / manifest.body
+            if body_path.exists():
+                entries[manifest.provider] = PartialEntry(manifest=manifest, body_path=body_path)
+
+        # Bare <provider>.md files written before manifests existed
+        for f in sorted(self.directory.glob("*.md")):
+            if f.stem in entries:
+                continue
+            stat = f.stat()
+            manifest = PartialManifest(
+                provider=f.stem,
+                model="unknown",
+                body=f.name,
+                codec=codec_for(f),
+                raw_bytes=stat.st_size,
+                stored_bytes=stat.st_size,
+                finished_at=stat.st_mtime,
+            )
+            entries[f.stem] = PartialEntry(manifest=manifest, body_path=f)
+
+        return entries
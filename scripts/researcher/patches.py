@@ -0,0 +1,125 @@
+"""
+Section-level patches for incremental re-synthesis.
+
+A document is split at its ## and ### headings into numbered sections (S1,
+S2, ...; text before the first heading is S1 if there is any). The model sees
+the numbered document and answers with patches:
+
+    <<< content.md replace S3
+    ## Theoretical Foundations
+    ...the whole new section...
+    >>>
+
+    <<< content.md insert-after S3
+    ### A new subsection
+    ...
+    >>>
+
+    <<< suggestions.md delete S5
+    >>>
+
+`insert-after S0` inserts before the first section. Sections no patch names
+are kept byte for byte, so edits made to the document by hand survive; only
+the blank line before a new or replaced section may be added.
+"""
+
+import re
+from dataclasses import dataclass
+
+
+_HEADING = re.compile(r"^#{2,3}\s")
+_FENCE = re.compile(r"^\s*(```|~~~)")
+_PATCH = re.compile(
+    r"^<<<\s*(?P<document>[\w.-]+)\s+(?P<action>replace|insert-after|delete)\s+S(?P<section>\d+)\s*$\n"
+    r"(?P<body>.*?)^>>>\s*$",
+    re.MULTILINE | re.DOTALL,
+)
+
+
+@dataclass
+class Patch:
+    """One edit the model asked for."""
+    document: str
+    action: str
+    section: int
+    text: str = ""
+
+
+def split_sections(markdown: str) -> list[str]:
+    """
+    The document's sections in order, each starting at its heading (blank
+    lines before the first one go with it). Joined, they are the document.
+    """
+    sections: list[str] = []
+    current: list[str] = []
+    in_fence = False
+    for line in markdown.splitlines(keepends=True):
+        if _FENCE.match(line):
+            in_fence = not in_fence
+        if not in_fence and _HEADING.match(line) and "".join(current).strip():
+            sections.append("".join(current))
+            current = []
+        current.append(line)
+    if "".join(current).strip():
+        sections.append("".join(current))
+    elif sections:
+        sections[-1] += "".join(current)
+    return sections
+
+
+def numbered(sections: list[str]) -> str:
+    """The sections labelled [S1], [S2], ... for the prompt."""
+    return "\n\n".join(f"[S{i}]\n{text.strip()}" for i, text in enumerate(sections, 1))
+
+
+def parse_patches(text: str) -> list[Patch]:
+    return [
+        Patch(m["document"], m["action"], int(m["section"]), m["body"].strip("\n"))
+        for m in _PATCH.finditer(text)
+    ]
+
+
+def apply_patches(sections: list[str], patches: list[Patch]) -> tuple[str, list[Patch]]:
+    """
+    Apply one document's patches to its sections.
+
+    Returns:
+        The patched document, and the patches that were skipped because they
+        name a section that does not exist.
+    """
+    replaced: dict[int, str | None] = {}  # None: deleted
+    inserted: dict[int, list[str]] = {}
+    skipped = []
+    for patch in patches:
+        lowest = 0 if patch.action == "insert-after" else 1
+        if not lowest <= patch.section <= len(sections):
+            skipped.append(patch)
+        elif patch.action == "insert-after":
+            inserted.setdefault(patch.section, []).append(patch.text)
+        else:
+            replaced[patch.section] = patch.text if patch.action == "replace" else None
+
+    document = ""
+
+    def add(text: str) -> None:
+        nonlocal document
+        if not text.strip():
+            return
+        if document and not document.endswith("\n\n"):
+            document = document.rstrip("\n") + "\n\n"
+        document += text.strip("\n") + "\n\n"
+
+    for text in inserted.get(0, []):
+        add(text)
+    for i, text in enumerate(sections, 1):
+        if i not in replaced:
+            document += text
+        elif replaced[i] is not None:
+            add(replaced[i])
+        for new in inserted.get(i, []):
+            add(new)
+    # The document still ends as before unless its end was patched
+    ends_as_before = bool(sections) and len(sections) not in replaced and not inserted.get(len(sections))
+    if not ends_as_before:
+        document = document.rstrip("\n") + "\n"
+    return document, skipped
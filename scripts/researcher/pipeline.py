@@ -0,0 +1,618 @@
+"""
+The research pipeline for a single playground.
+
+Builds context, generates queries, runs the deep research providers, synthesizes
+their reports and writes the research companion. Used by the CLI, batch mode
+and watch mode.
+"""
+
+import asyncio
+import hashlib
+import shutil
+import time
+from pathlib import Path
+from typing import Callable
+
+from rich.console import Console
+from rich.panel import Panel
+
+from archive import ResearchArchive, RunRecord
+from background import run_in_thread
+from cache import PROVIDER_TTL, cache_key, get_cache
+from config import DEFAULT_TIER, RESEARCH_TIERS, TIER_FAST, TIER_PREMIUM
+from context import PlaygroundContext
+from extract import extract_context
+from fileio import open_compressed_text
+from latency import LatencyHistory
+from metrics import record_report
+from output import write_output
+from profiling import RunProfiler
+from partials import PartialEntry, PartialStore
+from progress import ResearchProgress
+from providers.base import ResearchResult
+from providers.gemini_deep import POLL_INTERVAL as GEMINI_POLL_INTERVAL
+from providers.gemini_deep import GeminiDeepResearchProvider
+from providers.openai_deep import OpenAIDeepResearchProvider
+from querycache import QueryIndex, reused_results
+from queries import generate_focus_queries, review_matches, review_queries
+from retry import get_breaker
+from staleness import Fingerprint, fingerprint_inputs, load_meta, read_data_ts
+from synthesis import context_diff, synthesize, synthesize_incremental
+
+console = Console()
+
+
+# A reattached provider gets at least this long, however old its job is
+MIN_REATTACH_DEADLINE = 5 * 60.0
+
+
+class ResearchError(RuntimeError):
+    """A research run could not produce output."""
+
+
+def provider_models(model_override: str | None = None, tier: str = DEFAULT_TIER) -> dict[str, str]:
+    """The deep research model each provider runs at `tier`; providers without one are left out."""
+    models = dict(RESEARCH_TIERS[tier])
+    if model_override and "openai" in models:
+        models["openai"] = model_override
+    return models
+
+
+def healthy_providers(
+    names: list[str],
+    models: dict[str, str],
+    done: set[str],
+    reattached: set[str],
+) -> list[str]:
+    """
+    The providers to run `names` on. A provider whose circuit is open hands
+    its work to one at this tier that is healthy and neither running nor
+    done, or is skipped if there is none. Reattached providers always run:
+    their jobs are already going.
+    """
+    chosen: list[str] = []
+    for name in names:
+        if name in reattached or get_breaker(name).allow():
+            chosen.append(name)
+            continue
+        fallback = next(
+            (p for p in models if p not in names and p not in chosen and p not in done and get_breaker(p).allow()),
+            None,
+        )
+        if fallback:
+            console.print(f"[bold yellow]Circuit open for {name}; sending its research to {fallback}.[/bold yellow]")
+            chosen.append(fallback)
+        else:
+            console.print(f"[bold yellow]Circuit open for {name}, skipping this provider.[/bold yellow]")
+    return chosen
+
+
+def research_tier(results: list[ResearchResult]) -> str:
+    """The tier a companion was researched at: fast if its own reports all came from fast-tier models."""
+    return _tier_of({r.provider: r.model for r in results})
+
+
+def _tier_of(models: dict[str, str]) -> str:
+    fast = set(RESEARCH_TIERS[TIER_FAST].values())
+    own = {model for provider, model in models.items() if "@" not in provider}  # not reused from other playgrounds
+    return TIER_FAST if own and own <= fast else TIER_PREMIUM
+
+
+def run_meta(record: RunRecord) -> dict:
+    """
+    research/meta.json for a companion written from an archived run.
+
+    Runs archived before fingerprints were recorded get none, so staleness
+    reports them as changed rather than trusting the inputs of another run.
+    """
+    models = {name: info.get("model", "unknown") for name, info in record.providers.items()}
+    meta = {
+        "run_id": record.run_id,
+        "researched_at": time.strftime("%Y-%m-%dT%H:%M:%S%z", time.localtime(record.created_at)),
+    }
+    if record.fingerprint:
+        fingerprint = Fingerprint(dict(record.fingerprint))
+        meta["fingerprint"] = fingerprint.digest
+        meta["inputs"] = fingerprint.inputs
+    meta["models"] = models
+    meta["tier"] = record.tier or _tier_of(models)
+    return meta
+
+
+def build_research_prompt(ctx: PlaygroundContext, queries: list[str]) -> str:
+    """Concatenate the research queries into the prompt sent to every provider."""
+    return (
+        f"# Deep Research Request: {ctx.title}\n\n"
+        f"## Context\n\n"
+        f"This research is for an interactive scientific playground about: {ctx.description}\n"
+        f"Topics: {', '.join(ctx.topics)}\n"
+        f"Operations: {', '.join(ctx.operations)}\n\n"
+        f"## Research Questions\n\n"
+        + "\n".join(f"{i}. {q}" for i, q in enumerate(queries, 1))
+        + "\n\n## Instructions\n\n"
+        "Please provide comprehensive, well-sourced answers to the above research questions. "
+        "Include specific citations, data, and references where available. "
+        "Focus on academic and scientific rigor while remaining accessible. "
+        "Cover both established knowledge and recent developments."
+    )
+
+
+def previous_run(playground_dir: Path, archive: ResearchArchive) -> RunRecord | None:
+    """The archived run the current research companion was written from, if any."""
+    research_dir = playground_dir / "research"
+    run_id = load_meta(playground_dir).get("run_id")
+    if not run_id or not (research_dir / "content.md").exists() or not (research_dir / "suggestions.md").exists():
+        return None
+    try:
+        record = archive.get_run(run_id, playground=playground_dir.name)
+    except KeyError:
+        return None
+    if "context" not in record.inputs or archive.blob_path(record.inputs["context"]) is None:
+        return None
+    return record
+
+
+def draft_run(
+    playground_dir: Path,
+    fingerprint_digest: str,
+    focus: list[str] | None,
+    archive: ResearchArchive,
+) -> RunRecord | None:
+    """
+    The archived run behind the current companion, if it is a fast-tier
+    draft of the playground as it is now, with the same focus, for a premium
+    run to upgrade.
+    """
+    meta = load_meta(playground_dir)
+    if meta.get("tier") != TIER_FAST or meta.get("fingerprint") != fingerprint_digest:
+        return None
+    record = previous_run(playground_dir, archive)
+    if record is None or record.focus != ("; ".join(focus) if focus else None):
+        return None
+    return record
+
+
+def unseen_results(results: list[ResearchResult], previous: RunRecord) -> list[ResearchResult]:
+    """The results whose reports were not part of `previous`."""
+    seen = {info.get("blob") for info in previous.providers.values()}
+    return [
+        r for r in results
+        if hashlib.sha256(r.read_content().encode("utf-8")).hexdigest() not in seen
+    ]
+
+
+async def run_research(
+    playground_dir: Path,
+    project_root: Path,
+    provider_names: list[str],
+    focus: list[str] | None,
+    model_override: str | None,
+    resume: bool,
+    from_run: str | None = None,
+    interactive: bool = True,
+    live_progress: bool = True,
+    reuse_similar: bool = False,
+    focus_sections: bool = False,
+    incremental: bool = False,
+    tier: str = DEFAULT_TIER,
+    on_stage: Callable[[str], None] | None = None,
+    on_progress: Callable[[str, str, str], None] | None = None,
+    profiler: RunProfiler | None = None,
+) -> Path:
+    """
+    Run the full research pipeline.
+
+    If `from_run` names an archived run, its provider reports are re-synthesized
+    against the current context instead of running deep research again. With
+    `interactive=False` the generated queries are used without review; with
+    `live_progress=False` provider progress is logged line by line instead of
+    drawn as a live table, so several runs can share a terminal.
+
+    With several `focus` areas the context is built once, queries are
+    generated for each focus concurrently and deduplicated, and one set of
+    deep research jobs covers them all. Synthesis merges them into one
+    companion, or with `focus_sections` gives each focus its own section.
+
+    With `incremental`, an existing companion is patched section by section
+    with what changed since the run it was written from (new provider reports,
+    context changes) instead of being rewritten; edits made to it by hand are
+    kept. Without such a run to compare against it is synthesized in full.
+
+    `tier` ("fast" or "premium", see config.RESEARCH_TIERS) picks the deep
+    research models; providers without a model at that tier are skipped. The
+    companion records the tier it was researched at. A premium run over a
+    fast-tier draft of the unchanged playground, with the same focus,
+    upgrades it: the premium providers are asked the draft's queries and the
+    companion is synthesized in full, replacing the draft.
+
+    Generated queries that closely match queries archived for other
+    playgrounds are flagged; reused ones (confirmed interactively, or all of
+    them with `reuse_similar`) are left out of the research prompt and the
+    matching runs' provider reports are synthesized instead.
+
+    With `resume`, providers that were submitted but never finished are
+    reattached to through their stored handles rather than submitted again.
+    `on_stage` is called with "researching" and "synthesizing" as the run
+    enters those stages, and `on_progress` with (provider, status, message)
+    on every provider status update. With an enabled `profiler`, each stage
+    (context, queries, research, synthesis, archive, output) is profiled;
+    the caller reports it.
+
+    Returns:
+        Path to the research/ directory.
+
+    Raises:
+        ResearchError: If no provider produced a usable result.
+    """
+    profiler = profiler or RunProfiler(playground_dir.name, enabled=False)
+
+    # Build context, fingerprinting the inputs as they are now so edits made
+    # while research runs will still show up as stale afterwards
+    console.print("\n[bold #84cc16]Building playground context...[/bold #84cc16]")
+    with profiler.stage("context"):
+        data_ts = read_data_ts(project_root)
+        ctx = extract_context(playground_dir, project_root, data_ts=data_ts).context
+        fingerprint = fingerprint_inputs(playground_dir, data_ts)
+
+    console.print(
+        Panel(
+            f"[bold]{ctx.title}[/bold]\n"
+            f"{ctx.description}\n\n"
+            f"Topics: {', '.join(ctx.topics)}\n"
+            f"Operations: {', '.join(ctx.operations)}\n"
+            f"Date: {ctx.date}\n"
+            f"Logic files: {len(ctx.logic_files)}\n"
+            f"Has ideation: {'yes' if ctx.ideation_info else 'no'}",
+            title="[bold #84cc16]Playground Context[/bold #84cc16]",
+            border_style="#84cc16",
+        )
+    )
+
+    # Check for existing partials if resuming. Only manifests are read here;
+    # bodies are loaded lazily at synthesis time.
+    store = PartialStore(playground_dir)
+    models = provider_models(model_override, tier)
+    skipped = [p for p in provider_names if p not in models and any(p in m for m in RESEARCH_TIERS.values())]
+    if skipped and not from_run:
+        console.print(f"[dim]No {tier}-tier model for {', '.join(skipped)}; skipping.[/dim]")
+        provider_names = [p for p in provider_names if p not in skipped]
+        if not provider_names:
+            raise ResearchError(f"None of the requested providers runs at the {tier} tier.")
+    archive = ResearchArchive()
+    draft = None
+    if tier == TIER_PREMIUM and not from_run:
+        draft = draft_run(playground_dir, fingerprint.digest, focus, archive)
+    existing_partials: dict[str, PartialEntry] = {}
+    handles: dict[str, dict] = {}
+    if resume and not from_run:
+        for provider_name, info in store.handles().items():
+            if provider_name in provider_names and info.get("model") == models.get(provider_name):
+                handles[provider_name] = info
+        for provider_name, entry in store.entries().items():
+            manifest = entry.manifest
+            if provider_name not in provider_names or manifest.status != "completed":
+                continue
+            if manifest.model not in ("unknown", models.get(provider_name)):
+                console.print(
+                    f"  [dim]Ignoring partial for {provider_name}: "
+                    f"made with {manifest.model}, want {models.get(provider_name)}[/dim]"
+                )
+                continue
+            existing_partials[provider_name] = entry
+        if existing_partials:
+            console.print(
+                f"\n[bold #84cc16]Found partial results for: "
+                f"{', '.join(existing_partials.keys())}[/bold #84cc16]"
+            )
+
+    # Determine which providers still need to run
+    providers_to_run = [
+        p for p in provider_names
+        if p not in existing_partials
+    ]
+
+    results: list[ResearchResult] = []
+    queries: list[str] = []
+    reused: list[str] = []  # archived runs whose reports stand in for some queries
+    research_prompt = ""
+
+    if from_run:
+        try:
+            record = archive.get_run(from_run, playground=ctx.name)
+        except KeyError as e:
+            raise ResearchError(e.args[0]) from None
+        results = archive.provider_results(record)
+        queries = record.queries
+        providers_to_run = []
+        console.print(
+            f"\n[bold #84cc16]Re-synthesizing archived run {record.run_id} "
+            f"({', '.join(r.provider for r in results)})[/bold #84cc16]"
+        )
+
+    # Convert existing partials to ResearchResults
+    for provider_name, entry in existing_partials.items():
+        manifest = entry.manifest
+        results.append(entry.to_result())
+        console.print(
+            f"  [dim]Using cached result for {provider_name} "
+            f"({manifest.model}, {manifest.raw_bytes // 1024} KB"
+            f"{f', {manifest.duration / 60:.0f} min' if manifest.duration else ''})[/dim]"
+        )
+
+    handles = {p: h for p, h in handles.items() if p in providers_to_run}
+    if handles:
+        console.print(
+            f"\n[bold #84cc16]Reattaching to running jobs for: "
+            f"{', '.join(handles.keys())}[/bold #84cc16]"
+        )
+
+    if on_stage:
+        on_stage("researching")
+
+    with profiler.stage("queries"):
+        if draft is not None:
+            # Upgrading a draft: the premium providers are asked what the
+            # draft's were, alongside the reports it reused
+            research_prompt = archive.get_text(draft.inputs["prompt"]) if "prompt" in draft.inputs else ""
+            queries = draft.queries
+            results.extend(r for r in archive.provider_results(draft) if "@" in r.provider)
+            console.print(
+                f"\n[bold #84cc16]Upgrading draft run {draft.run_id} with its {len(queries)} queries[/bold #84cc16]"
+            )
+            if not research_prompt:
+                providers_to_run = []
+        elif providers_to_run and all(p in handles for p in providers_to_run):
+            # Every remaining provider is already running remotely: reuse the
+            # prompt it was submitted with instead of generating new queries
+            submitted = handles[providers_to_run[0]]
+            research_prompt = submitted.get("prompt", "")
+            queries = submitted.get("queries", [])
+            reused = submitted.get("reused", [])
+        elif providers_to_run:
+            # Generate and review queries
+            console.print("\n[bold #84cc16]Generating research queries...[/bold #84cc16]")
+            queries = await generate_focus_queries(ctx, focus)
+            if interactive:
+                with profiler.paused():
+                    queries = review_queries(queries)
+
+            # Queries already researched for another playground need not be asked again
+            matches = QueryIndex.from_archive(exclude_playground=ctx.name).match(queries)
+            with profiler.paused():
+                accepted = review_matches(matches, interactive=interactive, reuse=reuse_similar)
+            reused = list(dict.fromkeys(m.match.run_id for m in accepted))
+            to_research = [q for q in queries if q not in {m.query for m in accepted}]
+
+            if to_research:
+                # Concatenate queries into a single prompt
+                research_prompt = build_research_prompt(ctx, to_research)
+            else:
+                console.print("[bold #84cc16]Every query is covered by archived research; skipping deep research.[/bold #84cc16]")
+                providers_to_run = []
+        elif existing_partials and not from_run:
+            # Every provider already finished: restore what they were asked,
+            # so the same research is synthesized and archived
+            saved = store.inputs(list(existing_partials.values()))
+            if saved is not None:
+                research_prompt, queries, reused = saved["prompt"], saved["queries"], saved["reused"]
+
+        if providers_to_run and research_prompt:
+            store.save_inputs(research_prompt, queries, reused)
+        if reused:
+            results.extend(reused_results(reused, archive))
+
+    with profiler.stage("research"):
+        # A provider already asked exactly this prompt returns its cached report
+        cache = get_cache()
+        for name in [p for p in providers_to_run if p not in handles and p in models]:
+            cached = cache.open("provider", cache_key(name, models[name], research_prompt))
+            if cached is None:
+                continue
+            sink = store.writer(name, models[name], research_prompt)
+            with cached:
+                shutil.copyfileobj(cached, sink)
+            results.append(sink.commit().to_result())
+            providers_to_run.remove(name)
+            console.print(f"  [dim]Using the cached report of {name} for this prompt ({sink.chars:,} chars)[/dim]")
+
+        if providers_to_run:
+            # Polling intervals and deadlines follow each model's latency history.
+            # A reattached job has already used part of its deadline.
+            latency = LatencyHistory()
+            submitted_at = {p: handles[p].get("submitted_at") or time.time() for p in handles}
+
+            def remaining_deadline(name: str) -> float | None:
+                deadline = latency.deadline(name, models[name])
+                if deadline is None or name not in submitted_at:
+                    return deadline
+                return max(deadline - (time.time() - submitted_at[name]), MIN_REATTACH_DEADLINE)
+
+            # Initialize providers
+            provider_instances = []
+            for name in healthy_providers(
+                providers_to_run, models, done={r.provider for r in results}, reattached=set(handles),
+            ):
+                if name == "openai":
+                    provider_instances.append(OpenAIDeepResearchProvider(
+                        model=models["openai"],
+                        deadline=remaining_deadline("openai"),
+                    ))
+                elif name == "gemini":
+                    provider_instances.append(GeminiDeepResearchProvider(
+                        model=models["gemini"],
+                        poll_interval=latency.poll_interval("gemini", models["gemini"], GEMINI_POLL_INTERVAL),
+                        deadline=remaining_deadline("gemini"),
+                    ))
+                else:
+                    console.print(f"[bold red]Unknown provider: {name}[/bold red]")
+                    continue
+
+            # Run providers with progress tracking
+            console.print()
+            with ResearchProgress(
+                [p.name for p in provider_instances],
+                live=live_progress,
+                label=ctx.name,
+                on_update=on_progress,
+            ) as progress:
+
+                async def run_provider(provider: OpenAIDeepResearchProvider | GeminiDeepResearchProvider) -> ResearchResult:
+                    def on_status(msg: str) -> None:
+                        progress.update(provider.name, "polling", msg)
+
+                    progress.mark_started(provider.name)
+                    started_at = submitted_at.get(provider.name, time.time())
+                    # Stream straight into .partial/ so large reports never sit in memory
+                    sink = store.writer(provider.name, models[provider.name], research_prompt)
+                    try:
+                        result = await provider.research(
+                            research_prompt,
+                            on_status=on_status,
+                            sink=sink,
+                            handle=handles.get(provider.name, {}).get("handle"),
+                            on_handle=lambda h: store.save_handle(
+                                provider.name, models[provider.name], h, research_prompt, queries, reused,
+                            ),
+                        )
+                    except Exception:
+                        sink.discard()
+                        latency.record(provider.name, models[provider.name], "failed", time.time() - started_at)
+                        raise
+                    except BaseException:
+                        # Keep the handle: the remote job is still running and a
+                        # resumed run can reattach to it
+                        sink.discard()
+                        raise
+                    latency.record(provider.name, models[provider.name], result.status, time.time() - started_at)
+
+                    if result.status == "completed":
+                        entry = sink.commit(usage=result.usage)
+                        result.content_path = entry.body_path
+                        result.duration = entry.manifest.duration
+                        record_report(provider.name, models[provider.name], result.usage, entry.manifest.raw_bytes)
+                        with open_compressed_text(entry.body_path) as report:
+                            cache.put_stream(
+                                "provider",
+                                cache_key(provider.name, models[provider.name], research_prompt),
+                                report,
+                                ttl=PROVIDER_TTL,
+                                cost_seconds=result.duration,
+                            )
+                        progress.update(provider.name, "completed", f"Got {sink.chars} chars")
+                    elif result.status == "timed_out":
+                        # The remote job may still finish: keep its handle for --resume
+                        sink.discard()
+                        progress.update(provider.name, "failed", result.error[:60])
+                    else:
+                        sink.discard()
+                        store.clear_handle(provider.name)
+                        progress.update(provider.name, "failed", result.error[:60])
+
+                    return result
+
+                # Run all providers concurrently
+                provider_results = await asyncio.gather(
+                    *[run_provider(p) for p in provider_instances],
+                    return_exceptions=True,
+                )
+
+                for r in provider_results:
+                    if isinstance(r, Exception):
+                        console.print(f"[bold red]Provider error: {r}[/bold red]")
+                    else:
+                        results.append(r)
+
+    # Check we have at least one successful result
+    # In a stable order, so a resumed run sends synthesis the same prompt and
+    # finds its cached answer or background response
+    successful = sorted((r for r in results if r.status == "completed"), key=lambda r: r.provider)
+    if not successful:
+        console.print("\n[bold red]No successful research results. Cannot synthesize.[/bold red]")
+        for r in results:
+            if r.error:
+                console.print(f"  [red]{r.provider}: {r.error}[/red]")
+        raise ResearchError(f"No successful research results for {ctx.name}.")
+
+    previous = previous_run(playground_dir, archive) if incremental and draft is None else None
+    if incremental and draft is not None:
+        console.print("\n[yellow]Replacing a draft; synthesizing from scratch instead of patching it.[/yellow]")
+    elif incremental and previous is None:
+        console.print("\n[yellow]No archived run behind the current companion; synthesizing from scratch.[/yellow]")
+
+    if previous is not None:
+        new_results = unseen_results(successful, previous)
+        console.print(
+            f"\n[bold #84cc16]Patching the companion with {len(new_results)} new research result(s)...[/bold #84cc16]"
+        )
+    else:
+        console.print(
+            f"\n[bold #84cc16]Synthesizing {len(successful)} research result(s)...[/bold #84cc16]"
+        )
+    if on_stage:
+        on_stage("synthesizing")
+
+    # Synthesize
+    with profiler.stage("synthesis"):
+        if previous is not None:
+            research_dir = playground_dir / "research"
+            content_md, suggestions_md = await run_in_thread(
+                synthesize_incremental,
+                ctx,
+                new_results,
+                (research_dir / "content.md").read_text(),
+                (research_dir / "suggestions.md").read_text(),
+                changes=context_diff(archive.get_text(previous.inputs["context"]), ctx.to_prompt()),
+            )
+        else:
+            content_md, suggestions_md = await run_in_thread(
+                synthesize, ctx, successful, focuses=focus, per_focus=focus_sections,
+            )
+
+    # Archive inputs and outputs so this run can be restored or re-synthesized later
+    with profiler.stage("archive"):
+        record = archive.archive_run(
+            playground=ctx.name,
+            context=ctx.to_prompt(),
+            prompt=research_prompt,
+            queries=queries,
+            focus="; ".join(focus) if focus else None,
+            results=successful,
+            content_md=content_md,
+            suggestions_md=suggestions_md,
+            fingerprint=fingerprint.inputs,
+            tier=research_tier(successful),
+        )
+
+    # Write output
+    with profiler.stage("output"):
+        research_dir = write_output(playground_dir, ctx, content_md, suggestions_md, meta=run_meta(record))
+
+    console.print()
+    console.print(
+        Panel(
+            f"[bold green]Research complete![/bold green]\n\n"
+            f"  content.md:     {research_dir / 'content.md'}\n"
+            f"  suggestions.md: {research_dir / 'suggestions.md'}\n"
+            f"  page.tsx:       {research_dir / 'page.tsx'}\n\n"
+            f"View at: /playgrounds/{ctx.name}/research\n"
+            f"Archived as run {record.run_id}\n\n"
+            f"[dim]To link from the playground, add to PlaygroundLayout:[/dim]\n"
+            f'[dim]  researchUrl="/playgrounds/{ctx.name}/research"[/dim]',
+            title="[bold #84cc16]Output[/bold #84cc16]",
+            border_style="#84cc16",
+        )
+    )
+
+    return research_dir
+
+
+async def run_draft(**options) -> Path:
+    """
+    Publish a fast-tier draft companion, then upgrade it at the premium tier.
+
+    Takes the arguments of `run_research` other than `tier`. If the upgrade
+    fails, the draft stays published and a later premium run upgrades it.
+    """
+    await run_research(**options, tier=TIER_FAST)
+    console.print("\n[bold #84cc16]Draft published; upgrading it at the premium tier...[/bold #84cc16]")
+    return await run_research(**options, tier=TIER_PREMIUM)
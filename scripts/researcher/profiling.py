@@ -0,0 +1,255 @@
+"""
+Profiling hooks for a research run (--profile).
+
+Each pipeline stage of `run_research` runs under its own cProfile profiler and
+tracemalloc window, and with an event-loop lag sampler: a helper thread that
+posts a heartbeat callback to the loop every SAMPLE_INTERVAL and times how
+long the loop takes to run it. A late heartbeat means something held the
+loop, such as a synchronous SDK call or a large string build inside a
+coroutine, and is counted as a stall of the stage; so is a heartbeat still
+waiting when the stage ends, which is how a stage that blocks the loop from
+start to finish shows up. Stages run outside an event loop are reported as
+not sampled.
+
+The report lists, per stage, wall time, the functions with the most own CPU
+time, peak traced memory and the largest allocation sites, and the loop
+stalls. It is printed at the end of the run and saved with each stage's
+.prof file (for snakeviz or pstats) under <RESEARCHER_HOME>/profiles/.
+
+cProfile only sees the thread it was enabled on, so work done in
+`asyncio.to_thread` shows up as waiting; tracemalloc sees every thread.
+Interactive prompts run inside `paused()`, so time spent waiting for the user
+counts neither as wall time nor as a stall.
+"""
+
+import asyncio
+import cProfile
+import io
+import pstats
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Iterator
+
+from rich.console import Console
+from rich.panel import Panel
+from rich.text import Text
+
+from config import RESEARCHER_HOME
+
+
+console = Console()
+
+PROFILES_DIR = RESEARCHER_HOME / "profiles"
+
+SAMPLE_INTERVAL = 0.05  # seconds between loop heartbeats
+STALL_THRESHOLD = 0.1  # lag from which a sample counts as a stall
+TOP_FUNCTIONS = 12
+TOP_ALLOCATIONS = 8
+
+# Functions in which the event loop waits for I/O: idle time, not work
+_IDLE_FUNCTIONS = ("poll' of 'select.", "control' of 'select.kqueue", "select' of 'select.", "_overlapped")
+
+# Allocations made by the profiler itself
+_OWN_ALLOCATIONS = [
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, pstats.__file__),
+    tracemalloc.Filter(False, __file__),
+]
+
+
+@dataclass
+class StageProfile:
+    """Measurements of one pipeline stage."""
+    name: str
+    wall: float = 0.0
+    stats: pstats.Stats | None = None
+    peak_bytes: int = 0
+    allocations: list[tracemalloc.StatisticDiff] = field(default_factory=list)
+    sampled: bool = False  # whether the stage ran inside the event loop
+    stalls: list[float] = field(default_factory=list)  # seconds of lag
+
+
+class _LagSampler:
+    """Times heartbeats posted to an event loop from a helper thread."""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, profile: StageProfile, pauses: Callable[[], int]):
+        self._loop = loop
+        self._profile = profile
+        self._pauses = pauses
+        self._done = threading.Event()
+        self._pending: tuple[float, int] | None = None  # (sent at, pause count) of an unanswered heartbeat
+        self._thread = threading.Thread(target=self._run, name="loop-lag-sampler", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop sampling; called on the loop, so a pending heartbeat is still blocked."""
+        self._done.set()
+        self._thread.join()
+        if self._pending is not None:
+            self._record(*self._pending)
+
+    def _run(self) -> None:
+        while not self._done.wait(SAMPLE_INTERVAL):
+            answered = threading.Event()
+            self._pending = (time.perf_counter(), self._pauses())
+            try:
+                self._loop.call_soon_threadsafe(answered.set)
+            except RuntimeError:  # loop closed
+                self._pending = None
+                return
+            while not answered.wait(SAMPLE_INTERVAL):
+                if self._done.is_set():
+                    return
+            pending, self._pending = self._pending, None
+            self._record(*pending)
+
+    def _record(self, sent: float, pauses: int) -> None:
+        lag = time.perf_counter() - sent
+        # Heartbeats spanning a pause measure the user, not the loop
+        if lag >= STALL_THRESHOLD and self._pauses() == pauses:
+            self._profile.stalls.append(lag)
+
+
+class RunProfiler:
+    """
+    Collects per-stage profiles for one run. A disabled profiler's hooks do
+    nothing, so the pipeline can call them unconditionally.
+    """
+
+    def __init__(self, label: str, enabled: bool = True):
+        self.label = label
+        self.enabled = enabled
+        self.stages: list[StageProfile] = []
+        self._active: tuple[StageProfile, cProfile.Profile] | None = None
+        self._pauses = 0  # bumped on every pause, so lag samples spanning one are dropped
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Profile the enclosed block as stage `name`."""
+        if not self.enabled:
+            yield
+            return
+
+        profile = StageProfile(name)
+        self.stages.append(profile)
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:  # not inside the event loop
+            sampler = None
+        else:
+            sampler = _LagSampler(loop, profile, lambda: self._pauses)
+            sampler.start()
+            profile.sampled = True
+
+        started_tracing = not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        before = tracemalloc.take_snapshot().filter_traces(_OWN_ALLOCATIONS)
+
+        profiler = cProfile.Profile()
+        self._active = (profile, profiler)
+        started = time.perf_counter()
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            self._active = None
+            if sampler is not None:
+                sampler.stop()
+            profile.wall += time.perf_counter() - started
+            profile.peak_bytes = tracemalloc.get_traced_memory()[1]
+            after = tracemalloc.take_snapshot().filter_traces(_OWN_ALLOCATIONS)
+            profile.allocations = [
+                d for d in after.compare_to(before, "lineno")[:TOP_ALLOCATIONS] if d.size_diff > 0
+            ]
+            if started_tracing:
+                tracemalloc.stop()
+            profile.stats = pstats.Stats(profiler)
+            for key in [k for k in profile.stats.stats if any(idle in k[2] for idle in _IDLE_FUNCTIONS)]:
+                del profile.stats.stats[key]
+
+    @contextmanager
+    def paused(self) -> Iterator[None]:
+        """Leave the enclosed block (e.g. waiting for input) out of the current stage."""
+        if self._active is None:
+            yield
+            return
+        profile, profiler = self._active
+        profiler.disable()
+        self._pauses += 1
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            profile.wall -= time.perf_counter() - started
+            self._pauses += 1
+            profiler.enable()
+
+    def report(self) -> str:
+        """The per-stage report as plain text."""
+        lines = [f"Profile of {self.label}", ""]
+        for stage in self.stages:
+            lines.append(f"== {stage.name}: {stage.wall:.2f}s wall, peak {stage.peak_bytes / 1e6:.1f} MB traced")
+
+            if not stage.sampled:
+                lines.append("   event loop: not sampled (stage ran outside the event loop)")
+            elif stage.stalls:
+                lines.append(
+                    f"   event loop: {len(stage.stalls)} stall(s), "
+                    f"longest {max(stage.stalls) * 1000:.0f} ms, total {sum(stage.stalls):.2f}s"
+                )
+            else:
+                lines.append("   event loop: no stalls")
+
+            if stage.stats is not None:
+                out = io.StringIO()
+                stage.stats.stream = out
+                stage.stats.sort_stats(pstats.SortKey.TIME).print_stats(TOP_FUNCTIONS)
+                body = out.getvalue()
+                # Skip pstats' preamble up to the column header
+                header = body.find("   ncalls")
+                lines.append("   top functions by own time:")
+                lines.extend("   " + line for line in body[header:].rstrip().splitlines())
+
+            if stage.allocations:
+                lines.append("   largest allocations still held at the end of the stage:")
+                for diff in stage.allocations:
+                    frame = diff.traceback[0]
+                    lines.append(
+                        f"     {diff.size_diff / 1024:>10.1f} KB in {diff.count_diff:>6} blocks  "
+                        f"{frame.filename}:{frame.lineno}"
+                    )
+            lines.append("")
+        return "\n".join(lines)
+
+    def save(self) -> Path:
+        """Write the report and each stage's .prof file; returns the directory."""
+        directory = PROFILES_DIR / f"{self.label}-{time.strftime('%Y%m%d-%H%M%S')}"
+        directory.mkdir(parents=True, exist_ok=True)
+        for i, stage in enumerate(self.stages, 1):
+            if stage.stats is not None:
+                stage.stats.dump_stats(directory / f"{i:02d}-{stage.name}.prof")
+        (directory / "report.txt").write_text(self.report())
+        return directory
+
+    def finish(self) -> None:
+        """Print the report and save it, if profiling is enabled."""
+        if not self.enabled or not self.stages:
+            return
+        directory = self.save()
+        console.print(
+            Panel(
+                Text(self.report()),
+                title=f"[bold #84cc16]Profile: {self.label}[/bold #84cc16]",
+                border_style="#84cc16",
+            )
+        )
+        console.print(f"[dim]Profile saved to {directory}[/dim]")
@@ -3,12 +3,15 @@ Rich-based terminal progress display for long-running deep research calls.
 """
 
 import time
+from typing import Callable
 
 from rich.console import Console
 from rich.live import Live
 from rich.table import Table
 from rich.text import Text
 
+from metrics import record_progress
+
 
 console = Console()
 
@@ -25,11 +28,29 @@ class ResearchProgress:
             progress.update("openai", "completed", "Done")
     """
 
-    def __init__(self, providers: list[str]):
+    def __init__(
+        self,
+        providers: list[str],
+        live: bool = True,
+        label: str = "",
+        on_update: Callable[[str, str, str], None] | None = None,
+    ):
+        """
+        Args:
+            providers: Provider names to show.
+            live: Render a live table. When False (e.g. several runs sharing one
+                terminal), only status transitions are printed, one line each.
+            label: Prefix for printed lines, typically the playground name.
+            on_update: Called with (provider, status, message) on every update,
+                e.g. to forward progress to the job queue's event log.
+        """
         self.providers = providers
         self.status: dict[str, str] = {p: "pending" for p in providers}
         self.messages: dict[str, str] = {p: "Waiting to start..." for p in providers}
         self.start_times: dict[str, float] = {}
+        self.live = live
+        self.label = label
+        self.on_update = on_update
         self._live: Live | None = None
 
     def _build_table(self) -> Table:
@@ -72,12 +93,13 @@ class ResearchProgress:
         return table
 
     def __enter__(self) -> "ResearchProgress":
-        self._live = Live(
-            self._build_table(),
-            console=console,
-            refresh_per_second=1,
-        )
-        self._live.__enter__()
+        if self.live:
+            self._live = Live(
+                self._build_table(),
+                console=console,
+                refresh_per_second=1,
+            )
+            self._live.__enter__()
         return self
 
     def __exit__(self, *args: object) -> None:
@@ -85,14 +107,22 @@ class ResearchProgress:
             self._live.__exit__(*args)
 
     def update(self, provider: str, status: str, message: str = "") -> None:
-        """Update a provider's status and message."""
+        """Update a provider's status and message, and count it in the metrics."""
+        changed = self.status.get(provider) != status
         self.status[provider] = status
         if message:
             self.messages[provider] = message
         if status == "submitting" and provider not in self.start_times:
             self.start_times[provider] = time.time()
+        started = self.start_times.get(provider)
+        record_progress(provider, status, changed, time.time() - started if started else None)
+        if self.on_update:
+            self.on_update(provider, status, self.messages[provider])
         if self._live:
             self._live.update(self._build_table())
+        elif not self.live and changed:
+            prefix = f"[dim]{self.label}[/dim] " if self.label else ""
+            console.print(f"  {prefix}{provider}: {status} — {self.messages[provider]}")
 
     def mark_started(self, provider: str) -> None:
         """Mark a provider as started (sets start time)."""
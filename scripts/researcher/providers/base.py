@@ -3,17 +3,39 @@ Abstract base class for deep research providers.
 """
 
 from abc import ABC, abstractmethod
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TextIO
+
+from fileio import read_compressed_text
 
 
 @dataclass
 class ResearchResult:
-    """Result from a deep research provider."""
+    """
+    Result from a deep research provider.
+
+    "timed_out" means the provider's deadline passed while the remote job was
+    still running; the job is left running so a resumed run can reattach to it.
+
+    When the provider streamed its output to disk, `content` is empty and
+    `content_path` points at the (possibly compressed) file; use
+    `read_content()` to get the text.
+    """
     provider: str
     content: str
     model: str
-    status: str  # "completed", "failed", "partial"
+    status: str  # "completed", "failed", "timed_out", "partial"
     error: str = ""
+    content_path: Path | None = None
+    usage: dict[str, int] = field(default_factory=dict)
+    duration: float = 0.0  # seconds, 0 if unknown
+
+    def read_content(self) -> str:
+        """Return the result text, reading it from disk if it was streamed."""
+        if self.content or self.content_path is None:
+            return self.content
+        return read_compressed_text(self.content_path)
 
 
 class DeepResearchProvider(ABC):
@@ -30,6 +52,9 @@ class DeepResearchProvider(ABC):
         self,
         prompt: str,
         on_status: "callable[[str], None] | None" = None,
+        sink: TextIO | None = None,
+        handle: str | None = None,
+        on_handle: "callable[[str], None] | None" = None,
     ) -> ResearchResult:
         """
         Send a research prompt and wait for results.
@@ -37,6 +62,12 @@ class DeepResearchProvider(ABC):
         Args:
             prompt: The concatenated research queries as a single prompt.
             on_status: Optional callback for status updates during polling.
+            sink: Optional text stream. If given, output is written to it as it
+                arrives and the returned result's `content` is left empty.
+            handle: Remote job id from an earlier, interrupted call. If given,
+                that job is reattached to instead of submitting `prompt` again.
+            on_handle: Called with the remote job id as soon as it is known, so
+                the caller can persist it for reattaching after a restart.
 
         Returns:
             ResearchResult with the provider's findings.
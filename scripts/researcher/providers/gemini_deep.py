@@ -2,14 +2,19 @@
 Gemini deep research provider using the deep-research-pro-preview model.
 
 Uses the google-genai SDK's async interactions API for background research.
+Messages are consumed incrementally and written to the sink as they arrive.
 """
 
 import asyncio
-from typing import Callable
+import io
+import time
+from typing import Callable, TextIO
 
 from google import genai
 
 from config import MODEL_DEEP_RESEARCH_GEMINI
+from metrics import record_poll, record_retry
+from retry import CircuitBreaker, get_breaker, is_unsent, retry_async
 from .base import DeepResearchProvider, ResearchResult
 
 
@@ -19,53 +24,143 @@ POLL_INTERVAL = 30  # seconds
 class GeminiDeepResearchProvider(DeepResearchProvider):
     """Deep research via Google's Gemini deep-research-pro-preview model."""
 
-    def __init__(self, model: str = MODEL_DEEP_RESEARCH_GEMINI, api_key: str | None = None):
+    def __init__(
+        self,
+        model: str = MODEL_DEEP_RESEARCH_GEMINI,
+        api_key: str | None = None,
+        poll_interval: float = POLL_INTERVAL,
+        deadline: float | None = None,
+    ):
+        """
+        Args:
+            model: Deep research agent.
+            api_key: Google API key. Read from env if not provided.
+            poll_interval: Seconds between status polls.
+            deadline: Seconds to wait for the interaction before giving up on it.
+        """
         self._model = model
         self._client = genai.Client(api_key=api_key) if api_key else genai.Client()
+        self._poll_interval = poll_interval
+        self._deadline = deadline
 
     @property
     def name(self) -> str:
         return "gemini"
 
+    async def _send_prompt(
+        self,
+        interaction_id: str,
+        prompt: str,
+        breaker: CircuitBreaker,
+        on_retry: Callable[[int, float, BaseException], None],
+    ) -> None:
+        """
+        Send the research prompt to an interaction exactly once.
+
+        A send that timed out or failed with a 5xx may still have landed, and
+        sending it again would start a second research turn, so each retry
+        first checks the interaction's messages for the prompt.
+        """
+        attempts = 0
+
+        async def send() -> None:
+            nonlocal attempts
+            attempts += 1
+            if attempts > 1 and await self._has_message(interaction_id, prompt):
+                return
+            await self._client.aio.interactions.send_message(
+                interaction=interaction_id,
+                message=prompt,
+            )
+
+        await retry_async(send, breaker=breaker, on_retry=on_retry)
+
+    async def _has_message(self, interaction_id: str, text: str) -> bool:
+        """Whether any message of the interaction has `text` as one of its parts."""
+        async for message in self._client.aio.interactions.list_messages(
+            interaction=interaction_id,
+        ):
+            for part in getattr(message, "content", None) or []:
+                if getattr(part, "text", None) == text:
+                    return True
+        return False
+
     async def research(
         self,
         prompt: str,
         on_status: Callable[[str], None] | None = None,
+        sink: TextIO | None = None,
+        handle: str | None = None,
+        on_handle: Callable[[str], None] | None = None,
     ) -> ResearchResult:
         """
         Submit a deep research request and poll for completion.
 
-        Uses the interactions API with background=True.
+        Uses the interactions API with background=True. With `handle`, polls an
+        existing interaction instead of creating a new one.
         """
+        out = sink if sink is not None else io.StringIO()
         try:
-            if on_status:
-                on_status("Submitting to Gemini deep research...")
-
-            # Create a background interaction
-            interaction = await self._client.aio.interactions.create(
-                agent=self._model,
-                config=genai.types.InteractionConfig(
-                    background=True,
-                ),
-            )
+            breaker = get_breaker(self.name)
 
-            interaction_id = interaction.name
+            def on_retry(attempt: int, delay: float, exc: BaseException) -> None:
+                record_retry(self.name)
+                if on_status:
+                    on_status(f"Transient error ({exc.__class__.__name__}), retry {attempt} in {delay:.0f}s")
 
-            # Send the research prompt
-            await self._client.aio.interactions.send_message(
-                interaction=interaction_id,
-                message=prompt,
-            )
+            if handle:
+                interaction_id = handle
+                if on_status:
+                    on_status(f"Reattaching to interaction {interaction_id[-12:]}...")
+            else:
+                if on_status:
+                    on_status("Submitting to Gemini deep research...")
+
+                # Create a background interaction. Not retried once the request
+                # may have reached the server, or a retry could leave an orphan.
+                interaction = await retry_async(
+                    lambda: self._client.aio.interactions.create(
+                        agent=self._model,
+                        config=genai.types.InteractionConfig(
+                            background=True,
+                        ),
+                    ),
+                    breaker=breaker,
+                    on_retry=on_retry,
+                    retryable=is_unsent,
+                )
 
-            if on_status:
-                on_status(f"Submitted. Polling interaction...")
+                interaction_id = interaction.name
+                await self._send_prompt(interaction_id, prompt, breaker, on_retry)
+
+                if on_handle:
+                    on_handle(interaction_id)
+
+                if on_status:
+                    on_status("Submitted. Polling interaction...")
 
             # Poll for completion
+            started = time.monotonic()
             while True:
-                await asyncio.sleep(POLL_INTERVAL)
+                if self._deadline and time.monotonic() - started > self._deadline:
+                    # Leave the interaction running; --resume reattaches to it
+                    return ResearchResult(
+                        provider=self.name,
+                        content="",
+                        model=self._model,
+                        status="timed_out",
+                        error=f"No result after {self._deadline / 60:.0f} min",
+                    )
 
-                interaction = await self._client.aio.interactions.get(
-                    name=interaction_id,
+                await asyncio.sleep(self._poll_interval)
+
+                # Not refused by the breaker: the interaction is already running
+                record_poll(self.name)
+                interaction = await retry_async(
+                    lambda: self._client.aio.interactions.get(
+                        name=interaction_id,
+                    ),
+                    on_retry=on_retry,
                 )
 
                 status = interaction.status if hasattr(interaction, "status") else "unknown"
@@ -89,19 +184,20 @@ class GeminiDeepResearchProvider(DeepResearchProvider):
                     if on_status:
                         on_status(f"Unknown status: {status}, continuing to poll...")
 
-            # Retrieve the final response
-            messages = []
+            # Stream the final response to the sink, one message part at a time
+            chars = 0
             async for message in self._client.aio.interactions.list_messages(
                 interaction=interaction_id,
             ):
                 if hasattr(message, "content") and message.content:
                     for part in message.content:
                         if hasattr(part, "text") and part.text:
-                            messages.append(part.text)
-
-            content = "\n\n".join(messages)
+                            if chars:
+                                out.write("\n\n")
+                            out.write(part.text)
+                            chars += len(part.text)
 
-            if not content:
+            if not chars:
                 return ResearchResult(
                     provider=self.name,
                     content="",
@@ -112,7 +208,7 @@ class GeminiDeepResearchProvider(DeepResearchProvider):
 
             return ResearchResult(
                 provider=self.name,
-                content=content,
+                content="" if sink is not None else out.getvalue(),
                 model=self._model,
                 status="completed",
             )
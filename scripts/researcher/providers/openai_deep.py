@@ -1,28 +1,52 @@
 """
 OpenAI deep research provider using o3/o4-mini deep research models.
 
-Uses the Responses API with background=True for long-running research.
+Uses the Responses API with background=True and stream=True for long-running
+research. Output text deltas are written to the sink as they arrive; if the
+stream drops, it is resumed from the last seen sequence number.
+
+The stream is consumed with the async client on the event loop, so cancelling
+the run (job cancel, lost lease, Ctrl+C) closes it straight away, and the
+deadline is a timer rather than a check made when an event arrives. The
+response itself keeps running remotely; --resume reattaches to it.
 """
 
 import asyncio
+import io
 import time
-from typing import Callable
+from typing import Callable, TextIO
 
-from openai import OpenAI
+from openai import AsyncOpenAI
 
 from config import MODEL_DEEP_RESEARCH_OPENAI
+from metrics import record_retry
+from retry import DEFAULT_POLICY, get_breaker, idempotency_key, is_retryable, retry_async
 from .base import DeepResearchProvider, ResearchResult
 
 
-POLL_INTERVAL = 30  # seconds
+TERMINAL_EVENTS = ("response.completed", "response.failed", "response.incomplete")
+
+STATUS_INTERVAL = 1.0  # minimum seconds between "Writing report" status updates
 
 
 class OpenAIDeepResearchProvider(DeepResearchProvider):
     """Deep research via OpenAI's o3-deep-research model."""
 
-    def __init__(self, model: str = MODEL_DEEP_RESEARCH_OPENAI, client: OpenAI | None = None):
+    def __init__(
+        self,
+        model: str = MODEL_DEEP_RESEARCH_OPENAI,
+        client: AsyncOpenAI | None = None,
+        deadline: float | None = None,
+    ):
+        """
+        Args:
+            model: Deep research model.
+            client: OpenAI client. Created from env if not provided.
+            deadline: Seconds to wait for the response before giving up on it.
+        """
         self._model = model
-        self._client = client or OpenAI()
+        self._client = client or AsyncOpenAI()
+        self._deadline = deadline
 
     @property
     def name(self) -> str:
@@ -32,50 +56,34 @@ class OpenAIDeepResearchProvider(DeepResearchProvider):
         self,
         prompt: str,
         on_status: Callable[[str], None] | None = None,
+        sink: TextIO | None = None,
+        handle: str | None = None,
+        on_handle: Callable[[str], None] | None = None,
     ) -> ResearchResult:
         """
-        Submit a deep research request and poll for completion.
+        Submit a deep research request and stream its output.
 
-        The deep research model runs in background mode, returning a response ID
-        that we poll until the research is complete.
+        The deep research model runs in background mode and its event stream
+        is consumed with the async client. With `handle`, the existing
+        response is streamed from the start instead.
         """
+        out = sink if sink is not None else io.StringIO()
         try:
             if on_status:
-                on_status("Submitting to OpenAI deep research...")
+                on_status("Submitting to OpenAI deep research..." if not handle
+                          else f"Reattaching to response {handle[:12]}...")
 
-            # Submit as background task
-            response = self._client.responses.create(
-                model=self._model,
-                input=prompt,
-                tools=[{"type": "web_search_preview"}],
-                background=True,
-            )
-
-            response_id = response.id
-
-            if on_status:
-                on_status(f"Submitted. Polling response {response_id[:12]}...")
+            progress = {"chars": 0, "usage": {}}
+            try:
+                async with asyncio.timeout(self._deadline):
+                    status, error = await self._stream(prompt, out, on_status, handle, on_handle, progress)
+            except TimeoutError:
+                # Leave the response running; --resume reattaches to it
+                status, error = "timed_out", f"No result after {self._deadline / 60:.0f} min"
+            chars, usage = progress["chars"], progress["usage"]
 
-            # Poll for completion
-            while response.status in ("queued", "in_progress"):
-                await asyncio.sleep(POLL_INTERVAL)
-
-                response = self._client.responses.retrieve(response_id)
-
-                if on_status:
-                    elapsed = "polling"
-                    on_status(f"Status: {response.status} ({elapsed})")
-
-            if response.status == "completed":
-                # Extract text content from the response
-                content = ""
-                for item in response.output:
-                    if item.type == "message":
-                        for block in item.content:
-                            if block.type == "output_text":
-                                content += block.text
-
-                if not content:
+            if status == "completed":
+                if not chars:
                     return ResearchResult(
                         provider=self.name,
                         content="",
@@ -86,14 +94,23 @@ class OpenAIDeepResearchProvider(DeepResearchProvider):
 
                 return ResearchResult(
                     provider=self.name,
-                    content=content,
+                    content="" if sink is not None else out.getvalue(),
                     model=self._model,
                     status="completed",
+                    usage=usage,
+                )
+            elif status == "timed_out":
+                return ResearchResult(
+                    provider=self.name,
+                    content="",
+                    model=self._model,
+                    status="timed_out",
+                    error=error,
                 )
             else:
-                error_msg = f"Response ended with status: {response.status}"
-                if hasattr(response, "error") and response.error:
-                    error_msg += f" — {response.error}"
+                error_msg = f"Response ended with status: {status}"
+                if error:
+                    error_msg += f" — {error}"
                 return ResearchResult(
                     provider=self.name,
                     content="",
@@ -110,3 +127,138 @@ class OpenAIDeepResearchProvider(DeepResearchProvider):
                 status="failed",
                 error=str(e),
             )
+
+    async def _stream(
+        self,
+        prompt: str,
+        out: TextIO,
+        on_status: Callable[[str], None] | None,
+        handle: str | None,
+        on_handle: Callable[[str], None] | None,
+        progress: dict,
+    ) -> tuple[str, str]:
+        """
+        Consume the background response stream, resuming after disconnects.
+
+        Characters written and token usage are kept in `progress`, so they
+        are known even if the stream is cut short by the deadline.
+
+        Returns:
+            Tuple of (final status, error message).
+        """
+        breaker = get_breaker(self.name)
+
+        def on_retry(attempt: int, delay: float, exc: BaseException) -> None:
+            record_retry(self.name)
+            if on_status:
+                on_status(f"Transient error ({exc.__class__.__name__}), retry {attempt} in {delay:.0f}s")
+
+        if handle:
+            # Replay the existing response from its first event
+            stream = None
+        else:
+            # The idempotency key is fixed across retries so a lost response
+            # cannot start a second research job.
+            key = idempotency_key()
+            stream = await retry_async(
+                lambda: self._client.responses.create(
+                    model=self._model,
+                    input=prompt,
+                    tools=[{"type": "web_search_preview"}],
+                    background=True,
+                    stream=True,
+                    extra_headers={"Idempotency-Key": key},
+                ),
+                breaker=breaker,
+                on_retry=on_retry,
+            )
+
+        response_id = handle or ""
+        cursor: int | None = None
+        status = "queued"
+        error = ""
+        searches = 0
+        attempt = 0
+        reported = 0.0  # when the last "Writing report" status was sent
+
+        try:
+            while True:
+                try:
+                    if stream is None:
+                        if cursor is None:
+                            stream = await self._client.responses.retrieve(response_id, stream=True)
+                        else:
+                            if on_status:
+                                on_status(f"Resuming stream after event {cursor}...")
+                            stream = await self._client.responses.retrieve(
+                                response_id,
+                                stream=True,
+                                starting_after=cursor,
+                            )
+
+                    async for event in stream:
+                        cursor = event.sequence_number
+                        attempt = 0
+
+                        if event.type == "response.created":
+                            if not response_id and on_handle:
+                                on_handle(event.response.id)
+                            response_id = event.response.id
+                            if on_status:
+                                on_status(f"Submitted. Streaming response {response_id[:12]}...")
+                        elif event.type == "response.output_text.delta":
+                            out.write(event.delta)
+                            progress["chars"] += len(event.delta)
+                            now = time.monotonic()
+                            if on_status and now - reported >= STATUS_INTERVAL:
+                                reported = now
+                                on_status(f"Writing report ({progress['chars']} chars)")
+                        elif event.type == "response.web_search_call.searching":
+                            searches += 1
+                            if on_status:
+                                on_status(f"Researching ({searches} web searches)")
+                        elif event.type in TERMINAL_EVENTS:
+                            status = event.response.status
+                            if getattr(event.response, "error", None):
+                                error = str(event.response.error)
+                            if getattr(event.response, "usage", None):
+                                progress["usage"] = {
+                                    "input_tokens": event.response.usage.input_tokens,
+                                    "output_tokens": event.response.usage.output_tokens,
+                                }
+                        elif event.type == "error":
+                            status = "failed"
+                            error = getattr(event, "message", "") or "stream error"
+
+                    if status in ("completed", "failed", "incomplete", "cancelled"):
+                        breaker.record_success()
+                        return status, error
+                    # The server closed the stream before a terminal event; resume it,
+                    # backing off if the last attempt made no progress.
+                    await stream.close()
+                    stream = None
+                    if attempt:
+                        if attempt >= DEFAULT_POLICY.max_attempts:
+                            return "failed", "Stream kept closing without progress."
+                        await asyncio.sleep(DEFAULT_POLICY.delay_for(attempt, RuntimeError()))
+                    attempt += 1
+                except Exception as e:
+                    if stream is not None:
+                        await stream.close()
+                    stream = None
+                    if not response_id or not is_retryable(e):
+                        raise
+                    attempt += 1
+                    if attempt >= DEFAULT_POLICY.max_attempts:
+                        breaker.record_failure()
+                        raise
+                    delay = DEFAULT_POLICY.delay_for(attempt, e)
+                    on_retry(attempt, delay, e)
+                    await asyncio.sleep(delay)
+
+                if not response_id:
+                    return "failed", "Stream ended before the response was created."
+        finally:
+            # Cancelled or timed out: stop reading, the response runs on remotely
+            if stream is not None:
+                await stream.close()
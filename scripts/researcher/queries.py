@@ -2,14 +2,21 @@
 Generate research queries from playground context and present them for interactive review.
 """
 
+import asyncio
+import time
+
 from openai import OpenAI
 from rich.console import Console
 from rich.panel import Panel
 from rich.prompt import Confirm, Prompt
 from rich.text import Text
 
+from background import IncompleteResponseError, background_response, run_in_thread
+from batchapi import defer
+from cache import QUERIES_TTL, cache_key, get_cache
 from config import MODEL_QUERY_GENERATION
 from context import PlaygroundContext
+from querycache import QueryMatch, dedupe_queries
 
 console = Console()
 
@@ -35,6 +42,18 @@ Output ONLY the queries, one per line, numbered. Each query should be a complete
 """
 
 
+def build_query_prompt(ctx: PlaygroundContext, focus: str | None = None) -> str:
+    """Render the query generation prompt for a playground."""
+    focus_instruction = ""
+    if focus:
+        focus_instruction = f"Pay special attention to this focus area: {focus}"
+
+    return QUERY_GENERATION_PROMPT.format(
+        context=ctx.to_prompt(),
+        focus_instruction=focus_instruction,
+    )
+
+
 def generate_queries(
     ctx: PlaygroundContext,
     focus: str | None = None,
@@ -43,6 +62,9 @@ def generate_queries(
     """
     Generate research queries from playground context using GPT-4o.
 
+    The call runs in background mode and is resumed rather than repeated after
+    a restart (see background.py); its answer is cached by prompt.
+
     Args:
         ctx: The playground context bundle.
         focus: Optional focus area to steer query generation.
@@ -54,19 +76,35 @@ def generate_queries(
     if client is None:
         client = OpenAI()
 
-    focus_instruction = ""
-    if focus:
-        focus_instruction = f"Pay special attention to this focus area: {focus}"
-
-    response = client.responses.create(
-        model=MODEL_QUERY_GENERATION,
-        input=QUERY_GENERATION_PROMPT.format(
-            context=ctx.to_prompt(),
-            focus_instruction=focus_instruction,
-        ),
-    )
-
-    raw = response.output_text or ""
+    prompt = build_query_prompt(ctx, focus)
+
+    cache = get_cache()
+    key = cache_key(MODEL_QUERY_GENERATION, prompt)
+    raw = cache.get("queries", key)
+    if raw is not None:
+        console.print("  [dim]Using cached queries for this context (--no-cache to generate new ones)[/dim]")
+    else:
+        defer("queries", key, MODEL_QUERY_GENERATION, prompt, ttl=QUERIES_TTL)
+        started = time.perf_counter()
+        try:
+            raw = background_response(
+                client,
+                MODEL_QUERY_GENERATION,
+                prompt,
+                label="queries",
+                on_status=_report_status,
+                on_retry=_report_retry,
+            )
+        except IncompleteResponseError as e:
+            # The queries written before the cut-off are usable, but not worth
+            # caching; the last line may itself be cut off
+            if not e.text.strip():
+                raise
+            _report_status(f"{e}; using the queries it wrote")
+            raw = e.text.strip().rsplit("\n", 1)[0]
+        else:
+            if raw.strip():
+                cache.put("queries", key, raw, ttl=QUERIES_TTL, cost_seconds=time.perf_counter() - started)
 
     queries = []
     for line in raw.strip().splitlines():
@@ -82,6 +120,51 @@ def generate_queries(
     return queries
 
 
+async def generate_focus_queries(ctx: PlaygroundContext, focuses: list[str] | None) -> list[str]:
+    """
+    Generate queries for several focus areas at once.
+
+    Each focus gets its own generation call, all running concurrently against
+    the same context. Queries that closely match one kept from an earlier
+    focus are dropped, so overlapping angles are researched once.
+    """
+    if not focuses:
+        return await run_in_thread(generate_queries, ctx)
+
+    # Let every call finish before raising, so none outlives the run
+    per_focus = await asyncio.gather(*[
+        run_in_thread(generate_queries, ctx, focus) for focus in focuses
+    ], return_exceptions=True)
+    for result in per_focus:
+        if isinstance(result, BaseException):
+            raise result
+    queries = [q for focus_queries in per_focus for q in focus_queries]
+    unique = dedupe_queries(queries)
+    if len(focuses) > 1:
+        console.print(
+            f"  [dim]{len(queries)} queries for {len(focuses)} focus areas, "
+            f"{len(queries) - len(unique)} duplicate(s) removed[/dim]"
+        )
+    return unique
+
+
+def focus_list(focus: str | list[str] | None) -> list[str]:
+    """Focus areas as a list; a single string (as stored by older jobs) is one focus."""
+    if not focus:
+        return []
+    if isinstance(focus, str):
+        return [focus]
+    return [f for f in focus if f]
+
+
+def _report_status(message: str) -> None:
+    console.print(f"  [dim]{message}[/dim]")
+
+
+def _report_retry(attempt: int, delay: float, exc: BaseException) -> None:
+    console.print(f"  [dim]Transient error ({exc.__class__.__name__}), retry {attempt} in {delay:.0f}s[/dim]")
+
+
 def review_queries(queries: list[str]) -> list[str]:
     """
     Present queries for interactive review using Rich panels.
@@ -154,3 +237,48 @@ def review_queries(queries: list[str]) -> list[str]:
     )
 
     return final_queries
+
+
+def review_matches(matches: dict[str, QueryMatch], interactive: bool = True, reuse: bool = False) -> list[QueryMatch]:
+    """
+    Flag queries that closely match research already archived for another
+    playground, and decide which to reuse instead of researching again.
+
+    Args:
+        matches: Close matches by query, from `QueryIndex.match()`.
+        interactive: Ask about each match (defaulting to reuse).
+        reuse: Without `interactive`, whether to reuse every match.
+
+    Returns:
+        The matches to reuse.
+    """
+    if not matches:
+        return []
+
+    console.print()
+    console.print(
+        Panel(
+            "\n\n".join(
+                f"[white]{m.query}[/white]\n"
+                f"  [dim]≈ {m.match.query}[/dim]\n"
+                f"  [dim]{m.match.playground}, run {m.match.run_id} · similarity {m.score:.2f}[/dim]"
+                for m in matches.values()
+            ),
+            title=f"[bold #84cc16]Already Researched ({len(matches)})[/bold #84cc16]",
+            border_style="#84cc16",
+        )
+    )
+
+    if not interactive:
+        if reuse:
+            console.print("[dim]Reusing archived research for these queries.[/dim]")
+        return list(matches.values()) if reuse else []
+
+    accepted = []
+    for match in matches.values():
+        if Confirm.ask(
+            f"[#84cc16]Reuse {match.match.playground}'s research for \"{match.query[:60]}\"?[/#84cc16]",
+            default=True,
+        ):
+            accepted.append(match)
+    return accepted
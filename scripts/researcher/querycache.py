@@ -0,0 +1,186 @@
+"""
+Cross-playground similarity index over archived research queries.
+
+Many playgrounds share topics, so query generation often proposes background
+questions close to ones already researched for another playground. The index
+holds the queries of every archived run as TF-IDF vectors (word unigrams and
+bigrams) and finds the closest earlier query by cosine similarity, locally and
+without an embedding service. It is rebuilt from the run index on use, so it
+never goes out of date.
+
+A close match can be reused: the query is left out of the research prompt and
+the matching run's provider reports are passed to synthesis instead.
+"""
+
+import math
+import re
+import time
+from collections import Counter
+from dataclasses import dataclass
+
+from archive import ResearchArchive, RunRecord
+from providers.base import ResearchResult
+
+
+# Cosine similarity from which a query counts as already researched
+SIMILARITY_THRESHOLD = 0.8
+
+# Within one run's queries: a query that adds a word or two to another is a
+# duplicate, since both would be researched in the same prompt anyway
+DUPLICATE_THRESHOLD = 0.75
+
+# Research older than this is not offered for reuse
+MAX_AGE_DAYS = 180
+
+_WORD = re.compile(r"[a-z0-9]+(?:-[a-z0-9]+)*")
+
+_STOPWORDS = frozenset("""
+    a about above across after against all also among an and any are as at be been being between both
+    but by can could do does doing during each either for from has have how if in into is it its
+    like may might more most must not of on or other over should so such than that the their them
+    then there these they this those through to under up upon was were what when where whether which
+    while who whom why will with within would
+""".split())
+
+
+def _stem(word: str) -> str:
+    """Strip the commonest English plural and verb endings."""
+    for suffix in ("ies", "ing", "es", "ed", "s"):
+        if word.endswith(suffix) and len(word) - len(suffix) >= 4:
+            return word[: -len(suffix)] + ("y" if suffix == "ies" else "")
+    return word
+
+
+def terms(text: str) -> list[str]:
+    """The unigrams and bigrams a query is indexed by."""
+    words = [_stem(w) for w in _WORD.findall(text.lower()) if w not in _STOPWORDS]
+    return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+
+def _cosine(a: dict[str, float], b: dict[str, float]) -> float:
+    """Cosine similarity of two unit-length sparse vectors."""
+    if len(b) < len(a):
+        a, b = b, a
+    return sum(weight * b.get(term, 0.0) for term, weight in a.items())
+
+
+@dataclass
+class IndexedQuery:
+    """An archived query and the run that researched it."""
+    query: str
+    playground: str
+    run_id: str
+    created_at: float
+
+
+@dataclass
+class QueryMatch:
+    """A new query and the closest archived one."""
+    query: str
+    match: IndexedQuery
+    score: float
+
+
+class QueryIndex:
+    """TF-IDF vectors of archived queries."""
+
+    def __init__(self, entries: list[IndexedQuery]):
+        self.entries = entries
+        counts = [Counter(terms(e.query)) for e in entries]
+        document_frequency = Counter(term for c in counts for term in c)
+        self._idf = {
+            term: math.log((1 + len(entries)) / (1 + df)) + 1
+            for term, df in document_frequency.items()
+        }
+        self._unseen_idf = math.log(1 + len(entries)) + 1
+        self._vectors = [self._vector(c) for c in counts]
+
+    @classmethod
+    def from_archive(
+        cls,
+        archive: ResearchArchive | None = None,
+        exclude_playground: str | None = None,
+        max_age_days: float = MAX_AGE_DAYS,
+    ) -> "QueryIndex":
+        """
+        Index the queries of archived runs whose provider reports are still stored.
+
+        Args:
+            archive: The run archive (default: the shared one).
+            exclude_playground: Leave out this playground's own runs; refreshing
+                a playground should not reuse its previous research.
+            max_age_days: Leave out runs older than this.
+        """
+        archive = archive or ResearchArchive()
+        cutoff = time.time() - max_age_days * 86400
+        entries = []
+        for record in archive.runs():
+            if record.playground == exclude_playground or record.created_at < cutoff:
+                continue
+            if not record.providers or not all(archive.blob_path(i["blob"]) for i in record.providers.values()):
+                continue
+            for query in record.queries:
+                entries.append(IndexedQuery(query, record.playground, record.run_id, record.created_at))
+        return cls(entries)
+
+    def _vector(self, counts: Counter) -> dict[str, float]:
+        vector = {term: n * self._idf.get(term, self._unseen_idf) for term, n in counts.items()}
+        norm = math.sqrt(sum(v * v for v in vector.values())) or 1.0
+        return {term: v / norm for term, v in vector.items()}
+
+    def similar(self, query: str, limit: int = 3) -> list[QueryMatch]:
+        """The archived queries most similar to `query`, best first."""
+        vector = self._vector(Counter(terms(query)))
+        scored = []
+        for entry, other in zip(self.entries, self._vectors):
+            score = _cosine(vector, other)
+            if score > 0:
+                scored.append(QueryMatch(query, entry, round(score, 3)))
+        # Prefer the most recent run among equally close matches
+        scored.sort(key=lambda m: (m.score, m.match.created_at), reverse=True)
+        return scored[:limit]
+
+    def match(self, queries: list[str], threshold: float = SIMILARITY_THRESHOLD) -> dict[str, QueryMatch]:
+        """The close matches among `queries`, keyed by query."""
+        matches = {}
+        for query in queries:
+            best = self.similar(query, limit=1)
+            if best and best[0].score >= threshold:
+                matches[query] = best[0]
+        return matches
+
+
+def dedupe_queries(queries: list[str], threshold: float = DUPLICATE_THRESHOLD) -> list[str]:
+    """Drop queries that closely match an earlier query in the list."""
+    # Weight terms by how distinctive they are among these queries
+    vectors = QueryIndex([IndexedQuery(q, "", "", 0.0) for q in queries])._vectors
+    kept: list[int] = []
+    for i, vector in enumerate(vectors):
+        if all(_cosine(vector, vectors[j]) < threshold for j in kept):
+            kept.append(i)
+    return [queries[i] for i in kept]
+
+
+def reused_results(run_ids: list[str], archive: ResearchArchive | None = None) -> list[ResearchResult]:
+    """
+    Provider reports of the given archived runs, for synthesis alongside new
+    research. Each is labelled with the playground it was researched for, and
+    carries no duration or usage so it does not count towards latency or
+    token history again.
+    """
+    archive = archive or ResearchArchive()
+    records: dict[str, RunRecord] = {r.run_id: r for r in archive.runs()}
+    results = []
+    for run_id in run_ids:
+        record = records.get(run_id)
+        if record is None:
+            continue
+        for result in archive.provider_results(record):
+            if result.content_path is None:
+                continue
+            if "@" not in result.provider:  # already reused by that run
+                result.provider = f"{result.provider}@{record.playground}"
+            result.duration = 0.0
+            result.usage = {}
+            results.append(result)
+    return results
@@ -9,29 +9,88 @@ Examples:
     uv run scripts/researcher/researcher.py hsp90-canalization
     uv run scripts/researcher/researcher.py hsp90-canalization --providers openai
     uv run scripts/researcher/researcher.py hsp90-canalization --providers gemini,openai --focus "historical context"
+    uv run scripts/researcher/researcher.py hsp90-canalization --focus "historical context" --focus "experimental evidence"
     uv run scripts/researcher/researcher.py hsp90-canalization --resume
+    uv run scripts/researcher/researcher.py hsp90-canalization --history
+    uv run scripts/researcher/researcher.py hsp90-canalization --restore 20260301-101500
+    uv run scripts/researcher/researcher.py --plan
+    uv run scripts/researcher/researcher.py --batch --limit 10
+    uv run scripts/researcher/researcher.py hsp90-canalization --tier draft
+    uv run scripts/researcher/researcher.py --batch --tier auto --force
+    uv run scripts/researcher/researcher.py hsp90-canalization --dry-run
+    uv run scripts/researcher/researcher.py --batch --dry-run --concurrency 4
+    uv run scripts/researcher/researcher.py --batch --batch-api --concurrency 4 --force
+    uv run scripts/researcher/researcher.py --watch --concurrency 2
+    uv run scripts/researcher/researcher.py hsp90-canalization --enqueue
+    uv run scripts/researcher/researcher.py --work --concurrency 2
+    uv run scripts/researcher/researcher.py --jobs
+    uv run scripts/researcher/researcher.py --build-search-index
+    uv run scripts/researcher/researcher.py --serve --port 8765
+    uv run scripts/researcher/researcher.py --cache-stats
     uv run scripts/researcher/researcher.py --list
 """
 
 import argparse
 import asyncio
 import sys
+import time
+from contextlib import nullcontext
+from dataclasses import replace
 from pathlib import Path
+from typing import Awaitable
 
 from dotenv import load_dotenv
 from rich.console import Console
 from rich.panel import Panel
+from rich.table import Table
 
-from config import MODEL_DEEP_RESEARCH_OPENAI
+from archive import ResearchArchive
+from batchapi import BatchCollector, BatchRunner, DeferredCall, collecting
+from cache import ResearchCache, disable_cache, get_cache
+from catalog import ResearchCatalog
+from config import DEFAULT_TIER, TIER_AUTO, TIER_DRAFT, TIER_FAST, TIER_MODES, TIER_PREMIUM
 from context import build_context
 from discovery import find_playground, list_playgrounds
-from output import load_partials, save_partial, write_output
-from progress import ResearchProgress
-from providers.base import ResearchResult
-from providers.gemini_deep import GeminiDeepResearchProvider
-from providers.openai_deep import OpenAIDeepResearchProvider
-from queries import generate_queries, review_queries
-from synthesis import synthesize
+from estimate import (
+    STAGE_QUERIES,
+    STAGE_RESEARCH,
+    RunEstimate,
+    choose_providers,
+    estimate_run,
+    load_profiles,
+    longest_first,
+    schedule_seconds,
+)
+from extract import ExtractedContext, extract_context, extract_contexts
+from latency import LatencyHistory
+from metrics import export_to_file
+from jobqueue import (
+    STATE_CANCELLED,
+    STATE_DONE,
+    STATE_FAILED,
+    STATE_QUEUED,
+    JobQueue,
+    WorkerPool,
+)
+from output import build_search_index, render_artifacts, write_output
+from pipeline import ResearchError, run_draft, run_meta, run_research
+from profiling import RunProfiler
+from search import SearchIndex
+from server import DEFAULT_HOST, DEFAULT_PORT, ControlServer
+from staleness import (
+    STATUS_DRAFT,
+    STATUS_FRESH,
+    STATUS_MISSING,
+    STATUS_STALE,
+    STATUS_UNTRACKED,
+    PlanEntry,
+    assess,
+    read_data_ts,
+    resolve_tier,
+    scan,
+    select_batch,
+)
+from watch import DEFAULT_DEBOUNCE, ResearchWatcher
 
 console = Console()
 
@@ -55,17 +114,223 @@ def parse_args() -> argparse.Namespace:
     )
     parser.add_argument(
         "--focus",
-        help="Optional focus area to steer research query generation",
+        action="append",
+        help="Optional focus area to steer research query generation; repeat for several "
+        "(queries are generated per focus, deduplicated and researched in one run)",
+    )
+    parser.add_argument(
+        "--focus-sections",
+        action="store_true",
+        help="With several --focus, give each focus its own section in content.md instead of one merged companion",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Patch an existing companion section by section with what changed since its run, "
+        "keeping manual edits, instead of rewriting it",
     )
     parser.add_argument(
         "--model",
         help="Override the deep research model for OpenAI provider",
     )
+    parser.add_argument(
+        "--tier",
+        choices=TIER_MODES,
+        default=DEFAULT_TIER,
+        help="Deep research tier: fast (a draft in minutes, OpenAI only), premium, "
+        "draft (publish a fast draft, then upgrade it at premium) or auto (with --plan/--batch, "
+        f"chosen per playground from its staleness and priority) (default: {DEFAULT_TIER})",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Profile each pipeline stage (CPU, memory, event-loop stalls) and print a report; "
+        "saved under .researcher/profiles/",
+    )
     parser.add_argument(
         "--resume",
         action="store_true",
         help="Resume from partial results (skip completed providers, go to synthesis)",
     )
+    parser.add_argument(
+        "--reuse-similar",
+        action="store_true",
+        help="Without interactive review (batch, watch, queue), reuse archived research "
+        "for queries that closely match another playground's instead of researching them again",
+    )
+    parser.add_argument(
+        "--history",
+        action="store_true",
+        help="List archived research runs for the playground and exit",
+    )
+    parser.add_argument(
+        "--restore",
+        metavar="RUN_ID",
+        help="Restore content.md and suggestions.md from an archived run (no API calls)",
+    )
+    parser.add_argument(
+        "--resynthesize",
+        metavar="RUN_ID",
+        help="Re-synthesize an archived run's provider reports against the current context",
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Estimate tokens, cost and wall time of the run (or --batch) without calling any API",
+    )
+    parser.add_argument(
+        "--max-time",
+        type=float,
+        metavar="MINUTES",
+        help="Use only the providers whose predicted (p90) wall time fits, for the run or the whole --batch",
+    )
+    parser.add_argument(
+        "--max-cost",
+        type=float,
+        metavar="USD",
+        help="Use only the providers whose estimated cost fits, for the run or the whole --batch",
+    )
+    parser.add_argument(
+        "--plan",
+        action="store_true",
+        help="Scan all playgrounds for missing or stale research and print a refresh plan",
+    )
+    parser.add_argument(
+        "--batch",
+        action="store_true",
+        help="Research every missing or stale playground from the refresh plan",
+    )
+    parser.add_argument(
+        "--batch-api",
+        action="store_true",
+        help="With --batch, send query generation and synthesis through the OpenAI Batch API "
+        "(cheaper; each round may take up to 24 h)",
+    )
+    parser.add_argument(
+        "--batch-base-url",
+        type=str,
+        default=None,
+        metavar="URL",
+        help="With --batch-api, send the batches to this endpoint instead, e.g. the local "
+        "stand-in batch_standin.py (other API calls are unaffected)",
+    )
+    parser.add_argument(
+        "--limit",
+        type=int,
+        help="With --batch, research at most this many playgrounds (highest priority first)",
+    )
+    parser.add_argument(
+        "--include-untracked",
+        action="store_true",
+        help="With --plan/--batch, also refresh companions that predate input fingerprints",
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="Run as a daemon that re-researches playgrounds when their sources change",
+    )
+    parser.add_argument(
+        "--debounce",
+        type=float,
+        default=DEFAULT_DEBOUNCE,
+        help=f"With --watch, seconds of quiet before a changed playground is queued (default: {DEFAULT_DEBOUNCE:.0f})",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=1,
+        help="With --batch/--watch/--work/--serve, maximum number of research jobs running at once (default: 1)",
+    )
+    parser.add_argument(
+        "--poll",
+        action="store_true",
+        help="With --watch, poll for changes instead of using inotify",
+    )
+    parser.add_argument(
+        "--enqueue",
+        action="store_true",
+        help="Queue the playground (or, with --batch, the refresh plan) for the job workers instead of running it",
+    )
+    parser.add_argument(
+        "--jobs",
+        action="store_true",
+        help="List queued, running and recent jobs and exit",
+    )
+    parser.add_argument(
+        "--cancel",
+        type=int,
+        metavar="JOB_ID",
+        help="Cancel a queued or running job and exit",
+    )
+    parser.add_argument(
+        "--work",
+        action="store_true",
+        help="Run job workers that drain the queue until interrupted",
+    )
+    parser.add_argument(
+        "--serve",
+        action="store_true",
+        help="Run the HTTP control API, with --concurrency job workers (0 for none)",
+    )
+    parser.add_argument(
+        "--host",
+        default=DEFAULT_HOST,
+        help=f"With --serve, address to bind (default: {DEFAULT_HOST})",
+    )
+    parser.add_argument(
+        "--metrics-file",
+        type=Path,
+        default=None,
+        metavar="PATH",
+        help="With --work, --serve, --watch or --batch, keep Prometheus metrics in this file "
+        "(e.g. for node_exporter's textfile collector)",
+    )
+    parser.add_argument(
+        "--port",
+        type=int,
+        default=DEFAULT_PORT,
+        help=f"With --serve, port to listen on (default: {DEFAULT_PORT})",
+    )
+    parser.add_argument(
+        "--render-artifacts",
+        action="store_true",
+        help="Pre-render content.json for every existing research companion "
+        "(and move old pages over to it), rebuild the research catalog and search index, "
+        "without API calls, and exit",
+    )
+    parser.add_argument(
+        "--build-search-index",
+        action="store_true",
+        help="Rebuild the full-text search index in public/research-search/ from the "
+        "committed content.json files (run before next build) and exit",
+    )
+    parser.add_argument(
+        "--search",
+        type=str,
+        default=None,
+        metavar="QUERY",
+        help="Search the research companions through the full-text index and exit",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Neither read nor write the researcher cache (contexts, queries, provider reports, synthesis)",
+    )
+    parser.add_argument(
+        "--cache-stats",
+        action="store_true",
+        help="Show the cache's size, hit rates and saved API time per namespace and exit",
+    )
+    parser.add_argument(
+        "--cache-prune",
+        type=float,
+        nargs="?",
+        const=-1.0,
+        default=None,
+        metavar="MB",
+        help="Remove expired cache entries and evict least recently used ones down to MB "
+        "(default: the size cap) and exit",
+    )
     parser.add_argument(
         "--list",
         action="store_true",
@@ -105,163 +370,478 @@ def detect_project_root() -> Path:
     sys.exit(1)
 
 
-async def run_research(
-    playground_dir: Path,
+def plan_providers(args: argparse.Namespace, extracted: list[ExtractedContext]) -> list[str]:
+    """
+    The providers to run: those requested, narrowed to fit --max-time and
+    --max-cost when given.
+    """
+    requested = [p.strip() for p in args.providers.split(",")]
+    if args.max_time is None and args.max_cost is None:
+        return requested
+
+    choice = choose_providers(
+        extracted,
+        requested,
+        max_seconds=args.max_time * 60 if args.max_time is not None else None,
+        max_cost=args.max_cost,
+        concurrency=args.concurrency if args.batch else 1,
+        focus=args.focus,
+        model_override=args.model,
+        resume=args.resume or args.enqueue,
+        # A draft's upgrade runs the same providers at premium
+        tier=TIER_FAST if args.tier == TIER_FAST else TIER_PREMIUM,
+    )
+    summary = (
+        f"{', '.join(choice.providers)} — {format_duration(choice.seconds)} (p90), "
+        f"${choice.cost:,.2f}, {choice.success_rate:.0%} chance of a result per run"
+    )
+    if choice.feasible:
+        console.print(f"[#84cc16]Providers within target: {summary}[/#84cc16]")
+    else:
+        console.print(f"[bold yellow]No provider set meets the target; closest: {summary}[/bold yellow]")
+    return choice.providers
+
+
+def upgrade_estimate(extracted: ExtractedContext, **options) -> RunEstimate:
+    """The premium run upgrading a draft; it reuses the draft's queries, so generates none."""
+    estimate = estimate_run(extracted, tier=TIER_PREMIUM, **options)
+    estimate.playground += " (upgrade)"
+    estimate.calls = [c for c in estimate.calls if c.stage != STAGE_QUERIES]
+    return estimate
+
+
+def format_duration(seconds: float) -> str:
+    minutes, secs = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    if hours:
+        return f"{hours}h {minutes:02d}m"
+    return f"{minutes}m {secs:02d}s" if minutes else f"{secs}s"
+
+
+def show_estimate(estimate: RunEstimate) -> None:
+    """Print the calls one run would make, with totals."""
+    table = Table(
+        title=f"[bold #84cc16]Dry Run: {estimate.playground}[/bold #84cc16]",
+        border_style="#84cc16",
+        header_style="bold #84cc16",
+    )
+    table.add_column("Stage")
+    table.add_column("Model", style="white")
+    table.add_column("Input tokens", justify="right")
+    table.add_column("Output tokens", justify="right")
+    table.add_column("Cost", justify="right")
+    table.add_column("Time", justify="right")
+
+    for call in estimate.calls:
+        source = "" if call.stage != STAGE_RESEARCH or call.from_history else " [dim](default)[/dim]"
+        table.add_row(
+            f"{call.stage}{f' · {call.provider}' if call.provider else ''}",
+            call.model + source,
+            f"{call.input_tokens:,}",
+            f"{call.output_tokens:,}",
+            f"${call.cost:,.2f}",
+            format_duration(call.seconds),
+        )
+    table.add_row(
+        "[bold]total[/bold]", "",
+        f"[bold]{estimate.input_tokens:,}[/bold]",
+        f"[bold]{estimate.output_tokens:,}[/bold]",
+        f"[bold]${estimate.cost:,.2f}[/bold]",
+        f"[bold]{format_duration(estimate.seconds)}[/bold]",
+    )
+
+    console.print(table)
+    if estimate.skipped:
+        console.print(f"[dim]Reusing finished partials for: {', '.join(estimate.skipped)}[/dim]")
+    if estimate.unpriced:
+        console.print(f"[yellow]No price listed for: {', '.join(sorted(estimate.unpriced))} (counted as $0)[/yellow]")
+
+
+def show_batch_estimate(estimates: list[RunEstimate], concurrency: int) -> None:
+    """Print per-playground estimates of a batch, with totals and wall time."""
+    table = Table(
+        title=f"[bold #84cc16]Dry Run: {len(estimates)} playground(s)[/bold #84cc16]",
+        border_style="#84cc16",
+        header_style="bold #84cc16",
+    )
+    table.add_column("#", justify="right", width=4)
+    table.add_column("Playground", style="white")
+    table.add_column("Input tokens", justify="right")
+    table.add_column("Output tokens", justify="right")
+    table.add_column("Cost", justify="right")
+    table.add_column("Time", justify="right")
+
+    for i, estimate in enumerate(estimates, 1):
+        table.add_row(
+            str(i),
+            estimate.playground,
+            f"{estimate.input_tokens:,}",
+            f"{estimate.output_tokens:,}",
+            f"${estimate.cost:,.2f}",
+            format_duration(estimate.seconds),
+        )
+
+    console.print(table)
+    unpriced = set().union(*(e.unpriced for e in estimates)) if estimates else set()
+    console.print(
+        Panel(
+            f"Input tokens:  {sum(e.input_tokens for e in estimates):,}\n"
+            f"Output tokens: {sum(e.output_tokens for e in estimates):,}\n"
+            f"Cost:          ${sum(e.cost for e in estimates):,.2f}\n"
+            f"Wall time:     {format_duration(schedule_seconds(estimates, concurrency))} "
+            f"at concurrency {concurrency} "
+            f"({format_duration(sum(e.seconds for e in estimates))} one at a time)"
+            + (f"\n[yellow]No price listed for: {', '.join(sorted(unpriced))}[/yellow]" if unpriced else ""),
+            title="[bold #84cc16]Estimate[/bold #84cc16]",
+            border_style="#84cc16",
+        )
+    )
+
+
+def show_plan(plan: list[PlanEntry], tiers: dict[str, str] | None = None) -> None:
+    """Print a refresh plan as a table, with the tier each playground would run at if given."""
+    table = Table(
+        title="[bold #84cc16]Research Refresh Plan[/bold #84cc16]",
+        border_style="#84cc16",
+        header_style="bold #84cc16",
+    )
+    table.add_column("#", justify="right", width=4)
+    table.add_column("Playground", style="white")
+    table.add_column("Status", width=10)
+    table.add_column("Priority", justify="right", width=8)
+    if tiers is not None:
+        table.add_column("Tier", width=8)
+    table.add_column("Changed inputs", style="dim")
+
+    styles = {
+        STATUS_MISSING: "bold red",
+        STATUS_STALE: "bold yellow",
+        STATUS_DRAFT: "magenta",
+        STATUS_UNTRACKED: "cyan",
+    }
+    for i, entry in enumerate(plan, 1):
+        changed = ", ".join(entry.changed[:4]) + (f" +{len(entry.changed) - 4}" if len(entry.changed) > 4 else "")
+        table.add_row(
+            str(i),
+            entry.name,
+            f"[{styles.get(entry.status, 'dim')}]{entry.status}[/]",
+            f"{entry.priority:.0f}",
+            *([tiers.get(entry.name, "")] if tiers is not None else []),
+            changed,
+        )
+
+    console.print(table)
+
+
+async def run_batch(
+    plan: list[PlanEntry],
     project_root: Path,
     provider_names: list[str],
-    focus: str | None,
+    focus: list[str] | None,
     model_override: str | None,
-    resume: bool,
+    concurrency: int = 1,
+    reuse_similar: bool = False,
+    focus_sections: bool = False,
+    incremental: bool = False,
+    profile: bool = False,
+    batch_api: bool = False,
+    batch_base_url: str | None = None,
+    tiers: dict[str, str] | None = None,
 ) -> None:
-    """Run the full research pipeline."""
-    # Build context
-    console.print("\n[bold #84cc16]Building playground context...[/bold #84cc16]")
-    ctx = build_context(playground_dir, project_root)
+    """
+    Research each playground in the plan, in order, without interactive review.
+
+    Up to `concurrency` playgrounds run at once; above one, progress is logged
+    line by line instead of drawn as a live table.
+
+    `tiers` maps playgrounds to their tier mode (default: DEFAULT_TIER).
+    Playgrounds at the "draft" tier run at the fast tier first; once every
+    draft of the plan is published, a second pass upgrades them at premium.
+
+    With `batch_api`, query generation and synthesis go through the Batch API
+    (see batchapi.py): the playgrounds run in rounds, each stopping at its
+    next uncached model call, and each round's calls are sent as one batch,
+    to `batch_base_url` if given.
+    """
+    tiers = tiers or {}
+    slots = asyncio.Semaphore(max(concurrency, 1))
+    collector = BatchCollector()
+    runner = BatchRunner(
+        on_status=lambda message: console.print(f"[#84cc16]{message}[/#84cc16]"),
+        base_url=batch_base_url,
+    ) if batch_api else None
+
+    async def run_pass(runs: list[tuple[PlanEntry, str]]) -> list[str]:
+        """Research each (entry, tier) pair; returns the playgrounds that failed."""
+        failed: list[str] = []
+        resume: dict[str, bool] = {}  # runs deferred at synthesis resume from their partials
+
+        async def run_one(i: int, entry: PlanEntry, tier: str) -> str | None:
+            """Research one playground; returns the namespace of a deferred call, if any."""
+            async with slots:
+                console.rule(f"[bold #84cc16]{i}/{len(runs)} · {entry.name} ({entry.status}, {tier})[/bold #84cc16]")
+                profiler = RunProfiler(entry.name, enabled=profile)
+                try:
+                    await run_research(
+                        playground_dir=entry.path,
+                        project_root=project_root,
+                        provider_names=provider_names,
+                        focus=focus,
+                        model_override=model_override,
+                        resume=resume.get(entry.name, False),
+                        interactive=False,
+                        live_progress=concurrency <= 1,
+                        reuse_similar=reuse_similar,
+                        focus_sections=focus_sections,
+                        incremental=incremental,
+                        tier=tier,
+                        profiler=profiler,
+                    )
+                except DeferredCall as e:
+                    console.print(f"[dim]{entry.name}: {e}[/dim]")
+                    return e.namespace
+                except ResearchError as e:
+                    console.print(f"[bold red]{e}[/bold red]")
+                    failed.append(entry.name)
+                except Exception as e:
+                    # One playground's crash must not stop the rest of the batch
+                    console.print(f"[bold red]{entry.name} crashed: {e!r}[/bold red]")
+                    failed.append(entry.name)
+                finally:
+                    profiler.finish()
+            return None
+
+        pending = [(i, entry, tier) for i, (entry, tier) in enumerate(runs, 1)]
+        while pending:
+            with collecting(collector) if batch_api else nullcontext():
+                deferred = await asyncio.gather(
+                    *[run_one(i, entry, tier) for i, entry, tier in pending],
+                    return_exceptions=True,
+                )
+            for (_, entry, _), outcome in zip(pending, deferred):
+                if isinstance(outcome, BaseException):
+                    console.print(f"[bold red]{entry.name} crashed: {outcome!r}[/bold red]")
+                    failed.append(entry.name)
+            stopped = [(run, namespace) for run, namespace in zip(pending, deferred) if isinstance(namespace, str)]
+            if not stopped:
+                break
+            pending = [run for run, _ in stopped]
+            for (_, entry, _), namespace in stopped:
+                resume[entry.name] = namespace == "synthesis"
+            requests = list(collector.requests.values())
+            collector.requests.clear()
+            namespaces = sorted({r.namespace for r in requests})
+            console.rule(f"[bold #84cc16]Batch: {len(requests)} {'/'.join(namespaces)} request(s) for {len(pending)} playground(s)[/bold #84cc16]")
+            # Requests the batch did not answer are made directly next round
+            collector.failed |= await asyncio.to_thread(runner.run, requests, "/".join(namespaces))
+        return failed
+
+    failed = await run_pass([
+        (entry, TIER_FAST if tiers.get(entry.name) == TIER_DRAFT else tiers.get(entry.name, DEFAULT_TIER))
+        for entry in plan
+    ])
+    upgrades = [
+        (replace(entry, status=STATUS_DRAFT), TIER_PREMIUM) for entry in plan
+        if tiers.get(entry.name) == TIER_DRAFT and entry.name not in failed
+    ]
+    failed_upgrades = []
+    if upgrades:
+        console.rule(f"[bold #84cc16]Upgrading {len(upgrades)} draft(s) at the premium tier[/bold #84cc16]")
+        failed_upgrades = await run_pass(upgrades)
 
     console.print(
         Panel(
-            f"[bold]{ctx.title}[/bold]\n"
-            f"{ctx.description}\n\n"
-            f"Topics: {', '.join(ctx.topics)}\n"
-            f"Operations: {', '.join(ctx.operations)}\n"
-            f"Date: {ctx.date}\n"
-            f"Logic files: {len(ctx.logic_files)}\n"
-            f"Has ideation: {'yes' if ctx.ideation_info else 'no'}",
-            title="[bold #84cc16]Playground Context[/bold #84cc16]",
+            f"Researched: {len(plan) - len(failed)}/{len(plan)}"
+            + (f"\nUpgraded drafts: {len(upgrades) - len(failed_upgrades)}/{len(upgrades)}" if upgrades else "")
+            + (f"\nFailed: {', '.join(failed)}" if failed else "")
+            + (f"\nFailed upgrades (drafts kept): {', '.join(failed_upgrades)}" if failed_upgrades else ""),
+            title="[bold #84cc16]Batch Complete[/bold #84cc16]",
             border_style="#84cc16",
         )
     )
 
-    # Check for existing partials if resuming
-    existing_partials = {}
-    if resume:
-        existing_partials = load_partials(playground_dir)
-        if existing_partials:
-            console.print(
-                f"\n[bold #84cc16]Found partial results for: "
-                f"{', '.join(existing_partials.keys())}[/bold #84cc16]"
-            )
 
-    # Determine which providers still need to run
-    providers_to_run = [
-        p for p in provider_names
-        if not (resume and p in existing_partials)
-    ]
+def job_options(args: argparse.Namespace, provider_names: list[str], tier: str) -> dict:
+    """Pipeline options stored with a queued job."""
+    return {
+        "providers": provider_names,
+        "focus": args.focus,
+        "model": args.model,
+        "from_run": args.resynthesize,
+        "reuse_similar": args.reuse_similar,
+        "focus_sections": args.focus_sections,
+        "incremental": args.incremental,
+        "tier": tier,
+    }
 
-    results: list[ResearchResult] = []
-
-    # Convert existing partials to ResearchResults
-    for provider_name, content in existing_partials.items():
-        if provider_name in provider_names:
-            results.append(ResearchResult(
-                provider=provider_name,
-                content=content,
-                model="resumed",
-                status="completed",
-            ))
-            console.print(f"  [dim]Using cached result for {provider_name}[/dim]")
-
-    if providers_to_run:
-        # Generate and review queries
-        console.print("\n[bold #84cc16]Generating research queries...[/bold #84cc16]")
-        queries = generate_queries(ctx, focus=focus)
-        queries = review_queries(queries)
-
-        # Concatenate queries into a single prompt
-        research_prompt = (
-            f"# Deep Research Request: {ctx.title}\n\n"
-            f"## Context\n\n"
-            f"This research is for an interactive scientific playground about: {ctx.description}\n"
-            f"Topics: {', '.join(ctx.topics)}\n"
-            f"Operations: {', '.join(ctx.operations)}\n\n"
-            f"## Research Questions\n\n"
-            + "\n".join(f"{i}. {q}" for i, q in enumerate(queries, 1))
-            + "\n\n## Instructions\n\n"
-            "Please provide comprehensive, well-sourced answers to the above research questions. "
-            "Include specific citations, data, and references where available. "
-            "Focus on academic and scientific rigor while remaining accessible. "
-            "Cover both established knowledge and recent developments."
+
+async def with_metrics_file(main: Awaitable[None], path: Path | None) -> None:
+    """Run `main`, rewriting the metrics file at `path` alongside it if given."""
+    if path is None:
+        return await main
+    exporter = asyncio.create_task(export_to_file(path))
+    try:
+        await main
+    finally:
+        exporter.cancel()
+        try:
+            await exporter
+        except asyncio.CancelledError:
+            pass
+
+
+async def serve(project_root: Path, host: str, port: int, concurrency: int) -> None:
+    """Run the control API and, unless `concurrency` is 0, workers in one loop."""
+    tasks = [ControlServer(project_root, host, port).serve()]
+    if concurrency > 0:
+        tasks.append(WorkerPool(project_root, concurrency=concurrency).run())
+    await asyncio.gather(*tasks)
+
+
+def show_jobs(queue: JobQueue) -> None:
+    """Print recent jobs as a table."""
+    jobs = queue.list_jobs()
+    if not jobs:
+        console.print("[dim]No jobs.[/dim]")
+        return
+
+    table = Table(
+        title="[bold #84cc16]Research Jobs[/bold #84cc16]",
+        border_style="#84cc16",
+        header_style="bold #84cc16",
+    )
+    table.add_column("ID", justify="right", width=5)
+    table.add_column("Playground", style="white")
+    table.add_column("State", width=12)
+    table.add_column("Attempts", justify="right", width=8)
+    table.add_column("Updated", width=16)
+    table.add_column("Worker / error", style="dim")
+
+    styles = {
+        STATE_QUEUED: "cyan",
+        STATE_DONE: "bold green",
+        STATE_FAILED: "bold red",
+        STATE_CANCELLED: "dim",
+    }
+    for job in jobs:
+        table.add_row(
+            str(job.id),
+            job.playground,
+            f"[{styles.get(job.state, 'bold yellow')}]{job.state}[/]",
+            f"{job.attempts}/{job.max_attempts}",
+            time.strftime("%Y-%m-%d %H:%M", time.localtime(job.updated_at)),
+            job.error[:60] if job.error else (job.lease_owner or ""),
         )
 
-        # Initialize providers
-        provider_instances = []
-        for name in providers_to_run:
-            if name == "openai":
-                model = model_override or MODEL_DEEP_RESEARCH_OPENAI
-                provider_instances.append(OpenAIDeepResearchProvider(model=model))
-            elif name == "gemini":
-                provider_instances.append(GeminiDeepResearchProvider())
-            else:
-                console.print(f"[bold red]Unknown provider: {name}[/bold red]")
-                continue
-
-        # Run providers with progress tracking
-        console.print()
-        with ResearchProgress(providers_to_run) as progress:
-
-            async def run_provider(provider: OpenAIDeepResearchProvider | GeminiDeepResearchProvider) -> ResearchResult:
-                def on_status(msg: str) -> None:
-                    progress.update(provider.name, "polling", msg)
-
-                progress.mark_started(provider.name)
-                result = await provider.research(research_prompt, on_status=on_status)
-
-                if result.status == "completed":
-                    progress.update(provider.name, "completed", f"Got {len(result.content)} chars")
-                    # Save partial
-                    save_partial(playground_dir, provider.name, result.content)
-                else:
-                    progress.update(provider.name, "failed", result.error[:60])
-
-                return result
-
-            # Run all providers concurrently
-            provider_results = await asyncio.gather(
-                *[run_provider(p) for p in provider_instances],
-                return_exceptions=True,
-            )
+    console.print(table)
 
-            for r in provider_results:
-                if isinstance(r, Exception):
-                    console.print(f"[bold red]Provider error: {r}[/bold red]")
-                else:
-                    results.append(r)
-
-    # Check we have at least one successful result
-    successful = [r for r in results if r.status == "completed"]
-    if not successful:
-        console.print("\n[bold red]No successful research results. Cannot synthesize.[/bold red]")
-        for r in results:
-            if r.error:
-                console.print(f"  [red]{r.provider}: {r.error}[/red]")
-        sys.exit(1)
 
-    console.print(
-        f"\n[bold #84cc16]Synthesizing {len(successful)} research result(s)...[/bold #84cc16]"
+def show_search(index: SearchIndex, query: str) -> None:
+    results = index.search(query)
+    if not results:
+        console.print(f"[dim]No research companion matches {query!r}.[/dim]")
+        return
+    table = Table(
+        title=f"[bold #84cc16]Research matching {query!r}[/bold #84cc16]",
+        border_style="#84cc16",
+        header_style="bold #84cc16",
+    )
+    table.add_column("Playground", style="white")
+    table.add_column("Matches", justify="right", width=8)
+    table.add_column("Link", style="dim")
+    for slug, url, count in results:
+        table.add_row(slug, str(count), url)
+    console.print(table)
+
+
+def show_cache_stats(cache: ResearchCache) -> None:
+    """Print per-namespace cache size, hit rate and saved time."""
+    stats = cache.stats()
+    if not stats:
+        console.print("[dim]The cache is empty.[/dim]")
+        return
+
+    table = Table(
+        title=f"[bold #84cc16]Researcher Cache ({cache.max_bytes / 1e6:,.0f} MB cap)[/bold #84cc16]",
+        border_style="#84cc16",
+        header_style="bold #84cc16",
+    )
+    table.add_column("Namespace", style="white")
+    table.add_column("Entries", justify="right")
+    table.add_column("Size", justify="right")
+    table.add_column("Hits", justify="right")
+    table.add_column("Misses", justify="right")
+    table.add_column("Hit rate", justify="right")
+    table.add_column("Saved time", justify="right")
+
+    for ns in stats:
+        table.add_row(
+            ns.namespace,
+            f"{ns.entries:,}",
+            f"{ns.size / 1e6:,.1f} MB",
+            f"{ns.hits:,}",
+            f"{ns.misses:,}",
+            f"{ns.hit_rate:.0%}" if ns.hit_rate is not None else "—",
+            format_duration(ns.saved_seconds),
+        )
+    hits, misses = sum(ns.hits for ns in stats), sum(ns.misses for ns in stats)
+    table.add_row(
+        "[bold]total[/bold]",
+        f"[bold]{sum(ns.entries for ns in stats):,}[/bold]",
+        f"[bold]{sum(ns.size for ns in stats) / 1e6:,.1f} MB[/bold]",
+        f"[bold]{hits:,}[/bold]",
+        f"[bold]{misses:,}[/bold]",
+        f"[bold]{hits / (hits + misses):.0%}[/bold]" if hits + misses else "—",
+        f"[bold]{format_duration(sum(ns.saved_seconds for ns in stats))}[/bold]",
     )
+    console.print(table)
+
 
-    # Synthesize
-    content_md, suggestions_md = synthesize(ctx, successful)
+def show_history(playground: str) -> None:
+    """Print the archived runs of a playground."""
+    runs = ResearchArchive().runs(playground)
+    if not runs:
+        console.print(f"[dim]No archived runs for {playground}.[/dim]")
+        return
 
-    # Write output
-    research_dir = write_output(playground_dir, ctx, content_md, suggestions_md)
+    lines = []
+    for record in reversed(runs):
+        providers = ", ".join(
+            f"{name} ({info.get('model', '?')})" for name, info in record.providers.items()
+        )
+        when = time.strftime("%Y-%m-%d %H:%M", time.localtime(record.created_at))
+        focus = f" · focus: {record.focus}" if record.focus else ""
+        lines.append(f"  {record.run_id}  {when}  {providers}{focus}")
 
-    console.print()
     console.print(
         Panel(
-            f"[bold green]Research complete![/bold green]\n\n"
-            f"  content.md:     {research_dir / 'content.md'}\n"
-            f"  suggestions.md: {research_dir / 'suggestions.md'}\n"
-            f"  page.tsx:       {research_dir / 'page.tsx'}\n\n"
-            f"View at: /playgrounds/{ctx.name}/research\n\n"
-            f"[dim]To link from the playground, add to PlaygroundLayout:[/dim]\n"
-            f'[dim]  researchUrl="/playgrounds/{ctx.name}/research"[/dim]',
-            title="[bold #84cc16]Output[/bold #84cc16]",
+            "\n".join(lines),
+            title=f"[bold #84cc16]Archived Runs: {playground} ({len(runs)})[/bold #84cc16]",
             border_style="#84cc16",
         )
     )
 
 
+def restore_run(playground_dir: Path, project_root: Path, run_id: str) -> None:
+    """Write an archived run's content.md, suggestions.md and meta.json back into place."""
+    archive = ResearchArchive()
+    try:
+        record = archive.get_run(run_id, playground=playground_dir.name)
+    except KeyError as e:
+        console.print(f"[bold red]{e.args[0]}[/bold red]")
+        sys.exit(1)
+
+    ctx = build_context(playground_dir, project_root)
+    research_dir = write_output(
+        playground_dir,
+        ctx,
+        archive.get_text(record.outputs["content.md"]),
+        archive.get_text(record.outputs["suggestions.md"]),
+        meta=run_meta(record),
+    )
+    console.print(f"[bold green]Restored run {record.run_id} into {research_dir}[/bold green]")
+
+
 def main() -> None:
     # Load .env.local from project root
     project_root_env = detect_project_root()
@@ -270,20 +850,192 @@ def main() -> None:
     args = parse_args()
 
     project_root = args.project_root or detect_project_root()
+    if args.no_cache:
+        disable_cache()
 
     if args.list_playgrounds:
         playgrounds = list_playgrounds(project_root)
+        catalog = ResearchCatalog.for_project(project_root).entries()
+
+        def describe(name: str) -> str:
+            entry = catalog.get(name)
+            if entry is None:
+                return f"  {name}"
+            return f"  {name}  [dim]researched {entry.researched_at[:10] or '?'} · {entry.word_count:,} words[/dim]"
+
         console.print(
             Panel(
-                "\n".join(f"  {p['name']}" for p in playgrounds),
+                "\n".join(describe(p["name"]) for p in playgrounds),
                 title=f"[bold #84cc16]Available Playgrounds ({len(playgrounds)})[/bold #84cc16]",
                 border_style="#84cc16",
             )
         )
         return
 
+    if args.render_artifacts:
+        written, skipped = render_artifacts(project_root, [Path(p["path"]) for p in list_playgrounds(project_root)])
+        console.print(
+            f"[bold green]Rendered {written} research artifact(s) and rebuilt the catalog and search index.[/bold green]"
+        )
+        for page_path in skipped:
+            console.print(f"  [yellow]Left customized page as is: {page_path}[/yellow]")
+        return
+
+    if args.build_search_index:
+        indexed = build_search_index(project_root, [Path(p["path"]) for p in list_playgrounds(project_root)])
+        console.print(f"[bold green]Indexed {indexed} research companion(s) for search.[/bold green]")
+        return
+
+    if args.cache_stats:
+        show_cache_stats(get_cache())
+        return
+
+    if args.cache_prune is not None:
+        cache = get_cache()
+        max_bytes = None if args.cache_prune < 0 else int(args.cache_prune * 1e6)
+        removed, freed = cache.prune(max_bytes)
+        console.print(f"[bold green]Pruned {removed} cache entr{'y' if removed == 1 else 'ies'}, freed {freed / 1e6:,.1f} MB.[/bold green]")
+        return
+
+    if args.search is not None:
+        show_search(SearchIndex.for_project(project_root), args.search)
+        return
+
+    if args.jobs:
+        show_jobs(JobQueue())
+        return
+
+    if args.cancel is not None:
+        if JobQueue().cancel(args.cancel):
+            console.print(f"[bold green]Cancelled job {args.cancel}.[/bold green]")
+        else:
+            console.print(f"[bold red]Job {args.cancel} does not exist or has already finished.[/bold red]")
+            sys.exit(1)
+        return
+
+    if args.work:
+        try:
+            asyncio.run(with_metrics_file(WorkerPool(project_root, concurrency=args.concurrency).run(), args.metrics_file))
+        except KeyboardInterrupt:
+            console.print("\n[dim]Workers stopped; running jobs were returned to the queue.[/dim]")
+        return
+
+    if args.serve:
+        try:
+            asyncio.run(with_metrics_file(serve(project_root, args.host, args.port, args.concurrency), args.metrics_file))
+        except KeyboardInterrupt:
+            console.print("\n[dim]Server stopped; running jobs were returned to the queue.[/dim]")
+        return
+
+    if args.watch:
+        watcher = ResearchWatcher(
+            project_root,
+            provider_names=[p.strip() for p in args.providers.split(",")],
+            focus=args.focus,
+            model_override=args.model,
+            debounce=args.debounce,
+            concurrency=args.concurrency,
+            polling=args.poll,
+            reuse_similar=args.reuse_similar,
+            focus_sections=args.focus_sections,
+            incremental=args.incremental,
+        )
+        try:
+            asyncio.run(with_metrics_file(watcher.run(), args.metrics_file))
+        except KeyboardInterrupt:
+            console.print("\n[dim]Stopped watching.[/dim]")
+        return
+
+    if args.plan:
+        plan = select_batch(scan(project_root), args.include_untracked, limit=None, include_fresh=True)
+        show_plan(plan, {e.name: resolve_tier(args.tier, e) for e in plan if e.status != STATUS_FRESH})
+        return
+
+    if args.batch_api and args.no_cache:
+        console.print("[bold red]--batch-api delivers batch answers through the cache; drop --no-cache.[/bold red]")
+        sys.exit(1)
+
+    if args.batch_base_url and not args.batch_api:
+        console.print("[bold red]--batch-base-url only applies with --batch-api.[/bold red]")
+        sys.exit(1)
+
+    if args.resynthesize and args.tier in (TIER_DRAFT, TIER_AUTO):
+        console.print(f"[bold red]--resynthesize runs no deep research; --tier {args.tier} does not apply.[/bold red]")
+        sys.exit(1)
+
+    if args.batch:
+        plan = select_batch(scan(project_root), args.include_untracked, args.limit)
+        tiers = {entry.name: resolve_tier(args.tier, entry) for entry in plan}
+        show_plan(plan, tiers)
+        if not plan:
+            console.print("[dim]Nothing to refresh.[/dim]")
+            return
+
+        # Run the selected playgrounds longest-first, by predicted duration
+        extracted = list(extract_contexts([e.path for e in plan], project_root))
+        provider_names = plan_providers(args, extracted)
+        profiles, latency = load_profiles(), LatencyHistory()
+        options = dict(
+            provider_names=provider_names,
+            focus=args.focus,
+            model_override=args.model,
+            resume=args.enqueue,  # queue workers always resume
+            profiles=profiles,
+            latency=latency,
+        )
+        estimates = longest_first([
+            estimate_run(e, tier=TIER_FAST if tiers[e.path.name] == TIER_DRAFT else tiers[e.path.name], **options)
+            for e in extracted
+        ])
+        entries = {entry.name: entry for entry in plan}
+        plan = [entries[estimate.playground] for estimate in estimates]
+
+        if args.dry_run:
+            # Upgrades run after every draft is published
+            upgrades = [upgrade_estimate(e, **options) for e in extracted if tiers[e.path.name] == TIER_DRAFT]
+            show_batch_estimate(estimates + longest_first(upgrades), args.concurrency)
+            return
+        if args.enqueue:
+            # Workers claim by priority: predicted minutes keeps the queue longest-first
+            queue = JobQueue()
+            for entry, estimate in zip(plan, estimates):
+                queue.enqueue(
+                    entry.name,
+                    job_options(args, provider_names, tiers[entry.name]),
+                    priority=round(estimate.seconds / 60, 1),
+                )
+            console.print(f"[bold green]Queued {len(plan)} job(s).[/bold green]")
+            return
+        if not args.force:
+            answer = console.input(f"\nResearch {len(plan)} playground(s)? [y/N] ")
+            if answer.strip().lower() not in ("y", "yes"):
+                console.print("[dim]Aborted.[/dim]")
+                sys.exit(0)
+        if args.profile and args.concurrency > 1:
+            # Profilers of overlapping runs would measure each other
+            console.print("[yellow]--profile needs --concurrency 1; running without profiling.[/yellow]")
+        asyncio.run(with_metrics_file(
+            run_batch(
+                plan,
+                project_root=project_root,
+                provider_names=provider_names,
+                focus=args.focus,
+                model_override=args.model,
+                concurrency=args.concurrency,
+                reuse_similar=args.reuse_similar,
+                focus_sections=args.focus_sections,
+                incremental=args.incremental,
+                profile=args.profile and args.concurrency <= 1,
+                batch_api=args.batch_api,
+                batch_base_url=args.batch_base_url,
+                tiers=tiers,
+            ),
+            args.metrics_file,
+        ))
+        return
+
     if not args.playground:
-        console.print("[bold red]Please provide a playground name or use --list.[/bold red]")
+        console.print("[bold red]Please provide a playground name, or use --list, --plan, --batch or --jobs.[/bold red]")
         sys.exit(1)
 
     # Find the playground
@@ -293,13 +1045,41 @@ def main() -> None:
         console.print(f"[bold red]{e}[/bold red]")
         sys.exit(1)
 
+    if args.history:
+        show_history(args.playground)
+        return
+
+    tier = args.tier
+    if tier == TIER_AUTO:
+        entry = assess(playground_dir, read_data_ts(project_root))
+        tier = resolve_tier(tier, entry)
+        console.print(f"[#84cc16]Tier for {entry.name} ({entry.status}): {tier}[/#84cc16]")
+
+    provider_names = [p.strip() for p in args.providers.split(",")]
+    if args.dry_run or args.max_time is not None or args.max_cost is not None:
+        extracted = extract_context(playground_dir, project_root)
+        provider_names = plan_providers(args, [extracted])
+
+    if args.dry_run:
+        options = dict(provider_names=provider_names, focus=args.focus, model_override=args.model, resume=args.resume)
+        show_estimate(estimate_run(extracted, tier=TIER_FAST if tier == TIER_DRAFT else tier, **options))
+        if tier == TIER_DRAFT:
+            show_estimate(upgrade_estimate(extracted, **options))
+        return
+
+    if args.enqueue:
+        job = JobQueue().enqueue(args.playground, job_options(args, provider_names, tier))
+        console.print(f"[bold green]Queued job {job.id} for {args.playground}.[/bold green]")
+        return
+
     console.print(
         Panel(
             f"[bold #84cc16]Playground Researcher[/bold #84cc16]\n\n"
             f"  Playground: {args.playground}\n"
             f"  Directory:  {playground_dir}\n"
-            f"  Providers:  {args.providers}\n"
-            f"  Focus:      {args.focus or '(none)'}\n"
+            f"  Providers:  {', '.join(provider_names)}\n"
+            f"  Focus:      {'; '.join(args.focus) if args.focus else '(none)'}\n"
+            f"  Tier:       {tier}\n"
             f"  Resume:     {args.resume}",
             border_style="#84cc16",
         )
@@ -322,18 +1102,29 @@ def main() -> None:
             console.print("[dim]Aborted.[/dim]")
             sys.exit(0)
 
-    provider_names = [p.strip() for p in args.providers.split(",")]
+    if args.restore:
+        restore_run(playground_dir, project_root, args.restore)
+        return
 
-    asyncio.run(
-        run_research(
-            playground_dir=playground_dir,
-            project_root=project_root,
-            provider_names=provider_names,
-            focus=args.focus,
-            model_override=args.model,
-            resume=args.resume,
-        )
+    profiler = RunProfiler(args.playground, enabled=args.profile)
+    options = dict(
+        playground_dir=playground_dir,
+        project_root=project_root,
+        provider_names=provider_names,
+        focus=args.focus,
+        model_override=args.model,
+        resume=args.resume,
+        from_run=args.resynthesize,
+        focus_sections=args.focus_sections,
+        incremental=args.incremental,
+        profiler=profiler,
     )
+    try:
+        asyncio.run(run_draft(**options) if tier == TIER_DRAFT else run_research(**options, tier=tier))
+    except ResearchError:
+        sys.exit(1)
+    finally:
+        profiler.finish()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,302 @@
+"""
+Retry and circuit breaking for provider and model API calls.
+
+Transient failures (429, 5xx, timeouts, dropped connections) are retried with
+exponential backoff and jitter, honouring Retry-After when the server sends it.
+A per-provider circuit breaker stops sending work to a backend that keeps failing.
+
+Calls that are not idempotent (creating a job, sending it a message) must not
+be re-sent after a failure that may have reached the server, such as a 5xx or
+a read timeout; pass `retryable=is_unsent` to retry them only when the request
+was turned away before it took effect.
+
+The breaker counts calls, not attempts: a call that ran out of retries is one
+failure, so a single flaky call cannot open the circuit on its own. Polls of
+a job that is already running are not refused by the breaker, since giving
+up on them would throw away the job.
+"""
+
+import asyncio
+import random
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from email.utils import parsedate_to_datetime
+from typing import Awaitable, Callable, TypeVar
+
+T = TypeVar("T")
+
+RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504}
+
+# Exception class names raised by the OpenAI / httpx / google-genai stacks for
+# network-level failures that carry no HTTP status code.
+RETRYABLE_EXCEPTION_NAMES = {
+    "APIConnectionError",
+    "APITimeoutError",
+    "ConnectError",
+    "ConnectTimeout",
+    "ReadError",
+    "ReadTimeout",
+    "RemoteProtocolError",
+    "ServerDisconnectedError",
+}
+
+# Failures that mean the server turned the request away before acting on it
+UNSENT_STATUS = {429}
+UNSENT_EXCEPTION_NAMES = {"ConnectError", "ConnectTimeout"}
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised when a call is refused because the provider's circuit is open."""
+
+
+@dataclass
+class RetryPolicy:
+    """Exponential backoff settings."""
+    max_attempts: int = 5
+    base_delay: float = 2.0  # seconds
+    max_delay: float = 120.0  # seconds
+    jitter: float = 0.25  # +/- fraction of the computed delay
+
+    def delay_for(self, attempt: int, exc: BaseException) -> float:
+        """Seconds to wait before the given (1-based) retry attempt."""
+        retry_after = retry_after_seconds(exc)
+        if retry_after is not None:
+            return min(retry_after, self.max_delay)
+        delay = min(self.base_delay * 2 ** (attempt - 1), self.max_delay)
+        return delay * (1 + random.uniform(-self.jitter, self.jitter))
+
+
+DEFAULT_POLICY = RetryPolicy()
+
+
+@dataclass
+class CircuitBreaker:
+    """
+    Per-provider circuit breaker.
+
+    Opens after `failure_threshold` consecutive calls that failed with
+    transient errors (after their retries) and refuses calls until
+    `reset_timeout` has passed, then lets a single trial call through
+    (half-open). A success closes the circuit again; a failed trial reopens it.
+    """
+    name: str
+    failure_threshold: int = 3
+    reset_timeout: float = 300.0  # seconds
+    failures: int = 0
+    opened_at: float | None = None
+    trial: bool = False  # a half-open trial call is in flight
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half-open"
+        return "open"
+
+    def allow(self) -> bool:
+        """Whether a call could be sent to this provider right now (without taking the trial)."""
+        state = self.state
+        return state == "closed" or (state == "half-open" and not self.trial)
+
+    def acquire(self) -> bool:
+        """
+        Take permission for one call. In the half-open state only the first
+        caller gets it, until its call is recorded or released.
+        """
+        with self._lock:
+            state = self.state
+            if state == "closed":
+                return True
+            if state == "half-open" and not self.trial:
+                self.trial = True
+                return True
+            return False
+
+    def release(self) -> None:
+        """End a call taken with `acquire` that was neither a success nor a failure."""
+        with self._lock:
+            self.trial = False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self.trial = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self.trial or self.state == "half-open" or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+            self.trial = False
+
+
+_breakers: dict[str, CircuitBreaker] = {}
+
+
+def get_breaker(name: str) -> CircuitBreaker:
+    """Return the process-wide circuit breaker for a provider."""
+    if name not in _breakers:
+        _breakers[name] = CircuitBreaker(name=name)
+    return _breakers[name]
+
+
+def idempotency_key() -> str:
+    """A fresh key to send with a submission so retries are deduplicated server-side."""
+    return f"researcher-{uuid.uuid4().hex}"
+
+
+def status_code(exc: BaseException) -> int | None:
+    """Extract an HTTP status code from an SDK exception, if it carries one."""
+    for attr in ("status_code", "code"):
+        value = getattr(exc, attr, None)
+        if isinstance(value, int):
+            return value
+    return None
+
+
+def is_retryable(exc: BaseException) -> bool:
+    """Whether an exception looks like a transient failure worth retrying."""
+    if isinstance(exc, (ConnectionError, TimeoutError, asyncio.TimeoutError)):
+        return True
+    code = status_code(exc)
+    if code is not None:
+        return code in RETRYABLE_STATUS
+    return type(exc).__name__ in RETRYABLE_EXCEPTION_NAMES
+
+
+def is_unsent(exc: BaseException) -> bool:
+    """Whether a failure means the request never took effect, so sending it again cannot do its work twice."""
+    if isinstance(exc, ConnectionRefusedError):
+        return True
+    code = status_code(exc)
+    if code is not None:
+        return code in UNSENT_STATUS
+    return type(exc).__name__ in UNSENT_EXCEPTION_NAMES
+
+
+def retry_after_seconds(exc: BaseException) -> float | None:
+    """Read Retry-After (or OpenAI's retry-after-ms) from an exception's response."""
+    response = getattr(exc, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+
+    value = headers.get("retry-after-ms")
+    if value:
+        try:
+            return float(value) / 1000
+        except ValueError:
+            pass
+
+    value = headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+def _acquire(breaker: CircuitBreaker | None) -> None:
+    if breaker and not breaker.acquire():
+        raise CircuitOpenError(f"Circuit open for {breaker.name}; not sending request.")
+
+
+async def retry_async(
+    fn: Callable[[], Awaitable[T]],
+    policy: RetryPolicy = DEFAULT_POLICY,
+    breaker: CircuitBreaker | None = None,
+    on_retry: Callable[[int, float, BaseException], None] | None = None,
+    retryable: Callable[[BaseException], bool] = is_retryable,
+) -> T:
+    """
+    Await `fn()` with retries on transient failures.
+
+    Args:
+        fn: Zero-argument callable returning a fresh awaitable per attempt.
+        policy: Backoff settings.
+        breaker: Optional circuit breaker, consulted once before the call and
+            told its outcome: one failure if every attempt failed transiently.
+        on_retry: Called with (attempt, delay, exception) before each wait.
+        retryable: Which failures to retry; `is_unsent` for calls that are not idempotent.
+
+    Returns:
+        The result of the first successful attempt.
+
+    Raises:
+        CircuitOpenError: If the breaker is open.
+        Exception: The last error once retries are exhausted, or any non-transient error.
+    """
+    _acquire(breaker)
+    try:
+        attempt = 1
+        while True:
+            try:
+                result = await fn()
+            except Exception as e:
+                if not retryable(e):
+                    if breaker and is_retryable(e):
+                        breaker.record_failure()
+                    raise
+                if attempt >= policy.max_attempts:
+                    if breaker:
+                        breaker.record_failure()
+                    raise
+                delay = policy.delay_for(attempt, e)
+                if on_retry:
+                    on_retry(attempt, delay, e)
+                await asyncio.sleep(delay)
+                attempt += 1
+                continue
+            if breaker:
+                breaker.record_success()
+            return result
+    finally:
+        if breaker:
+            breaker.release()
+
+
+def retry_sync(
+    fn: Callable[[], T],
+    policy: RetryPolicy = DEFAULT_POLICY,
+    breaker: CircuitBreaker | None = None,
+    on_retry: Callable[[int, float, BaseException], None] | None = None,
+    retryable: Callable[[BaseException], bool] = is_retryable,
+) -> T:
+    """Blocking counterpart of `retry_async` for synchronous SDK calls."""
+    _acquire(breaker)
+    try:
+        attempt = 1
+        while True:
+            try:
+                result = fn()
+            except Exception as e:
+                if not retryable(e):
+                    if breaker and is_retryable(e):
+                        breaker.record_failure()
+                    raise
+                if attempt >= policy.max_attempts:
+                    if breaker:
+                        breaker.record_failure()
+                    raise
+                delay = policy.delay_for(attempt, e)
+                if on_retry:
+                    on_retry(attempt, delay, e)
+                time.sleep(delay)
+                attempt += 1
+                continue
+            if breaker:
+                breaker.record_success()
+            return result
+    finally:
+        if breaker:
+            breaker.release()
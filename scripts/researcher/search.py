@@ -0,0 +1,259 @@
+"""
+Full-text search index over all research companions.
+
+The index is a set of static JSON files in public/research-search/, so the
+site can fetch them lazily from the browser without a search service:
+
+    docs.json   {"version": 2, "shardCount": 256, "docs": {slug: {"title", "url", "sections", "shards"}}}
+    00.json     {term: {slug: [position, ...]}, ...}   terms whose shard is 0x00
+    ...
+    ff.json
+
+A term's shard is the 32-bit FNV-1a hash of its (ASCII) bytes modulo
+SHARD_COUNT, in two hex digits; it is simple to compute in the browser and
+spreads terms evenly, unlike first letters, so each shard stays small.
+
+Text comes from the pre-rendered artifact (see artifact.py), so the index
+matches what the page shows. Terms are lowercased ASCII words with accents
+stripped; stopwords and one-letter words are not indexed. Positions count
+every word of the document in order, stopwords included, so phrase queries can
+check adjacency. `sections` lists [first position, heading id, heading text]
+for each heading; a match links to the last section starting at or before its
+position, i.e. `url#id`. A query only needs docs.json and its terms' shards.
+
+The files are build output: they are gitignored and built before `next build`
+with --build-search-index from the committed content.json files.
+
+`write_output` updates one playground at a time: its postings are removed from
+the shards it appeared in (recorded in its `shards`) and added for its new
+text, so only the touched shards are rewritten. Updates happen under a lock
+and every file is written atomically.
+"""
+
+import json
+import re
+import unicodedata
+from contextlib import AbstractContextManager
+from pathlib import Path
+
+from fileio import atomic_write_text, file_lock
+
+
+SEARCH_DIRNAME = "research-search"
+SEARCH_VERSION = 2
+DOCS_FILENAME = "docs.json"
+SHARD_COUNT = 256
+
+# Shorter words, and stopwords, are counted for positions but not indexed
+MIN_TERM_LENGTH = 2
+STOPWORDS = frozenset("""
+    a about above after again against all also am an and any are as at be because been before being
+    below between both but by can could did do does doing down during each few for from further had
+    has have having he her here hers herself him himself his how if in into is it its itself just me
+    more most my myself no nor not now of off on once only or other our ours ourselves out over own
+    same she should so some such than that the their theirs them themselves then there these they
+    this those through to too under until up very was we were what when where which while who whom
+    why will with would you your yours yourself yourselves
+""".split())
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: str) -> list[str]:
+    """Lowercased ASCII words of `text`, accents stripped."""
+    text = unicodedata.normalize("NFKD", text)
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    return _WORD.findall(text.lower())
+
+
+def is_indexed(word: str) -> bool:
+    return len(word) >= MIN_TERM_LENGTH and word not in STOPWORDS
+
+
+def shard_of(term: str) -> str:
+    """The term's shard: FNV-1a (32-bit) of its bytes modulo SHARD_COUNT, as hex."""
+    h = 0x811C9DC5
+    for byte in term.encode():
+        h = ((h ^ byte) * 0x01000193) & 0xFFFFFFFF
+    return f"{h % SHARD_COUNT:02x}"
+
+
+def _heading_text(nodes: list) -> str:
+    return "".join(n if isinstance(n, str) else _heading_text(n.get("c", [])) for n in nodes)
+
+
+def document_postings(artifact: dict) -> tuple[dict[str, list[int]], list[list]]:
+    """
+    Positions of each term in a rendered research document, and its sections.
+
+    Returns:
+        {term: [position, ...]}, and [[first position, heading id, heading text], ...].
+    """
+    postings: dict[str, list[int]] = {}
+    sections: list[list] = []
+    position = 0
+
+    def add_text(text: str) -> None:
+        nonlocal position
+        for word in tokenize(text):
+            if is_indexed(word):
+                postings.setdefault(word, []).append(position)
+            position += 1
+
+    def walk(nodes: list) -> None:
+        for node in nodes:
+            if isinstance(node, str):
+                add_text(node)
+            elif node["t"] == "pre":
+                continue
+            else:
+                if re.fullmatch(r"h[1-6]", node["t"]) and node.get("p", {}).get("id"):
+                    sections.append([position, node["p"]["id"], _heading_text(node.get("c", []))])
+                walk(node.get("c", []))
+
+    walk(artifact["tree"])
+    return postings, sections
+
+
+class SearchIndex:
+    """The sharded index in a project's public/ directory."""
+
+    def __init__(self, directory: Path):
+        self.directory = directory
+
+    @classmethod
+    def for_project(cls, project_root: Path) -> "SearchIndex":
+        return cls(project_root / "public" / SEARCH_DIRNAME)
+
+    @classmethod
+    def for_playground(cls, playground_dir: Path) -> "SearchIndex":
+        # <root>/app/playgrounds/(YYYY)/(MM)/<slug>
+        return cls.for_project(playground_dir.parents[4])
+
+    def _lock(self) -> AbstractContextManager[None]:
+        return file_lock(self.directory / ".lock")
+
+    def _read(self, name: str) -> dict:
+        path = self.directory / name
+        if not path.exists():
+            return {}
+        try:
+            return json.loads(path.read_text())
+        except ValueError:
+            return {}
+
+    def _write(self, name: str, data: dict) -> bool:
+        return atomic_write_text(
+            self.directory / name,
+            json.dumps(data, ensure_ascii=False, sort_keys=True, separators=(",", ":")) + "\n",
+        )
+
+    def docs(self) -> dict[str, dict]:
+        return self._read(DOCS_FILENAME).get("docs", {})
+
+    def _docs_file(self, docs: dict[str, dict]) -> dict:
+        return {"version": SEARCH_VERSION, "shardCount": SHARD_COUNT, "docs": docs}
+
+    def _clear(self) -> None:
+        """Remove every index file; called with the lock held."""
+        if self.directory.is_dir():
+            for path in self.directory.glob("*.json"):
+                path.unlink()
+
+    def update(self, slug: str, title: str, url: str, artifact: dict) -> list[str]:
+        """
+        Replace one playground's postings.
+
+        Returns:
+            The shards that were rewritten.
+        """
+        postings, sections = document_postings(artifact)
+        by_shard: dict[str, dict[str, list[int]]] = {}
+        for term, positions in postings.items():
+            by_shard.setdefault(shard_of(term), {})[term] = positions
+
+        with self._lock():
+            if self._read(DOCS_FILENAME).get("version", SEARCH_VERSION) != SEARCH_VERSION:
+                # Shards of an older layout; this starts a partial index until the next rebuild
+                self._clear()
+            docs = self.docs()
+            previous = docs.get(slug, {}).get("shards", [])
+            written = []
+            for shard in sorted(set(previous) | set(by_shard)):
+                terms = self._read(f"{shard}.json")
+                for term in list(terms):
+                    if terms[term].pop(slug, None) is not None and not terms[term]:
+                        del terms[term]
+                for term, positions in by_shard.get(shard, {}).items():
+                    terms.setdefault(term, {})[slug] = positions
+                if terms:
+                    changed = self._write(f"{shard}.json", terms)
+                else:
+                    path = self.directory / f"{shard}.json"
+                    changed = path.exists()
+                    path.unlink(missing_ok=True)
+                if changed:
+                    written.append(shard)
+
+            docs[slug] = {"title": title, "url": url, "sections": sections, "shards": sorted(by_shard)}
+            self._write(DOCS_FILENAME, self._docs_file(docs))
+        return written
+
+    def rebuild(self, documents: list[tuple[str, str, str, dict]]) -> int:
+        """
+        Rebuild the whole index from (slug, title, url, artifact) tuples.
+
+        Returns:
+            The number of shards written.
+        """
+        shards: dict[str, dict[str, dict[str, list[int]]]] = {}
+        docs = {}
+        for slug, title, url, artifact in documents:
+            postings, sections = document_postings(artifact)
+            for term, positions in postings.items():
+                shards.setdefault(shard_of(term), {}).setdefault(term, {})[slug] = positions
+            docs[slug] = {
+                "title": title,
+                "url": url,
+                "sections": sections,
+                "shards": sorted({shard_of(t) for t in postings}),
+            }
+
+        with self._lock():
+            if self.directory.is_dir():
+                for path in self.directory.glob("*.json"):
+                    if path.name != DOCS_FILENAME and path.stem not in shards:
+                        path.unlink()
+            for shard, terms in shards.items():
+                self._write(f"{shard}.json", terms)
+            self._write(DOCS_FILENAME, self._docs_file(docs))
+        return len(shards)
+
+    def search(self, query: str, limit: int = 10) -> list[tuple[str, str, int]]:
+        """
+        Playgrounds containing every term of `query`, as the site would find them.
+
+        Returns:
+            (slug, url with the section anchor of the first match, match count),
+            most matches first.
+        """
+        terms = [t for t in tokenize(query) if is_indexed(t)]
+        if not terms:
+            return []
+        docs = self.docs()
+        shards = {s: self._read(f"{s}.json") for s in {shard_of(t) for t in terms}}
+        postings = [shards[shard_of(t)].get(t, {}) for t in terms]
+
+        results = []
+        for slug in set.intersection(*(set(p) for p in postings)):
+            first = min(p[slug][0] for p in postings)
+            doc = docs.get(slug, {})
+            anchor = ""
+            for start, section_id, _ in doc.get("sections", []):
+                if start > first:
+                    break
+                anchor = section_id
+            url = doc.get("url", "") + (f"#{anchor}" if anchor else "")
+            results.append((slug, url, sum(len(p[slug]) for p in postings)))
+        results.sort(key=lambda r: (-r[2], r[0]))
+        return results[:limit]
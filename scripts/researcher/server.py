@@ -0,0 +1,329 @@
+"""
+Local HTTP control API for the research job queue.
+
+A small asyncio HTTP/1.1 server (standard library only) so internal tools and
+the Next.js dev environment can submit and watch research without shelling out
+to the CLI. It reads and writes the same SQLite queue as `--enqueue`/`--jobs`,
+and jobs are run by the same workers as `--work`.
+
+Endpoints (JSON unless noted):
+
+    GET    /health                  liveness check
+    GET    /metrics                 Prometheus metrics (text format, see metrics.py)
+    GET    /jobs[?state=queued]     recent jobs
+    POST   /jobs                    submit {"playground": slug} or {"batch": {"limit", "include_untracked"}},
+                                    plus optional "providers", "focus" (one or a list), "focus_sections",
+                                    "model", "from_run", "reuse_similar", "incremental",
+                                    "tier" (fast, premium, draft or auto; see config.RESEARCH_TIERS)
+    GET    /jobs/<id>               job status with per-stage timings
+    DELETE /jobs/<id>               cancel a job
+    GET    /jobs/<id>/events        progress as Server-Sent Events (resumes from Last-Event-ID)
+    GET    /jobs/<id>/result        content.md and suggestions.md of a finished job
+
+The server binds to localhost and only accepts JSON request bodies, so a web
+page cannot submit jobs with a plain cross-site form post.
+"""
+
+import asyncio
+import json
+import time
+from dataclasses import asdict
+from http import HTTPStatus
+from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
+
+from rich.console import Console
+
+from archive import ResearchArchive
+from config import DEFAULT_TIER, TIER_AUTO, TIER_MODES
+from discovery import find_playground
+from jobqueue import FINAL_STATES, Job, JobQueue
+from metrics import REGISTRY
+from queries import focus_list
+from staleness import assess, read_data_ts, resolve_tier, scan, select_batch
+
+console = Console()
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+
+MAX_BODY = 1 << 20  # bytes
+SSE_POLL_INTERVAL = 1.0  # seconds between checks for new events
+SSE_KEEPALIVE = 15.0  # seconds between comments on an idle stream
+METRICS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+DEFAULT_PROVIDERS = ["openai", "gemini"]
+
+
+class HTTPError(Exception):
+    """An error response with a status code and message."""
+
+    def __init__(self, status: HTTPStatus, message: str = ""):
+        super().__init__(message or status.phrase)
+        self.status = status
+        self.message = message or status.phrase
+
+
+class Request:
+    """A parsed HTTP request."""
+
+    def __init__(self, method: str, target: str, headers: dict[str, str], body: bytes):
+        self.method = method
+        url = urlsplit(target)
+        self.path = url.path.rstrip("/") or "/"
+        self.query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        self.headers = headers
+        self.body = body
+
+    def json(self) -> dict:
+        if not self.headers.get("content-type", "").startswith("application/json"):
+            raise HTTPError(HTTPStatus.UNSUPPORTED_MEDIA_TYPE, "Request body must be application/json.")
+        try:
+            data = json.loads(self.body or b"{}")
+        except ValueError:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "Request body is not valid JSON.") from None
+        if not isinstance(data, dict):
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "Request body must be a JSON object.")
+        return data
+
+
+async def read_request(reader: asyncio.StreamReader) -> Request | None:
+    """Read one request; None if the client closed the connection."""
+    request_line = await reader.readline()
+    if not request_line:
+        return None
+    try:
+        method, target, _version = request_line.decode("latin-1").split()
+    except ValueError:
+        raise HTTPError(HTTPStatus.BAD_REQUEST, "Malformed request line.") from None
+
+    headers: dict[str, str] = {}
+    while (line := await reader.readline()) not in (b"\r\n", b"\n", b""):
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+    try:
+        length = int(headers.get("content-length", "0") or 0)
+    except ValueError:
+        raise HTTPError(HTTPStatus.BAD_REQUEST, "Content-Length must be a number.") from None
+    if length < 0:
+        raise HTTPError(HTTPStatus.BAD_REQUEST, "Content-Length must not be negative.")
+    if length > MAX_BODY:
+        raise HTTPError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE)
+    body = await reader.readexactly(length) if length else b""
+    return Request(method.upper(), target, headers, body)
+
+
+def job_to_dict(job: Job) -> dict:
+    data = asdict(job)
+    data.pop("lease_expires")
+    return data
+
+
+class ControlServer:
+    """Routes HTTP requests to the job queue."""
+
+    def __init__(
+        self,
+        project_root: Path,
+        host: str = DEFAULT_HOST,
+        port: int = DEFAULT_PORT,
+        queue: JobQueue | None = None,
+    ):
+        self.project_root = project_root
+        self.host = host
+        self.port = port
+        self.queue = queue or JobQueue()
+        REGISTRY.add_collector(self.queue.metric_samples)
+
+    async def serve(self) -> None:
+        """Serve until cancelled."""
+        server = await asyncio.start_server(self._handle, self.host, self.port)
+        console.print(f"[bold #84cc16]Control API listening on http://{self.host}:{self.port}[/bold #84cc16]")
+        async with server:
+            await server.serve_forever()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            try:
+                request = await read_request(reader)
+                if request is None:
+                    return
+                await self._dispatch(request, writer)
+            except HTTPError as e:
+                await self._send_json(writer, {"error": e.message}, e.status)
+            except Exception as e:
+                console.print(f"[bold red]Control API error: {e!r}[/bold red]")
+                await self._send_json(writer, {"error": "Internal server error."}, HTTPStatus.INTERNAL_SERVER_ERROR)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _dispatch(self, request: Request, writer: asyncio.StreamWriter) -> None:
+        parts = request.path.strip("/").split("/")
+        method = request.method
+
+        if parts == ["health"] and method == "GET":
+            return await self._send_json(writer, {"ok": True})
+
+        if parts == ["metrics"] and method == "GET":
+            return await self._send_text(writer, await asyncio.to_thread(REGISTRY.render), METRICS_CONTENT_TYPE)
+
+        if parts[0] != "jobs":
+            raise HTTPError(HTTPStatus.NOT_FOUND)
+
+        if len(parts) == 1:
+            if method == "GET":
+                states = request.query.get("state")
+                jobs = await asyncio.to_thread(self.queue.list_jobs, states.split(",") if states else None)
+                return await self._send_json(writer, {"jobs": [job_to_dict(j) for j in jobs]})
+            if method == "POST":
+                jobs = await asyncio.to_thread(self._submit, request.json())
+                return await self._send_json(writer, {"jobs": [job_to_dict(j) for j in jobs]}, HTTPStatus.CREATED)
+            raise HTTPError(HTTPStatus.METHOD_NOT_ALLOWED)
+
+        try:
+            job_id = int(parts[1])
+        except ValueError:
+            raise HTTPError(HTTPStatus.NOT_FOUND) from None
+        job = await asyncio.to_thread(self.queue.get, job_id)
+        if job is None:
+            raise HTTPError(HTTPStatus.NOT_FOUND, f"No job {job_id}.")
+
+        if len(parts) == 2 and method == "GET":
+            data = job_to_dict(job)
+            data["stages"] = await asyncio.to_thread(self.queue.stage_timings, job_id)
+            return await self._send_json(writer, data)
+        if len(parts) == 2 and method == "DELETE":
+            if not await asyncio.to_thread(self.queue.cancel, job_id):
+                raise HTTPError(HTTPStatus.CONFLICT, f"Job {job_id} has already finished.")
+            return await self._send_json(writer, job_to_dict(self.queue.get(job_id)))
+        if parts[2:] == ["events"] and method == "GET":
+            after = request.headers.get("last-event-id") or request.query.get("after") or "0"
+            return await self._stream_events(writer, job_id, int(after) if after.isdigit() else 0)
+        if parts[2:] == ["result"] and method == "GET":
+            return await self._send_json(writer, await asyncio.to_thread(self._result, job))
+        raise HTTPError(HTTPStatus.NOT_FOUND)
+
+    # ── Handlers ─────────────────────────────────────────────────────────
+
+    def _submit(self, data: dict) -> list[Job]:
+        providers = data.get("providers") or DEFAULT_PROVIDERS
+        if isinstance(providers, str):
+            providers = [p.strip() for p in providers.split(",")]
+        options = {
+            "providers": providers,
+            "focus": focus_list(data.get("focus")),
+            "focus_sections": bool(data.get("focus_sections")),
+            "model": data.get("model"),
+            "from_run": data.get("from_run"),
+            "reuse_similar": bool(data.get("reuse_similar")),
+            "incremental": bool(data.get("incremental")),
+            "tier": data.get("tier") or DEFAULT_TIER,
+        }
+        if options["tier"] not in TIER_MODES:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, f'"tier" must be one of {", ".join(TIER_MODES)}.')
+
+        if "batch" in data:
+            batch = data["batch"] if isinstance(data["batch"], dict) else {}
+            limit = batch.get("limit")
+            if limit is not None and (isinstance(limit, bool) or not isinstance(limit, int) or limit < 0):
+                raise HTTPError(HTTPStatus.BAD_REQUEST, '"batch.limit" must be a non-negative integer.')
+            plan = select_batch(
+                scan(self.project_root),
+                bool(batch.get("include_untracked")),
+                limit,
+            )
+            return [
+                self.queue.enqueue(
+                    entry.name,
+                    {**options, "tier": resolve_tier(options["tier"], entry)},
+                    priority=entry.priority,
+                )
+                for entry in plan
+            ]
+
+        playground = data.get("playground")
+        if not playground:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, 'Give a "playground" or a "batch".')
+        try:
+            playground_dir = find_playground(playground, self.project_root)
+        except FileNotFoundError as e:
+            raise HTTPError(HTTPStatus.NOT_FOUND, str(e)) from None
+        if options["tier"] == TIER_AUTO:
+            entry = assess(playground_dir, read_data_ts(self.project_root))
+            options = {**options, "tier": resolve_tier(TIER_AUTO, entry)}
+        return [self.queue.enqueue(playground, options)]
+
+    def _result(self, job: Job) -> dict:
+        result = self.queue.result(job.id)
+        if result is None:
+            raise HTTPError(HTTPStatus.CONFLICT, f"Job {job.id} is {job.state}, not done.")
+
+        archive = ResearchArchive()
+        try:
+            record = archive.get_run(result.get("run_id") or "", playground=job.playground)
+        except KeyError as e:
+            raise HTTPError(HTTPStatus.GONE, e.args[0]) from None
+        return {
+            "job": job.id,
+            "playground": job.playground,
+            "run_id": record.run_id,
+            "research_dir": result.get("research_dir"),
+            "content": archive.get_text(record.outputs["content.md"]),
+            "suggestions": archive.get_text(record.outputs["suggestions.md"]),
+        }
+
+    async def _stream_events(self, writer: asyncio.StreamWriter, job_id: int, after: int) -> None:
+        """Send a job's events as SSE until the job reaches a final state."""
+        writer.write(
+            b"HTTP/1.1 200 OK\r\n"
+            b"Content-Type: text/event-stream\r\n"
+            b"Cache-Control: no-cache\r\n"
+            b"Connection: close\r\n\r\n"
+        )
+        await writer.drain()
+
+        last_sent = time.monotonic()
+        while True:
+            events = await asyncio.to_thread(self.queue.events, job_id, after)
+            for event in events:
+                payload = json.dumps({"at": event.at, **event.data})
+                writer.write(f"id: {event.id}\nevent: {event.kind}\ndata: {payload}\n\n".encode())
+                after = event.id
+            if events:
+                await writer.drain()
+                last_sent = time.monotonic()
+                continue
+
+            job = await asyncio.to_thread(self.queue.get, job_id)
+            if job is None or job.state in FINAL_STATES:
+                writer.write(b"event: end\ndata: {}\n\n")
+                await writer.drain()
+                return
+            if time.monotonic() - last_sent > SSE_KEEPALIVE:
+                writer.write(b": keepalive\n\n")
+                await writer.drain()
+                last_sent = time.monotonic()
+            await asyncio.sleep(SSE_POLL_INTERVAL)
+
+    async def _send_json(self, writer: asyncio.StreamWriter, data: dict, status: HTTPStatus = HTTPStatus.OK) -> None:
+        await self._send_text(writer, json.dumps(data, indent=2), "application/json", status)
+
+    async def _send_text(
+        self,
+        writer: asyncio.StreamWriter,
+        text: str,
+        content_type: str,
+        status: HTTPStatus = HTTPStatus.OK,
+    ) -> None:
+        body = text.encode("utf-8")
+        writer.write(
+            f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+            f"Content-Type: {content_type}\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: close\r\n\r\n".encode("latin-1")
+            + body
+        )
+        await writer.drain()
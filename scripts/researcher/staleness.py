@@ -0,0 +1,228 @@
+"""
+Detect playgrounds whose research companion is missing or out of date.
+
+Each playground's research inputs (page.tsx, playground.tsx, logic/, ideation/
+and its data.ts entry) are hashed into a fingerprint. A run stores that
+fingerprint in research/meta.json; comparing it with the current one tells
+whether the companion has fallen behind, and which inputs changed. A
+companion that is up to date but was researched at the fast tier is a draft,
+due for its premium upgrade.
+"""
+
+import hashlib
+import json
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from catalog import CatalogEntry, ResearchCatalog
+from config import TIER_AUTO, TIER_DRAFT, TIER_FAST, TIER_PREMIUM
+from context import find_data_entry
+from discovery import list_playgrounds
+
+
+META_FILENAME = "meta.json"
+
+# How much a change to each kind of input matters when prioritizing refreshes
+INPUT_WEIGHTS = {
+    "logic": 10,
+    "playground.tsx": 10,
+    "ideation": 8,
+    "data.ts": 5,
+    "page.tsx": 3,
+}
+
+# Playgrounds at least this urgent get a fast draft before their premium
+# run when the tier is chosen per playground: every missing one, and stale
+# ones whose logic or playground changed
+DRAFT_PRIORITY = 60.0
+
+STATUS_MISSING = "missing"      # no research companion at all
+STATUS_STALE = "stale"          # inputs changed since the last run
+STATUS_UNTRACKED = "untracked"  # companion exists but predates fingerprints
+STATUS_DRAFT = "draft"          # up to date, but researched at the fast tier only
+STATUS_FRESH = "fresh"
+
+
+@dataclass
+class Fingerprint:
+    """Per-input hashes plus a combined digest."""
+    inputs: dict[str, str]
+
+    @property
+    def digest(self) -> str:
+        hasher = hashlib.sha256()
+        for name in sorted(self.inputs):
+            hasher.update(f"{name}\0{self.inputs[name]}\n".encode("utf-8"))
+        return hasher.hexdigest()[:16]
+
+    def changed_inputs(self, previous: dict[str, str]) -> list[str]:
+        """Inputs added, removed or modified relative to `previous`."""
+        names = set(self.inputs) | set(previous)
+        return sorted(n for n in names if self.inputs.get(n) != previous.get(n))
+
+
+@dataclass
+class PlanEntry:
+    """One playground in a refresh plan."""
+    name: str
+    path: Path
+    status: str
+    priority: float
+    changed: list[str] = field(default_factory=list)
+    fingerprint: Fingerprint | None = None
+
+
+def _hash_bytes(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()[:16]
+
+
+def fingerprint_inputs(playground_dir: Path, data_ts: str) -> Fingerprint:
+    """
+    Hash everything `build_context` reads for a playground.
+
+    Args:
+        playground_dir: Path to the playground directory.
+        data_ts: Contents of app/playgrounds/data.ts (read once by the caller).
+    """
+    inputs: dict[str, str] = {}
+
+    for filename in ("page.tsx", "playground.tsx"):
+        path = playground_dir / filename
+        if path.exists():
+            inputs[filename] = _hash_bytes(path.read_bytes())
+
+    logic_dir = playground_dir / "logic"
+    if logic_dir.is_dir():
+        for f in sorted(logic_dir.iterdir()):
+            if f.suffix in (".ts", ".tsx"):
+                inputs[f"logic/{f.name}"] = _hash_bytes(f.read_bytes())
+
+    for filename in ("info.md", "demo.xtsx"):
+        path = playground_dir / "ideation" / filename
+        if path.exists():
+            inputs[f"ideation/{filename}"] = _hash_bytes(path.read_bytes())
+
+    entry = find_data_entry(data_ts, f"/playgrounds/{playground_dir.name}")
+    if entry:
+        inputs["data.ts"] = _hash_bytes(entry.encode("utf-8"))
+
+    return Fingerprint(inputs=inputs)
+
+
+def read_data_ts(project_root: Path) -> str:
+    path = project_root / "app" / "playgrounds" / "data.ts"
+    return path.read_text() if path.exists() else ""
+
+
+def load_meta(playground_dir: Path) -> dict:
+    """The research/meta.json written by the last run, or {}."""
+    path = playground_dir / "research" / META_FILENAME
+    if not path.exists():
+        return {}
+    try:
+        return json.loads(path.read_text())
+    except ValueError:
+        return {}
+
+
+def _input_kind(name: str) -> str:
+    return name.split("/", 1)[0]
+
+
+def assess(playground_dir: Path, data_ts: str, catalog_entry: CatalogEntry | None = None) -> PlanEntry:
+    """
+    Classify one playground and score how urgently it needs a refresh.
+
+    A catalog entry whose fingerprint matches the current inputs settles that
+    the companion is fresh (or a draft) without reading research/meta.json.
+    """
+    fingerprint = fingerprint_inputs(playground_dir, data_ts)
+    research_dir = playground_dir / "research"
+    entry = PlanEntry(
+        name=playground_dir.name,
+        path=playground_dir,
+        status=STATUS_FRESH,
+        priority=0.0,
+        fingerprint=fingerprint,
+    )
+
+    if not (research_dir / "content.md").exists():
+        entry.status = STATUS_MISSING
+        entry.priority = 100.0
+        return entry
+
+    if catalog_entry is not None and catalog_entry.fingerprint == fingerprint.digest:
+        return _mark_draft(entry) if catalog_entry.tier == TIER_FAST else entry
+
+    meta = load_meta(playground_dir)
+    if not meta.get("fingerprint"):
+        # Older companions: rank by age so the oldest are refreshed first
+        age_days = (time.time() - (research_dir / "content.md").stat().st_mtime) / 86400
+        entry.status = STATUS_UNTRACKED
+        entry.priority = 10.0 + min(age_days / 30, 20.0)
+        return entry
+
+    if meta["fingerprint"] == fingerprint.digest:
+        return _mark_draft(entry) if meta.get("tier") == TIER_FAST else entry
+
+    entry.status = STATUS_STALE
+    entry.changed = fingerprint.changed_inputs(meta.get("inputs", {}))
+    weight = sum(INPUT_WEIGHTS.get(_input_kind(n), 1) for n in entry.changed)
+    entry.priority = 50.0 + min(weight, 45.0)
+    return entry
+
+
+def _mark_draft(entry: PlanEntry) -> PlanEntry:
+    entry.status = STATUS_DRAFT
+    entry.priority = 40.0
+    return entry
+
+
+def scan(project_root: Path) -> list[PlanEntry]:
+    """
+    Assess every playground and return a refresh plan, most urgent first.
+
+    Fresh playgrounds are included (priority 0) so callers can report them.
+    """
+    data_ts = read_data_ts(project_root)
+    catalog = ResearchCatalog.for_project(project_root).entries()
+    entries = [
+        assess(Path(p["path"]), data_ts, catalog.get(p["name"]))
+        for p in list_playgrounds(project_root)
+    ]
+    entries.sort(key=lambda e: (-e.priority, e.name))
+    return entries
+
+
+def select_batch(
+    plan: list[PlanEntry],
+    include_untracked: bool,
+    limit: int | None,
+    include_fresh: bool = False,
+) -> list[PlanEntry]:
+    """Pick the plan entries a batch should run, most urgent first."""
+    statuses = {STATUS_MISSING, STATUS_STALE, STATUS_DRAFT}
+    if include_untracked:
+        statuses.add(STATUS_UNTRACKED)
+    selected = [e for e in plan if include_fresh or e.status in statuses]
+    return selected[:limit] if limit else selected
+
+
+def choose_tier(entry: PlanEntry) -> str:
+    """
+    The tier to run a plan entry at when it is chosen per playground
+    (--tier auto).
+
+    Missing companions, and stale ones whose changes would make them
+    misleading, get a fast draft now and their premium upgrade after
+    (TIER_DRAFT). Drafts and everything less urgent go straight to premium.
+    """
+    if entry.status != STATUS_DRAFT and entry.priority >= DRAFT_PRIORITY:
+        return TIER_DRAFT
+    return TIER_PREMIUM
+
+
+def resolve_tier(mode: str, entry: PlanEntry) -> str:
+    """The tier mode to run a plan entry at: `mode`, or for "auto" the one `choose_tier` picks."""
+    return choose_tier(entry) if mode == TIER_AUTO else mode
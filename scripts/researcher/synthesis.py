@@ -2,14 +2,45 @@
 Cross-provider synthesis.
 
 Takes research results from multiple providers and synthesizes them
-into a coherent content.md and suggestions.md.
+into a coherent content.md and suggestions.md. Citations are first
+deduplicated into a shared reference table (see citations.py); the model cites
+by reference key and the keys are turned back into links afterwards.
+
+`synthesize_incremental` updates existing documents instead: the model sees
+them split into numbered sections together with what changed, and answers with
+section patches (see patches.py), so its output grows with the change rather
+than with the document.
+
+The model is called in background mode and polled (see background.py).
 """
 
-from openai import OpenAI
+import difflib
+import time
+from dataclasses import replace
 
+from openai import OpenAI
+from rich.console import Console
+
+from background import background_response
+from batchapi import defer
+from cache import SYNTHESIS_TTL, cache_key, get_cache
+from citations import (
+    ReferenceTable,
+    citation_numbers,
+    cite_keys,
+    link_citations,
+    normalize_reports,
+    render_citations,
+    split_bibliography,
+    with_bibliography,
+)
 from config import MODEL_SYNTHESIS
 from context import PlaygroundContext
+from patches import apply_patches, numbered, parse_patches, split_sections
 from providers.base import ResearchResult
+from tokens import count_tokens
+
+console = Console()
 
 
 SYNTHESIS_SYSTEM_PROMPT = """\
@@ -26,7 +57,8 @@ Your task is to synthesize deep research findings into two documents:
    - Addresses limitations and open questions
    - Concludes with future directions
    - Uses markdown formatting with headers (##, ###), emphasis, and lists
-   - Includes inline citations as markdown links where available
+   - Cites sources inline by their keys from the Reference Table, e.g. [R4] or [R4, R9] \
+(keys are turned into links and a reference list is added automatically, so do not write one)
    - Is written for an educated general audience (undergrad+ level)
 
 2. **suggestions.md** — Improvement recommendations for the playground:
@@ -34,7 +66,7 @@ Your task is to synthesize deep research findings into two documents:
    - Additional parameters or visualizations to add
    - Missing concepts or models to incorporate
    - UI/UX suggestions for better learning
-   - References to key papers or datasets
+   - References to key papers or datasets, cited by their keys
    - Each suggestion should be actionable and specific
 
 Format your response as:
@@ -49,37 +81,77 @@ Format your response as:
 """
 
 
-def synthesize(
+INCREMENTAL_SYSTEM_PROMPT = """\
+You are the editor of a research companion document (content.md) and its improvement \
+suggestions (suggestions.md) for an interactive educational playground on piatra.institute.
+
+New research findings or changes to the playground have come in. Bring the documents up to \
+date with the smallest set of section patches that does it:
+- Both documents are shown split into numbered sections [S1], [S2], ...
+- Patch only sections the changes affect and leave every other section alone. The documents \
+may contain edits made by hand: keep their wording unless the new material contradicts it.
+- Work new material into the section it belongs to (replace), or add it as a new section \
+(insert-after). Remove sections only when they are now wrong or redundant.
+- Cite sources inline by their keys from the Reference Table, e.g. [R4] or [R4, R9], as the \
+existing text does. Do not write a reference list.
+
+Answer only with patches of this form, one per edit:
+
+<<< content.md replace S3
+(the complete new text of section S3, starting with its heading)
+>>>
+
+<<< content.md insert-after S3
+(a new section, starting with its heading)
+>>>
+
+<<< suggestions.md delete S5
+>>>
+
+If nothing needs to change, answer NO CHANGES.
+"""
+
+
+def context_diff(previous: str, current: str) -> str:
+    """A unified diff of two playground context prompts; empty if they are equal."""
+    return "\n".join(difflib.unified_diff(
+        previous.splitlines(), current.splitlines(), "previous context", "current context", n=1, lineterm="",
+    ))
+
+
+def build_synthesis_prompt(
     ctx: PlaygroundContext,
-    results: list[ResearchResult],
-    client: OpenAI | None = None,
-) -> tuple[str, str]:
+    research_sections: list[str],
+    references: str = "",
+    focuses: list[str] | None = None,
+    per_focus: bool = False,
+) -> str:
     """
-    Synthesize multiple research results into content.md and suggestions.md.
+    Render the synthesis user prompt (sent with SYNTHESIS_SYSTEM_PROMPT).
 
     Args:
         ctx: Playground context for additional grounding.
-        results: Research results from providers.
-        client: OpenAI client. Created from env if not provided.
-
-    Returns:
-        Tuple of (content_md, suggestions_md).
+        research_sections: One markdown section per provider report.
+        references: The shared reference table the reports cite by key.
+        focuses: Focus areas the research was steered towards.
+        per_focus: Organize content.md into one section per focus area
+            rather than one merged companion.
     """
-    if client is None:
-        client = OpenAI()
-
-    # Build the user prompt with all research findings
-    research_sections = []
-    for result in results:
-        if result.status == "completed" and result.content:
-            research_sections.append(
-                f"## Research from {result.provider} ({result.model})\n\n{result.content}"
-            )
-
-    if not research_sections:
-        raise ValueError("No successful research results to synthesize.")
-
-    user_prompt = f"""\
+    focus_instruction = ""
+    if focuses and per_focus:
+        focus_instruction = (
+            "Organize content.md into one top-level section (##) per focus area, in this order: "
+            + "; ".join(focuses)
+            + ". Put material that spans several areas in a short introduction and conclusion.\n\n"
+        )
+    elif focuses:
+        focus_instruction = (
+            "Give particular attention to these focus areas, woven into one coherent document: "
+            + "; ".join(focuses)
+            + ".\n\n"
+        )
+
+    return f"""\
 ## Playground Context
 
 **Title:** {ctx.title}
@@ -96,18 +168,56 @@ def synthesize(
 
 {chr(10).join(research_sections)}
 
+{references}
+
 ---
 
-Please synthesize the above research findings into a content.md and suggestions.md as described in your instructions.
+{focus_instruction}Please synthesize the above research findings into a content.md and suggestions.md as described in your instructions.
 """
 
-    response = client.responses.create(
-        model=MODEL_SYNTHESIS,
-        instructions=SYNTHESIS_SYSTEM_PROMPT,
-        input=user_prompt,
+
+def synthesize(
+    ctx: PlaygroundContext,
+    results: list[ResearchResult],
+    client: OpenAI | None = None,
+    focuses: list[str] | None = None,
+    per_focus: bool = False,
+) -> tuple[str, str]:
+    """
+    Synthesize multiple research results into content.md and suggestions.md.
+
+    Args:
+        ctx: Playground context for additional grounding.
+        results: Research results from providers.
+        client: OpenAI client. Created from env if not provided.
+        focuses: Focus areas the research was steered towards.
+        per_focus: One content.md section per focus area instead of a merged document.
+
+    Returns:
+        Tuple of (content_md, suggestions_md).
+    """
+    if client is None:
+        client = OpenAI()
+
+    # Build the user prompt with all research findings, citing a shared
+    # reference table instead of repeating each provider's reference list
+    reports, references = normalize_reports(results)
+    research_sections = [
+        f"## Research from {report.provider} ({report.model})\n\n{report.text}"
+        for report in reports
+    ]
+
+    if not research_sections:
+        raise ValueError("No successful research results to synthesize.")
+
+    user_prompt = build_synthesis_prompt(ctx, research_sections, references.to_prompt(), focuses, per_focus)
+    console.print(
+        f"  [dim]{references.citations} citations → {len(references.references)} unique sources; "
+        f"reports {sum(r.original_tokens for r in reports):,} → "
+        f"{sum(count_tokens(r.text) for r in reports):,} tokens[/dim]"
     )
 
-    raw = response.output_text or ""
+    raw = _respond(client, SYNTHESIS_SYSTEM_PROMPT, user_prompt)
 
     # Parse the two documents from the response
     content_md = _extract_block(raw, "content.md")
@@ -118,9 +228,158 @@ Please synthesize the above research findings into a content.md and suggestions.
         content_md = raw
         suggestions_md = "No suggestions could be extracted from the synthesis."
 
+    content_md = render_citations(content_md, references)
+    suggestions_md = render_citations(suggestions_md, references, bibliography=False)
     return content_md, suggestions_md
 
 
+def build_incremental_prompt(
+    ctx: PlaygroundContext,
+    content_sections: list[str],
+    suggestion_sections: list[str],
+    changes: str,
+    research_sections: list[str],
+    references: str,
+) -> str:
+    """
+    Render the incremental synthesis user prompt (sent with INCREMENTAL_SYSTEM_PROMPT).
+
+    Args:
+        ctx: Playground context.
+        content_sections: content.md split into sections, citing by key.
+        suggestion_sections: suggestions.md split into sections.
+        changes: Unified diff of the playground context since the documents were written.
+        research_sections: One markdown section per new provider report.
+        references: The reference table of the documents and the new reports.
+    """
+    parts = [f"## Playground\n\n**Title:** {ctx.title}\n**Description:** {ctx.description}"]
+    if changes:
+        parts.append(f"## Changes to the Playground\n\n```diff\n{changes}\n```")
+    if research_sections:
+        parts.append("## New Research Findings\n\n" + "\n".join(research_sections))
+    parts.append(references)
+    parts.append(f"## Current content.md\n\n{numbered(content_sections)}")
+    parts.append(f"## Current suggestions.md\n\n{numbered(suggestion_sections)}")
+    parts.append("Please patch content.md and suggestions.md as described in your instructions.")
+    return "\n\n---\n\n".join(parts) + "\n"
+
+
+def synthesize_incremental(
+    ctx: PlaygroundContext,
+    results: list[ResearchResult],
+    content_md: str,
+    suggestions_md: str,
+    changes: str = "",
+    client: OpenAI | None = None,
+) -> tuple[str, str]:
+    """
+    Update existing documents with section patches instead of rewriting them.
+
+    Args:
+        ctx: Playground context.
+        results: New provider results only; reports the documents were
+            already written from should be left out.
+        content_md: The current content.md, possibly edited by hand.
+        suggestions_md: The current suggestions.md.
+        changes: Unified diff of the playground context since the documents
+            were written (see `context_diff`).
+        client: OpenAI client. Created from env if not provided.
+
+    Returns:
+        Tuple of (content_md, suggestions_md). A document no patch applies to
+        is returned unchanged.
+    """
+    table = ReferenceTable()
+    keyed_content = cite_keys(content_md, table)
+    reports, table = normalize_reports(results, table)
+    if not reports and not changes:
+        console.print("  [dim]No new findings or context changes; documents left as they are.[/dim]")
+        return content_md, suggestions_md
+
+    if client is None:
+        client = OpenAI()
+
+    content_sections = split_sections(keyed_content)
+    suggestion_sections = split_sections(suggestions_md)
+    research_sections = [
+        f"## Research from {report.provider} ({report.model})\n\n{report.text}"
+        for report in reports
+    ]
+    user_prompt = build_incremental_prompt(
+        ctx, content_sections, suggestion_sections, changes, research_sections, table.to_prompt(),
+    )
+
+    raw = _respond(client, INCREMENTAL_SYSTEM_PROMPT, user_prompt)
+    patches = parse_patches(raw)
+
+    # Only the patched sections are rendered; the others are kept as written,
+    # so new sources are numbered after the ones the document already cites
+    numbers = citation_numbers(content_md, table)
+    documents = {
+        "content.md": (split_sections(split_bibliography(content_md)[0]),
+                       lambda text: link_citations(text, table, numbers)),
+        "suggestions.md": (split_sections(suggestions_md),
+                           lambda text: render_citations(text, table, bibliography=False)),
+    }
+    outputs = {"content.md": content_md, "suggestions.md": suggestions_md}
+    for name, (sections, render) in documents.items():
+        document_patches = [replace(p, text=render(p.text)) for p in patches if p.document == name]
+        if not document_patches:
+            continue
+        patched, skipped = apply_patches(sections, document_patches)
+        for patch in skipped:
+            console.print(f"  [yellow]Skipped patch for missing section {name} S{patch.section}[/yellow]")
+        if len(skipped) < len(document_patches):
+            outputs[name] = with_bibliography(patched, table) if name == "content.md" else patched
+
+    console.print(
+        f"  [dim]{len(patches)} section patch(es) to {len(content_sections)} + {len(suggestion_sections)} "
+        f"sections; {count_tokens(raw):,} output tokens[/dim]"
+    )
+    return outputs["content.md"], outputs["suggestions.md"]
+
+
+def _respond(client: OpenAI, instructions: str, user_prompt: str) -> str:
+    """
+    The synthesis model's answer, from the cache (namespace "synthesis") if
+    the same instructions and prompt were answered before. Otherwise the call
+    runs in background mode (see background.py), so a restarted run waits for
+    the response already submitted instead of paying for a second one.
+
+    A cut-off answer raises IncompleteResponseError rather than being written
+    out (and cached) as a truncated document.
+    """
+    cache = get_cache()
+    key = cache_key(MODEL_SYNTHESIS, instructions, user_prompt)
+    raw = cache.get("synthesis", key)
+    if raw is not None:
+        console.print("  [dim]Using the cached synthesis of these reports[/dim]")
+        return raw
+
+    defer("synthesis", key, MODEL_SYNTHESIS, user_prompt, instructions=instructions, ttl=SYNTHESIS_TTL)
+    started = time.perf_counter()
+    raw = background_response(
+        client,
+        MODEL_SYNTHESIS,
+        user_prompt,
+        instructions=instructions,
+        label="synthesis",
+        on_status=_report_status,
+        on_retry=_report_retry,
+    )
+    if raw.strip():
+        cache.put("synthesis", key, raw, ttl=SYNTHESIS_TTL, cost_seconds=time.perf_counter() - started)
+    return raw
+
+
+def _report_status(message: str) -> None:
+    console.print(f"  [dim]{message}[/dim]")
+
+
+def _report_retry(attempt: int, delay: float, exc: BaseException) -> None:
+    console.print(f"  [dim]Transient error ({exc.__class__.__name__}), retry {attempt} in {delay:.0f}s[/dim]")
+
+
 def _extract_block(text: str, label: str) -> str:
     """Extract a labeled code block from the synthesis output."""
     import re
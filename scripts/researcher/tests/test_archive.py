@@ -0,0 +1,47 @@
+"""Content-addressed blobs of the run archive."""
+
+from concurrent.futures import ThreadPoolExecutor
+
+from archive import ResearchArchive
+from pipeline import run_meta
+from staleness import Fingerprint
+
+
+def test_concurrent_writers_of_one_blob_never_publish_a_torn_copy(tmp_path):
+    archive = ResearchArchive(tmp_path)
+    source = tmp_path / "report.md"
+    text = "".join(f"line {i} of a long provider report\n" for i in range(50_000))
+    source.write_text(text)
+
+    with ThreadPoolExecutor(8) as pool:
+        digests = set(pool.map(lambda _: archive.put_file(source), range(8)))
+
+    assert len(digests) == 1
+    assert archive.get_text(digests.pop()) == text
+    assert not list(archive.blob_dir.rglob("*.tmp"))
+
+
+def test_a_restored_run_brings_back_its_own_meta(tmp_path):
+    archive = ResearchArchive(tmp_path)
+    runs = [
+        archive.archive_run(
+            playground="a", context=f"context {i}", prompt="", queries=[], focus=None, results=[],
+            content_md=f"content {i}", suggestions_md="", fingerprint={"page.tsx": f"hash {i}"}, tier=tier,
+        )
+        for i, tier in enumerate(["fast", "premium"])
+    ]
+
+    meta = run_meta(archive.get_run(runs[0].run_id, playground="a"))
+    assert meta["run_id"] == runs[0].run_id
+    assert meta["inputs"] == {"page.tsx": "hash 0"}
+    assert meta["fingerprint"] == Fingerprint({"page.tsx": "hash 0"}).digest
+    assert meta["tier"] == "fast"
+
+
+def test_runs_archived_without_a_fingerprint_restore_without_one(tmp_path):
+    archive = ResearchArchive(tmp_path)
+    record = archive.archive_run(
+        playground="a", context="context", prompt="", queries=[], focus=None, results=[],
+        content_md="content", suggestions_md="",
+    )
+    assert "fingerprint" not in run_meta(record)
@@ -0,0 +1,48 @@
+"""Markdown features and link safety of pre-rendered research artifacts."""
+
+from artifact import render_artifact
+
+
+def find(nodes: list, tag: str) -> list[dict]:
+    found = []
+    for node in nodes:
+        if isinstance(node, dict):
+            if node["t"] == tag:
+                found.append(node)
+            found += find(node.get("c", []), tag)
+    return found
+
+
+def hrefs(markdown: str) -> list[str | None]:
+    return [a.get("p", {}).get("href") for a in find(render_artifact(markdown)["tree"], "a")]
+
+
+def test_urls_and_www_hosts_are_autolinked_but_bare_domains_are_not():
+    assert hrefs("See https://a.org/x, www.b.org/y. and c.org.") == ["https://a.org/x", "http://www.b.org/y"]
+
+
+def test_protocol_relative_links_lose_their_href():
+    assert hrefs("[a](//evil.example) [b](/playgrounds/x) //evil.example") == [None, "/playgrounds/x"]
+
+
+def test_footnotes_render_like_remark_gfm():
+    tree = render_artifact("## Claims\n\nOne[^src] and again[^src].\n\n[^src]: The source.\n")["tree"]
+
+    refs = [sup["c"][0]["p"] for sup in find(tree, "sup")]
+    assert refs == [
+        {"href": "#user-content-fn-src", "id": "user-content-fnref-src", "aria-describedby": "footnote-label"},
+        {"href": "#user-content-fn-src", "id": "user-content-fnref-src-2", "aria-describedby": "footnote-label"},
+    ]
+
+    section = tree[-1]
+    assert section["t"] == "section" and section["p"] == {"className": "footnotes"}
+    assert section["c"][0]["p"]["id"] == "footnote-label"
+    (note,) = find(section["c"], "li")
+    assert note["p"] == {"id": "user-content-fn-src"}
+    backrefs = [a["p"]["href"] for a in find(note["c"], "a")]
+    assert backrefs == ["#user-content-fnref-src", "#user-content-fnref-src-2"]
+
+
+def test_the_footnotes_heading_stays_out_of_the_table_of_contents():
+    artifact = render_artifact("## Claims\n\nOne[^1].\n\n[^1]: The source.\n")
+    assert [entry["id"] for entry in artifact["toc"]] == ["claims"]
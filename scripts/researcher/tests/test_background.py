@@ -0,0 +1,131 @@
+"""Cancelling and timing out long-running OpenAI calls."""
+
+import asyncio
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+import background
+from background import (
+    BackgroundResponseError,
+    IncompleteResponseError,
+    ResponseHandles,
+    background_response,
+    run_in_thread,
+)
+from providers.openai_deep import OpenAIDeepResearchProvider
+
+
+class PendingResponses:
+    """A Responses API whose background response never finishes."""
+
+    def __init__(self):
+        self.polled = threading.Event()
+
+    def create(self, **kwargs):
+        return SimpleNamespace(id="resp_pending", status="queued")
+
+    def retrieve(self, response_id):
+        self.polled.set()
+        return SimpleNamespace(id=response_id, status="in_progress")
+
+
+def test_cancelling_the_caller_stops_the_poll_loop_and_keeps_the_handle(tmp_path, monkeypatch):
+    monkeypatch.setattr(background, "POLL_INTERVAL", 0.01)
+    monkeypatch.setattr(background, "MAX_POLL_INTERVAL", 60.0)
+    responses = PendingResponses()
+    handles = ResponseHandles(tmp_path)
+    finished = threading.Event()
+    errors = []
+
+    def call():
+        try:
+            background_response(SimpleNamespace(responses=responses), "model", "input", handles=handles)
+        except BackgroundResponseError as e:
+            errors.append(e)
+        finally:
+            finished.set()
+
+    async def main():
+        task = asyncio.create_task(run_in_thread(call))
+        await asyncio.to_thread(responses.polled.wait, 5)
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+    asyncio.run(main())
+    # Woken from its (60s) sleep rather than left waiting
+    assert finished.wait(5)
+    assert errors and "Stopped waiting" in str(errors[0])
+    assert list(tmp_path.glob("*.json"))
+
+
+def test_a_cut_off_response_is_not_returned_as_the_answer(tmp_path):
+    responses = SimpleNamespace(create=lambda **kwargs: SimpleNamespace(
+        id="resp_cut", status="incomplete", output_text="1. first\n2. seco",
+        incomplete_details={"reason": "max_output_tokens"},
+    ))
+    with pytest.raises(IncompleteResponseError) as raised:
+        background_response(SimpleNamespace(responses=responses), "model", "input",
+                            handles=ResponseHandles(tmp_path))
+    assert raised.value.text == "1. first\n2. seco"
+
+
+class StalledStream:
+    """A response stream that sends a few deltas, then nothing."""
+
+    def __init__(self, deltas: int):
+        self.deltas = deltas
+        self.closed = False
+
+    async def __aiter__(self):
+        yield SimpleNamespace(type="response.created", sequence_number=0,
+                              response=SimpleNamespace(id="resp_stalled"))
+        for i in range(self.deltas):
+            yield SimpleNamespace(type="response.output_text.delta", sequence_number=i + 1, delta="x")
+        await asyncio.sleep(3600)
+
+    async def close(self):
+        self.closed = True
+
+
+def provider_with(stream: StalledStream, deadline: float) -> OpenAIDeepResearchProvider:
+    async def create(**kwargs):
+        return stream
+
+    client = SimpleNamespace(responses=SimpleNamespace(create=create))
+    return OpenAIDeepResearchProvider(client=client, deadline=deadline)
+
+
+def test_deadline_interrupts_a_stalled_stream():
+    stream = StalledStream(deltas=500)
+    statuses = []
+    handles = []
+    result = asyncio.run(provider_with(stream, deadline=0.2).research(
+        "prompt", on_status=statuses.append, on_handle=handles.append,
+    ))
+
+    assert result.status == "timed_out"
+    assert handles == ["resp_stalled"]
+    assert stream.closed
+    # Deltas arrive together, so they produce a single status update
+    assert sum(s.startswith("Writing report") for s in statuses) == 1
+
+
+def test_cancelling_the_run_closes_the_stream():
+    stream = StalledStream(deltas=1)
+
+    async def main():
+        task = asyncio.create_task(provider_with(stream, deadline=None).research("prompt"))
+        await asyncio.sleep(0.05)
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+    asyncio.run(main())
+    assert stream.closed
@@ -0,0 +1,45 @@
+"""The Batch API client against the local stand-in (batch_standin.py)."""
+
+import threading
+from http.server import ThreadingHTTPServer
+
+import pytest
+
+openai = pytest.importorskip("openai")
+if not hasattr(openai, "APIError"):
+    pytest.skip("needs the openai SDK", allow_module_level=True)
+
+import batchapi  # noqa: E402
+from batch_standin import BatchStandin, make_handler  # noqa: E402
+from batchapi import BatchRequest, BatchRunner  # noqa: E402
+from cache import ResearchCache  # noqa: E402
+
+
+@pytest.fixture
+def standin():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(BatchStandin(delay=0.3)))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/v1"
+    server.shutdown()
+    server.server_close()
+
+
+def test_runner_stores_the_standins_answers_in_the_cache(standin, tmp_path, monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "standin")
+    monkeypatch.setattr(batchapi, "POLL_INTERVAL", 0.1)
+    cache = ResearchCache(tmp_path / "cache")
+    runner = BatchRunner(cache=cache, directory=tmp_path / "batches", base_url=standin)
+    requests = [
+        BatchRequest("queries", "q" * 64, "model", "# Playground: Canalization\n\nWrite five research queries."),
+        BatchRequest(
+            "synthesis", "s" * 64, "model", "# Playground: Canalization\n\nReports...",
+            instructions="Write content.md and suggestions.md.",
+        ),
+    ]
+
+    assert runner.run(requests, "test") == set()
+    assert "core theory behind Canalization" in cache.get("queries", "q" * 64)
+    assert "```content.md" in cache.get("synthesis", "s" * 64)
+    # Nothing left to collect by a later run
+    assert runner.pending() == []
@@ -0,0 +1,102 @@
+"""The shared on-disk cache."""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import cache
+from cache import ResearchCache
+
+
+def test_threads_storing_one_key_never_publish_a_torn_value(tmp_path):
+    cache = ResearchCache(tmp_path)
+    values = ["".join(f"line {i} of report {n}\n" for i in range(20_000)) for n in range(8)]
+
+    with ThreadPoolExecutor(8) as pool:
+        list(pool.map(lambda value: cache.put("provider", "k" * 64, value), values))
+
+    assert cache.get("provider", "k" * 64) in values
+    assert not list(tmp_path.rglob("*.tmp"))
+
+
+class Clock:
+    """A settable time.time() for the cache module."""
+
+    def __init__(self, now: float = 1_000_000.0):
+        self.now = now
+
+    def time(self) -> float:
+        return self.now
+
+    def perf_counter(self) -> float:
+        return self.now
+
+
+def value(n: int) -> str:
+    """A value that compresses poorly, so every entry has about the same size."""
+    return os.urandom(4000).hex() + str(n)
+
+
+def test_least_recently_used_entries_are_evicted_first(tmp_path, monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(cache, "time", clock)
+    store = ResearchCache(tmp_path)
+    for key in ("a", "b"):
+        store.put("queries", key, value(0))
+        clock.now += 1
+    assert store.get("queries", "a") is not None  # "a" is now more recent than "b"
+    clock.now += 1
+
+    size = store.stats()[0].size / 2
+    store.max_bytes = int(size * 2.5)
+    store.put("queries", "c", value(1))
+
+    assert store.contains("queries", "a") and store.contains("queries", "c")
+    assert not store.contains("queries", "b")
+    assert len(list(tmp_path.glob("queries/*/*"))) == 2
+
+
+def test_expired_entries_are_misses_and_are_pruned(tmp_path, monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(cache, "time", clock)
+    store = ResearchCache(tmp_path)
+    store.put("provider", "read", "report", ttl=60)
+    store.put("provider", "unread", "report", ttl=60)
+    store.put("provider", "forever", "report")
+
+    clock.now += 61
+    assert store.get("provider", "read") is None
+    removed, freed = store.prune()
+    assert removed == 1 and freed > 0
+    assert [s.entries for s in store.stats()] == [1]
+    assert store.get("provider", "forever") == "report"
+
+
+def test_hits_misses_and_saved_seconds_are_counted_per_namespace(tmp_path, monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(cache, "time", clock)
+    store = ResearchCache(tmp_path)
+
+    def compute():
+        clock.now += 12.5
+        return "queries"
+
+    assert store.memoize("queries", "k", compute) == "queries"  # miss, then stored
+    assert store.memoize("queries", "k", compute) == "queries"  # hit
+    store.get("queries", "k")
+    store.get("synthesis", "absent")
+
+    stats = {s.namespace: s for s in store.stats()}
+    assert (stats["queries"].hits, stats["queries"].misses, stats["queries"].saved_seconds) == (2, 1, 25.0)
+    assert stats["queries"].hit_rate == 2 / 3
+    assert (stats["synthesis"].entries, stats["synthesis"].misses) == (0, 1)
+
+
+def test_a_value_whose_file_is_gone_is_a_miss(tmp_path):
+    store = ResearchCache(tmp_path)
+    store.put("context", "k", "rendered")
+    for body in tmp_path.glob("context/*/*"):
+        body.unlink()
+
+    assert store.get("context", "k") is None
+    assert not store.contains("context", "k")
+    assert {s.namespace: s.misses for s in store.stats()} == {"context": 1}
@@ -0,0 +1,29 @@
+"""Reading and updating the research catalog manifest."""
+
+import json
+
+import pytest
+
+from catalog import CatalogEntry, CatalogError, ResearchCatalog
+
+
+def test_update_refuses_to_overwrite_an_unparseable_manifest(tmp_path):
+    catalog = ResearchCatalog(tmp_path)
+    catalog.path.write_text('{"version": 1, "playgrounds": {')
+
+    assert catalog.entries() == {}
+    with pytest.raises(CatalogError):
+        catalog.update(CatalogEntry(slug="a", path="(2025)/(01)/a"))
+    assert catalog.path.read_text() == '{"version": 1, "playgrounds": {'
+
+
+def test_unknown_fields_are_ignored(tmp_path):
+    catalog = ResearchCatalog(tmp_path)
+    catalog.path.write_text(json.dumps({
+        "version": 2,
+        "playgrounds": {"a": {"slug": "a", "path": "(2025)/(01)/a", "added_later": True}},
+    }))
+
+    assert catalog.get("a") == CatalogEntry(slug="a", path="(2025)/(01)/a")
+    assert catalog.update(CatalogEntry(slug="b", path="(2025)/(02)/b"))
+    assert set(catalog.entries()) == {"a", "b"}
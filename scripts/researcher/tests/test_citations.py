@@ -0,0 +1,66 @@
+"""Reference list detection and the URLs citations are rendered with."""
+
+from citations import ReferenceTable, canonical_url, normalize_report, render_citations
+
+
+REPORT = """# Report
+
+Uptake varies [1].
+
+## Sources of Variation in CO2 Uptake
+
+Temperature drives most of the variance, see https://a.org/x.
+
+## References
+
+Numbering follows the order of first citation.
+1. [Paper One](http://www.one.org/p1)
+2. Two, https://two.org/p2#results
+"""
+
+
+def test_section_only_headed_like_references_is_kept():
+    table = ReferenceTable()
+    body = normalize_report(REPORT, table)
+    assert "## Sources of Variation in CO2 Uptake" in body
+    assert "Temperature drives most of the variance" in body
+
+
+def test_reference_list_links_are_taken_out_but_other_lines_stay():
+    table = ReferenceTable()
+    body = normalize_report(REPORT, table)
+    assert "Uptake varies [R1]." in body
+    assert "Numbering follows the order of first citation." in body
+    assert "Paper One" not in body
+    assert len(table.references) == 3
+
+
+def test_reference_like_heading_over_a_link_list_is_a_reference_list():
+    table = ReferenceTable()
+    body = normalize_report(
+        "Claim [1].\n\n## Sources used in this report\n\n1. https://one.org/a\n2. https://two.org/b\n",
+        table,
+    )
+    assert body == "Claim [R1]."
+
+
+def test_first_seen_url_is_rendered_and_canonical_form_deduplicates():
+    table = ReferenceTable()
+    first = table.add("http://example.org/page#section-2", "Deep link")
+    assert table.add("https://www.example.org/page/") == first
+    rendered = render_citations(f"See [{first}].", table)
+    assert "(http://example.org/page#section-2)" in rendered
+    assert table.references["https://example.org/page"].citations == 2
+
+
+def test_malformed_urls_are_kept_as_written():
+    table = ReferenceTable()
+    body = normalize_report(
+        "Bad port https://example.com:99999/x and https://example.com:abc/ "
+        "and [v6](http://[::1/x) and a fine https://example.com/ok.",
+        table,
+    )
+    assert canonical_url("https://example.com:99999/x.") == "https://example.com:99999/x"
+    assert canonical_url("http://[::1/x") == "http://[::1/x"
+    assert body.count("[R") == 4
+    assert "https://example.com:abc/" in render_citations(body, table)
@@ -0,0 +1,50 @@
+"""Submitting Gemini deep research interactions."""
+
+import asyncio
+from types import SimpleNamespace
+
+from providers import gemini_deep
+from providers.gemini_deep import GeminiDeepResearchProvider
+from retry import CircuitBreaker, RetryPolicy
+
+
+class Dropped(Exception):
+    status_code = 503
+
+
+class Interactions:
+    """An interactions API whose first send lands but answers with a 503."""
+
+    def __init__(self):
+        self.messages = []
+        self.sends = 0
+
+    async def send_message(self, interaction, message):
+        self.sends += 1
+        self.messages.append(SimpleNamespace(content=[SimpleNamespace(text=message)]))
+        if self.sends == 1:
+            raise Dropped()
+
+    async def list_messages(self, interaction):
+        for message in self.messages:
+            yield message
+
+
+def test_a_prompt_that_landed_before_a_5xx_is_not_sent_twice(monkeypatch):
+    monkeypatch.setattr(gemini_deep, "retry_async", with_policy(RetryPolicy(base_delay=0.0, jitter=0.0)))
+    interactions = Interactions()
+    provider = GeminiDeepResearchProvider(api_key="test")
+    provider._client = SimpleNamespace(aio=SimpleNamespace(interactions=interactions))
+    retries = []
+
+    asyncio.run(provider._send_prompt("interactions/1", "prompt", CircuitBreaker("test"),
+                                      lambda *args: retries.append(args)))
+
+    assert interactions.sends == 1
+    assert len(interactions.messages) == 1
+    assert len(retries) == 1
+
+
+def with_policy(policy: RetryPolicy):
+    retry_async = gemini_deep.retry_async
+    return lambda fn, **kwargs: retry_async(fn, policy=policy, **kwargs)
@@ -0,0 +1,134 @@
+"""Leases, retries and cancellation in the job queue."""
+
+import asyncio
+import threading
+
+import jobqueue
+from jobqueue import (
+    EVENT_PROVIDER,
+    STATE_CANCELLED,
+    STATE_DONE,
+    STATE_FAILED,
+    STATE_QUEUED,
+    STATE_RESEARCHING,
+    STATE_SYNTHESIZING,
+    JobQueue,
+    WorkerPool,
+)
+
+
+def test_a_lapsed_lease_is_reclaimed_by_another_worker_in_its_stage(tmp_path):
+    queue = JobQueue(tmp_path / "jobs.sqlite3")
+    job = queue.enqueue("a")
+
+    assert queue.claim("w1", lease=-1).id == job.id
+    assert queue.set_state(job.id, "w1", STATE_SYNTHESIZING)
+    reclaimed = queue.claim("w2")
+    assert (reclaimed.id, reclaimed.state, reclaimed.attempts) == (job.id, STATE_SYNTHESIZING, 2)
+    # The first worker has lost it
+    assert not queue.heartbeat(job.id, "w1")
+    assert not queue.complete(job.id, "w1")
+    assert queue.heartbeat(job.id, "w2")
+
+
+def test_a_live_lease_keeps_other_jobs_of_the_playground_waiting(tmp_path):
+    queue = JobQueue(tmp_path / "jobs.sqlite3")
+    first = queue.enqueue("a", {"focus": "x"})
+    second = queue.enqueue("a", {"focus": "y"})
+
+    assert first.id != second.id
+    assert queue.claim("w1").id == first.id
+    assert queue.claim("w2") is None
+
+
+def test_queuing_again_reuses_only_a_job_with_the_same_options(tmp_path):
+    queue = JobQueue(tmp_path / "jobs.sqlite3")
+    job = queue.enqueue("a", {"tier": "draft"}, priority=1.0)
+
+    assert queue.enqueue("a", {"tier": "draft"}, priority=5.0).id == job.id
+    assert queue.get(job.id).priority == 5.0
+    other = queue.enqueue("a", {"tier": "premium"})
+    assert other.id != job.id
+    assert queue.get(job.id).options == {"tier": "draft"}
+
+
+def test_failed_attempts_are_retried_until_they_run_out(tmp_path):
+    queue = JobQueue(tmp_path / "jobs.sqlite3")
+    job = queue.enqueue("a", max_attempts=2)
+
+    queue.claim("w")
+    assert queue.fail(job.id, "w", "boom")
+    assert queue.get(job.id).state == STATE_QUEUED
+    queue.claim("w")
+    assert queue.fail(job.id, "w", "boom again")
+    failed = queue.get(job.id)
+    assert (failed.state, failed.attempts, failed.error) == (STATE_FAILED, 2, "boom again")
+    assert queue.claim("w") is None
+
+
+def test_released_jobs_do_not_use_up_an_attempt(tmp_path):
+    queue = JobQueue(tmp_path / "jobs.sqlite3")
+    job = queue.enqueue("a", max_attempts=1)
+
+    queue.claim("w1")
+    assert queue.release(job.id, "w1")
+    assert queue.claim("w2").attempts == 1
+
+
+def test_a_job_whose_lease_lapsed_on_its_last_attempt_is_failed_not_claimed(tmp_path):
+    queue = JobQueue(tmp_path / "jobs.sqlite3")
+    job = queue.enqueue("a", max_attempts=1)
+
+    queue.claim("w1", lease=-1)
+    assert queue.claim("w2") is None
+    assert queue.get(job.id).state == STATE_FAILED
+
+
+def test_cancel_stops_a_running_job_and_leaves_final_ones(tmp_path):
+    queue = JobQueue(tmp_path / "jobs.sqlite3")
+    job = queue.enqueue("a")
+    queue.claim("w")
+
+    assert queue.cancel(job.id)
+    assert queue.get(job.id).state == STATE_CANCELLED
+    assert not queue.heartbeat(job.id, "w")
+    assert not queue.cancel(job.id)
+
+
+class RecordingQueue(JobQueue):
+    """A queue noting which threads write stages and progress events."""
+
+    def __init__(self, path):
+        super().__init__(path)
+        self.writers = set()
+
+    def set_state(self, *args):
+        self.writers.add(threading.current_thread())
+        return super().set_state(*args)
+
+    def record_event(self, *args):
+        self.writers.add(threading.current_thread())
+        return super().record_event(*args)
+
+
+def test_workers_write_stages_and_progress_off_the_event_loop(tmp_path, monkeypatch):
+    queue = RecordingQueue(tmp_path / "jobs.sqlite3")
+    job = queue.enqueue("a")
+
+    async def run_research(on_stage, on_progress, **options):
+        on_stage(STATE_SYNTHESIZING)
+        on_progress("openai", "streaming", "Writing report")
+        return tmp_path
+
+    monkeypatch.setattr(jobqueue, "run_research", run_research)
+    monkeypatch.setattr(jobqueue, "find_playground", lambda slug, root: tmp_path)
+    monkeypatch.setattr(jobqueue.REGISTRY, "_collectors", [])  # not this temporary queue's gauges
+    pool = WorkerPool(tmp_path, queue=queue)
+    asyncio.run(pool._run_job(queue.claim("w"), "w"))
+
+    assert queue.writers and threading.main_thread() not in queue.writers
+    events = queue.events(job.id)
+    assert [e.data["state"] for e in events if e.kind != EVENT_PROVIDER] == [
+        STATE_QUEUED, STATE_RESEARCHING, STATE_SYNTHESIZING, STATE_DONE,
+    ]
+    assert any(e.kind == EVENT_PROVIDER for e in events)
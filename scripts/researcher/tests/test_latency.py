@@ -0,0 +1,43 @@
+"""Latency statistics with timed-out calls."""
+
+from latency import DEADLINE_FACTOR, MIN_DEADLINE, LatencyHistory
+
+
+class NoArchive:
+    def runs(self):
+        return []
+
+
+def history(tmp_path, *samples: tuple[str, float]) -> LatencyHistory:
+    latency = LatencyHistory(tmp_path / "latency.jsonl", archive=NoArchive())
+    for status, seconds in samples:
+        latency.record("openai", "model", status, seconds)
+    return latency
+
+
+def test_all_completed_calls_give_plain_percentiles(tmp_path):
+    latency = history(tmp_path, *[("completed", float(s)) for s in range(100, 1100, 100)])
+    stats = latency.stats("openai", "model")
+    assert (stats.p50, stats.p90) == (500.0, 900.0)
+
+
+def test_timed_out_calls_are_lower_bounds(tmp_path):
+    latency = history(tmp_path, *[("completed", 1500.0)] * 5, *[("timed_out", 3000.0)] * 5)
+    stats = latency.stats("openai", "model")
+    assert (stats.successes, stats.timed_out) == (5, 5)
+    assert stats.p50 == 1500.0
+    # Half the calls ran past 3000s, so the p90 is at least that, not 1500s
+    assert stats.p90 == 3000.0
+
+
+def test_timeouts_alone_keep_a_growing_deadline(tmp_path):
+    latency = history(tmp_path, ("timed_out", 2400.0))
+    assert latency.stats("openai", "model").success_rate == 0.0
+    assert latency.deadline("openai", "model") == 2400.0 * DEADLINE_FACTOR
+
+
+def test_failures_alone_fall_back_to_the_minimum_deadline(tmp_path):
+    latency = history(tmp_path, ("failed", 3.0), ("failed", 4.0))
+    assert latency.deadline("openai", "model") == MIN_DEADLINE
+    assert latency.poll_interval("openai", "model", default=10.0) == 10.0
+    assert latency.stats("other", "model") is None
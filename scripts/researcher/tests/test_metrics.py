@@ -0,0 +1,71 @@
+"""Provider retry and poll counters."""
+
+import asyncio
+import re
+from types import SimpleNamespace
+
+from metrics import REGISTRY
+from progress import ResearchProgress
+from providers import openai_deep
+from providers.openai_deep import OpenAIDeepResearchProvider
+from retry import RetryPolicy
+
+
+def count(name: str, provider: str = "openai") -> float:
+    match = re.search(rf'^{name}\{{provider="{provider}"\}} (\S+)$', REGISTRY.render(), re.MULTILINE)
+    return float(match[1]) if match else 0.0
+
+
+class Dropped(Exception):
+    status_code = 503
+
+
+class Stream:
+    def __init__(self, events: list, fail: bool = False):
+        self.events = events
+        self.fail = fail
+
+    async def __aiter__(self):
+        for event in self.events:
+            yield event
+        if self.fail:
+            raise Dropped()
+
+    async def close(self):
+        pass
+
+
+def event(type: str, sequence_number: int, **fields) -> SimpleNamespace:
+    return SimpleNamespace(type=type, sequence_number=sequence_number, **fields)
+
+
+def test_a_dropped_stream_counts_one_retry_and_no_polls(monkeypatch):
+    monkeypatch.setattr(openai_deep, "DEFAULT_POLICY", RetryPolicy(base_delay=0.0, max_delay=0.0, jitter=0.0))
+    response = SimpleNamespace(id="resp_1", status="completed", error=None, usage=None)
+    first = Stream([
+        event("response.created", 0, response=response),
+        *[event("response.output_text.delta", i, delta="x") for i in range(1, 50)],
+    ], fail=True)
+    resumed = Stream([event("response.completed", 50, response=response)])
+
+    async def create(**kwargs):
+        return first
+
+    async def retrieve(response_id, **kwargs):
+        assert kwargs["starting_after"] == 49
+        return resumed
+
+    client = SimpleNamespace(responses=SimpleNamespace(create=create, retrieve=retrieve))
+    provider = OpenAIDeepResearchProvider(client=client)
+    retries, polls = count("researcher_provider_retries_total"), count("researcher_provider_polls_total")
+
+    # Messages that merely look like retries are not counted as one
+    with ResearchProgress(["openai"], live=False) as progress:
+        progress.update("openai", "polling", "Transient error (n/a), but only a message")
+        result = asyncio.run(provider.research(
+            "prompt", on_status=lambda message: progress.update("openai", "polling", message),
+        ))
+
+    assert result.status == "completed"
+    assert count("researcher_provider_retries_total") == retries + 1
+    assert count("researcher_provider_polls_total") == polls
@@ -0,0 +1,18 @@
+"""Streaming provider results into .partial/."""
+
+from fileio import read_compressed_text
+from partials import PartialStore
+
+
+def test_two_writers_of_one_provider_keep_their_own_temp_files(tmp_path):
+    store = PartialStore(tmp_path)
+    first = store.writer("openai", "model")
+    second = store.writer("openai", "model")
+    first.write("the whole report")
+    second.write("half of another")
+
+    entry = first.commit()
+    second.discard()
+
+    assert read_compressed_text(entry.body_path) == "the whole report"
+    assert not list(store.directory.glob("*.tmp"))
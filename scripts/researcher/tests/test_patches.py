@@ -0,0 +1,81 @@
+"""Section patches for incremental re-synthesis."""
+
+from types import SimpleNamespace
+
+import synthesis
+from citations import ReferenceTable, render_citations
+from patches import Patch, apply_patches, numbered, parse_patches, split_sections
+from providers.base import ResearchResult
+
+
+DOCUMENT = """Intro  with   odd spacing.
+
+## Background
+Tight paragraph under its heading.
+
+
+```python
+## not a heading inside a fence
+```
+
+### Details
+
+- a hand-edited list
+"""
+
+
+def test_sections_join_back_into_the_document():
+    sections = split_sections(DOCUMENT)
+    assert "".join(sections) == DOCUMENT
+    assert [s.splitlines()[0] for s in sections] == ["Intro  with   odd spacing.", "## Background", "### Details"]
+    assert "".join(split_sections("\n\n## Only\ntext")) == "\n\n## Only\ntext"
+    assert numbered(sections).startswith("[S1]\nIntro  with   odd spacing.\n\n[S2]\n## Background")
+
+
+def test_unpatched_sections_are_kept_byte_for_byte():
+    sections = split_sections(DOCUMENT)
+    patched, skipped = apply_patches(sections, [
+        Patch("content.md", "replace", 1, "New intro."),
+        Patch("content.md", "insert-after", 2, "### Added\n\nMore."),
+        Patch("content.md", "delete", 9),
+    ])
+
+    assert [p.section for p in skipped] == [9]
+    assert patched == "New intro.\n\n" + sections[1] + "### Added\n\nMore.\n\n" + sections[2]
+
+
+def test_patching_the_end_leaves_a_single_trailing_newline():
+    patched, _ = apply_patches(split_sections("## A\none\n\n## B\ntwo\n"), [Patch("content.md", "delete", 2)])
+    assert patched == "## A\none\n"
+    patched, _ = apply_patches(split_sections("## A\none"), [Patch("content.md", "insert-after", 1, "## B\ntwo")])
+    assert patched == "## A\none\n\n## B\ntwo\n"
+
+
+def test_parse_patches():
+    raw = "Sure.\n<<< content.md replace S2\n## New\n\nText.\n>>>\n<<< suggestions.md delete S1\n>>>\n"
+    assert parse_patches(raw) == [
+        Patch("content.md", "replace", 2, "## New\n\nText."),
+        Patch("suggestions.md", "delete", 1, ""),
+    ]
+
+
+def test_incremental_synthesis_leaves_untouched_citations_alone(monkeypatch):
+    table = ReferenceTable()
+    one, two = table.add("https://one.org/a", "One"), table.add("https://two.org/b", "Two")
+    content = render_citations(f"## A\nFirst  [{two}].\n\n## B\nSecond [{one}].\n", table)
+    # Edited by hand after rendering: extra spaces, its own wording
+    content = content.replace("First", "First,  kept")
+
+    answer = "<<< content.md replace S2\n## B\nRewritten [R3] and [R2].\n>>>\n"
+    monkeypatch.setattr(synthesis, "_respond", lambda client, instructions, prompt: answer)
+    report = ResearchResult("openai", "New [source](https://three.org/c).", "model", "completed")
+    monkeypatch.setattr(synthesis, "build_incremental_prompt", lambda *args: "prompt")
+
+    patched, _ = synthesis.synthesize_incremental(SimpleNamespace(), [report], content, "## S\nx\n", client=object())
+
+    assert patched.startswith("## A\nFirst,  kept  [[1]](https://two.org/b).\n\n## B\nRewritten ")
+    # The new source is numbered after the existing ones; both still cited are listed
+    assert "Rewritten [[3]](https://three.org/c) and [[2]](https://one.org/a)." in patched
+    assert patched.endswith(
+        "## References\n\n1. [Two](https://two.org/b)\n2. [One](https://one.org/a)\n3. [https://three.org/c](https://three.org/c)\n"
+    )
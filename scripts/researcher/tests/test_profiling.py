@@ -0,0 +1,55 @@
+"""Event-loop stall sampling of profiled stages."""
+
+import asyncio
+import time
+
+from profiling import RunProfiler
+
+
+def run_stage(body) -> RunProfiler:
+    profiler = RunProfiler("test")
+
+    async def main():
+        with profiler.stage("stage"):
+            await body()
+
+    asyncio.run(main())
+    return profiler
+
+
+def test_a_stage_that_blocks_the_loop_throughout_is_a_stall():
+    async def blocking():
+        time.sleep(0.3)
+
+    stage = run_stage(blocking).stages[0]
+    assert stage.sampled
+    assert stage.stalls and max(stage.stalls) >= 0.2
+
+
+def test_a_stage_that_awaits_has_no_stalls():
+    async def waiting():
+        await asyncio.sleep(0.3)
+
+    stage = run_stage(waiting).stages[0]
+    assert stage.sampled
+    assert not stage.stalls
+
+
+def test_time_at_a_prompt_is_not_a_stall():
+    profiler = RunProfiler("test")
+
+    async def main():
+        with profiler.stage("stage"):
+            with profiler.paused():
+                time.sleep(0.3)
+
+    asyncio.run(main())
+    assert not profiler.stages[0].stalls
+
+
+def test_stages_outside_the_loop_are_reported_as_not_sampled():
+    profiler = RunProfiler("test")
+    with profiler.stage("sync"):
+        pass
+    assert not profiler.stages[0].sampled
+    assert "not sampled" in profiler.report()
@@ -0,0 +1,160 @@
+"""Retry loop and circuit breaker behaviour."""
+
+import asyncio
+
+import pytest
+
+import retry
+from retry import CircuitBreaker, CircuitOpenError, RetryPolicy, is_unsent, retry_async, retry_sync
+
+
+FAST = RetryPolicy(max_attempts=5, base_delay=0.0, max_delay=0.0, jitter=0.0)
+
+
+class Transient(Exception):
+    status_code = 503
+
+
+class Fatal(Exception):
+    status_code = 400
+
+
+class Limited(Exception):
+    status_code = 429
+
+
+def flaky(failures: int, exc: type[Exception] = Transient):
+    """A call that fails `failures` times, then returns "ok"."""
+    calls = {"n": 0}
+
+    def fn():
+        calls["n"] += 1
+        if calls["n"] <= failures:
+            raise exc()
+        return "ok"
+
+    return fn, calls
+
+
+def test_sync_call_gets_every_attempt_before_the_breaker_counts_it():
+    breaker = CircuitBreaker("test", failure_threshold=3)
+    fn, calls = flaky(4)
+    assert retry_sync(fn, policy=FAST, breaker=breaker) == "ok"
+    assert calls["n"] == 5
+    assert breaker.state == "closed"
+    assert breaker.failures == 0
+
+
+def test_exhausted_call_counts_as_one_failure():
+    breaker = CircuitBreaker("test", failure_threshold=3)
+    fn, calls = flaky(10)
+    with pytest.raises(Transient):
+        retry_sync(fn, policy=FAST, breaker=breaker)
+    assert calls["n"] == FAST.max_attempts
+    assert breaker.failures == 1
+    assert breaker.state == "closed"
+
+
+def test_breaker_opens_after_threshold_exhausted_calls():
+    breaker = CircuitBreaker("test", failure_threshold=3)
+    for _ in range(3):
+        fn, _ = flaky(10)
+        with pytest.raises(Transient):
+            retry_sync(fn, policy=FAST, breaker=breaker)
+    assert breaker.state == "open"
+    fn, calls = flaky(0)
+    with pytest.raises(CircuitOpenError):
+        retry_sync(fn, policy=FAST, breaker=breaker)
+    assert calls["n"] == 0
+
+
+def test_non_transient_error_is_not_retried_or_counted():
+    breaker = CircuitBreaker("test")
+    fn, calls = flaky(1, Fatal)
+    with pytest.raises(Fatal):
+        retry_sync(fn, policy=FAST, breaker=breaker)
+    assert calls["n"] == 1
+    assert breaker.failures == 0
+
+
+def test_half_open_lets_a_single_trial_through():
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_timeout=0.0)
+    breaker.record_failure()
+    assert breaker.state == "half-open"
+    assert breaker.acquire()
+    assert not breaker.allow()
+    assert not breaker.acquire()
+    breaker.record_success()
+    assert breaker.state == "closed"
+    assert breaker.acquire()
+
+
+def test_failed_trial_reopens_the_circuit():
+    breaker = CircuitBreaker("test", failure_threshold=3, reset_timeout=60.0)
+    for _ in range(3):
+        breaker.record_failure()
+    breaker.opened_at -= 60.0
+    assert breaker.state == "half-open"
+    fn, _ = flaky(10)
+    with pytest.raises(Transient):
+        retry_sync(fn, policy=FAST, breaker=breaker)
+    assert breaker.state == "open"
+    assert not breaker.trial
+
+
+def test_trial_released_after_non_transient_error():
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_timeout=0.0)
+    breaker.record_failure()
+    fn, _ = flaky(1, Fatal)
+    with pytest.raises(Fatal):
+        retry_sync(fn, policy=FAST, breaker=breaker)
+    assert breaker.allow()
+
+
+def test_async_retry_uses_every_attempt():
+    breaker = CircuitBreaker("test", failure_threshold=3)
+    fn, calls = flaky(4)
+
+    async def call():
+        return fn()
+
+    assert asyncio.run(retry_async(call, policy=FAST, breaker=breaker)) == "ok"
+    assert calls["n"] == 5
+    assert breaker.state == "closed"
+
+
+def test_retry_after_header_sets_the_delay():
+    class LimitedFor7s(Limited):
+        class response:
+            headers = {"retry-after": "7"}
+
+    assert RetryPolicy(max_delay=120.0).delay_for(1, LimitedFor7s()) == 7.0
+    assert RetryPolicy(max_delay=5.0).delay_for(1, LimitedFor7s()) == 5.0
+
+
+def test_open_provider_hands_its_work_to_a_healthy_one(monkeypatch):
+    pipeline = pytest.importorskip("pipeline")
+    breakers = {"openai": CircuitBreaker("openai"), "gemini": CircuitBreaker("gemini")}
+    breakers["gemini"].opened_at = retry.time.monotonic()
+    monkeypatch.setattr(pipeline, "get_breaker", breakers.__getitem__)
+    models = {"openai": "o3-deep-research", "gemini": "deep-research-pro-preview-12-2025"}
+
+    assert pipeline.healthy_providers(["gemini"], models, done=set(), reattached=set()) == ["openai"]
+    # Already running: nothing to hand over to, so the open provider is skipped
+    assert pipeline.healthy_providers(["openai", "gemini"], models, done=set(), reattached=set()) == ["openai"]
+    # A reattached job keeps running whatever the breaker says
+    assert pipeline.healthy_providers(["gemini"], models, done=set(), reattached={"gemini"}) == ["gemini"]
+
+
+def test_a_call_that_may_have_landed_is_not_sent_again():
+    breaker = CircuitBreaker("test", failure_threshold=1)
+    fn, calls = flaky(1, Transient)
+    with pytest.raises(Transient):
+        retry_sync(fn, policy=FAST, breaker=breaker, retryable=is_unsent)
+    assert calls["n"] == 1
+    # Still a failed call as far as the breaker is concerned
+    assert breaker.state == "open"
+
+    fn, calls = flaky(2, Limited)
+    assert retry_sync(fn, policy=FAST, retryable=is_unsent) == "ok"
+    assert calls["n"] == 3
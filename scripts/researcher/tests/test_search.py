@@ -0,0 +1,35 @@
+"""The sharded full-text search index."""
+
+import json
+
+from artifact import render_artifact
+from search import SHARD_COUNT, SearchIndex, document_postings, shard_of
+
+
+def test_shards_are_two_hex_digits_spread_over_the_buckets():
+    assert shard_of("a") == "2c"  # FNV-1a("a") = 0xe40c292c
+    words = [f"term{i}" for i in range(2000)]
+    shards = {shard_of(w) for w in words}
+    assert all(len(s) == 2 for s in shards)
+    assert len(shards) > SHARD_COUNT * 0.9
+
+
+def test_stopwords_are_not_indexed_but_keep_positions():
+    postings, _ = document_postings(render_artifact("The heat of the shock protein"))
+    assert "the" not in postings and "of" not in postings
+    assert postings["heat"] == [1] and postings["shock"] == [4]
+
+
+def test_update_only_touches_the_documents_shards(tmp_path):
+    index = SearchIndex(tmp_path)
+    index.update("a", "A", "/playgrounds/a/research", render_artifact("# Intro\n\nCanalization buffers variation."))
+    index.update("b", "B", "/playgrounds/b/research", render_artifact("Chaperone buffering."))
+
+    assert json.loads((tmp_path / "docs.json").read_text())["shardCount"] == SHARD_COUNT
+    assert [r[0] for r in index.search("canalization")] == ["a"]
+    assert index.search("the buffering") == [("b", "/playgrounds/b/research", 1)]
+
+    rewritten = index.update("b", "B", "/playgrounds/b/research", render_artifact("Chaperone."))
+    # chaperone's postings are unchanged, so its shard is left alone
+    assert rewritten == [shard_of("buffering")]
+    assert index.search("buffering") == []
@@ -0,0 +1,51 @@
+"""Request validation of the HTTP control API."""
+
+import asyncio
+import json
+
+from jobqueue import JobQueue
+from server import ControlServer
+
+
+def exchange(tmp_path, raw: bytes) -> tuple[int, dict]:
+    """Send one raw request to a control server; returns (status, JSON body)."""
+    control = ControlServer(tmp_path, queue=JobQueue(tmp_path / "jobs.sqlite3"))
+
+    async def main() -> bytes:
+        server = await asyncio.start_server(control._handle, "127.0.0.1", 0)
+        async with server:
+            reader, writer = await asyncio.open_connection(*server.sockets[0].getsockname()[:2])
+            writer.write(raw)
+            await writer.drain()
+            response = await reader.read()
+            writer.close()
+            return response
+
+    response = asyncio.run(main())
+    head, _, body = response.partition(b"\r\n\r\n")
+    return int(head.split()[1]), json.loads(body)
+
+
+def post_jobs(body: str, length: str | None = None) -> bytes:
+    return (
+        "POST /jobs HTTP/1.1\r\nContent-Type: application/json\r\n"
+        f"Content-Length: {len(body) if length is None else length}\r\n\r\n{body}"
+    ).encode()
+
+
+def test_non_numeric_content_length_is_a_bad_request(tmp_path):
+    status, body = exchange(tmp_path, post_jobs("{}", length="ten"))
+    assert status == 400
+    assert "Content-Length" in body["error"]
+
+
+def test_negative_content_length_is_a_bad_request(tmp_path):
+    status, _ = exchange(tmp_path, post_jobs("{}", length="-1"))
+    assert status == 400
+
+
+def test_non_integer_batch_limit_is_a_bad_request(tmp_path):
+    for limit in ('"10"', "2.5", "-1", "true"):
+        status, body = exchange(tmp_path, post_jobs(f'{{"batch": {{"limit": {limit}}}}}'))
+        assert status == 400, limit
+        assert "batch.limit" in body["error"]
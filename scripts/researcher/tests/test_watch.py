@@ -0,0 +1,51 @@
+"""Which job watch mode queues for a settled playground."""
+
+from pathlib import Path
+
+import watch
+from archive import ResearchArchive, RunRecord
+from watch import JOB_RESEARCH, JOB_SYNTHESIZE, ResearchWatcher
+
+
+def watcher(tmp_path: Path, monkeypatch) -> tuple[ResearchWatcher, ResearchArchive, Path]:
+    playground = tmp_path / "app" / "playgrounds" / "(2025)" / "(01)" / "canalization"
+    (playground / "logic").mkdir(parents=True)
+    archive = ResearchArchive(tmp_path / "archive")
+    monkeypatch.setattr(watch, "ResearchArchive", lambda: archive)
+    return ResearchWatcher(tmp_path, ["openai"], debounce=0.0), archive, playground
+
+
+def settle(w: ResearchWatcher, *paths: Path) -> str:
+    for path in paths:
+        w.on_change(path)
+    w._deadlines.clear()
+    w._enqueue("canalization")
+    return w._pending.pop("canalization")
+
+
+def test_copy_edits_resynthesize_but_logic_edits_research(tmp_path, monkeypatch):
+    w, archive, playground = watcher(tmp_path, monkeypatch)
+    assert settle(w, playground / "page.tsx") == JOB_RESEARCH
+
+    archive.record_run(RunRecord(run_id="r1", playground="canalization", created_at=1.0))
+    assert settle(w, playground / "page.tsx") == JOB_SYNTHESIZE
+    assert settle(w, playground / "page.tsx", playground / "logic" / "model.ts") == JOB_RESEARCH
+    # The research edit was consumed by the job it queued
+    assert settle(w, playground / "playground.tsx") == JOB_SYNTHESIZE
+
+
+def test_the_run_index_is_only_reread_when_it_changes(tmp_path, monkeypatch):
+    w, archive, _ = watcher(tmp_path, monkeypatch)
+    archive.record_run(RunRecord(run_id="r1", playground="canalization", created_at=1.0))
+
+    reads = []
+    runs = archive.runs
+    monkeypatch.setattr(archive, "runs", lambda *args: reads.append(args) or runs(*args))
+
+    assert w._latest_runs() == {"canalization": "r1"}
+    assert w._latest_runs() == {"canalization": "r1"}
+    assert len(reads) == 1
+
+    archive.record_run(RunRecord(run_id="r2", playground="canalization", created_at=2.0))
+    assert w._latest_runs() == {"canalization": "r2"}
+    assert len(reads) == 2
@@ -0,0 +1,32 @@
+"""
+Offline token estimates for prompts.
+
+Counting exactly would need the model's tokenizer (and, for tiktoken, a
+download of its vocabulary on first use). Cost and size estimates only need
+to be close, so text is split the way BPE tokenizers roughly split it —
+words, digit groups, punctuation, whitespace runs — and each piece is charged
+by length. No network access is needed.
+"""
+
+import re
+
+# A leading space merges into the following word or number, as in BPE vocabularies
+_PIECES = re.compile(r" ?[^\W\d_]+| ?\d+|\s+|[^\w\s]|_")
+
+CHARS_PER_WORD_TOKEN = 6   # long words split into several tokens
+DIGITS_PER_TOKEN = 3
+
+_LONG_WORDS = re.compile(rf"[^\W\d_]{{{CHARS_PER_WORD_TOKEN + 1},}}")
+_LONG_NUMBERS = re.compile(rf"\d{{{DIGITS_PER_TOKEN + 1},}}")
+
+
+def count_tokens(text: str) -> int:
+    """Estimate how many tokens `text` takes in GPT-style tokenizers."""
+    # One token per piece, plus the extra tokens of pieces too long for one.
+    # findall keeps the per-piece work in C; only long pieces reach Python.
+    tokens = len(_PIECES.findall(text))
+    for word in _LONG_WORDS.findall(text):
+        tokens += (len(word) - 1) // CHARS_PER_WORD_TOKEN
+    for number in _LONG_NUMBERS.findall(text):
+        tokens += (len(number) - 1) // DIGITS_PER_TOKEN
+    return tokens
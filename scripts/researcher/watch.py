@@ -0,0 +1,390 @@
+"""
+Watch mode: re-research playgrounds when their sources change.
+
+Watches app/playgrounds/ with inotify (Linux, via ctypes) and falls back to
+polling file mtimes elsewhere. Bursts of edits are debounced per playground;
+each settled playground gets one queued job, and jobs run with bounded
+concurrency. When only a playground's copy changed (page.tsx, playground.tsx or
+its data.ts entry) and it has an archived run, it is re-synthesized from that
+run's provider reports against the new context; changes to logic/ or ideation/,
+and playgrounds never researched, get a full research run.
+"""
+
+import asyncio
+import ctypes
+import ctypes.util
+import os
+import struct
+import sys
+import time
+from pathlib import Path
+from typing import Callable
+
+from rich.console import Console
+
+from archive import ResearchArchive
+from context import find_data_entry
+from discovery import find_playground
+from pipeline import ResearchError, run_research
+from staleness import read_data_ts
+
+console = Console()
+
+DEFAULT_DEBOUNCE = 10.0  # seconds of quiet before a playground's job is queued
+DEFAULT_POLL_INTERVAL = 2.0  # seconds, polling fallback only
+
+# Inputs (relative to the playground directory) that trigger a job: the page's
+# copy, which a re-synthesis covers, and the model it describes, which needs research
+WATCHED_FILES = {"page.tsx", "playground.tsx"}
+WATCHED_DIRS = {"logic", "ideation"}
+
+JOB_RESEARCH = "research"
+JOB_SYNTHESIZE = "synthesize"
+
+
+def playground_for(path: Path, playgrounds_dir: Path) -> str | None:
+    """
+    Map a changed path to the slug of the playground whose inputs it belongs to.
+
+    Returns None for paths outside any playground's research inputs, including
+    the research/ output directory itself.
+    """
+    try:
+        parts = path.relative_to(playgrounds_dir).parts
+    except ValueError:
+        return None
+    # (YYYY)/(MM)/<slug>/<input>...
+    if len(parts) < 4 or not parts[0].startswith("(") or not parts[1].startswith("("):
+        return None
+    if parts[3] in WATCHED_FILES and len(parts) == 4:
+        return parts[2]
+    if parts[3] in WATCHED_DIRS and len(parts) > 4:
+        return parts[2]
+    return None
+
+
+def needs_research(path: Path, playgrounds_dir: Path) -> bool:
+    """
+    Whether a changed input (see `playground_for`) is in logic/ or ideation/,
+    which the archived provider reports cannot have covered.
+    """
+    parts = path.relative_to(playgrounds_dir).parts
+    return len(parts) > 4 and parts[3] in WATCHED_DIRS
+
+
+# ── Change sources ───────────────────────────────────────────────────────────
+
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = os.O_CLOEXEC
+
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+
+EVENT_HEADER = struct.Struct("iIII")  # wd, mask, cookie, name length
+
+
+class InotifySource:
+    """
+    Recursive inotify watch over the directories that hold research inputs.
+
+    Only the levels that matter are watched: app/playgrounds/ (for data.ts),
+    the (YYYY)/(MM)/ route groups, each playground directory and its logic/
+    and ideation/ subdirectories. New directories are picked up as they appear.
+    """
+
+    def __init__(self, playgrounds_dir: Path, on_change: Callable[[Path], None]):
+        libc_name = ctypes.util.find_library("c")
+        if sys.platform != "linux" or not libc_name:
+            raise OSError("inotify is only available on Linux")
+        self._libc = ctypes.CDLL(libc_name, use_errno=True)
+        self._fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+
+        self.playgrounds_dir = playgrounds_dir
+        self.on_change = on_change
+        self._dirs: dict[int, Path] = {}
+        self._add_tree(playgrounds_dir)
+
+    def _depth(self, path: Path) -> int:
+        return len(path.relative_to(self.playgrounds_dir).parts)
+
+    def _should_watch(self, path: Path) -> bool:
+        depth = self._depth(path)
+        if depth in (1, 2):
+            return path.name.startswith("(")
+        if depth == 4:
+            return path.name in WATCHED_DIRS
+        return depth <= 3
+
+    def _add_tree(self, path: Path) -> None:
+        if not self._should_watch(path):
+            return
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(path), WATCH_MASK)
+        if wd < 0:
+            console.print(f"[yellow]Could not watch {path} (errno {ctypes.get_errno()})[/yellow]")
+            return
+        self._dirs[wd] = path
+        if self._depth(path) < 4:
+            for child in path.iterdir():
+                if child.is_dir():
+                    self._add_tree(child)
+
+    def start(self, loop: asyncio.AbstractEventLoop) -> None:
+        loop.add_reader(self._fd, self._read_events)
+
+    def _read_events(self) -> None:
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return
+
+        offset = 0
+        while offset < len(data):
+            wd, mask, _cookie, length = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size
+            name = data[offset:offset + length].rstrip(b"\0")
+            offset += length
+
+            if mask & IN_Q_OVERFLOW:
+                console.print("[yellow]inotify queue overflowed; some changes may be missed[/yellow]")
+                continue
+            parent = self._dirs.get(wd)
+            if parent is None:
+                continue
+            path = parent / os.fsdecode(name)
+            if mask & IN_ISDIR and mask & (IN_CREATE | IN_MOVED_TO):
+                self._add_tree(path)
+            self.on_change(path)
+
+
+class PollingSource:
+    """Fallback: compare input file mtimes every few seconds."""
+
+    def __init__(
+        self,
+        playgrounds_dir: Path,
+        on_change: Callable[[Path], None],
+        interval: float = DEFAULT_POLL_INTERVAL,
+    ):
+        self.playgrounds_dir = playgrounds_dir
+        self.on_change = on_change
+        self.interval = interval
+        self._mtimes = self._snapshot()
+
+    def _snapshot(self) -> dict[Path, float]:
+        mtimes: dict[Path, float] = {}
+        data_ts = self.playgrounds_dir / "data.ts"
+        if data_ts.exists():
+            mtimes[data_ts] = data_ts.stat().st_mtime
+        for pg_dir in self.playgrounds_dir.glob("(*)/(*)/*"):
+            if not pg_dir.is_dir():
+                continue
+            for name in WATCHED_FILES:
+                f = pg_dir / name
+                if f.exists():
+                    mtimes[f] = f.stat().st_mtime
+            for name in WATCHED_DIRS:
+                for f in (pg_dir / name).glob("*"):
+                    if f.is_file():
+                        mtimes[f] = f.stat().st_mtime
+        return mtimes
+
+    def start(self, loop: asyncio.AbstractEventLoop) -> None:
+        loop.create_task(self._poll())
+
+    async def _poll(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            current = await asyncio.to_thread(self._snapshot)
+            for path in set(current) | set(self._mtimes):
+                if current.get(path) != self._mtimes.get(path):
+                    self.on_change(path)
+            self._mtimes = current
+
+
+# ── Watcher ──────────────────────────────────────────────────────────────────
+
+class ResearchWatcher:
+    """
+    Debounces source changes into research jobs and runs them.
+
+    Pending jobs are coalesced per playground (a pending full research absorbs
+    a later re-synthesis), a playground never has two jobs running at once, and
+    at most `concurrency` jobs run in total. The run index is only re-read when
+    it has changed, not on every queued job.
+    """
+
+    def __init__(
+        self,
+        project_root: Path,
+        provider_names: list[str],
+        focus: list[str] | None = None,
+        model_override: str | None = None,
+        debounce: float = DEFAULT_DEBOUNCE,
+        concurrency: int = 1,
+        polling: bool = False,
+        reuse_similar: bool = False,
+        focus_sections: bool = False,
+        incremental: bool = False,
+    ):
+        self.project_root = project_root
+        self.playgrounds_dir = project_root / "app" / "playgrounds"
+        self.provider_names = provider_names
+        self.focus = focus
+        self.model_override = model_override
+        self.debounce = debounce
+        self.concurrency = concurrency
+        self.polling = polling
+        self.reuse_similar = reuse_similar
+        self.focus_sections = focus_sections
+        self.incremental = incremental
+
+        self._deadlines: dict[str, float] = {}   # slug -> time its edits settle
+        self._pending: dict[str, str] = {}       # slug -> job kind, queued
+        self._running: set[str] = set()
+        self._research: set[str] = set()        # slugs with logic/ or ideation/ edits settling
+        self._latest: dict[str, str] = {}       # slug -> latest archived run id
+        self._index_stamp: tuple[int, int] | None = None
+        self._wakeup = asyncio.Event()
+        self._data_entries = self._data_entry_snapshot()
+
+    def _data_entry_snapshot(self) -> dict[str, str]:
+        data_ts = read_data_ts(self.project_root)
+        return {
+            pg_dir.name: find_data_entry(data_ts, f"/playgrounds/{pg_dir.name}")
+            for pg_dir in self.playgrounds_dir.glob("(*)/(*)/*")
+            if pg_dir.is_dir()
+        }
+
+    def on_change(self, path: Path) -> None:
+        """Record a changed path; called by the change source."""
+        if path == self.playgrounds_dir / "data.ts":
+            # Only playgrounds whose own entry changed are affected
+            current = self._data_entry_snapshot()
+            for slug, entry in current.items():
+                if self._data_entries.get(slug) != entry:
+                    self._touch(slug)
+            self._data_entries = current
+            return
+
+        slug = playground_for(path, self.playgrounds_dir)
+        if slug:
+            self._touch(slug, research=needs_research(path, self.playgrounds_dir))
+
+    def _touch(self, slug: str, research: bool = False) -> None:
+        if slug not in self._deadlines:
+            console.print(f"[dim]Change detected in {slug}; waiting for edits to settle...[/dim]")
+        if research:
+            self._research.add(slug)
+        self._deadlines[slug] = time.monotonic() + self.debounce
+        self._wakeup.set()
+
+    def _latest_runs(self) -> dict[str, str]:
+        """Latest archived run id per playground, re-read only when the index changed."""
+        archive = ResearchArchive()
+        try:
+            stat = archive.index_path.stat()
+        except FileNotFoundError:
+            return {}
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        if stamp != self._index_stamp:
+            self._latest = {record.playground: record.run_id for record in archive.runs()}
+            self._index_stamp = stamp
+        return self._latest
+
+    def _job_kind(self, slug: str) -> str:
+        if slug in self._research:
+            return JOB_RESEARCH
+        return JOB_SYNTHESIZE if slug in self._latest_runs() else JOB_RESEARCH
+
+    def _enqueue(self, slug: str) -> None:
+        kind = self._job_kind(slug)
+        self._research.discard(slug)
+        if self._pending.get(slug) == JOB_RESEARCH:
+            kind = JOB_RESEARCH
+        if slug in self._pending:
+            console.print(f"[dim]Coalesced with pending {self._pending[slug]} job for {slug}[/dim]")
+        else:
+            console.print(f"[#84cc16]Queued {kind} job for {slug}[/#84cc16]")
+        self._pending[slug] = kind
+
+    async def _run_job(self, slug: str, kind: str) -> None:
+        try:
+            playground_dir = find_playground(slug, self.project_root)
+            from_run = self._latest_runs().get(slug) if kind == JOB_SYNTHESIZE else None
+            await run_research(
+                playground_dir=playground_dir,
+                project_root=self.project_root,
+                provider_names=self.provider_names,
+                focus=self.focus,
+                model_override=self.model_override,
+                resume=False,
+                from_run=from_run,
+                interactive=False,
+                live_progress=False,
+                reuse_similar=self.reuse_similar,
+                focus_sections=self.focus_sections,
+                incremental=self.incremental,
+            )
+        except (ResearchError, FileNotFoundError) as e:
+            console.print(f"[bold red]{slug}: {kind} job failed: {e}[/bold red]")
+        except Exception as e:
+            console.print(f"[bold red]{slug}: {kind} job crashed: {e!r}[/bold red]")
+        finally:
+            self._running.discard(slug)
+            self._wakeup.set()
+
+    async def run(self) -> None:
+        """Watch and dispatch jobs until cancelled."""
+        loop = asyncio.get_running_loop()
+        source = None
+        if not self.polling:
+            try:
+                source = InotifySource(self.playgrounds_dir, self.on_change)
+                console.print("[dim]Watching with inotify.[/dim]")
+            except OSError as e:
+                console.print(f"[yellow]inotify unavailable ({e}); falling back to polling.[/yellow]")
+        if source is None:
+            source = PollingSource(self.playgrounds_dir, self.on_change)
+            console.print(f"[dim]Watching by polling every {source.interval:.0f}s.[/dim]")
+        source.start(loop)
+
+        console.print(
+            f"[bold #84cc16]Watching {self.playgrounds_dir} "
+            f"(debounce {self.debounce:.0f}s, concurrency {self.concurrency})[/bold #84cc16]"
+        )
+
+        tasks: set[asyncio.Task] = set()
+        while True:
+            now = time.monotonic()
+            for slug, deadline in list(self._deadlines.items()):
+                if deadline <= now:
+                    del self._deadlines[slug]
+                    self._enqueue(slug)
+
+            for slug in list(self._pending):
+                if len(self._running) >= self.concurrency:
+                    break
+                if slug in self._running:
+                    continue
+                kind = self._pending.pop(slug)
+                self._running.add(slug)
+                task = loop.create_task(self._run_job(slug, kind))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+
+            self._wakeup.clear()
+            timeout = None
+            if self._deadlines:
+                timeout = max(min(self._deadlines.values()) - time.monotonic(), 0.0)
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass